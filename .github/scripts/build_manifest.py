@@ -14,6 +14,7 @@ from common_utils import (
     log_info,
     log_success,
     log_warning,
+    memory_stage,
     exit_failure,
     exit_success,
     get_repo_root,
@@ -234,12 +235,14 @@ def main() -> None:
     log_info("Building skill manifest...")
 
     # Scan skills
-    skills = scan_skills_directory()
+    with memory_stage("manifest.scan"):
+        skills = scan_skills_directory()
     if not skills:
         exit_failure("No skills found to include in manifest")
 
     # Build manifest
-    manifest = build_manifest(skills)
+    with memory_stage("manifest.build"):
+        manifest = build_manifest(skills)
 
     # Validate
     if not validate_manifest_structure(manifest):
@@ -248,13 +251,14 @@ def main() -> None:
     # Save manifest files
     repo_root = get_repo_root()
 
-    json_path = repo_root / "SKILL_MANIFEST.json"
-    if not save_manifest_json(manifest, json_path):
-        exit_failure("Failed to save JSON manifest")
+    with memory_stage("manifest.save"):
+        json_path = repo_root / "SKILL_MANIFEST.json"
+        if not save_manifest_json(manifest, json_path):
+            exit_failure("Failed to save JSON manifest")
 
-    md_path = repo_root / "UNIFIED_SKILL_MANIFEST.md"
-    if not save_manifest_markdown(manifest, md_path):
-        exit_failure("Failed to save markdown manifest")
+        md_path = repo_root / "UNIFIED_SKILL_MANIFEST.md"
+        if not save_manifest_markdown(manifest, md_path):
+            exit_failure("Failed to save markdown manifest")
 
     exit_success(f"Manifest built successfully: {manifest['total_skills']} skills")
 
@@ -10,12 +10,14 @@ from typing import Any, Dict, List
 
 from common_utils import (
     find_all_skills,
+    find_files,
     find_skills_directory,
     load_json,
     log_error,
     log_info,
     log_success,
     log_warning,
+    memory_stage,
     exit_failure,
     exit_success,
     get_repo_root,
@@ -38,7 +40,7 @@ def check_directory_naming(skills_dir: Path) -> List[Dict[str, str]]:
         List of issues found
     """
     issues = []
-    skill_dirs = [d for d in skills_dir.glob("**/*") if d.is_dir() and (d / "SKILL.md").exists()]
+    skill_dirs = [f.parent for f in find_files("**/SKILL.md", skills_dir)]
 
     for skill_dir in skill_dirs:
         skill_name = skill_dir.name
@@ -63,7 +65,7 @@ def check_file_names(skills_dir: Path) -> List[Dict[str, str]]:
     """
     issues = []
 
-    for skill_file in skills_dir.glob("**/SKILL.md"):
+    for skill_file in find_files("**/SKILL.md", skills_dir):
         # All SKILL.md files should exist - just verify they're uppercase
         if skill_file.name != "SKILL.md":
             issues.append({
@@ -73,7 +75,7 @@ def check_file_names(skills_dir: Path) -> List[Dict[str, str]]:
             })
 
     # Check for incorrect skill.md (lowercase)
-    for skill_file in skills_dir.glob("**/skill.md"):
+    for skill_file in find_files("**/skill.md", skills_dir):
         issues.append({
             "type": "filename",
             "path": str(skill_file),
@@ -133,7 +135,7 @@ def verify_manifest_entries(skills_dir: Path) -> List[Dict[str, str]]:
         return issues
 
     # Get all skill names from directories
-    skill_dirs = [d for d in skills_dir.glob("**/SKILL.md")]
+    skill_dirs = find_files("**/SKILL.md", skills_dir)
     skill_names = [d.parent.name for d in skill_dirs]
 
     # Check that each skill is mentioned in manifest
@@ -198,7 +200,8 @@ def run_all_checks() -> Dict[str, Any]:
 
 def main() -> None:
     """Run consistency checks."""
-    results = run_all_checks()
+    with memory_stage("consistency.checks"):
+        results = run_all_checks()
 
     log_info(results["summary"])
 
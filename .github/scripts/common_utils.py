@@ -5,11 +5,23 @@ Common utilities for GitHub Actions workflow scripts.
 Provides shared functions for JSON handling, file discovery, logging, and exit codes.
 """
 
+import atexit
+import importlib.util
 import json
 import sys
 import os
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Dict, List
+from types import ModuleType
+from typing import Any, ContextManager, Dict, List
+
+# Gitignore matcher shared with the skill-recommendation-engine
+GITIGNORE_MODULE = Path("skills") / "meta" / "skill-recommendation-engine" / "lib" / "gitignore.py"
+# Metrics registry shared with the engine and the installer
+METRICS_MODULE = Path("skills") / "meta" / "skill-recommendation-engine" / "lib" / "metrics.py"
+# Memory profiler shared with the engine
+MEMPROFILE_MODULE = Path("skills") / "meta" / "skill-recommendation-engine" / "lib" / "memprofile.py"
 
 # Ensure UTF-8 output on all platforms
 if sys.stdout.encoding != "utf-8":
@@ -113,10 +125,95 @@ def save_json(data: Dict[str, Any], path: str | Path, pretty: bool = True) -> No
         sys.exit(1)
 
 
+def _load_engine_module(name: str, relative: Path) -> ModuleType:
+    """Load a stdlib-only module of the skill-recommendation-engine by file path."""
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, get_repo_root() / relative)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def load_gitignore_module() -> ModuleType:
+    """
+    Load the gitignore matcher from the skill-recommendation-engine by file path.
+
+    Returns:
+        The gitignore module (IgnoreMatcher, walk_files, glob_to_regex)
+    """
+    return _load_engine_module("skill_engine_gitignore", GITIGNORE_MODULE)
+
+
+def load_metrics_module() -> ModuleType:
+    """
+    Load the metrics registry from the skill-recommendation-engine by file path.
+
+    Returns:
+        The metrics module (REGISTRY, Counter, Histogram, export_at_exit_from_env)
+    """
+    return _load_engine_module("skill_engine_metrics", METRICS_MODULE)
+
+
+def _start_script_metrics() -> None:
+    """
+    Time this script run and export the registry at exit.
+
+    Written to <SKILL_METRICS_DIR>/skill_ci_<script>.prom when the variable
+    is set; a no-op otherwise.
+    """
+    if not os.environ.get("SKILL_METRICS_DIR"):
+        return
+    try:
+        metrics = load_metrics_module()
+    except (RuntimeError, ImportError, OSError):
+        return
+
+    script = Path(sys.argv[0]).stem or "interactive"
+    seconds = metrics.REGISTRY.histogram(
+        "skill_ci_script_seconds", "Wall time of .github script runs", ["script"])
+    metrics.export_at_exit_from_env(f"skill_ci_{script}")
+    start = time.perf_counter()
+    # Registered after the export hook, so it runs first
+    atexit.register(lambda: seconds.observe(time.perf_counter() - start, script))
+
+
+def load_memprofile_module() -> ModuleType:
+    """
+    Load the memory profiler from the skill-recommendation-engine by file path.
+
+    Importing it starts a process-wide profiler when SKILL_MEMORY_PROFILE is set.
+
+    Returns:
+        The memprofile module (MemoryProfiler, memory_stage)
+    """
+    return _load_engine_module("skill_engine_memprofile", MEMPROFILE_MODULE)
+
+
+def _start_script_memory_profile() -> None:
+    """Profile this script run into the SKILL_MEMORY_PROFILE JSON report, if set."""
+    if not os.environ.get("SKILL_MEMORY_PROFILE"):
+        return
+    try:
+        load_memprofile_module()
+    except (RuntimeError, ImportError, OSError):
+        pass
+
+
+def memory_stage(name: str) -> ContextManager[Any]:
+    """Measure a named stage of a script run when memory profiling is on."""
+    if "skill_engine_memprofile" in sys.modules:
+        return sys.modules["skill_engine_memprofile"].memory_stage(name)
+    return nullcontext()
+
+
 def find_files(pattern: str, directory: str | Path = ".") -> List[Path]:
     """
     Recursively find files matching glob pattern.
 
+    Directories ignored by .gitignore, nested ignore files or .git/info/exclude
+    are pruned rather than descended into.
+
     Args:
         pattern: Glob pattern (e.g., "**/*.md")
         directory: Root directory to search (default current)
@@ -125,7 +222,20 @@ def find_files(pattern: str, directory: str | Path = ".") -> List[Path]:
         List of matching Path objects
     """
     directory = Path(directory)
-    return sorted(directory.glob(pattern))
+    root = get_repo_root()
+    try:
+        directory.resolve().relative_to(root.resolve())
+    except ValueError:
+        root = directory  # outside the repository: apply the directory's own ignore files
+
+    gitignore = load_gitignore_module()
+    with memory_stage(f"find_files {pattern}"):
+        files = sorted(gitignore.walk_files(root, [pattern], start=directory))
+    if "skill_engine_metrics" in sys.modules:
+        sys.modules["skill_engine_metrics"].REGISTRY.counter(
+            "skill_ci_files_found_total", "Files matched by .github script searches", ["pattern"]
+        ).inc(len(files), pattern)
+    return files
 
 
 def find_skills_directory() -> Path:
@@ -156,7 +266,7 @@ def find_all_skills() -> List[Path]:
         List of paths to skill SKILL.md files
     """
     skills_dir = find_skills_directory()
-    skill_files = list(skills_dir.glob("**/SKILL.md"))
+    skill_files = find_files("**/SKILL.md", skills_dir)
 
     if not skill_files:
         log_warning("No SKILL.md files found")
@@ -182,6 +292,10 @@ def exit_failure(message: str = "Failure") -> None:
     sys.exit(1)
 
 
+_start_script_metrics()
+_start_script_memory_profile()
+
+
 if __name__ == "__main__":
     # Self-test
     log_info("Testing common_utils module")
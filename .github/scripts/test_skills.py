@@ -13,6 +13,7 @@ from common_utils import (
     log_info,
     log_success,
     log_warning,
+    memory_stage,
     save_json,
     exit_failure,
     exit_success,
@@ -211,7 +212,8 @@ def run_all_tests() -> Dict[str, Any]:
 
 def main() -> None:
     """Run skill testing."""
-    results = run_all_tests()
+    with memory_stage("skills.test"):
+        results = run_all_tests()
 
     # Save test results
     report_path = Path("test-results.json")
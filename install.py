@@ -8,10 +8,12 @@ and automated dependency management.
 """
 
 import argparse
+import importlib.util
 import json
 import os
 import shutil
 import sys
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
@@ -21,6 +23,42 @@ if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+# Metrics registry shared with the skill-recommendation-engine
+METRICS_MODULE = Path(__file__).parent / "skills" / "meta" / "skill-recommendation-engine" / "lib" / "metrics.py"
+
+
+def _load_metrics():
+    """Load the engine's metrics module by file path (None if unavailable)."""
+    try:
+        spec = importlib.util.spec_from_file_location("skill_engine_metrics", METRICS_MODULE)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except (ImportError, OSError, AttributeError):
+        return None
+    sys.modules["skill_engine_metrics"] = module
+    return module
+
+
+metrics = _load_metrics()
+if metrics is not None:
+    SKILLS_INSTALLED = metrics.REGISTRY.counter(
+        "skill_install_skills_total", "Skill install attempts by outcome", ["outcome"])
+    BYTES_COPIED = metrics.REGISTRY.counter(
+        "skill_install_bytes_copied_total", "Bytes of skill files copied")
+    COPY_SECONDS = metrics.REGISTRY.histogram(
+        "skill_install_copy_seconds", "Time to copy one skill file")
+    metrics.export_at_exit_from_env("skill_install")
+
+
+def _record_install(outcome: str, size: int = 0, seconds: Optional[float] = None) -> None:
+    """Count one install attempt (no-op without the metrics module)."""
+    if metrics is None:
+        return
+    SKILLS_INSTALLED.inc(1, outcome)
+    if seconds is not None:
+        BYTES_COPIED.inc(size)
+        COPY_SECONDS.observe(seconds)
+
 
 class SkillInstaller:
     """Main installer class for Claude Code skills."""
@@ -237,11 +275,13 @@ class SkillInstaller:
         skill_info = self.get_skill_info(skill_name)
         if not skill_info:
             print(f"❌ Skill '{skill_name}' not found")
+            _record_install("unknown")
             return False
         
         source_file = Path(skill_info["file"])
         if not source_file.exists():
             print(f"❌ Skill file not found: {source_file}")
+            _record_install("missing")
             return False
         
         target_file = Path(self.target_dir) / f"{skill_name}.md"
@@ -260,11 +300,14 @@ class SkillInstaller:
                     return False
             
             # Copy skill file
+            start = time.perf_counter()
             shutil.copy2(source_file, target_file)
+            _record_install("installed", target_file.stat().st_size, time.perf_counter() - start)
             print(f"✅ Installed: {skill_name} ({skill_info['description']})")
             return True
         except Exception as e:
             print(f"❌ Failed to install {skill_name}: {e}")
+            _record_install("failed")
             return False
     
     def install_category(self, category: str, dry_run: bool = False) -> bool:
@@ -385,8 +428,12 @@ Examples:
                        help="Preview installation without making changes")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Enable verbose output")
+    parser.add_argument("--metrics-file", type=str,
+                       help="Write Prometheus text-format metrics to this file at exit")
     
     args = parser.parse_args()
+    if args.metrics_file and metrics is not None:
+        metrics.REGISTRY.write_at_exit(args.metrics_file)
     
     # Initialize installer
     installer = SkillInstaller(args.target_dir)
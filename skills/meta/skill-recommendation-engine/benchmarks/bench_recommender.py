@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the Skill Recommendation Engine
+
+Generates synthetic repositories and feedback histories at several sizes,
+measures p50/p95 latency of the hot entry points, and compares the results
+against a stored baseline so that performance regressions fail the run.
+
+benchmarks/baseline.json holds the committed baseline for the preset
+scales. Timings depend on the machine, so record a baseline on the machine
+that runs the comparison (e.g. the CI runner) before relying on it: record
+mode runs the cases and stores their timings instead of comparing, merging
+them into the existing baseline case by case.
+
+Usage:
+    python benchmarks/bench_recommender.py --scales small medium
+    python benchmarks/bench_recommender.py --scales small medium --record
+    python benchmarks/bench_recommender.py --files 5000 --commits 200 --feedback 2000
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add parent directory to path to allow package imports
+parent_path = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_path))
+
+from lib.context_analyzer import ContextAnalyzer
+from lib.recommender import SkillRecommender
+from lib.user_patterns import UserPatternAnalyzer
+
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+# Preset sizes: (files in tree, commits in history, feedback entries)
+SCALES = {
+    "small": {"files": 100, "commits": 10, "feedback": 10},
+    "medium": {"files": 10_000, "commits": 5_000, "feedback": 10_000},
+    "large": {"files": 100_000, "commits": 50_000, "feedback": 100_000},
+    "huge": {"files": 1_000_000, "commits": 500_000, "feedback": 1_000_000},
+}
+
+FILE_EXTENSIONS = [".py", ".js", ".ts", ".md", ".json", ".rs", ".go"]
+SKILL_NAMES = [
+    "quick-test-runner", "diff-summariser", "dependency-audit",
+    "dead-code-hunter", "refactoring", "lean-plan", "repo-briefing",
+]
+ACTIVITIES = ["coding", "refactoring", "testing", "exploring"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of samples.
+
+    Args:
+        samples: Measured values (need not be sorted)
+        pct: Percentile 0-100
+
+    Returns:
+        The sample at the requested rank, or 0.0 for an empty list.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without floats
+    return ordered[int(rank) - 1]
+
+
+def _git(repo: Path, *args: str, stdin: Optional[bytes] = None) -> None:
+    """Run a git command in repo, raising on failure."""
+    subprocess.run(
+        ["git", *args],
+        cwd=repo,
+        input=stdin,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def generate_repository(root: Path, files: int, commits: int, dirty_ratio: float = 0.01) -> Path:
+    """
+    Create a synthetic git repository.
+
+    The history is written with a single ``git fast-import`` stream so that
+    hundreds of thousands of commits cost one process. The first commit adds
+    every file; each following commit touches one file. A fraction of the
+    tree is then modified in the working directory so git status has work to do.
+
+    Args:
+        root: Directory in which to create the repository
+        files: Number of tracked files
+        commits: Number of commits in history (at least 1)
+        dirty_ratio: Fraction of tracked files left modified
+
+    Returns:
+        Path to the repository.
+    """
+    repo = root / "repo"
+    repo.mkdir(parents=True)
+    _git(repo, "init", "-q")
+
+    paths = [
+        f"pkg{i % 97}/mod{i % 13}/file{i}{FILE_EXTENSIONS[i % len(FILE_EXTENSIONS)]}"
+        for i in range(files)
+    ]
+
+    start = int((datetime.now() - timedelta(days=800)).timestamp())
+    stream: List[bytes] = [b"blob\nmark :1\ndata 2\nx\n"]
+    commits = max(1, commits)
+    for n in range(commits):
+        ts = start + n * 60
+        message = f"commit {n}\n".encode()
+        header = (
+            f"commit refs/heads/master\nmark :{n + 2}\n"
+            f"committer Bench <bench@example.com> {ts} +0000\n"
+            f"data {len(message)}\n"
+        ).encode()
+        stream.append(header + message)
+        if n == 0:
+            stream.append(b"".join(f"M 100644 :1 {p}\n".encode() for p in paths))
+        else:
+            body = f"commit {n}\n".encode()
+            target = paths[n % len(paths)] if paths else "README.md"
+            stream.append(f"M 100644 inline {target}\ndata {len(body)}\n".encode() + body)
+        stream.append(b"\n")
+
+    _git(repo, "fast-import", "--quiet", stdin=b"".join(stream))
+    _git(repo, "checkout", "-q", "-f", "master")
+
+    (repo / "requirements.txt").write_text("requests==2.31.0\npytest\n")
+    (repo / "README.md").write_text("# Synthetic benchmark repository\n" * 50)
+
+    rng = random.Random(files)
+    for p in rng.sample(paths, int(len(paths) * dirty_ratio)):
+        with open(repo / p, "a", encoding="utf-8") as f:
+            f.write("y\n")
+
+    return repo
+
+
+def generate_feedback(data_dir: Path, entries: int) -> None:
+    """
+    Write a synthetic feedback history and matching preferences.
+
+    Args:
+        data_dir: Data directory used by UserPatternAnalyzer
+        entries: Number of feedback entries
+    """
+    data_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(entries)
+    base = datetime(2025, 1, 1)
+
+    feedback = []
+    for i in range(entries):
+        feedback.append({
+            "timestamp": (base + timedelta(seconds=i * 30)).isoformat() + "Z",
+            "skill": rng.choice(SKILL_NAMES),
+            "context": {
+                "current_activity": rng.choice(ACTIVITIES),
+                "file_types": rng.sample(FILE_EXTENSIONS, 2),
+                "project_type": "python",
+            },
+            "outcome": "success" if rng.random() < 0.7 else "failure",
+            "user_rating": rng.randint(1, 5),
+            "notes": "",
+        })
+
+    with open(data_dir / "feedback_history.json", "w", encoding="utf-8") as f:
+        json.dump({"version": "1.0", "feedback": feedback}, f)
+
+    with open(data_dir / "preferences.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "version": "1.0",
+            "preferred_skills": SKILL_NAMES[:2],
+            "avoided_skills": [],
+            "skill_success_rates": {name: 0.6 for name in SKILL_NAMES},
+            "complexity_tolerance": "medium",
+            "domain_expertise": ["development"],
+        }, f)
+
+
+def time_operation(
+    operation: Callable[..., Any],
+    iterations: int,
+    warmup: int = 1,
+    setup: Optional[Callable[[], Any]] = None
+) -> Dict[str, float]:
+    """
+    Time repeated calls of an operation.
+
+    Args:
+        operation: Callable to measure; takes setup's result when setup is given
+        iterations: Number of measured calls
+        warmup: Number of unmeasured calls made first
+        setup: Untimed callable run before every call to prepare its state
+
+    Returns:
+        Dict with p50_ms, p95_ms, min_ms, max_ms and iterations.
+    """
+    def call() -> float:
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        operation(*args)
+        return (time.perf_counter() - start) * 1000
+
+    for _ in range(warmup):
+        call()
+
+    samples = [call() for _ in range(iterations)]
+
+    return {
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "iterations": iterations,
+    }
+
+
+def run_case(name: str, files: int, commits: int, feedback: int, iterations: int) -> Dict[str, Any]:
+    """
+    Build one synthetic environment and benchmark all operations against it.
+
+    Args:
+        name: Case name used as the key in results
+        files: Tracked files in the synthetic repository
+        commits: Commits in the synthetic history
+        feedback: Entries in the synthetic feedback history
+        iterations: Measured calls per operation
+
+    Returns:
+        Dict describing the case sizes and per-operation timings.
+    """
+    skills_dir = str(parent_path.parent.parent.parent)
+    tmp = Path(tempfile.mkdtemp(prefix=f"bench-{name}-"))
+    try:
+        setup_start = time.perf_counter()
+        repo = generate_repository(tmp, files, commits)
+        data_dir = tmp / "data"
+        generate_feedback(data_dir, feedback)
+        setup_s = time.perf_counter() - setup_start
+
+        recommender = SkillRecommender(
+            skills_dir=skills_dir,
+            data_dir=str(data_dir),
+            working_dir=str(repo)
+        )
+        patterns = UserPatternAnalyzer(data_dir=str(data_dir))
+        context = ContextAnalyzer(working_dir=str(repo)).analyze()
+
+        def fresh_history() -> UserPatternAnalyzer:
+            # Every record_feedback call appends to a copy of the generated history,
+            # so later iterations do not measure a history earlier ones have grown
+            copy = Path(tempfile.mkdtemp(prefix="history-", dir=tmp))
+            for filename in ("feedback_history.json", "preferences.json"):
+                shutil.copyfile(data_dir / filename, copy / filename)
+            return UserPatternAnalyzer(data_dir=str(copy))
+
+        operations = {
+            "recommend": (lambda: recommender.recommend(top_n=5, min_confidence=0.0), None),
+            "record_feedback": (lambda fresh: fresh.record_feedback(
+                "quick-test-runner", context, "success", rating=4
+            ), fresh_history),
+            "calculate_skill_affinity": (lambda: patterns.calculate_skill_affinity(
+                "quick-test-runner", context
+            ), None),
+        }
+
+        results = {
+            op: time_operation(fn, iterations, setup=setup)
+            for op, (fn, setup) in operations.items()
+        }
+
+        return {
+            "sizes": {"files": files, "commits": commits, "feedback": feedback},
+            "setup_seconds": round(setup_s, 2),
+            "operations": results,
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare_to_baseline(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float
+) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    A regression is a p95 latency more than ``tolerance`` above the baseline
+    p95 for the same case and operation. Cases or operations missing from
+    the baseline are not compared.
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Previously saved output of run_benchmarks
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        List of human-readable regression descriptions (empty if none).
+    """
+    regressions = []
+    base_cases = baseline.get("cases", {})
+
+    for case_name, case in results.get("cases", {}).items():
+        base_case = base_cases.get(case_name)
+        if not base_case:
+            continue
+        for op, timing in case["operations"].items():
+            base_timing = base_case.get("operations", {}).get(op)
+            if not base_timing:
+                continue
+            limit = base_timing["p95_ms"] * (1 + tolerance)
+            if timing["p95_ms"] > limit:
+                regressions.append(
+                    f"{case_name}/{op}: p95 {timing['p95_ms']:.1f}ms > "
+                    f"{limit:.1f}ms (baseline {base_timing['p95_ms']:.1f}ms)"
+                )
+
+    return regressions
+
+
+def run_benchmarks(cases: Dict[str, Dict[str, int]], iterations: int) -> Dict[str, Any]:
+    """
+    Run every benchmark case.
+
+    Args:
+        cases: Mapping of case name to {files, commits, feedback}
+        iterations: Measured calls per operation
+
+    Returns:
+        Results dict suitable for JSON output and baseline comparison.
+    """
+    results = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": {},
+    }
+
+    for name, sizes in cases.items():
+        print(f"[{name}] files={sizes['files']:,} commits={sizes['commits']:,} "
+              f"feedback={sizes['feedback']:,}")
+        case = run_case(name, sizes["files"], sizes["commits"], sizes["feedback"], iterations)
+        results["cases"][name] = case
+        for op, timing in case["operations"].items():
+            print(f"  {op:<26} p50 {timing['p50_ms']:>10.2f}ms   p95 {timing['p95_ms']:>10.2f}ms")
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the skill recommendation engine on synthetic repositories"
+    )
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=["small"],
+                        help="Preset sizes to run (default: small)")
+    parser.add_argument("--files", type=int, help="Custom case: files in the repository")
+    parser.add_argument("--commits", type=int, default=100, help="Custom case: commits in history")
+    parser.add_argument("--feedback", type=int, default=100, help="Custom case: feedback entries")
+    parser.add_argument("--iterations", type=int, default=20, help="Measured calls per operation")
+    parser.add_argument("--output", type=Path, help="Write results JSON to this path")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed p95 slowdown relative to baseline (default 0.25)")
+    parser.add_argument("--record", "--save-baseline", dest="record", action="store_true",
+                        help="Record mode: store these results in the baseline instead of comparing")
+    args = parser.parse_args()
+
+    if args.files is not None:
+        cases = {"custom": {"files": args.files, "commits": args.commits, "feedback": args.feedback}}
+    else:
+        cases = {name: SCALES[name] for name in args.scales}
+
+    results = run_benchmarks(cases, args.iterations)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    if args.record:
+        baseline = {"cases": {}}
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        baseline.setdefault("cases", {}).update(results["cases"])
+        args.baseline.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --record to create one")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("Performance regressions detected:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,39 +14,77 @@ Usage:
 
     # Record feedback
     record_feedback("quick-test-runner", "success", rating=5, notes="Very helpful!")
+
+    # Replay a JSONL stream of usage events in one pass
+    recorded, skipped = ingest_feedback("events.jsonl")
+
+    # From asyncio code
+    recommendations = await get_recommendations_async(top_n=3, deadline_ms=200)
 """
 
-from typing import List, Optional
+import asyncio
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 # Import main components
-from .recommender import SkillRecommender, Recommendation
+from .recommender import SkillRecommender, Recommendation, RecommendationPlan, MonorepoRecommendations
+from .monorepo import MonorepoAnalyzer
 from .context_analyzer import ContextAnalysis, ContextAnalyzer
+from .context_watcher import ContextWatcher
 from .project_analyzer import ProjectState, ProjectAnalyzer
-from .user_patterns import UserPreferences, UserPatternAnalyzer
-from .skill_metadata import SkillMetadata, SkillMetadataLoader
+from .user_patterns import UserPreferences, UserPatternAnalyzer, read_feedback_events
+from .feedback_columns import FeedbackColumns
+from .skill_metadata import SkillMetadata, SkillMetadataLoader, default_skill_roots
 from .skill_utility import SkillUtility, SkillUtilityScorer
 from .confidence_scorer import ConfidenceScorer
+from .metrics import REGISTRY as METRICS
+from .memprofile import MemoryProfiler, memory_stage
+from .git_objects import GitObjects, git_objects
+from .replay import ReplayEvaluator, ReplayReport
+from .next_skills import NEXT_SKILLS_FILE, NextSkillTable, feedback_stamp, refresh_in_background
 
 __version__ = "1.0.0"
 __all__ = [
     # Main functions
     "get_recommendations",
     "record_feedback",
+    "ingest_feedback",
+    "get_recommendation_plan",
+    "get_monorepo_recommendations",
+    "get_recommendations_async",
+    "record_feedback_async",
+    "analyze_current_context_async",
+    "default_skill_roots",
+    "write_metrics",
+    "memory_stage",
+    "git_objects",
+    "suggest_next_skills",
 
     # Classes
     "SkillRecommender",
     "Recommendation",
+    "RecommendationPlan",
+    "MonorepoRecommendations",
+    "MonorepoAnalyzer",
     "ContextAnalysis",
     "ContextAnalyzer",
+    "ContextWatcher",
     "ProjectState",
     "ProjectAnalyzer",
     "UserPreferences",
     "UserPatternAnalyzer",
+    "FeedbackColumns",
     "SkillMetadata",
     "SkillMetadataLoader",
     "SkillUtility",
     "SkillUtilityScorer",
-    "ConfidenceScorer"
+    "ConfidenceScorer",
+    "MemoryProfiler",
+    "ReplayEvaluator",
+    "ReplayReport",
+    "NextSkillTable",
+    "GitObjects"
 ]
 
 
@@ -54,7 +92,8 @@ def get_recommendations(
     top_n: int = 5,
     min_confidence: float = 60.0,
     skills_dir: Optional[str] = None,
-    data_dir: Optional[str] = None
+    data_dir: Optional[str] = None,
+    deadline_ms: Optional[float] = None
 ) -> List[Recommendation]:
     """
     Quick function to get skill recommendations.
@@ -64,6 +103,7 @@ def get_recommendations(
         min_confidence: Minimum confidence threshold 0-100 (default 60)
         skills_dir: Optional skills directory for metadata
         data_dir: Optional data directory for user preferences
+        deadline_ms: Optional analysis time budget (e.g. 50 for an interactive hook)
 
     Returns:
         List of Recommendation objects sorted by confidence.
@@ -77,7 +117,71 @@ def get_recommendations(
         dependency-audit (72.3%): Mature project (2+ years old) - Review dependency health
     """
     recommender = SkillRecommender(skills_dir=skills_dir, data_dir=data_dir)
-    return recommender.recommend(top_n=top_n, min_confidence=min_confidence)
+    return recommender.recommend(top_n=top_n, min_confidence=min_confidence, deadline_ms=deadline_ms)
+
+
+def get_recommendation_plan(
+    token_budget: Optional[int] = None,
+    min_confidence: float = 60.0,
+    method: str = "dp",
+    skills_dir: Optional[str] = None,
+    data_dir: Optional[str] = None
+) -> RecommendationPlan:
+    """
+    Get the highest-value set of skills that fits a token budget.
+
+    Args:
+        token_budget: Token budget to fill (defaults to CLAUDE_TOKEN_BUDGET / 150000)
+        min_confidence: Minimum confidence for a skill to be considered (default 60)
+        method: "dp" for an exact selection, "greedy" for a fast approximation
+        skills_dir: Optional skills directory for metadata
+        data_dir: Optional data directory for user preferences
+
+    Returns:
+        RecommendationPlan with the chosen recommendations and expected token cost.
+
+    Example:
+        >>> plan = get_recommendation_plan(token_budget=1500)
+        >>> print(f"{[r.skill.name for r in plan.recommendations]} ({plan.expected_token_cost} tokens)")
+        ['quick-test-runner', 'diff-summariser', 'dependency-audit'] (1300 tokens)
+    """
+    recommender = SkillRecommender(skills_dir=skills_dir, data_dir=data_dir)
+    return recommender.recommend_within_budget(
+        token_budget=token_budget,
+        min_confidence=min_confidence,
+        method=method
+    )
+
+
+def get_monorepo_recommendations(
+    top_n: int = 5,
+    min_confidence: float = 60.0,
+    skills_dir: Optional[str] = None,
+    data_dir: Optional[str] = None,
+    deadline_ms: Optional[float] = None
+) -> MonorepoRecommendations:
+    """
+    Get recommendations for a monorepo, ranked by which packages have changes.
+
+    Args:
+        top_n: Number of recommendations to return (default 5)
+        min_confidence: Minimum confidence threshold 0-100 (default 60)
+        skills_dir: Optional skills directory for metadata
+        data_dir: Optional data directory for user preferences
+        deadline_ms: Optional analysis time budget
+
+    Returns:
+        MonorepoRecommendations with aggregated and per-package recommendations.
+
+    Example:
+        >>> result = get_monorepo_recommendations(top_n=3)
+        >>> for rec in result.recommendations:
+        ...     print(f"{rec.skill.name} ({rec.confidence:.1f}%): {', '.join(rec.packages)}")
+        quick-test-runner (88.0%): packages/api, packages/web
+        dependency-audit (74.5%): packages/web
+    """
+    recommender = SkillRecommender(skills_dir=skills_dir, data_dir=data_dir)
+    return recommender.recommend_monorepo(top_n=top_n, min_confidence=min_confidence, deadline_ms=deadline_ms)
 
 
 def record_feedback(
@@ -123,6 +227,88 @@ def record_feedback(
     )
 
 
+def write_metrics(path: Union[str, Path]) -> bool:
+    """
+    Write the engine's operational metrics in Prometheus text format.
+
+    Counters and histograms cover recommend latency, git subprocess time,
+    files scanned, cache hits and misses, and feedback file rewrites. Set
+    SKILL_METRICS_DIR instead to have them written to
+    <dir>/skill_engine.prom at exit.
+
+    Args:
+        path: Output file (e.g. in node-exporter's textfile collector directory)
+
+    Returns:
+        True if the file was written.
+    """
+    return METRICS.write(path)
+
+
+def ingest_feedback(
+    events: Union[str, Path, Iterable[Dict[str, Any]]],
+    data_dir: Optional[str] = None
+) -> Tuple[int, int]:
+    """
+    Record many feedback events at once (e.g. replayed team telemetry).
+
+    Unlike record_feedback, no context analysis is run per event and the
+    history and preferences are written once for the whole stream.
+
+    Args:
+        events: Path to a JSONL file of events, or an iterable of event dicts
+                (see UserPatternAnalyzer.record_feedback_batch for the fields)
+        data_dir: Optional data directory for storing feedback
+
+    Returns:
+        (recorded, skipped) event counts.
+
+    Example:
+        >>> ingest_feedback("events.jsonl")
+        (98412, 3)
+    """
+    analyzer = UserPatternAnalyzer(data_dir=data_dir)
+    if isinstance(events, (str, Path)):
+        with open(events, "r", encoding="utf-8") as f:
+            return analyzer.record_feedback_batch(read_feedback_events(f))
+    return analyzer.record_feedback_batch(events)
+
+
+def suggest_next_skills(
+    skill_name: str,
+    limit: int = 3,
+    data_dir: Optional[str] = None
+) -> List[Tuple[str, float]]:
+    """
+    Suggest follow-up skills for a skill that just completed.
+
+    Reads the next-skill table mined from the feedback history (see
+    scripts/mine_next_skills.py); no context analysis or scoring is run.
+    If the history changed since, the stored table is still used and a
+    background thread re-mines it with its own parameters.
+
+    Args:
+        skill_name: Skill that just completed
+        limit: Maximum number of suggestions
+        data_dir: Optional data directory containing next_skills.json
+
+    Returns:
+        [(skill, confidence 0.0-1.0)], most likely first.
+
+    Example:
+        >>> suggest_next_skills("diff-summariser")
+        [('quick-test-runner', 0.62), ('dependency-audit', 0.18)]
+    """
+    analyzer = UserPatternAnalyzer(data_dir=data_dir)
+    table_path = analyzer.data_dir / NEXT_SKILLS_FILE
+    table = NextSkillTable.load(table_path)
+    if table is None:
+        return []
+    if table.source != feedback_stamp(analyzer.feedback_file):
+        refresh_in_background(table_path, analyzer.feedback_file, analyzer.load_feedback_columns)
+    return table.next_skills(skill_name, limit)
+
+
 def get_recommendations_for_scenario(
     scenario: str,
     skills_dir: Optional[str] = None,
@@ -151,12 +337,16 @@ def get_recommendations_for_scenario(
     return recommender.recommend_for_scenario(scenario)
 
 
-def analyze_current_context(working_dir: Optional[str] = None) -> ContextAnalysis:
+def analyze_current_context(
+    working_dir: Optional[str] = None,
+    deadline_ms: Optional[float] = None
+) -> ContextAnalysis:
     """
     Analyze the current working context.
 
     Args:
         working_dir: Optional working directory (defaults to current)
+        deadline_ms: Optional time budget; see ContextAnalysis.field_confidence
 
     Returns:
         ContextAnalysis object with current activity, file types, etc.
@@ -171,7 +361,7 @@ def analyze_current_context(working_dir: Optional[str] = None) -> ContextAnalysi
         Project type: python
     """
     analyzer = ContextAnalyzer(working_dir=working_dir)
-    return analyzer.analyze()
+    return analyzer.analyze(deadline_ms=deadline_ms)
 
 
 def get_user_preferences(data_dir: Optional[str] = None) -> UserPreferences:
@@ -198,3 +388,93 @@ def get_user_preferences(data_dir: Optional[str] = None) -> UserPreferences:
 # Convenience aliases
 recommend = get_recommendations
 feedback = record_feedback
+
+
+async def get_recommendations_async(
+    top_n: int = 5,
+    min_confidence: float = 60.0,
+    skills_dir: Optional[str] = None,
+    data_dir: Optional[str] = None,
+    deadline_ms: Optional[float] = None
+) -> List[Recommendation]:
+    """
+    Asyncio version of get_recommendations().
+
+    Git runs as asyncio subprocesses and filesystem work runs in the default
+    executor, so the event loop is never blocked. Context, project and
+    preference loading run concurrently; cancelling the call kills git.
+
+    Args:
+        top_n: Number of recommendations to return (default 5)
+        min_confidence: Minimum confidence threshold 0-100 (default 60)
+        skills_dir: Optional skills directory for metadata
+        data_dir: Optional data directory for user preferences
+        deadline_ms: Optional analysis time budget
+
+    Returns:
+        List of Recommendation objects sorted by confidence.
+
+    Example:
+        >>> recommendations = await get_recommendations_async(top_n=3, deadline_ms=200)
+    """
+    loop = asyncio.get_running_loop()
+    recommender = await loop.run_in_executor(
+        None, partial(SkillRecommender, skills_dir=skills_dir, data_dir=data_dir)
+    )
+    return await recommender.recommend_async(
+        top_n=top_n, min_confidence=min_confidence, deadline_ms=deadline_ms
+    )
+
+
+async def record_feedback_async(
+    skill_name: str,
+    outcome: str,
+    rating: Optional[int] = None,
+    notes: str = "",
+    data_dir: Optional[str] = None
+) -> None:
+    """
+    Asyncio version of record_feedback().
+
+    The context is analyzed with an asyncio git subprocess; the feedback
+    and preference files are written in the default executor.
+
+    Args:
+        skill_name: Name of skill that was used
+        outcome: "success" or "failure"
+        rating: Optional 1-5 star rating
+        notes: Optional text notes about the experience
+        data_dir: Optional data directory for storing feedback
+    """
+    loop = asyncio.get_running_loop()
+    context = await ContextAnalyzer().analyze_async()
+
+    def write() -> None:
+        analyzer = UserPatternAnalyzer(data_dir=data_dir)
+        analyzer.record_feedback(
+            skill=skill_name,
+            context=context,
+            outcome=outcome,
+            rating=rating,
+            notes=notes
+        )
+
+    await loop.run_in_executor(None, write)
+
+
+async def analyze_current_context_async(
+    working_dir: Optional[str] = None,
+    deadline_ms: Optional[float] = None
+) -> ContextAnalysis:
+    """
+    Asyncio version of analyze_current_context().
+
+    Args:
+        working_dir: Optional working directory (defaults to current)
+        deadline_ms: Optional time budget; see ContextAnalysis.field_confidence
+
+    Returns:
+        ContextAnalysis object with current activity, file types, etc.
+    """
+    analyzer = ContextAnalyzer(working_dir=working_dir)
+    return await analyzer.analyze_async(deadline_ms=deadline_ms)
@@ -8,7 +8,7 @@ Calculates recommendation confidence by combining:
 - Utility + success bonus (10 points)
 """
 
-from typing import Optional
+from typing import Optional, Tuple
 
 # Import data structures
 try:
@@ -25,6 +25,9 @@ except ImportError:
     UserPreferences = None
     SkillUtility = None
 
+# Token budget below which budget-friendly skills get a context bonus
+LOW_TOKEN_BUDGET = 50000
+
 
 class ConfidenceScorer:
     """Calculates confidence scores for skill recommendations."""
@@ -119,7 +122,7 @@ class ConfidenceScorer:
                 score += 0.2
 
         # Token budget considerations
-        if token_budget < 50000:  # Low budget
+        if token_budget < LOW_TOKEN_BUDGET:  # Low budget
             if skill_name in ["lean-plan", "dependency-audit", "diff-summariser"]:
                 score += 0.2
 
@@ -136,6 +139,71 @@ class ConfidenceScorer:
 
         return min(1.0, score)
 
+    def context_signature(self, context: any) -> Tuple[str, str, str, str]:
+        """
+        Reduce a context to the features analyze_context_relevance depends on.
+
+        Two contexts with the same signature get the same context relevance
+        for every skill, so the signature can key precomputed scores.
+
+        Args:
+            context: ContextAnalysis object
+
+        Returns:
+            (activity, project_type, file type class, budget band)
+        """
+        activity = context.current_activity if hasattr(context, 'current_activity') else "exploring"
+        file_types = context.file_types if hasattr(context, 'file_types') else set()
+        project_type = context.project_type if hasattr(context, 'project_type') else "unknown"
+        token_budget = context.token_budget_remaining if hasattr(context, 'token_budget_remaining') else 150000
+
+        # Same precedence as the file type matching above
+        if ".v" in file_types:
+            file_class = ".v"
+        elif ".qasm" in file_types or ".qpy" in file_types:
+            file_class = ".qasm"
+        elif ".py" in file_types or ".js" in file_types or ".ts" in file_types:
+            file_class = ".py"
+        else:
+            file_class = "other"
+
+        budget_band = "low" if token_budget < LOW_TOKEN_BUDGET else "normal"
+        return activity, project_type, file_class, budget_band
+
+    def user_signature(self, skill: any, user_prefs: any) -> Optional[Tuple]:
+        """
+        Reduce preferences to the features analyze_user_alignment reads for one skill.
+
+        A change to preferences only affects the skills whose signature changes
+        (e.g. recording feedback for one skill moves that skill's success rate).
+
+        Args:
+            skill: SkillMetadata object
+            user_prefs: UserPreferences object (or None)
+
+        Returns:
+            (preferred, avoided, success rate, domain expertise, complexity), or None without preferences
+        """
+        if not user_prefs:
+            return None
+        skill_name = skill.name if hasattr(skill, 'name') else str(skill)
+        skill_category = skill.category if hasattr(skill, 'category') else ""
+        skill_domain = skill_category.split('/')[0] if '/' in skill_category else skill_category
+
+        preferred = user_prefs.preferred_skills if hasattr(user_prefs, 'preferred_skills') else set()
+        avoided = user_prefs.avoided_skills if hasattr(user_prefs, 'avoided_skills') else set()
+        success_rates = user_prefs.skill_success_rates if hasattr(user_prefs, 'skill_success_rates') else {}
+        complexity = user_prefs.complexity_tolerance if hasattr(user_prefs, 'complexity_tolerance') else "medium"
+        expertise = user_prefs.domain_expertise if hasattr(user_prefs, 'domain_expertise') else set()
+
+        return (
+            skill_name in preferred,
+            skill_name in avoided,
+            success_rates.get(skill_name),
+            skill_domain in expertise,
+            complexity
+        )
+
     def analyze_user_alignment(self, skill: any, user_prefs: any, context: any) -> float:
         """
         Analyze how well a skill aligns with user preferences.
@@ -241,6 +309,29 @@ class ConfidenceScorer:
 
         return min(1.0, score)
 
+    def project_signature(self, project_state: any) -> Optional[Tuple]:
+        """
+        Reduce a project state to the features analyze_project_fit depends on.
+
+        Args:
+            project_state: ProjectState object (or None)
+
+        Returns:
+            (old repository, test coverage, dependency band, documentation quality,
+             many large files), or None without a project state
+        """
+        if not project_state:
+            return None
+        repo_age = project_state.repository_age_days if hasattr(project_state, 'repository_age_days') else 0
+        test_coverage = project_state.test_coverage_estimate if hasattr(project_state, 'test_coverage_estimate') else "medium"
+        dep_count = project_state.dependency_count if hasattr(project_state, 'dependency_count') else 0
+        doc_quality = project_state.documentation_quality if hasattr(project_state, 'documentation_quality') else "adequate"
+        complexity = project_state.complexity_indicators if hasattr(project_state, 'complexity_indicators') else {}
+        large_files = complexity.get("large_files", 0) if isinstance(complexity, dict) else 0
+
+        dep_band = "many" if dep_count > 50 else "some" if dep_count > 20 else "few"
+        return repo_age > 365, test_coverage, dep_band, doc_quality, large_files > 5
+
     def get_confidence_category(self, confidence: float) -> str:
         """
         Categorize confidence score.
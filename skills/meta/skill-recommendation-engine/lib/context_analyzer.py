@@ -5,11 +5,34 @@ Analyzes the current working context to determine activity, file types,
 and project characteristics. Implements 40% weight of the recommendation algorithm.
 """
 
+import asyncio
 import os
+import queue
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, List, Set, Any, Optional, Iterable, Iterator, Tuple
+
+from .deadline import DEFAULT, EXACT, PARTIAL, Deadline
+from .git_index import list_untracked, nothing_staged, read_index, worktree_stamp, worktree_status
+from .git_objects import git_objects
+from .gitignore import git_exclude_files
+from .metrics import GIT_SECONDS, STATUS_SOURCES, cache_result
+from .repositories import (
+    MAIN, STATUS_CACHE_FILE, SUBMODULE, Repository, RepositoryStatusCache, discover_repositories, read_head,
+    resolve_git_dir
+)
+
+
+# Streaming git status tuning
+GIT_STATUS_TIMEOUT = 5.0  # seconds before returning partial results
+GIT_STATUS_CHUNK_SIZE = 64 * 1024
+GIT_STATUS_QUEUE_CHUNKS = 16  # at most ~1MB of unparsed output in flight
+MAX_STATUS_WORKERS = 8  # repositories (main, submodules, worktrees) queried concurrently
+MAX_UNCERTAIN_PATHS = 256  # index entries left to a pathspec-limited git status before running a full one
 
 
 @dataclass
@@ -21,88 +44,673 @@ class ContextAnalysis:
     project_type: str  # web, python, formal_verification, quantum, polyglot, unknown
     session_metadata: Dict[str, Any] = field(default_factory=dict)
     token_budget_remaining: int = 150000  # Default budget
+    field_confidence: Dict[str, str] = field(default_factory=dict)  # field -> exact, partial, default
+    change_sources: Dict[str, str] = field(default_factory=dict)  # changed path -> submodule/worktree name
+
+
+def _classify_xy(xy: str) -> str:
+    """
+    Map a porcelain XY status pair to a change category.
+
+    Args:
+        xy: Two-character status (index, worktree); '.' means unchanged
+
+    Returns:
+        One of "modified", "added", "deleted"
+    """
+    if 'M' in xy:
+        return "modified"
+    if xy[:1] == 'A':
+        return "added"
+    if 'D' in xy:
+        return "deleted"
+    # Renames, copies, type changes: count as modifications
+    return "modified"
+
+
+class PorcelainV2Parser:
+    """
+    Push parser for ``git status --porcelain=v2 -z`` output.
+
+    Records are NUL-terminated, so paths with spaces, quotes or newlines need
+    no unquoting. Rename/copy records carry the original path as an extra
+    NUL-terminated field, which is skipped. Only the current partial record is
+    buffered between chunks. A record with the wrong number of fields raises
+    ValueError, so callers can tell truncated output from a complete status.
+    """
+
+    def __init__(self):
+        self._pending = b""
+        self._skip_next = False
+
+    def feed(self, chunk: bytes) -> Iterator[Tuple[str, str]]:
+        """
+        Parse one chunk of output.
+
+        Args:
+            chunk: Raw bytes read from git
+
+        Yields:
+            (category, path) tuples completed by this chunk, where category is
+            one of modified, added, deleted, untracked.
+
+        Raises:
+            ValueError: At the first malformed record, after the entries before it
+        """
+        self._pending += chunk
+        *records, self._pending = self._pending.split(b"\0")
+
+        for record in records:
+            if self._skip_next:
+                self._skip_next = False
+                continue
+            if not record:
+                continue
+
+            kind = record[:1]
+            if kind == b"1":
+                fields = self._fields(record, 9)
+                yield _classify_xy(fields[1].decode("ascii", "replace")), os.fsdecode(fields[8])
+            elif kind == b"2":
+                fields = self._fields(record, 10)
+                self._skip_next = True  # original path follows
+                yield _classify_xy(fields[1].decode("ascii", "replace")), os.fsdecode(fields[9])
+            elif kind == b"u":
+                fields = self._fields(record, 11)
+                yield "modified", os.fsdecode(fields[10])
+            elif kind == b"?":
+                yield "untracked", os.fsdecode(record[2:])
+            # '!' (ignored) and '#' (headers) records are not reported
+
+    @staticmethod
+    def _fields(record: bytes, count: int) -> List[bytes]:
+        """Split a record into count space-separated fields (the last one is the path)."""
+        fields = record.split(b" ", count - 1)
+        if len(fields) != count:
+            raise ValueError(f"malformed porcelain v2 record: {record[:80]!r}")
+        return fields
+
+
+def parse_porcelain_v2(chunks: Iterable[bytes]) -> Iterator[Tuple[str, str]]:
+    """
+    Incrementally parse ``git status --porcelain=v2 -z`` output.
+
+    Args:
+        chunks: Iterable of raw byte chunks read from git
+
+    Yields:
+        (category, path) tuples where category is one of
+        modified, added, deleted, untracked.
+    """
+    parser = PorcelainV2Parser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
 
 
 class ContextAnalyzer:
     """Analyzes current working context."""
 
-    def __init__(self, working_dir: Optional[str] = None):
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        watcher: Optional[Any] = None,
+        include_repositories: bool = True,
+        cache_dir: Optional[str] = None,
+        use_index: bool = True
+    ):
         """
         Initialize context analyzer.
 
         Args:
             working_dir: Working directory to analyze. Defaults to current directory.
+            watcher: Optional running ContextWatcher; when given, analyze() reads
+                     its live state instead of running git status.
+            include_repositories: Also collect the status of submodules and linked
+                                  worktrees, concurrently with the main tree
+            cache_dir: Optional directory to persist submodule status results in
+            use_index: Read tracked changes from .git/index instead of running
+                       git status when the index format allows it
         """
         self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.watcher = watcher
+        self.include_repositories = include_repositories
+        self.use_index = use_index
+        self.status_cache = RepositoryStatusCache(
+            cache_file=Path(cache_dir) / STATUS_CACHE_FILE if cache_dir else None
+        )
+        # Outcome of the last blocking analyze() or _get_*status() call, for callers
+        # that drive one analyzer from a single thread (the watcher); analysis
+        # itself threads completeness through return values
+        self.last_status_complete = False
+        self.last_repositories: List[Dict[str, Any]] = []
 
-    def analyze(self) -> ContextAnalysis:
+    def analyze(self, deadline_ms: Optional[float] = None) -> ContextAnalysis:
         """
         Perform full context analysis.
 
+        Cheap signals (token budget, project marker files) are always computed.
+        Git status gets whatever time is left before the deadline and is cut
+        short if needed; field_confidence records which fields are exact,
+        partial (from a truncated status) or defaults (status skipped).
+        Submodules and linked worktrees are queried concurrently with the main
+        tree; change_sources records which of them each of their changes came from.
+
+        Args:
+            deadline_ms: Optional time budget in milliseconds
+
         Returns:
             ContextAnalysis object with all context information.
         """
-        git_status = self._get_git_status()
-        file_types = self._analyze_file_types(git_status)
-        project_type = self._identify_project_type(file_types)
-        activity = self._detect_current_activity(git_status)
+        deadline = Deadline(deadline_ms)
         token_budget = self._estimate_token_budget()
+        sources: Dict[str, str] = {}
+        summary: List[Dict[str, Any]] = []
+
+        if self.watcher is not None and self.watcher.is_running:
+            git_status, file_types = self.watcher.snapshot()
+            complete = True
+            status_confidence = EXACT
+        elif deadline.expired:
+            git_status = {"modified": [], "added": [], "deleted": [], "untracked": []}
+            file_types = set()
+            complete = False
+            status_confidence = DEFAULT
+        else:
+            repositories = self._repositories()
+            if len(repositories) > 1:
+                git_status, sources, complete, summary = self._collect_combined_status(
+                    repositories, timeout=deadline.remaining(GIT_STATUS_TIMEOUT)
+                )
+            else:
+                git_status, complete = self._collect_status(timeout=deadline.remaining(GIT_STATUS_TIMEOUT))
+            file_types = self._analyze_file_types(git_status)
+            status_confidence = EXACT if complete else PARTIAL
+
+        self.last_status_complete, self.last_repositories = complete, summary
+        analysis = self._build_analysis(
+            git_status, file_types, status_confidence, token_budget,
+            session_metadata={"git_status_complete": complete, "repositories": summary}
+        )
+        analysis.change_sources = sources
+        return analysis
+
+    async def analyze_async(self, deadline_ms: Optional[float] = None) -> ContextAnalysis:
+        """
+        Perform full context analysis without blocking the event loop.
+
+        Git status runs as an asyncio subprocess and the project marker checks
+        run in the default executor. Cancelling the task kills git.
+
+        Args:
+            deadline_ms: Optional time budget in milliseconds
+
+        Returns:
+            ContextAnalysis object with all context information.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = Deadline(deadline_ms)
+        token_budget = self._estimate_token_budget()
+        sources: Dict[str, str] = {}
+        summary: List[Dict[str, Any]] = []
+
+        if self.watcher is not None and self.watcher.is_running:
+            git_status, file_types = self.watcher.snapshot()
+            complete = True
+            status_confidence = EXACT
+        elif deadline.expired:
+            git_status = {"modified": [], "added": [], "deleted": [], "untracked": []}
+            file_types = set()
+            complete = False
+            status_confidence = DEFAULT
+        else:
+            repositories = await loop.run_in_executor(None, self._repositories)
+            if len(repositories) > 1:
+                # Each repository's status already runs in its own worker thread
+                git_status, sources, complete, summary = await loop.run_in_executor(
+                    None, self._collect_combined_status, repositories, deadline.remaining(GIT_STATUS_TIMEOUT)
+                )
+            else:
+                result = None
+                if self.use_index:
+                    result = await loop.run_in_executor(
+                        None, self._collect_index_status, "normal", deadline.remaining(GIT_STATUS_TIMEOUT)
+                    )
+                    STATUS_SOURCES.inc(1, "git" if result is None else "index")
+                if result is None:
+                    result = await self._get_git_status_async(timeout=deadline.remaining(GIT_STATUS_TIMEOUT))
+                git_status, complete = result
+            file_types = self._analyze_file_types(git_status)
+            status_confidence = EXACT if complete else PARTIAL
+
+        analysis = await loop.run_in_executor(
+            None, lambda: self._build_analysis(
+                git_status, file_types, status_confidence, token_budget,
+                session_metadata={"git_status_complete": complete, "repositories": summary}
+            )
+        )
+        analysis.change_sources = sources
+        return analysis
+
+    def _build_analysis(
+        self,
+        git_status: Dict[str, List[str]],
+        file_types: Set[str],
+        status_confidence: str,
+        token_budget: int,
+        directory: Optional[Path] = None,
+        session_metadata: Optional[Dict[str, Any]] = None
+    ) -> ContextAnalysis:
+        """
+        Derive project type and activity from git status and assemble the result.
+
+        Args:
+            directory: Directory whose marker files decide the project type
+                       (defaults to the working directory; a package in a monorepo)
+            session_metadata: Status completeness and repository summary of the analysis
+        """
+        project_type = self._identify_project_type(file_types, directory)
+        activity = self._detect_current_activity(git_status)
 
         return ContextAnalysis(
             current_activity=activity,
             file_types=file_types,
             recent_changes=git_status,
             project_type=project_type,
-            session_metadata={},
-            token_budget_remaining=token_budget
+            session_metadata=dict(session_metadata or {}),
+            token_budget_remaining=token_budget,
+            field_confidence={
+                "current_activity": status_confidence,
+                "file_types": status_confidence,
+                "recent_changes": status_confidence,
+                # Marker files are always checked, so a skipped status still leaves a partial answer
+                "project_type": PARTIAL if status_confidence == DEFAULT else status_confidence,
+                "token_budget_remaining": EXACT,
+            }
         )
 
-    def _get_git_status(self) -> Dict[str, List[str]]:
+    @staticmethod
+    def _git_status_command(
+        untracked_files: str = "normal",
+        use_untracked_cache: bool = False,
+        paths: Optional[List[str]] = None,
+        ignore_submodules: Optional[str] = None
+    ) -> List[str]:
+        """Build the ``git status --porcelain=v2 -z`` command line."""
+        cmd = ["git", "--literal-pathspecs"]
+        if use_untracked_cache:
+            cmd += ["-c", "core.untrackedCache=true"]
+        cmd += ["status", "--porcelain=v2", "-z", f"--untracked-files={untracked_files}"]
+        if ignore_submodules:
+            cmd.append(f"--ignore-submodules={ignore_submodules}")
+        if paths:
+            cmd += ["--"] + list(paths)
+        return cmd
+
+    def _get_status(
+        self,
+        untracked_files: str = "normal",
+        timeout: float = GIT_STATUS_TIMEOUT,
+        ignore_submodules: Optional[str] = None
+    ) -> Dict[str, List[str]]:
         """
-        Get git status of working directory.
+        Working tree status from the index when possible, from git status otherwise.
+
+        Args:
+            untracked_files: "normal", "all" or "no"
+            timeout: Seconds before returning partial results
+            ignore_submodules: None or "dirty" (see _get_git_status)
 
         Returns:
             Dict with keys: modified, added, deleted, untracked
+            (``last_status_complete`` is set)
+        """
+        status, self.last_status_complete = self._collect_status(untracked_files, timeout, ignore_submodules)
+        return status
+
+    def _collect_status(
+        self,
+        untracked_files: str = "normal",
+        timeout: float = GIT_STATUS_TIMEOUT,
+        ignore_submodules: Optional[str] = None
+    ) -> Tuple[Dict[str, List[str]], bool]:
+        """
+        _get_status without touching the analyzer's state.
+
+        Returns:
+            (status dict, whether it finished before the timeout)
+        """
+        if self.use_index:
+            result = self._collect_index_status(untracked_files, timeout, ignore_submodules)
+            STATUS_SOURCES.inc(1, "git" if result is None else "index")
+            if result is not None:
+                return result
+        return self._collect_git_status(untracked_files, timeout=timeout, ignore_submodules=ignore_submodules)
+
+    def _collect_index_status(
+        self,
+        untracked_files: str = "normal",
+        timeout: float = GIT_STATUS_TIMEOUT,
+        ignore_submodules: Optional[str] = None
+    ) -> Optional[Tuple[Dict[str, List[str]], bool]]:
         """
+        Working tree status read from .git/index without a full git status.
+
+        Tracked files are compared by the stat data cached in the index and
+        untracked files are listed with the gitignore matcher. Entries whose
+        content has to be compared (racy or touched files) are passed to a
+        pathspec-limited git status. Gives up, so the caller runs git status,
+        when working_dir is not the top of a working tree, the index format
+        is unsupported, something may be staged (the index's cache tree does
+        not match HEAD), submodule working trees would have to be checked,
+        too many entries are uncertain, or untracked files are wanted and the
+        exclude files git would apply cannot be determined.
+
+        Args:
+            untracked_files: "normal", "all" or "no"
+            timeout: Seconds before returning partial results
+            ignore_submodules: None or "dirty"; anything else is left to git
+
+        Returns:
+            (dict with keys modified, added, deleted, untracked, whether it
+             finished before the timeout), or None to fall back to git.
+        """
+        if ignore_submodules not in (None, "dirty"):
+            return None
+        git_dir = resolve_git_dir(self.working_dir)
+        if git_dir is None:
+            return None
+        exclude_files = git_exclude_files(self.working_dir) if untracked_files != "no" else []
+        if exclude_files is None:
+            return None
+        index = read_index(git_dir)
+        if index is None or not nothing_staged(git_dir, index, git_objects(self.working_dir).resolve):
+            return None
+
+        deadline = Deadline(timeout * 1000.0)
+        tracked = worktree_status(self.working_dir, index, git_dir)
+        if tracked.submodules and ignore_submodules is None:
+            return None
+        if len(tracked.uncertain) > MAX_UNCERTAIN_PATHS:
+            return None
+
+        status = {"modified": tracked.modified, "added": [], "deleted": tracked.deleted, "untracked": []}
+        complete = True
+        if tracked.uncertain:
+            checked, complete = self._collect_git_status(
+                untracked_files="no", timeout=deadline.remaining(timeout),
+                paths=tracked.uncertain, ignore_submodules=ignore_submodules
+            )
+            for category in ("modified", "added", "deleted"):
+                status[category].extend(checked[category])
+        if untracked_files != "no":
+            status["untracked"], walked = list_untracked(
+                self.working_dir, index, untracked_files, deadline, exclude_files
+            )
+            complete = complete and walked
+
+        return status, complete
+
+    def _get_git_status(
+        self,
+        untracked_files: str = "normal",
+        use_untracked_cache: bool = False,
+        timeout: float = GIT_STATUS_TIMEOUT,
+        paths: Optional[List[str]] = None,
+        ignore_submodules: Optional[str] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Get git status of working directory (see _collect_git_status).
+
+        Returns:
+            Dict with keys: modified, added, deleted, untracked
+            (``last_status_complete`` is set)
+        """
+        status, self.last_status_complete = self._collect_git_status(
+            untracked_files, use_untracked_cache, timeout, paths, ignore_submodules
+        )
+        return status
+
+    @GIT_SECONDS.timed("status")
+    def _collect_git_status(
+        self,
+        untracked_files: str = "normal",
+        use_untracked_cache: bool = False,
+        timeout: float = GIT_STATUS_TIMEOUT,
+        paths: Optional[List[str]] = None,
+        ignore_submodules: Optional[str] = None
+    ) -> Tuple[Dict[str, List[str]], bool]:
+        """
+        Run git status on the working directory.
+
+        Streams ``git status --porcelain=v2 -z`` from the pipe and parses it
+        record by record, so large dirty trees never have to be held as a
+        single string. If the deadline passes before git finishes, the entries
+        parsed so far are returned as incomplete.
+
+        Args:
+            untracked_files: "normal", "all" or "no" (passed to ``--untracked-files``);
+                use "no" when only tracked changes are needed
+            use_untracked_cache: Ask git to use the untracked cache when listing them
+            timeout: Seconds to wait for git before returning partial results
+            paths: Optional repository-relative paths to limit the status to
+            ignore_submodules: Passed to ``--ignore-submodules`` ("dirty" skips
+                scanning submodule working trees but still reports new commits)
+
+        Returns:
+            (dict with keys modified, added, deleted, untracked, whether git
+             finished before the timeout)
+        """
+        status = {"modified": [], "added": [], "deleted": [], "untracked": []}
+        complete = False
+
+        cmd = self._git_status_command(untracked_files, use_untracked_cache, paths, ignore_submodules)
+
         try:
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
+            proc = subprocess.Popen(
+                cmd,
                 cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=5
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
             )
+        except (FileNotFoundError, OSError):
+            return status, False
+
+        # A bounded queue between the reader thread and the parser gives
+        # back-pressure: git blocks on its pipe instead of us buffering output.
+        chunks: "queue.Queue[bytes]" = queue.Queue(maxsize=GIT_STATUS_QUEUE_CHUNKS)
+
+        def pump() -> None:
+            try:
+                while True:
+                    data = proc.stdout.read1(GIT_STATUS_CHUNK_SIZE)
+                    chunks.put(data)
+                    if not data:
+                        return
+            except (OSError, ValueError):
+                chunks.put(b"")
+
+        reader = threading.Thread(target=pump, daemon=True)
+        reader.start()
+
+        deadline = time.monotonic() + timeout
+        finished = []
+
+        def until_deadline() -> Iterator[bytes]:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    data = chunks.get(timeout=remaining)
+                except queue.Empty:
+                    return
+                if not data:
+                    finished.append(True)
+                    return
+                yield data
 
-            if result.returncode != 0:
-                return {"modified": [], "added": [], "deleted": [], "untracked": []}
-
-            # Parse git status output
-            modified, added, deleted, untracked = [], [], [], []
-
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-
-                status = line[:2]
-                filepath = line[3:] if len(line) > 3 else ""
-
-                if status[0] == 'M' or status[1] == 'M':
-                    modified.append(filepath)
-                elif status[0] == 'A':
-                    added.append(filepath)
-                elif status[0] == 'D' or status[1] == 'D':
-                    deleted.append(filepath)
-                elif status[0] == '?':
-                    untracked.append(filepath)
-
-            return {
-                "modified": modified,
-                "added": added,
-                "deleted": deleted,
-                "untracked": untracked
-            }
-        except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-            return {"modified": [], "added": [], "deleted": [], "untracked": []}
+        try:
+            for category, path in parse_porcelain_v2(until_deadline()):
+                status[category].append(path)
+        except ValueError:
+            # Output we cannot parse: keep the entries before it as a partial status
+            finished.clear()
+        except BaseException:
+            proc.kill()
+            raise
+
+        if finished:
+            returncode = proc.wait()
+            proc.stdout.close()
+            if returncode != 0:
+                return {"modified": [], "added": [], "deleted": [], "untracked": []}, False
+            complete = True
+        else:
+            # Deadline hit: stop git and unblock the reader, keep what we have
+            proc.kill()
+            while reader.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            proc.wait()
+            proc.stdout.close()
+
+        return status, complete
+
+    def _repositories(self) -> List[Repository]:
+        """Main tree plus submodules and linked worktrees (just the main tree if disabled)."""
+        if not self.include_repositories:
+            return [Repository(self.working_dir, "", MAIN)]
+        return discover_repositories(self.working_dir)
+
+    def _collect_combined_status(
+        self,
+        repositories: List[Repository],
+        timeout: float = GIT_STATUS_TIMEOUT
+    ) -> Tuple[Dict[str, List[str]], Dict[str, str], bool, List[Dict[str, Any]]]:
+        """
+        Git status of several repositories, collected concurrently.
+
+        Each repository gets its own ``git status`` with
+        ``--ignore-submodules=dirty``, so no repository rescans the working
+        tree of a submodule that is queried separately (a submodule that moved
+        to another commit is still reported by its parent). Submodule results
+        are cached by the submodule's HEAD, index and working tree stat data;
+        a submodule whose index cannot be read is always queried. Paths from submodules and
+        worktrees are prefixed with the repository name; the status is complete
+        only if every repository finished in time.
+
+        Args:
+            repositories: Output of _repositories(), main tree first
+            timeout: Seconds each repository's git status may take
+
+        Returns:
+            (combined status dict, changed path -> repository name for
+             changes outside the main tree, whether every status is complete,
+             per-repository summary)
+        """
+        def collect(repository: Repository) -> Tuple[Dict[str, List[str]], bool, bool]:
+            stamp = None
+            if repository.kind == SUBMODULE and repository.git_dir is not None:
+                index = read_index(repository.git_dir)
+                stamp = worktree_stamp(repository.path, index) if index is not None else None
+            if stamp is not None:
+                cached = self.status_cache.get(repository, stamp)
+                cache_result("repository_status", cached is not None)
+                if cached is not None:
+                    return cached, True, True
+            analyzer = ContextAnalyzer(
+                working_dir=str(repository.path), include_repositories=False, use_index=self.use_index
+            )
+            status, complete = analyzer._collect_status(timeout=timeout, ignore_submodules="dirty")
+            if stamp is not None and complete:
+                self.status_cache.put(repository, status, stamp)
+            return status, complete, False
+
+        with ThreadPoolExecutor(max_workers=min(MAX_STATUS_WORKERS, len(repositories))) as pool:
+            results = list(pool.map(collect, repositories))
+        self.status_cache.save()
+
+        combined = {"modified": [], "added": [], "deleted": [], "untracked": []}
+        sources: Dict[str, str] = {}
+        summary = []
+        for repository, (status, complete, cached) in zip(repositories, results):
+            for category, paths in status.items():
+                for path in paths:
+                    qualified = repository.qualify(path)
+                    combined.setdefault(category, []).append(qualified)
+                    if repository.name:
+                        sources[qualified] = repository.name
+            summary.append({
+                "name": repository.name,
+                "kind": repository.kind,
+                "head": read_head(repository.git_dir) if repository.git_dir else None,
+                "changes": sum(len(paths) for paths in status.values()),
+                "complete": complete,
+                "cached": cached,
+            })
+
+        return combined, sources, all(complete for _, complete, _ in results), summary
+
+    @GIT_SECONDS.timed("status")
+    async def _get_git_status_async(
+        self,
+        untracked_files: str = "normal",
+        timeout: float = GIT_STATUS_TIMEOUT
+    ) -> Tuple[Dict[str, List[str]], bool]:
+        """
+        Asyncio counterpart of _get_git_status.
+
+        Reads the subprocess pipe chunk by chunk into the porcelain parser.
+        The subprocess is killed on timeout and on cancellation.
+
+        Args:
+            untracked_files: "normal", "all" or "no"
+            timeout: Seconds to wait for git before returning partial results
+
+        Returns:
+            (status dict with modified/added/deleted/untracked lists,
+             whether git finished before the timeout)
+        """
+        status = {"modified": [], "added": [], "deleted": [], "untracked": []}
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self._git_status_command(untracked_files),
+                cwd=str(self.working_dir),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+        except (FileNotFoundError, OSError):
+            return status, False
+
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        parser = PorcelainV2Parser()
+        try:
+            while True:
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    return status, False
+                try:
+                    chunk = await asyncio.wait_for(proc.stdout.read(GIT_STATUS_CHUNK_SIZE), remaining)
+                except asyncio.TimeoutError:
+                    return status, False
+                if not chunk:
+                    break
+                try:
+                    for category, path in parser.feed(chunk):
+                        status[category].append(path)
+                except ValueError:
+                    return status, False  # unparseable output: partial status
+
+            if await proc.wait() != 0:
+                return {"modified": [], "added": [], "deleted": [], "untracked": []}, False
+            return status, True
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
 
     def _analyze_file_types(self, git_status: Dict[str, List[str]]) -> Set[str]:
         """
@@ -124,16 +732,19 @@ class ContextAnalyzer:
 
         return file_types
 
-    def _identify_project_type(self, file_types: Set[str]) -> str:
+    def _identify_project_type(self, file_types: Set[str], directory: Optional[Path] = None) -> str:
         """
         Identify project type based on file extensions and markers.
 
         Args:
             file_types: Set of file extensions
+            directory: Directory to look for marker files in (defaults to the working directory)
 
         Returns:
             Project type string
         """
+        root = directory if directory is not None else self.working_dir
+
         # Check for specific file types
         if '.v' in file_types:
             return "formal_verification"
@@ -142,18 +753,18 @@ class ContextAnalyzer:
             return "quantum"
 
         # Check for project markers
-        if (self.working_dir / "package.json").exists():
+        if (root / "package.json").exists():
             if '.js' in file_types or '.ts' in file_types or '.tsx' in file_types or '.jsx' in file_types:
                 return "web"
 
-        if (self.working_dir / "requirements.txt").exists() or (self.working_dir / "pyproject.toml").exists():
+        if (root / "requirements.txt").exists() or (root / "pyproject.toml").exists():
             if '.py' in file_types:
                 return "python"
 
-        if (self.working_dir / "Cargo.toml").exists():
+        if (root / "Cargo.toml").exists():
             return "rust"
 
-        if (self.working_dir / "go.mod").exists():
+        if (root / "go.mod").exists():
             return "go"
 
         # Fallback based on file types
@@ -0,0 +1,411 @@
+"""
+Live Context Tracking Module
+
+Keeps the git working-tree state of a repository up to date in the background
+so that ContextAnalyzer can read it without spawning git on every call.
+Uses Linux inotify through ctypes when available and falls back to periodic
+polling elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .context_analyzer import ContextAnalyzer
+from .gitignore import IGNORE_FILE, IgnoreMatcher
+from .metrics import GIT_SECONDS
+
+
+# inotify constants (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+STATUS_CATEGORIES = ("modified", "added", "deleted", "untracked")
+RECLASSIFY_BATCH = 500  # paths per pathspec-limited git status call
+
+
+class _Inotify:
+    """Minimal ctypes binding for Linux inotify."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is not available on this platform")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: Path, mask: int = WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def read_events(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """
+        Wait up to timeout seconds and return pending (wd, mask, name) events.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ContextWatcher:
+    """
+    Background tracker for modified/added/deleted/untracked files.
+
+    State is updated incrementally: file events only trigger a git status
+    limited to the paths that changed, and changes to ``.git/index`` or an
+    event-queue overflow trigger a full resync. A full resync also runs every
+    ``resync_interval`` seconds to correct any drift.
+
+    Usage:
+        with ContextWatcher("/path/to/repo") as watcher:
+            analyzer = ContextAnalyzer("/path/to/repo", watcher=watcher)
+            context = analyzer.analyze()  # no git subprocess
+    """
+
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        resync_interval: float = 60.0,
+        poll_interval: float = 2.0,
+        debounce: float = 0.05,
+        use_inotify: bool = True
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            working_dir: Directory inside the repository to watch. Defaults to current directory.
+            resync_interval: Seconds between full resyncs against git status
+            poll_interval: Seconds between resyncs when inotify is unavailable
+            debounce: Seconds to wait for an event burst to settle before reclassifying
+            use_inotify: Set False to force the polling fallback
+        """
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.repo_root = self._find_repo_root()
+        self.resync_interval = resync_interval
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+
+        self._analyzer = ContextAnalyzer(working_dir=str(self.repo_root))
+        self._lock = threading.Lock()
+        self._categories: Dict[str, str] = {}  # path -> category
+        self._ext_counts: Counter = Counter()
+        self._version = 0
+        self._snapshot_version = -1
+        self._snapshot: Tuple[Dict[str, List[str]], Set[str]] = (
+            {category: [] for category in STATUS_CATEGORIES}, set()
+        )
+
+        self._inotify: Optional[_Inotify] = None
+        self._watches: Dict[int, Path] = {}
+        self._ignores: Optional[IgnoreMatcher] = None  # compiled once, dropped when a .gitignore changes
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.mode = "stopped"
+        self.last_resync = 0.0
+
+    @GIT_SECONDS.timed("rev-parse")
+    def _find_repo_root(self) -> Path:
+        """Resolve the top level of the git repository containing working_dir."""
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel"],
+                cwd=self.working_dir,
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                return Path(result.stdout.strip())
+        except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+            pass
+        return self.working_dir
+
+    @property
+    def is_running(self) -> bool:
+        """True once the initial sync is done and the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "ContextWatcher":
+        """
+        Perform the initial sync and start watching in the background.
+
+        Returns:
+            self, for chaining.
+        """
+        if self.is_running:
+            return self
+
+        self.resync()
+
+        self.mode = "polling"
+        self._ignores = None
+        if self.use_inotify:
+            try:
+                self._inotify = _Inotify()
+                self._add_watches(self.repo_root)
+                self.mode = "inotify"
+            except OSError:
+                # Unsupported platform or watch limit reached
+                if self._inotify is not None:
+                    self._inotify.close()
+                self._inotify = None
+                self._watches.clear()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="context-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread and release inotify resources."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._watches.clear()
+        self.mode = "stopped"
+
+    def __enter__(self) -> "ContextWatcher":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def snapshot(self) -> Tuple[Dict[str, List[str]], Set[str]]:
+        """
+        Return the current git status and file-type set.
+
+        The snapshot is rebuilt at most once per change, so repeated reads
+        while nothing changes only copy it.
+
+        Returns:
+            (status dict with modified/added/deleted/untracked lists, file types set),
+            both copies the caller may modify
+        """
+        with self._lock:
+            if self._snapshot_version != self._version:
+                status = {category: [] for category in STATUS_CATEGORIES}
+                for path, category in self._categories.items():
+                    status[category].append(path)
+                file_types = {ext for ext, count in self._ext_counts.items() if count > 0}
+                self._snapshot = (status, file_types)
+                self._snapshot_version = self._version
+            status, file_types = self._snapshot
+            return {category: list(paths) for category, paths in status.items()}, set(file_types)
+
+    def resync(self) -> None:
+        """Replace the tracked state with a full status (from the index when possible)."""
+        status = self._analyzer._get_status(untracked_files="all")
+        if not self._analyzer.last_status_complete and self.last_resync:
+            return  # keep the previous state rather than a truncated one
+
+        categories = {}
+        ext_counts: Counter = Counter()
+        for category, paths in status.items():
+            for path in paths:
+                categories[path] = category
+                ext_counts[self._extension(path)] += 1
+
+        with self._lock:
+            self._categories = categories
+            self._ext_counts = ext_counts
+            self._version += 1
+        self.last_resync = time.monotonic()
+
+    def _reclassify(self, paths: Set[str], directories: Set[str]) -> None:
+        """
+        Refresh the state of specific paths with a pathspec-limited git status.
+
+        Args:
+            paths: Repository-relative paths that changed
+            directories: Subset of paths that are (or were) directories
+        """
+        ordered = sorted(paths)
+        for i in range(0, len(ordered), RECLASSIFY_BATCH):
+            batch = ordered[i:i + RECLASSIFY_BATCH]
+            status = self._analyzer._get_git_status(untracked_files="all", paths=batch)
+            if not self._analyzer.last_status_complete:
+                self.resync()
+                return
+
+            with self._lock:
+                # Drop old entries for the batch, including files under changed directories
+                for path in batch:
+                    stale = [path] if path in self._categories else []
+                    if path in directories:
+                        prefix = path + "/"
+                        stale += [p for p in self._categories if p.startswith(prefix)]
+                    for p in stale:
+                        self._ext_counts[self._extension(p)] -= 1
+                        del self._categories[p]
+
+                for category, found in status.items():
+                    for path in found:
+                        previous = self._categories.get(path)
+                        if previous is None:
+                            self._ext_counts[self._extension(path)] += 1
+                        self._categories[path] = category
+                self._version += 1
+
+    @staticmethod
+    def _extension(path: str) -> str:
+        return os.path.splitext(path)[1].lower()
+
+    def _ignore_matcher(self) -> IgnoreMatcher:
+        if self._ignores is None:
+            self._ignores = IgnoreMatcher(self.repo_root)
+        return self._ignores
+
+    def _add_watches(self, directory: Path) -> None:
+        """Watch directory and all subdirectories, skipping .git internals and ignored trees."""
+        git_dir = self.repo_root / ".git"
+        ignores = self._ignore_matcher()
+        for current, dirnames, _ in os.walk(directory):
+            current_path = Path(current)
+            wd = self._inotify.add_watch(current_path)
+            self._watches[wd] = current_path
+            if ".git" in dirnames:
+                dirnames.remove(".git")
+                if git_dir.is_dir():
+                    wd = self._inotify.add_watch(git_dir, IN_CLOSE_WRITE | IN_MOVED_TO)
+                    self._watches[wd] = git_dir
+
+            # Ignored directories (node_modules, build output) never affect git status
+            relative = ignores.relative(current_path)
+            if relative is not None:
+                dirnames[:] = [
+                    d for d in dirnames
+                    if not ignores.is_ignored(f"{relative}/{d}" if relative else d, is_dir=True)
+                ]
+
+    def _run(self) -> None:
+        """Background loop: collect events, debounce, reclassify, resync periodically."""
+        while not self._stop.is_set():
+            if self._inotify is None:
+                self._stop.wait(self.poll_interval)
+                if not self._stop.is_set():
+                    self.resync()
+                continue
+
+            try:
+                changed, directories, needs_resync = self._collect_events(
+                    timeout=min(1.0, self.resync_interval)
+                )
+            except OSError:
+                continue
+
+            if needs_resync or time.monotonic() - self.last_resync >= self.resync_interval:
+                self.resync()
+            elif changed:
+                self._reclassify(changed, directories)
+
+    def _collect_events(self, timeout: float) -> Tuple[Set[str], Set[str], bool]:
+        """
+        Gather one debounced burst of inotify events.
+
+        Returns:
+            (changed repository-relative paths, the subset that are directories,
+             whether a full resync is needed)
+        """
+        changed: Set[str] = set()
+        directories: Set[str] = set()
+        needs_resync = False
+        git_dir = self.repo_root / ".git"
+
+        events = self._inotify.read_events(timeout)
+        while events:
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    needs_resync = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if directory == git_dir:
+                    if name == "index":
+                        needs_resync = True
+                    continue
+
+                full_path = directory / name if name else directory
+                try:
+                    relative = full_path.relative_to(self.repo_root).as_posix()
+                except ValueError:
+                    continue
+                if name == IGNORE_FILE:
+                    self._ignores = None  # rules changed; recompile on next use
+                if mask & IN_ISDIR and relative != "." and self._ignore_matcher().is_ignored(relative, is_dir=True):
+                    continue  # ignored trees (node_modules, build output) are neither watched nor status-checked
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self._add_watches(full_path)
+                    except OSError:
+                        needs_resync = True
+                if relative and relative != ".":
+                    changed.add(relative)
+                    if mask & IN_ISDIR:
+                        directories.add(relative)
+
+            events = self._inotify.read_events(self.debounce)
+
+        return changed, directories, needs_resync
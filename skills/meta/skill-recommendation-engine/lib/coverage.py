@@ -0,0 +1,308 @@
+"""
+Coverage Artifact Module
+
+Reads line coverage from the reports test runners leave behind: Cobertura
+coverage.xml, lcov.info, coverage.py's .coverage SQLite database and
+Istanbul's coverage-final.json. Every format is streamed (iterparse, line
+or chunk scanning, SQL cursors) so reports of hundreds of megabytes are
+never held in memory. Results are cached by artifact mtime and size.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from .metrics import cache_result
+
+CACHE_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+# Artifact locations relative to the project, in precedence order for equal mtimes
+ARTIFACT_PATHS = (
+    "coverage.xml",
+    "lcov.info",
+    "coverage/lcov.info",
+    ".coverage",
+    "coverage/coverage-final.json",
+    "coverage-final.json",
+)
+
+
+@dataclass
+class CoverageReport:
+    """Line coverage totals from one artifact."""
+    covered: int
+    total: int
+    source: str  # artifact path relative to the project
+
+    @property
+    def ratio(self) -> float:
+        return self.covered / self.total if self.total else 0.0
+
+
+# ----------------------------------------------------------------------
+# Format parsers: each returns (covered lines, total lines)
+# ----------------------------------------------------------------------
+
+def parse_cobertura(path: Path) -> Tuple[int, int]:
+    """
+    Parse a Cobertura coverage.xml.
+
+    The root element's lines-covered / lines-valid totals are used when
+    present, which ends the parse after the first tag. Otherwise the <line>
+    elements of every class are counted (method-level line lists repeat the
+    class's lines and are skipped), clearing each class once counted.
+    """
+    covered = total = 0
+    stack = []
+    context = ElementTree.iterparse(str(path), events=("start", "end"))
+    for event, elem in context:
+        if event == "start":
+            if not stack and elem.tag == "coverage":
+                valid = elem.get("lines-valid")
+                if valid is not None and int(valid) > 0:
+                    return int(elem.get("lines-covered", 0)), int(valid)
+            stack.append(elem.tag)
+            continue
+
+        stack.pop()
+        if elem.tag == "line" and stack[-2:] == ["class", "lines"]:
+            total += 1
+            if int(elem.get("hits", 0)) > 0:
+                covered += 1
+        elif elem.tag == "class":
+            elem.clear()
+    return covered, total
+
+
+def parse_lcov(path: Path) -> Tuple[int, int]:
+    """
+    Parse an lcov tracefile line by line.
+
+    Uses each record's LF/LH summary lines, falling back to its DA lines
+    when a record has no summary.
+    """
+    covered = total = 0
+    found = hit = None
+    da_total = da_hit = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("DA:"):
+                da_total += 1
+                fields = line[3:].split(",")
+                if len(fields) > 1 and fields[1].strip() not in ("0", "-"):
+                    da_hit += 1
+            elif line.startswith("LF:"):
+                found = int(line[3:])
+            elif line.startswith("LH:"):
+                hit = int(line[3:])
+            elif line.startswith("end_of_record"):
+                total += found if found is not None else da_total
+                covered += hit if hit is not None else da_hit
+                found = hit = None
+                da_total = da_hit = 0
+    return covered, total
+
+
+def _code_lines(path: Path) -> int:
+    """Non-blank, non-comment lines of a Python source file."""
+    count = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("#"):
+                count += 1
+    return count
+
+
+def parse_coverage_db(path: Path) -> Tuple[int, int]:
+    """
+    Parse a coverage.py (5.0+) .coverage SQLite database.
+
+    The database stores executed lines only, not the statements that could
+    run, so the total is the measured files' code lines (non-blank,
+    non-comment) as found on disk; files no longer present are skipped.
+    """
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        executed: Dict[int, int] = {}  # file id -> bitmap of executed lines (all contexts)
+        for file_id, numbits in connection.execute("SELECT file_id, numbits FROM line_bits"):
+            executed[file_id] = executed.get(file_id, 0) | int.from_bytes(numbits, "little")
+        if not executed:
+            # Branch measurement stores arcs instead of line bitmaps
+            rows = connection.execute(
+                "SELECT file_id, fromno FROM arc WHERE fromno > 0 "
+                "UNION SELECT file_id, tono FROM arc WHERE tono > 0"
+            )
+            for file_id, line in rows:
+                executed[file_id] = executed.get(file_id, 0) | 1 << line
+
+        covered = total = 0
+        for file_id, name in connection.execute("SELECT id, path FROM file"):
+            source = Path(name)
+            if not source.is_absolute():
+                source = path.parent / source
+            try:
+                lines = _code_lines(source)
+            except (IOError, OSError):
+                continue
+            hit = min(bin(executed.get(file_id, 0)).count("1"), lines)
+            covered += hit
+            total += lines
+        return covered, total
+    finally:
+        connection.close()
+
+
+_STATEMENT_COUNTERS = re.compile(r'"s"\s*:\s*\{')
+
+
+def parse_istanbul(path: Path) -> Tuple[int, int]:
+    """
+    Parse an Istanbul coverage-final.json in chunks.
+
+    Istanbul writes the report as one line, so it is scanned chunk by chunk
+    for each file's "s" statement-counter object, which is flat and small;
+    only those objects are decoded.
+    """
+    covered = total = 0
+    buffer = ""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        eof = False
+        while not eof:
+            chunk = f.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            position = 0
+            while True:
+                match = _STATEMENT_COUNTERS.search(buffer, position)
+                if match is None:
+                    # Keep a tail that may hold the start of a split marker
+                    position = max(position, len(buffer) - 16)
+                    break
+                end = buffer.find("}", match.end())
+                if end < 0:
+                    position = match.start()
+                    break
+                counters = json.loads(buffer[match.end() - 1:end + 1])
+                total += len(counters)
+                covered += sum(1 for hits in counters.values() if hits)
+                position = end + 1
+            buffer = buffer[position:]
+    return covered, total
+
+
+COVERAGE_PARSERS: Dict[str, Callable[[Path], Tuple[int, int]]] = {
+    "coverage.xml": parse_cobertura,
+    "lcov.info": parse_lcov,
+    ".coverage": parse_coverage_db,
+    "coverage-final.json": parse_istanbul,
+}
+
+
+class CoverageReader:
+    """Finds and parses coverage artifacts with an mtime keyed cache."""
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        """
+        Initialize the reader.
+
+        Args:
+            cache_file: Optional JSON file to persist results across processes
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._lock = threading.Lock()
+        self._results: Dict[str, list] = {}  # path -> [mtime_ns, size, covered, total]
+        self._dirty = False
+        self._load_cache()
+
+    def _load_cache(self) -> None:
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+            if data.get("version") == CACHE_VERSION:
+                self._results = data.get("results", {})
+        except (IOError, OSError, ValueError, AttributeError):
+            pass
+
+    def save(self) -> None:
+        """Persist the cache if it changed."""
+        if not self.cache_file or not self._dirty:
+            return
+        with self._lock:
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.cache_file, "w", encoding="utf-8") as f:
+                    json.dump({"version": CACHE_VERSION, "results": self._results}, f)
+                self._dirty = False
+            except (IOError, OSError):
+                pass
+
+    def read(self, path: Path) -> Optional[Tuple[int, int]]:
+        """
+        Coverage totals of one artifact, parsed only if it changed.
+
+        Args:
+            path: Path to a supported artifact
+
+        Returns:
+            (covered, total) lines, or None if unsupported, unreadable or empty.
+        """
+        path = Path(path)
+        parser = COVERAGE_PARSERS.get(path.name)
+        if parser is None:
+            return None
+        try:
+            stat = path.stat()
+        except (IOError, OSError):
+            return None
+
+        key = str(path.resolve())
+        cached = self._results.get(key)
+        hit = bool(cached) and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size
+        cache_result("coverage", hit)
+        if hit:
+            covered, total = cached[2], cached[3]
+        else:
+            try:
+                covered, total = parser(path)
+            except (IOError, OSError, ValueError, KeyError, AttributeError,
+                    ElementTree.ParseError, sqlite3.Error):
+                return None
+            with self._lock:
+                self._results[key] = [stat.st_mtime_ns, stat.st_size, covered, total]
+                self._dirty = True
+        return (covered, total) if total else None
+
+    def find(self, project_dir: Path) -> Optional[CoverageReport]:
+        """
+        Coverage of a project from its most recently written artifact.
+
+        Args:
+            project_dir: Directory containing the artifacts
+
+        Returns:
+            CoverageReport, or None if the project has no usable artifact.
+        """
+        candidates = []
+        for order, relative in enumerate(ARTIFACT_PATHS):
+            try:
+                mtime = (Path(project_dir) / relative).stat().st_mtime_ns
+            except (IOError, OSError):
+                continue
+            candidates.append((-mtime, order, relative))
+
+        report = None
+        for _, _, relative in sorted(candidates):
+            totals = self.read(Path(project_dir) / relative)
+            if totals is not None:
+                report = CoverageReport(totals[0], totals[1], relative)
+                break
+        self.save()
+        return report
@@ -0,0 +1,60 @@
+"""
+Analysis Deadline Module
+
+Time budget shared by the anytime analyzers: cheap signals are computed
+first, expensive ones only while time remains. Fields that could not be
+computed fully are reported with a per-field confidence flag.
+"""
+
+import time
+from typing import Optional
+
+# Per-field confidence flags
+EXACT = "exact"        # computed from complete data
+PARTIAL = "partial"    # computed from data cut short by the deadline
+DEFAULT = "default"    # skipped; the field holds its default value
+ESTIMATED = "estimated"  # computed from a random sample (see ProjectState.estimates)
+
+
+class Deadline:
+    """A wall-clock deadline measured from construction; None means unlimited."""
+
+    def __init__(self, deadline_ms: Optional[float] = None):
+        """
+        Args:
+            deadline_ms: Milliseconds from now, or None for no deadline
+        """
+        self.deadline_ms = deadline_ms
+        self._end = time.monotonic() + deadline_ms / 1000.0 if deadline_ms is not None else None
+
+    @property
+    def unlimited(self) -> bool:
+        return self._end is None
+
+    @property
+    def expired(self) -> bool:
+        return self._end is not None and time.monotonic() >= self._end
+
+    def cancel(self) -> None:
+        """Expire the deadline now (e.g. when the awaiting task is cancelled)."""
+        self._end = 0.0
+
+    def remaining(self, cap: float) -> float:
+        """
+        Seconds left, capped at an operation's own timeout.
+
+        Args:
+            cap: Maximum seconds to return (the operation's normal timeout)
+
+        Returns:
+            min(cap, seconds until the deadline), never negative.
+        """
+        if self._end is None:
+            return cap
+        return max(0.0, min(cap, self._end - time.monotonic()))
+
+    def remaining_ms(self) -> Optional[float]:
+        """Milliseconds left, or None if unlimited (for passing on to another analyzer)."""
+        if self._end is None:
+            return None
+        return max(0.0, (self._end - time.monotonic()) * 1000.0)
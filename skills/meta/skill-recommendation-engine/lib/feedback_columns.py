@@ -0,0 +1,438 @@
+"""
+Columnar Feedback Analytics Module
+
+Decodes the feedback history into flat typed arrays (one per field) instead of
+one FeedbackEntry object per row, and answers the aggregate questions asked by
+UserPatternAnalyzer with whole-column reductions. Decoded columns are cached in
+a binary sidecar file so later loads are a handful of bulk reads.
+"""
+
+import json
+import re
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime
+from itertools import compress
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .fingerprint import ContextFingerprint, FingerprintVocabulary
+
+COLUMNS_VERSION = 1
+SIDECAR_NAME = "feedback_columns.bin"
+
+# Column name -> array typecode
+COLUMN_TYPES = {
+    "timestamps": "d",      # seconds since the epoch
+    "skill_ids": "I",       # index into skills vocabulary
+    "outcomes": "b",        # 1 success, 0 failure, -1 unknown
+    "ratings": "b",         # 1-5, 0 when not rated
+    "activity_ids": "I",    # index into activities vocabulary
+    "project_type_ids": "I",  # index into project_types vocabulary
+    "file_type_masks": "Q",   # bit i set when file_types vocabulary[i] was present
+}
+
+# Bit 63 collects every extension beyond the first 63. It only records that
+# some such extension was present, so it never makes two contexts similar.
+MAX_FILE_TYPE_BITS = 63
+OTHER_FILE_TYPE_BIT = 1 << 63
+
+_SEPARATORS = re.compile(r"[\s,]*")
+# Maps a signed outcome byte to 1 for success (1) and 0 otherwise
+_SUCCESS_TABLE = bytes(1 if b == 1 else 0 for b in range(256))
+
+
+class FeedbackColumns:
+    """Feedback history stored as parallel typed arrays."""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {
+            name: array(code) for name, code in COLUMN_TYPES.items()
+        }
+        self.skills: List[str] = []
+        self.activities: List[str] = []
+        self.project_types: List[str] = []
+        self.file_types: List[str] = []
+        self._ids: Dict[str, Dict[str, int]] = {
+            "skills": {}, "activities": {}, "project_types": {}, "file_types": {}
+        }
+        self._success_by_context: Optional[Counter] = None
+        self._outcomes_by_skill: Optional[Counter] = None
+        self._fingerprint_fields: Dict[str, Tuple[str, str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns["skill_ids"])
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _intern(self, vocabulary: str, value: str) -> int:
+        ids = self._ids[vocabulary]
+        index = ids.get(value)
+        if index is None:
+            index = len(ids)
+            ids[value] = index
+            getattr(self, vocabulary).append(value)
+        return index
+
+    def file_type_mask(self, file_types: Iterable[str], add: bool = False) -> int:
+        """
+        Encode a collection of extensions as a bitmask.
+
+        Args:
+            file_types: Extensions such as '.py'
+            add: Grow the vocabulary for unseen extensions (otherwise they are ignored)
+
+        Returns:
+            Bitmask over the file_types vocabulary.
+        """
+        mask = 0
+        ids = self._ids["file_types"]
+        for ext in file_types:
+            index = ids.get(ext)
+            if index is None:
+                if not add:
+                    continue
+                index = self._intern("file_types", ext)
+            mask |= (1 << index) if index < MAX_FILE_TYPE_BITS else OTHER_FILE_TYPE_BIT
+        return mask
+
+    def _fingerprint_context(self, encoded: str, vocabulary: FingerprintVocabulary) -> Tuple[str, str, int]:
+        """Decode a stored fingerprint to (activity, project type, column file-type mask), memoized."""
+        fields = self._fingerprint_fields.get(encoded)
+        if fields is None:
+            fingerprint = ContextFingerprint.decode(encoded)
+            fields = (
+                vocabulary.value_for("activities", fingerprint.activity) or "",
+                vocabulary.value_for("project_types", fingerprint.project_type) or "",
+                self.file_type_mask(vocabulary.file_types_of(fingerprint.file_types), add=True),
+            )
+            self._fingerprint_fields[encoded] = fields
+        return fields
+
+    def append(self, entry: Dict[str, Any], vocabulary: Optional[FingerprintVocabulary] = None) -> None:
+        """
+        Append one feedback entry in its stored dict form.
+
+        Args:
+            entry: Dict with timestamp, skill, fingerprint (or legacy context),
+                   outcome, user_rating
+            vocabulary: Vocabulary of the history the entry came from
+                        (needed to decode fingerprints)
+        """
+        outcome = entry.get("outcome", "unknown")
+        rating = entry.get("user_rating")
+
+        if entry.get("fingerprint"):
+            activity, project_type, mask = self._fingerprint_context(
+                entry["fingerprint"], vocabulary or FingerprintVocabulary()
+            )
+        else:
+            context = entry.get("context") or {}
+            activity = context.get("current_activity") or ""
+            project_type = context.get("project_type") or ""
+            mask = self.file_type_mask(context.get("file_types") or [], add=True)
+
+        cols = self.columns
+        cols["timestamps"].append(_parse_timestamp(entry.get("timestamp", "")))
+        cols["skill_ids"].append(self._intern("skills", entry.get("skill", "")))
+        cols["outcomes"].append(1 if outcome == "success" else 0 if outcome == "failure" else -1)
+        cols["ratings"].append(rating if isinstance(rating, int) and 1 <= rating <= 5 else 0)
+        cols["activity_ids"].append(self._intern("activities", activity))
+        cols["project_type_ids"].append(self._intern("project_types", project_type))
+        cols["file_type_masks"].append(mask)
+
+        self._success_by_context = None
+        self._outcomes_by_skill = None
+
+    @classmethod
+    def from_history_file(cls, path: Path) -> "FeedbackColumns":
+        """
+        Decode a feedback_history.json file entry by entry.
+
+        The file is read line by line and entries are decoded one at a time
+        from the "feedback" array, then dropped after their fields are
+        appended, so neither the file's text nor the full object graph is
+        ever held. The history is written one entry per line; an entry that
+        spans lines (an indented dump) is decoded once its last line is read.
+
+        Args:
+            path: Path to feedback_history.json
+
+        Returns:
+            FeedbackColumns (empty if the file is missing or unreadable).
+        """
+        table = cls()
+        decoder = json.JSONDecoder()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                # Header: everything up to the opening bracket of the entries
+                buffer = ""
+                key = bracket = -1
+                while bracket < 0:
+                    line = f.readline()
+                    if not line:
+                        return table
+                    buffer += line
+                    if key < 0:
+                        key = buffer.find('"feedback"')
+                    if key >= 0:
+                        bracket = buffer.find("[", key)
+
+                # The vocabulary header is written before the entries
+                vocabulary = FingerprintVocabulary()
+                vocabulary_key = buffer.find('"vocabulary"', 0, key)
+                if vocabulary_key >= 0:
+                    start = _SEPARATORS.match(buffer, buffer.index(":", vocabulary_key) + 1).end()
+                    vocabulary = FingerprintVocabulary(decoder.raw_decode(buffer, start)[0])
+
+                buffer, index = buffer[bracket + 1:], 0
+                while True:
+                    index = _SEPARATORS.match(buffer, index).end()
+                    if index < len(buffer) and buffer[index] == "]":
+                        break
+                    if index < len(buffer):
+                        try:
+                            entry, index = decoder.raw_decode(buffer, index)
+                            table.append(entry, vocabulary)
+                            continue
+                        except ValueError:
+                            pass  # entry continues on the next line
+                    line = f.readline()
+                    if not line:
+                        raise ValueError("Unterminated feedback array")
+                    buffer, index = buffer[index:] + line, 0
+        except (IOError, OSError):
+            return cls()
+        except (ValueError, AttributeError, TypeError):
+            # Malformed or unexpected layout: fall back to a full parse
+            table = cls()
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                vocabulary = FingerprintVocabulary(data.get("vocabulary"))
+                for entry in data.get("feedback", []):
+                    table.append(entry, vocabulary)
+            except (IOError, OSError, ValueError, AttributeError, TypeError):
+                return cls()
+        return table
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path, source_stamp: Tuple[int, int]) -> None:
+        """
+        Write columns to a binary sidecar.
+
+        Args:
+            path: Sidecar path
+            source_stamp: (mtime_ns, size) of the feedback file the columns came from
+        """
+        header = {
+            "version": COLUMNS_VERSION,
+            "byteorder": sys.byteorder,
+            "source": list(source_stamp),
+            "rows": len(self),
+            "skills": self.skills,
+            "activities": self.activities,
+            "project_types": self.project_types,
+            "file_types": self.file_types,
+            "columns": {name: col.typecode for name, col in self.columns.items()},
+        }
+        try:
+            with open(path, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                for name in COLUMN_TYPES:
+                    self.columns[name].tofile(f)
+        except (IOError, OSError):
+            pass
+
+    @classmethod
+    def load_sidecar(cls, path: Path, source_stamp: Tuple[int, int]) -> Optional["FeedbackColumns"]:
+        """
+        Read columns from a sidecar if it matches the source file.
+
+        Returns:
+            FeedbackColumns, or None if the sidecar is missing or stale.
+        """
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                if (header.get("version") != COLUMNS_VERSION
+                        or header.get("byteorder") != sys.byteorder
+                        or tuple(header.get("source", ())) != tuple(source_stamp)
+                        or header.get("columns") != COLUMN_TYPES):
+                    return None
+
+                table = cls()
+                rows = header["rows"]
+                for name, code in COLUMN_TYPES.items():
+                    column = array(code)
+                    column.fromfile(f, rows)
+                    table.columns[name] = column
+        except (IOError, OSError, EOFError, ValueError, KeyError):
+            return None
+
+        for vocabulary in ("skills", "activities", "project_types", "file_types"):
+            values = header.get(vocabulary, [])
+            setattr(table, vocabulary, list(values))
+            table._ids[vocabulary] = {value: i for i, value in enumerate(values)}
+        return table
+
+    @classmethod
+    def load(cls, history_path: Path, use_sidecar: bool = True) -> "FeedbackColumns":
+        """
+        Load columns for a feedback file, using the sidecar cache when fresh.
+
+        Args:
+            history_path: Path to feedback_history.json
+            use_sidecar: Read and refresh the binary sidecar next to the history file
+
+        Returns:
+            FeedbackColumns for the current file contents.
+        """
+        history_path = Path(history_path)
+        try:
+            stat = history_path.stat()
+        except (IOError, OSError):
+            return cls()
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        sidecar = history_path.with_name(SIDECAR_NAME)
+        if use_sidecar:
+            cached = cls.load_sidecar(sidecar, stamp)
+            if cached is not None:
+                return cached
+
+        table = cls.from_history_file(history_path)
+        if use_sidecar:
+            table.save(sidecar, stamp)
+        return table
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+
+    def _success_flags(self) -> bytes:
+        return self.columns["outcomes"].tobytes().translate(_SUCCESS_TABLE)
+
+    def outcome_counts_by_skill(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Count successes and failures per skill.
+
+        Returns:
+            Dict mapping skill name to (successes, failures).
+        """
+        if self._outcomes_by_skill is None:
+            self._outcomes_by_skill = Counter(zip(self.columns["skill_ids"], self.columns["outcomes"]))
+
+        result = {}
+        for (skill, outcome), count in self._outcomes_by_skill.items():
+            successes, failures = result.get(self.skills[skill], (0, 0))
+            if outcome == 1:
+                successes += count
+            elif outcome == 0:
+                failures += count
+            result[self.skills[skill]] = (successes, failures)
+        return result
+
+    def success_rate_by_skill(self) -> Dict[str, float]:
+        """
+        Success rate per skill over entries with a known outcome.
+
+        Returns:
+            Dict mapping skill name to success rate 0.0-1.0.
+        """
+        return {
+            skill: successes / (successes + failures)
+            for skill, (successes, failures) in self.outcome_counts_by_skill().items()
+            if successes + failures
+        }
+
+    def success_counts_by_context(self) -> Counter:
+        """
+        Successful uses grouped by (skill_id, activity_id, file_type_mask).
+
+        The number of distinct groups is small compared to the number of rows,
+        so context queries scan groups instead of rows.
+
+        Returns:
+            Counter keyed by (skill_id, activity_id, file_type_mask).
+        """
+        if self._success_by_context is None:
+            rows = zip(self.columns["skill_ids"], self.columns["activity_ids"],
+                       self.columns["file_type_masks"])
+            self._success_by_context = Counter(compress(rows, self._success_flags()))
+        return self._success_by_context
+
+    def similar_success_count(self, skill: str, activity: Optional[str], file_types: Set[str]) -> int:
+        """
+        Count successful uses of skill in a similar context.
+
+        Similar means the same activity or at least one shared file type,
+        matching UserPatternAnalyzer._is_similar_context. Extensions past the
+        first MAX_FILE_TYPE_BITS share the overflow bit and are not compared.
+
+        Args:
+            skill: Skill name
+            activity: Current activity
+            file_types: Current file extensions
+
+        Returns:
+            Number of matching successful entries.
+        """
+        skill_id = self._ids["skills"].get(skill)
+        if skill_id is None:
+            return 0
+        activity_id = self._ids["activities"].get(activity) if activity else None
+        mask = self.file_type_mask(file_types) & ~OTHER_FILE_TYPE_BIT
+
+        return sum(
+            count
+            for (s, a, m), count in self.success_counts_by_context().items()
+            if s == skill_id and ((activity_id is not None and a == activity_id) or (m & mask))
+        )
+
+    def success_count_for(self, skills: Set[str]) -> int:
+        """
+        Total successful uses across a set of skills.
+
+        Args:
+            skills: Skill names
+
+        Returns:
+            Number of successful entries for any of the skills.
+        """
+        counts = self.outcome_counts_by_skill()
+        return sum(counts.get(skill, (0, 0))[0] for skill in skills)
+
+
+def is_relevant(outcome: int, rating: int) -> bool:
+    """
+    Whether a history row counts as the user wanting the skill.
+
+    A rating of 4 or 5 always does; otherwise the use must have succeeded
+    and not been rated 1 or 2.
+
+    Args:
+        outcome: Outcome column value (1 success, 0 failure, -1 unknown)
+        rating: Rating column value (1-5, 0 when not rated)
+    """
+    if rating >= 4:
+        return True
+    return outcome == 1 and not 1 <= rating <= 2
+
+
+def _parse_timestamp(value: str) -> float:
+    """Convert an ISO-8601 timestamp (optionally 'Z'-suffixed) to epoch seconds."""
+    if not value:
+        return 0.0
+    try:
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return 0.0
@@ -0,0 +1,282 @@
+"""
+Context Fingerprint Module
+
+Compact stand-in for a full ContextAnalysis in stored feedback. A fingerprint
+keeps only what feedback queries need: interned activity and project type
+ids, a file-type bitmask, a bucketed change count and an optional hash of the
+changed paths. The id vocabularies are stored once in the history file
+header, so each entry is a short string and context similarity is a pair of
+integer comparisons.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+HISTORY_VERSION = "2.0"
+
+# Upper bounds of the change-count buckets: 0 | 1-2 | 3-5 | 6-20 | 21-100 | >100
+CHANGE_BUCKET_BOUNDS = (0, 2, 5, 20, 100)
+TRACKED_CHANGE_CATEGORIES = ("modified", "added", "deleted")
+PATH_HASH_BYTES = 6
+
+
+@dataclass(frozen=True)
+class ContextFingerprint:
+    """Interned summary of a ContextAnalysis."""
+    activity: Optional[int]      # index into the activities vocabulary
+    project_type: Optional[int]  # index into the project_types vocabulary
+    file_types: int              # bit i set when file_types vocabulary[i] was present
+    change_bucket: int           # index into CHANGE_BUCKET_BOUNDS (len() for > last bound)
+    path_hash: Optional[str] = None  # short hash of the changed paths, if any
+
+    def encode(self) -> str:
+        """Serialize as 'activity:project:mask-hex:bucket[:hash]' ('' for unknown ids)."""
+        parts = [
+            "" if self.activity is None else str(self.activity),
+            "" if self.project_type is None else str(self.project_type),
+            format(self.file_types, "x"),
+            str(self.change_bucket),
+        ]
+        if self.path_hash:
+            parts.append(self.path_hash)
+        return ":".join(parts)
+
+    @classmethod
+    def decode(cls, text: str) -> "ContextFingerprint":
+        """Parse the output of encode(); raises ValueError on malformed input."""
+        parts = text.split(":")
+        if len(parts) not in (4, 5):
+            raise ValueError(f"Malformed context fingerprint: {text!r}")
+        return cls(
+            activity=int(parts[0]) if parts[0] else None,
+            project_type=int(parts[1]) if parts[1] else None,
+            file_types=int(parts[2], 16),
+            change_bucket=int(parts[3]),
+            path_hash=parts[4] if len(parts) == 5 else None
+        )
+
+    def similar_to(self, other: "ContextFingerprint") -> bool:
+        """Same activity or at least one shared file type."""
+        if self.activity is not None and self.activity == other.activity:
+            return True
+        return bool(self.file_types & other.file_types)
+
+
+class FingerprintVocabulary:
+    """Value <-> id tables for activities, project types and file types."""
+
+    KINDS = ("activities", "project_types", "file_types")
+
+    def __init__(self, tables: Optional[Dict[str, List[str]]] = None):
+        tables = tables or {}
+        self.tables: Dict[str, List[str]] = {kind: list(tables.get(kind, [])) for kind in self.KINDS}
+        self._ids: Dict[str, Dict[str, int]] = {
+            kind: {value: i for i, value in enumerate(values)} for kind, values in self.tables.items()
+        }
+
+    def id_for(self, kind: str, value: Optional[str], add: bool = True) -> Optional[int]:
+        """
+        Id of a value, interning it when add is True.
+
+        Returns:
+            The id, or None for empty values and (with add=False) unseen ones.
+        """
+        if not value:
+            return None
+        ids = self._ids[kind]
+        index = ids.get(value)
+        if index is None and add:
+            index = len(ids)
+            ids[value] = index
+            self.tables[kind].append(value)
+        return index
+
+    def value_for(self, kind: str, index: Optional[int]) -> Optional[str]:
+        """Value of an id, or None if unknown."""
+        table = self.tables[kind]
+        if index is None or not 0 <= index < len(table):
+            return None
+        return table[index]
+
+    def file_type_mask(self, file_types: Iterable[str], add: bool = True) -> int:
+        """Bitmask of extensions (unseen ones are skipped when add is False)."""
+        mask = 0
+        for ext in file_types:
+            index = self.id_for("file_types", ext, add=add)
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def file_types_of(self, mask: int) -> List[str]:
+        """Extensions whose bits are set in mask."""
+        table = self.tables["file_types"]
+        return [ext for i, ext in enumerate(table) if mask >> i & 1]
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {kind: list(values) for kind, values in self.tables.items()}
+
+
+def change_bucket(count: int) -> int:
+    """Bucket index of a change count (see CHANGE_BUCKET_BOUNDS)."""
+    return bisect_left(CHANGE_BUCKET_BOUNDS, count)
+
+
+def path_hash(paths: Iterable[str]) -> Optional[str]:
+    """Order-independent short hash of a set of paths, or None if empty."""
+    unique = sorted(set(paths))
+    if not unique:
+        return None
+    digest = hashlib.blake2b("\0".join(unique).encode("utf-8", "surrogateescape"), digest_size=PATH_HASH_BYTES)
+    return digest.hexdigest()
+
+
+def fingerprint_context(
+    context: Any,
+    vocabulary: FingerprintVocabulary,
+    add: bool = True,
+    include_path_hash: bool = True
+) -> ContextFingerprint:
+    """
+    Fingerprint a ContextAnalysis or a legacy context dict.
+
+    Args:
+        context: ContextAnalysis, or dict as stored by older versions
+        vocabulary: Vocabulary to intern ids in
+        add: Intern unseen values (use False for read-only queries)
+        include_path_hash: Record a hash of the changed paths
+
+    Returns:
+        ContextFingerprint
+    """
+    if isinstance(context, ContextFingerprint):
+        return context
+    if isinstance(context, dict):
+        get = context.get
+    else:
+        def get(name, default=None):
+            return getattr(context, name, default)
+
+    changes = get("recent_changes") or {}
+    tracked = sum(len(changes.get(category) or ()) for category in TRACKED_CHANGE_CATEGORIES)
+    hashed = None
+    if include_path_hash:
+        hashed = path_hash(path for paths in changes.values() for path in paths or ())
+
+    return ContextFingerprint(
+        activity=vocabulary.id_for("activities", get("current_activity"), add=add),
+        project_type=vocabulary.id_for("project_types", get("project_type"), add=add),
+        file_types=vocabulary.file_type_mask(get("file_types") or (), add=add),
+        change_bucket=change_bucket(tracked),
+        path_hash=hashed
+    )
+
+
+def fingerprint_from_values(values: Dict[str, Any], vocabulary: FingerprintVocabulary) -> ContextFingerprint:
+    """
+    Intern a fingerprint given by value, as produced outside this history.
+
+    Args:
+        values: Dict with optional activity, project_type, file_types (list),
+                change_bucket (int) and path_hash
+        vocabulary: Vocabulary to intern ids in
+
+    Returns:
+        ContextFingerprint; raises ValueError on malformed values (checked
+        before anything is interned).
+    """
+    bucket = values.get("change_bucket", 0)
+    if not isinstance(bucket, int) or isinstance(bucket, bool) or not 0 <= bucket <= len(CHANGE_BUCKET_BOUNDS):
+        raise ValueError(f"Invalid change bucket: {bucket!r}")
+    for name in ("activity", "project_type"):
+        if values.get(name) is not None and not isinstance(values[name], str):
+            raise ValueError(f"{name} must be a string")
+    file_types = values.get("file_types") or ()
+    if not isinstance(file_types, (list, tuple)) or not all(isinstance(ext, str) for ext in file_types):
+        raise ValueError("file_types must be a list of strings")
+    hashed = values.get("path_hash") or None
+    if hashed is not None and not _is_path_hash(hashed):
+        raise ValueError(f"Invalid path hash: {hashed!r}")
+    return ContextFingerprint(
+        activity=vocabulary.id_for("activities", values.get("activity")),
+        project_type=vocabulary.id_for("project_types", values.get("project_type")),
+        file_types=vocabulary.file_type_mask(file_types),
+        change_bucket=bucket,
+        path_hash=hashed
+    )
+
+
+def _is_path_hash(value: Any) -> bool:
+    """Whether value looks like the output of path_hash()."""
+    if not isinstance(value, str) or len(value) != PATH_HASH_BYTES * 2:
+        return False
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        return False
+    return True
+
+
+def dump_history(entries: Iterable[Dict[str, Any]], vocabulary: "FingerprintVocabulary", f: TextIO) -> None:
+    """
+    Write a feedback history: the vocabulary header its fingerprints refer
+    to, then one compact entry per line.
+
+    An indented dump runs through the pure-Python encoder, which dominates
+    the cost of writing a large history, and the per-line layout is what
+    the streaming history readers expect.
+
+    Args:
+        entries: Feedback entries as plain dicts
+        vocabulary: Vocabulary the entries' fingerprints refer to
+        f: Text file open for writing
+    """
+    header = json.dumps(HISTORY_VERSION), json.dumps(vocabulary.to_dict(), ensure_ascii=False)
+    lines = ",\n".join("    " + json.dumps(entry, ensure_ascii=False) for entry in entries)
+    f.write('{\n  "version": %s,\n  "vocabulary": %s,\n  "feedback": [\n' % header)
+    f.write(lines)
+    f.write('\n  ]\n}\n' if lines else '  ]\n}\n')
+
+
+def migrate_history_file(path: Path, backup: bool = True) -> Tuple[int, int, int]:
+    """
+    Rewrite a feedback history so every entry stores a fingerprint.
+
+    Entries that already have a fingerprint are kept as they are; legacy
+    entries have their "context" replaced. The file is replaced atomically.
+
+    Args:
+        path: feedback_history.json to convert
+        backup: Keep the original as <name>.bak
+
+    Returns:
+        (entries converted, size before in bytes, size after in bytes)
+    """
+    path = Path(path)
+    before = path.stat().st_size
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    vocabulary = FingerprintVocabulary(data.get("vocabulary"))
+    converted = 0
+    entries = []
+    for entry in data.get("feedback", []):
+        if "fingerprint" not in entry:
+            entry = dict(entry)
+            context = entry.pop("context", None) or {}
+            entry["fingerprint"] = fingerprint_context(context, vocabulary).encode()
+            converted += 1
+        entries.append(entry)
+
+    temp = path.with_name(path.name + ".tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        dump_history(entries, vocabulary, f)
+    if backup:
+        shutil.copy2(path, path.with_name(path.name + ".bak"))
+    os.replace(temp, path)
+    return converted, before, path.stat().st_size
@@ -0,0 +1,537 @@
+"""
+Git Index Module
+
+Reads .git/index (versions 2, 3 and 4, including version 4's path prefix
+compression) with mmap and struct, and compares the stat data cached in it
+with the working tree. This answers the tracked part of ``git status``
+without a subprocess:
+
+- stat data unchanged: the file is clean
+- missing: deleted
+- size, type or executable bit changed: modified
+- only timestamps or inode changed, or the entry is racy (written in the
+  same instant as the index): uncertain, the content has to be compared,
+  which is left to git
+
+The index only records the working tree side. Staged changes (index versus
+HEAD) are ruled out via the index's cache-tree extension: when its root
+matches HEAD's tree, nothing is staged. Untracked files are listed with the
+engine's own gitignore matcher.
+
+Split indexes, sparse indexes and SHA-256 repositories are not supported;
+read_index() returns None for them and callers fall back to git.
+"""
+
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .deadline import Deadline
+from .gitignore import IgnoreMatcher
+from .repositories import common_dir, read_head, resolve_git_dir
+
+INDEX_SIGNATURE = b"DIRC"
+SUPPORTED_VERSIONS = (2, 3, 4)
+OID_SIZE = 20  # SHA-1; SHA-256 repositories are unsupported
+
+_HEADER = struct.Struct(">4sII")
+# ctime s/ns, mtime s/ns, dev, ino, mode, uid, gid, size, object id, flags
+_ENTRY = struct.Struct(">10I20sH")
+_EXTENDED_FLAGS = struct.Struct(">H")
+_EXTENSION = struct.Struct(">4sI")
+
+NAME_MASK = 0x0FFF
+STAGE_MASK = 0x3000
+EXTENDED = 0x4000
+SKIP_WORKTREE = 0x4000  # in the extended flags
+INTENT_TO_ADD = 0x2000  # in the extended flags
+
+# Extensions whose presence means the entries alone do not describe the index
+UNSUPPORTED_EXTENSIONS = (b"link", b"sdir")
+
+GITLINK = 0o160000
+DIRECTORY = 0o040000
+UNTRACKED_CHECK_INTERVAL = 256  # files walked between deadline checks
+
+# Packfile object types
+OBJ_COMMIT = 1
+PACK_IDX_MAGIC = b"\377tOc"
+
+
+class IndexEntry(NamedTuple):
+    """One index entry: a path with the stat data git cached for it."""
+    path: str
+    ctime_s: int
+    ctime_ns: int
+    mtime_s: int
+    mtime_ns: int
+    ino: int
+    mode: int
+    uid: int
+    gid: int
+    size: int
+    oid: str
+    stage: int
+    skip_worktree: bool
+    intent_to_add: bool
+
+
+@dataclass
+class GitIndex:
+    """Parsed index file."""
+    version: int
+    entries: List[IndexEntry]
+    tree_oid: Optional[str]  # root of the cache-tree extension, None if absent or invalidated
+    mtime_s: int             # modification time of the index file, for racy checks
+    mtime_ns: int
+
+
+@dataclass
+class IndexStatus:
+    """Working tree changes to tracked files, from stat data alone."""
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    uncertain: List[str] = field(default_factory=list)   # content must be compared to tell
+    submodules: List[str] = field(default_factory=list)  # gitlinks at their recorded commit (trees not checked)
+
+
+def _varint(data: mmap.mmap, position: int) -> Tuple[int, int]:
+    """Decode the offset varint version 4 uses for path prefix lengths."""
+    byte = data[position]
+    position += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[position]
+        position += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, position
+
+
+def _parse_entries(data: mmap.mmap, version: int, count: int) -> Tuple[List[IndexEntry], int]:
+    """
+    Parse the entry table.
+
+    Returns:
+        (entries, offset of the first extension)
+    """
+    entries = []
+    position = _HEADER.size
+    previous = b""
+    for _ in range(count):
+        start = position
+        (ctime_s, ctime_ns, mtime_s, mtime_ns, _dev, ino, mode, uid, gid, size,
+         oid, flags) = _ENTRY.unpack_from(data, position)
+        position += _ENTRY.size
+
+        extended = 0
+        if flags & EXTENDED:
+            if version < 3:
+                raise ValueError("extended flags in a version 2 index")
+            extended, = _EXTENDED_FLAGS.unpack_from(data, position)
+            position += _EXTENDED_FLAGS.size
+
+        if version == 4:
+            strip, position = _varint(data, position)
+            end = data.find(b"\0", position)
+            if end < 0 or strip > len(previous):
+                raise ValueError("truncated path")
+            name = previous[:len(previous) - strip] + data[position:end]
+            position = end + 1
+        else:
+            length = flags & NAME_MASK
+            end = position + length if length < NAME_MASK else data.find(b"\0", position)
+            if end < 0:
+                raise ValueError("truncated path")
+            name = data[position:end]
+            # Entries are NUL-padded to a multiple of eight bytes
+            position = start + ((end - start + 8) & ~7)
+        previous = name
+
+        if mode & 0o170000 == DIRECTORY:
+            raise ValueError("sparse directory entry")
+        entries.append(IndexEntry(
+            os.fsdecode(name), ctime_s, ctime_ns, mtime_s, mtime_ns, ino, mode, uid, gid, size,
+            oid.hex(), (flags & STAGE_MASK) >> 12,
+            bool(extended & SKIP_WORKTREE), bool(extended & INTENT_TO_ADD)
+        ))
+    return entries, position
+
+
+def _parse_extensions(data: mmap.mmap, position: int) -> Optional[str]:
+    """
+    Walk the extensions after the entries.
+
+    Returns:
+        Root tree id of the cache-tree extension, or None if absent or invalidated.
+    """
+    tree_oid = None
+    end = len(data) - OID_SIZE
+    while position + _EXTENSION.size <= end:
+        signature, size = _EXTENSION.unpack_from(data, position)
+        position += _EXTENSION.size
+        if signature in UNSUPPORTED_EXTENSIONS:
+            raise ValueError(f"unsupported extension {signature!r}")
+        if signature == b"TREE":
+            # Root node: "" NUL entry_count SP subtree_count LF [object id]
+            newline = data.find(b"\n", position, position + size)
+            if newline > 0 and data[position] == 0:
+                entry_count = int(data[position + 1:newline].split(b" ")[0])
+                if entry_count >= 0:
+                    tree_oid = data[newline + 1:newline + 1 + OID_SIZE].hex()
+        position += size
+    return tree_oid
+
+
+def _read_config(git_dir: Path) -> Dict[str, str]:
+    """core.* and extensions.* settings of a repository's config, keys lowercased."""
+    settings: Dict[str, str] = {}
+    section = ""
+    try:
+        with open(common_dir(git_dir) / "config", "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    section = line.strip("[]").split()[0].lower() if line.strip("[]") else ""
+                elif "=" in line and section in ("core", "extensions"):
+                    key, _, value = line.partition("=")
+                    settings[f"{section}.{key.strip().lower()}"] = value.split("#")[0].strip().strip('"')
+    except (IOError, OSError):
+        pass
+    return settings
+
+
+def _config_bool(settings: Dict[str, str], key: str, default: bool) -> bool:
+    value = settings.get(key)
+    if value is None:
+        return default
+    return value.lower() not in ("false", "no", "off", "0")
+
+
+def read_index(git_dir: Path) -> Optional[GitIndex]:
+    """
+    Parse a repository's index file.
+
+    Args:
+        git_dir: The repository's git directory
+
+    Returns:
+        GitIndex, or None if there is no index or its format is unsupported
+        (unknown version, split or sparse index, SHA-256 object ids) or corrupt.
+    """
+    path = Path(git_dir) / "index"
+    if _read_config(Path(git_dir)).get("extensions.objectformat", "sha1").lower() != "sha1":
+        return None
+    try:
+        with open(path, "rb") as f:
+            index_stat = os.fstat(f.fileno())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                signature, version, count = _HEADER.unpack_from(data, 0)
+                if signature != INDEX_SIGNATURE or version not in SUPPORTED_VERSIONS:
+                    return None
+                entries, position = _parse_entries(data, version, count)
+                tree_oid = _parse_extensions(data, position)
+    except (IOError, OSError, ValueError, IndexError, struct.error):
+        return None
+    return GitIndex(version, entries, tree_oid, index_stat.st_mtime_ns // 10**9, index_stat.st_mtime_ns % 10**9)
+
+
+def _read_object_header(git_dir: Path, oid: str, limit: int = 256) -> Optional[bytes]:
+    """
+    First bytes of a commit's content, from a loose object or an undeltified packed one.
+
+    Returns:
+        Up to limit bytes of the object's content, or None if not found this way.
+    """
+    objects = common_dir(git_dir) / "objects"
+    try:
+        with open(objects / oid[:2] / oid[2:], "rb") as f:
+            raw = zlib.decompressobj().decompress(f.read(), limit + 64)
+        header, _, content = raw.partition(b"\0")
+        return content if header.startswith(b"commit ") else None
+    except (IOError, OSError, zlib.error):
+        pass
+
+    wanted = bytes.fromhex(oid)
+    try:
+        idx_files = sorted((objects / "pack").glob("*.idx"))
+    except OSError:
+        return None
+    for idx_file in idx_files:
+        try:
+            with open(idx_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as idx:
+                if idx[:4] != PACK_IDX_MAGIC or struct.unpack_from(">I", idx, 4)[0] != 2:
+                    continue
+                fanout = 8
+                count = struct.unpack_from(">I", idx, fanout + 255 * 4)[0]
+                lo = struct.unpack_from(">I", idx, fanout + (wanted[0] - 1) * 4)[0] if wanted[0] else 0
+                hi = struct.unpack_from(">I", idx, fanout + wanted[0] * 4)[0]
+                names = fanout + 256 * 4
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    name = idx[names + mid * OID_SIZE:names + (mid + 1) * OID_SIZE]
+                    if name < wanted:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                if idx[names + lo * OID_SIZE:names + (lo + 1) * OID_SIZE] != wanted:
+                    continue
+                offsets = names + count * (OID_SIZE + 4)
+                offset = struct.unpack_from(">I", idx, offsets + lo * 4)[0]
+                if offset & 0x80000000:
+                    large = offsets + count * 4 + (offset & 0x7FFFFFFF) * 8
+                    offset = struct.unpack_from(">Q", idx, large)[0]
+            with open(idx_file.with_suffix(".pack"), "rb") as pack:
+                pack.seek(offset)
+                data = pack.read(4096)
+        except (IOError, OSError, ValueError, struct.error):
+            continue
+
+        byte = data[0]
+        if (byte >> 4) & 7 != OBJ_COMMIT:
+            return None  # deltified: left to git
+        position = 1
+        while byte & 0x80:
+            byte = data[position]
+            position += 1
+        try:
+            return zlib.decompressobj().decompress(data[position:], limit)
+        except zlib.error:
+            return None
+    return None
+
+
+def head_tree(git_dir: Path) -> Optional[str]:
+    """
+    Tree id of the commit HEAD points to.
+
+    Returns:
+        Hex tree id, or None if HEAD is unborn or its commit cannot be read
+        without git (deltified in a pack, or in an alternate object store).
+    """
+    head = read_head(Path(git_dir))
+    if not head or head.startswith("ref:") or len(head) != OID_SIZE * 2:
+        return None
+    content = _read_object_header(Path(git_dir), head)
+    if not content or not content.startswith(b"tree "):
+        return None
+    return content[5:5 + OID_SIZE * 2].decode("ascii", "replace")
+
+
+def nothing_staged(
+    git_dir: Path,
+    index: GitIndex,
+    resolve: Optional[Callable[[str], Optional[str]]] = None
+) -> bool:
+    """
+    Whether the index is known to match HEAD (no staged changes).
+
+    True when the cache-tree root is valid and equals HEAD's tree and no
+    entry is unmerged or marked intent-to-add; False when that cannot be
+    established.
+
+    Args:
+        git_dir: The repository's git directory
+        index: Output of read_index()
+        resolve: Optional object name resolver (e.g. GitObjects.resolve) used
+                 for "HEAD^{tree}" when the commit cannot be read directly
+    """
+    if index.tree_oid is None:
+        return False
+    if any(entry.stage or entry.intent_to_add for entry in index.entries):
+        return False
+    tree = head_tree(git_dir)
+    if tree is None and resolve is not None:
+        tree = resolve("HEAD^{tree}")
+    return tree == index.tree_oid
+
+
+def worktree_status(root: Path, index: GitIndex, git_dir: Optional[Path] = None) -> IndexStatus:
+    """
+    Compare the index's stat data with the working tree.
+
+    Follows git's own check: size, file type and (with core.fileMode) the
+    executable bit decide a modification outright; changed timestamps,
+    inode or owner only mean the content has to be compared, so the entry is
+    reported as uncertain, as are racy entries (modified in the same instant
+    the index was written) and entries git smudged to size 0.
+
+    Args:
+        root: Top level of the working tree
+        index: Output of read_index()
+        git_dir: Git directory whose config applies (defaults to root/.git)
+
+    Returns:
+        IndexStatus with repository-relative '/'-separated paths.
+    """
+    settings = _read_config(Path(git_dir) if git_dir else Path(root) / ".git")
+    filemode = _config_bool(settings, "core.filemode", True)
+    trust_ctime = _config_bool(settings, "core.trustctime", True)
+    minimal = settings.get("core.checkstat", "default").lower() == "minimal"
+    racy_before = (index.mtime_s, index.mtime_ns)
+
+    status = IndexStatus()
+    unmerged: Set[str] = set()
+    base = os.fspath(root)
+    for entry in index.entries:
+        if entry.stage:
+            if entry.path not in unmerged:
+                unmerged.add(entry.path)
+                status.modified.append(entry.path)
+            continue
+        if entry.skip_worktree:
+            continue
+        if entry.intent_to_add:
+            status.modified.append(entry.path)
+            continue
+
+        full = os.path.join(base, entry.path)
+        if entry.mode == GITLINK:
+            git_dir_of_sub = resolve_git_dir(Path(full))
+            if git_dir_of_sub is None:
+                continue  # not initialized: git reports nothing either
+            if read_head(git_dir_of_sub) != entry.oid:
+                status.modified.append(entry.path)
+            else:
+                status.submodules.append(entry.path)
+            continue
+
+        try:
+            st = os.lstat(full)
+        except (FileNotFoundError, NotADirectoryError):
+            status.deleted.append(entry.path)
+            continue
+        except OSError:
+            status.uncertain.append(entry.path)
+            continue
+
+        if stat.S_IFMT(st.st_mode) != stat.S_IFMT(entry.mode):
+            if stat.S_ISDIR(st.st_mode):
+                status.deleted.append(entry.path)  # replaced by a directory
+            else:
+                status.modified.append(entry.path)
+            continue
+        if filemode and stat.S_ISREG(st.st_mode) and (st.st_mode ^ entry.mode) & 0o100:
+            status.modified.append(entry.path)
+            continue
+        if st.st_size & 0xFFFFFFFF != entry.size:
+            # Size 0 is how git smudges racy entries: only the content can tell
+            (status.modified if entry.size else status.uncertain).append(entry.path)
+            continue
+
+        mtime_s, mtime_ns = divmod(st.st_mtime_ns, 10**9)
+        ctime_s, ctime_ns = divmod(st.st_ctime_ns, 10**9)
+        changed = (mtime_s & 0xFFFFFFFF != entry.mtime_s
+                   or (trust_ctime and ctime_s & 0xFFFFFFFF != entry.ctime_s))
+        if not minimal:
+            changed = (changed
+                       or mtime_ns != entry.mtime_ns
+                       or (trust_ctime and ctime_ns != entry.ctime_ns)
+                       or (entry.ino and st.st_ino & 0xFFFFFFFF != entry.ino)
+                       or (entry.uid and st.st_uid != entry.uid)
+                       or (entry.gid and st.st_gid != entry.gid))
+        if changed or (entry.mtime_s, entry.mtime_ns) >= racy_before:
+            status.uncertain.append(entry.path)
+    return status
+
+
+def worktree_stamp(root: Path, index: GitIndex) -> str:
+    """
+    Digest of the working tree's stat data, for caching a status result.
+
+    Covers every tracked path's size, timestamps, inode and mode, and the
+    modification times of the directories holding them (creating or
+    removing a file changes its directory's mtime), so editing, adding or
+    deleting a file changes the digest. Taking it costs one lstat per
+    tracked file, no content reads.
+
+    Args:
+        root: Top level of the working tree
+        index: Output of read_index()
+
+    Returns:
+        Hex digest.
+    """
+    digest = hashlib.sha1()
+    base = os.fspath(root)
+    directories = {""}
+    for entry in index.entries:
+        try:
+            st = os.lstat(os.path.join(base, entry.path))
+            digest.update(f"{entry.path}\0{st.st_size} {st.st_mtime_ns} {st.st_ctime_ns} "
+                          f"{st.st_ino} {st.st_mode}\n".encode("utf-8", "surrogateescape"))
+        except OSError:
+            digest.update(f"{entry.path}\0-\n".encode("utf-8", "surrogateescape"))
+        directory = entry.path.rpartition("/")[0]
+        while directory not in directories:
+            directories.add(directory)
+            directory = directory.rpartition("/")[0]
+    for directory in sorted(directories):
+        try:
+            mtime = os.stat(os.path.join(base, directory)).st_mtime_ns
+        except OSError:
+            mtime = -1
+        digest.update(f"{directory}/\0{mtime}\n".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def list_untracked(
+    root: Path,
+    index: GitIndex,
+    mode: str = "normal",
+    deadline: Optional[Deadline] = None,
+    exclude_files: Optional[List[Path]] = None
+) -> Tuple[List[str], bool]:
+    """
+    Files git would list as untracked, found with the engine's gitignore matcher.
+
+    Args:
+        root: Top level of the working tree
+        index: Output of read_index()
+        mode: "normal" reports a directory holding no tracked files as
+              "dir/" (like git's default), "all" lists every file
+        deadline: Optional deadline; the walk stops when it expires
+        exclude_files: Exclude files from gitignore.git_exclude_files (resolved
+                       from root when omitted)
+
+    Returns:
+        (untracked paths, whether the walk finished)
+    """
+    tracked = set()
+    tracked_dirs = {""}
+    gitlinks = set()
+    for entry in index.entries:
+        tracked.add(entry.path)
+        if entry.mode == GITLINK:
+            gitlinks.add(entry.path)
+        parent = entry.path.rpartition("/")[0]
+        while parent not in tracked_dirs:
+            tracked_dirs.add(parent)
+            parent = parent.rpartition("/")[0]
+
+    found: List[str] = []
+    reported: Set[str] = set()
+    walked = 0
+    for relative, _entry in IgnoreMatcher(Path(root), exclude_files=exclude_files).walk(skip=gitlinks):
+        walked += 1
+        if deadline is not None and walked % UNTRACKED_CHECK_INTERVAL == 0 and deadline.expired:
+            return sorted(found), False
+        if relative in tracked:
+            continue
+        if mode != "all":
+            # Collapse to the outermost directory without tracked files
+            parts = relative.split("/")
+            for depth in range(1, len(parts)):
+                directory = "/".join(parts[:depth])
+                if directory not in tracked_dirs:
+                    relative = directory + "/"
+                    break
+        if relative not in reported:
+            reported.add(relative)
+            found.append(relative)
+    return sorted(found), True
@@ -0,0 +1,322 @@
+"""
+Git Object Access Module
+
+Reads git objects through long-lived ``git cat-file --batch`` (contents)
+and ``--batch-check`` (type and size) processes instead of one git process
+per query. Each repository gets a small pool of such processes, started on
+first use and reused until exit, so thousands of lookups cost one process
+startup. Requests are pipelined: a batch of names is written ahead of the
+responses being read, bounded so neither pipe can fill up and deadlock.
+
+The pool is safe to share between threads; each thread checks a process
+out for the duration of its batch.
+
+Usage:
+    objects = git_objects(repo_dir)
+    readme = objects.read_blob("HEAD:README.md")
+    sizes = objects.object_sizes([f"HEAD:{path}" for path in paths])
+"""
+
+import atexit
+import os
+import subprocess
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from .metrics import GIT_OBJECT_PROCESSES
+
+BATCH, BATCH_CHECK = "batch", "batch-check"
+DEFAULT_MAX_PROCESSES = 4  # per repository and mode
+PIPELINE_BYTES = 16 * 1024  # request bytes written ahead of their responses (well under a pipe buffer)
+
+GITLINK = 0o160000
+TREE_MODE = 0o040000
+
+
+class ObjectInfo(NamedTuple):
+    """What --batch-check reports for an object."""
+    oid: str
+    type: str  # blob, tree, commit, tag
+    size: int
+
+
+class TreeEntry(NamedTuple):
+    """One entry of a tree object."""
+    mode: int
+    name: str
+    oid: str
+    type: str  # blob, tree, commit (submodule)
+
+
+def parse_tree(data: bytes, oid_size: int = 20) -> List[TreeEntry]:
+    """
+    Decode a raw tree object ("<mode> <name>\\0<binary object id>" records).
+
+    Args:
+        data: Tree contents as returned by cat-file
+        oid_size: Object id length in bytes (32 for SHA-256 repositories)
+    """
+    entries = []
+    position = 0
+    while position < len(data):
+        space = data.index(b" ", position)
+        nul = data.index(b"\0", space)
+        mode = int(data[position:space], 8)
+        oid = data[nul + 1:nul + 1 + oid_size].hex()
+        kind = "tree" if mode == TREE_MODE else "commit" if mode == GITLINK else "blob"
+        entries.append(TreeEntry(mode, os.fsdecode(data[space + 1:nul]), oid, kind))
+        position = nul + 1 + oid_size
+    return entries
+
+
+class _CatFile:
+    """One long-lived ``git cat-file --batch`` or ``--batch-check`` process."""
+
+    def __init__(self, repo: Path, mode: str):
+        self.mode = mode
+        self.proc = subprocess.Popen(
+            ["git", "cat-file", f"--{mode}"],
+            cwd=repo,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        GIT_OBJECT_PROCESSES.inc(1, mode)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def query(self, requests: Sequence[bytes]) -> List[Optional[tuple]]:
+        """
+        Send newline-terminated requests and read their responses in order.
+
+        Returns:
+            Per request (ObjectInfo, contents or None in check mode), or None
+            if the object does not exist.
+
+        Raises:
+            OSError: If the process died or answered out of protocol.
+        """
+        results: List[Optional[tuple]] = []
+        sent = 0
+        in_flight = 0
+        while len(results) < len(requests):
+            # Write ahead while the unanswered requests fit comfortably in git's stdin pipe
+            wrote = False
+            while sent < len(requests) and (in_flight == 0 or in_flight + len(requests[sent]) <= PIPELINE_BYTES):
+                self.proc.stdin.write(requests[sent])
+                in_flight += len(requests[sent])
+                sent += 1
+                wrote = True
+            if wrote:
+                self.proc.stdin.flush()
+
+            results.append(self._read_response())
+            in_flight -= len(requests[len(results) - 1])
+        return results
+
+    def _read_response(self) -> Optional[tuple]:
+        header = self.proc.stdout.readline()
+        if not header.endswith(b"\n"):
+            raise OSError("git cat-file exited")
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        fields = header.split()
+        if len(fields) != 3:
+            raise OSError(f"unexpected cat-file response {header!r}")
+        info = ObjectInfo(fields[0].decode("ascii"), fields[1].decode("ascii"), int(fields[2]))
+        if self.mode == BATCH_CHECK:
+            return info, None
+        contents = self.proc.stdout.read(info.size + 1)
+        if len(contents) != info.size + 1:
+            raise OSError("git cat-file exited")
+        return info, contents[:-1]
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc.stdout.close()
+
+
+class GitObjects:
+    """Pool of cat-file processes for one repository."""
+
+    def __init__(self, repo: Union[str, Path], max_processes: int = DEFAULT_MAX_PROCESSES):
+        """
+        Args:
+            repo: Any directory inside the repository (or worktree) to read from
+            max_processes: Processes per mode; more concurrent threads wait for one
+        """
+        self.repo = Path(repo)
+        self.max_processes = max(1, max_processes)
+        self._idle: Dict[str, List[_CatFile]] = {BATCH: [], BATCH_CHECK: []}
+        self._started = {BATCH: 0, BATCH_CHECK: 0}
+        self._available = threading.Condition()
+        self._closed = False
+
+    @contextmanager
+    def _checkout(self, mode: str) -> Iterator[_CatFile]:
+        """Borrow an idle process, starting one if the pool has room."""
+        with self._available:
+            while not self._idle[mode] and self._started[mode] >= self.max_processes:
+                self._available.wait()
+            if self._closed:
+                raise OSError("object pool is closed")
+            process = self._idle[mode].pop() if self._idle[mode] else None
+            if process is None:
+                self._started[mode] += 1
+
+        healthy = False
+        try:
+            if process is None:
+                process = _CatFile(self.repo, mode)
+            yield process
+            healthy = process.alive
+        finally:
+            with self._available:
+                if healthy and not self._closed:
+                    self._idle[mode].append(process)
+                else:
+                    self._started[mode] -= 1
+                    if process is not None:
+                        process.close()
+                self._available.notify()
+
+    def _query(self, mode: str, names: Sequence[str]) -> List[Optional[tuple]]:
+        # Names cannot contain newlines in the batch protocol; those are simply not found
+        valid = [i for i, name in enumerate(names) if "\n" not in name]
+        results: List[Optional[tuple]] = [None] * len(names)
+        if not valid:
+            return results
+        try:
+            with self._checkout(mode) as process:
+                answers = process.query([os.fsencode(names[i]) + b"\n" for i in valid])
+        except (OSError, ValueError):
+            return results
+        for i, answer in zip(valid, answers):
+            results[i] = answer
+        return results
+
+    def object_infos(self, names: Sequence[str]) -> List[Optional[ObjectInfo]]:
+        """
+        Type and size of many objects in one pipelined batch.
+
+        Args:
+            names: Object names git understands (ids, "HEAD:path", "v1.0^{tree}", ...)
+
+        Returns:
+            ObjectInfo per name, None where the object does not exist.
+        """
+        return [answer[0] if answer else None for answer in self._query(BATCH_CHECK, names)]
+
+    def object_info(self, name: str) -> Optional[ObjectInfo]:
+        """Type and size of one object (None if it does not exist)."""
+        return self.object_infos([name])[0]
+
+    def object_sizes(self, names: Sequence[str]) -> List[Optional[int]]:
+        """Sizes in bytes of many objects, None where missing."""
+        return [info.size if info else None for info in self.object_infos(names)]
+
+    def object_size(self, name: str) -> Optional[int]:
+        """Size in bytes of one object (None if it does not exist)."""
+        return self.object_sizes([name])[0]
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Object id a name refers to (None if it does not exist)."""
+        info = self.object_info(name)
+        return info.oid if info else None
+
+    def read_blobs(self, names: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        Contents of many blobs in one pipelined batch.
+
+        Returns:
+            Bytes per name, None where missing or not a blob.
+        """
+        return [
+            answer[1] if answer and answer[0].type == "blob" else None
+            for answer in self._query(BATCH, names)
+        ]
+
+    def read_blob(self, name: str) -> Optional[bytes]:
+        """Contents of one blob (None if missing or not a blob)."""
+        return self.read_blobs([name])[0]
+
+    def read_tree(self, name: str) -> Optional[List[TreeEntry]]:
+        """
+        Entries of a tree.
+
+        Args:
+            name: A tree, or a commit or tag peeled to its tree (e.g. "HEAD");
+                  "rev:path" names a subdirectory
+
+        Returns:
+            TreeEntry list in git's order, or None if missing or not a tree.
+        """
+        request = name if ":" in name else f"{name}^{{tree}}"
+        answer = self._query(BATCH, [request])[0]
+        if not answer or answer[0].type != "tree":
+            return None
+        info, contents = answer
+        try:
+            return parse_tree(contents, len(info.oid) // 2)
+        except ValueError:
+            return None
+
+    def close(self) -> None:
+        """Stop the idle processes; processes in use stop when returned."""
+        with self._available:
+            self._closed = True
+            idle = self._idle[BATCH] + self._idle[BATCH_CHECK]
+            self._idle = {BATCH: [], BATCH_CHECK: []}
+            for process in idle:
+                self._started[process.mode] -= 1
+            self._available.notify_all()
+        for process in idle:
+            process.close()
+
+    def __enter__(self) -> "GitObjects":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_pools: Dict[str, GitObjects] = {}
+_pools_lock = threading.Lock()
+
+
+def git_objects(repo: Union[str, Path]) -> GitObjects:
+    """
+    The process-wide object pool of a repository, created on first use.
+
+    Args:
+        repo: Directory inside the repository (pools are per resolved path)
+    """
+    key = str(Path(repo).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = GitObjects(key)
+        return pool
+
+
+def _close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(_close_pools)
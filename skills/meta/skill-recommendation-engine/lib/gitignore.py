@@ -0,0 +1,544 @@
+"""
+Gitignore Matching Module
+
+Compiles the user's global excludes file (core.excludesFile), the
+repository's info/exclude, .gitignore and nested ignore files into rule sets
+and walks a directory tree while pruning ignored directories, so scanners
+never descend into node_modules, virtualenvs, build output or vendored trees.
+
+This module has no intra-package imports so that the CI scripts under
+.github/scripts can load it directly by file path.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+IGNORE_FILE = ".gitignore"
+ALWAYS_PRUNED = {".git"}
+
+SYSTEM_CONFIG = "/etc/gitconfig"  # git's system config for the usual /usr prefix
+# Environment variables that change which repository or config files git reads
+CONFIG_ENVIRONMENT = (
+    "GIT_DIR", "GIT_COMMON_DIR", "GIT_CONFIG", "GIT_CONFIG_GLOBAL", "GIT_CONFIG_SYSTEM",
+    "GIT_CONFIG_COUNT", "GIT_CONFIG_PARAMETERS",
+)
+
+_GLOB_CHARS = re.compile(r"[*?\[\\]")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a gitignore-style glob into a regular expression.
+
+    Supports '*' and '?' (not matching '/'), character classes, and '**' as
+    a leading "**/", trailing "/**" or middle "/**/" component.
+
+    Args:
+        pattern: Glob relative to some base directory, without leading '/'
+
+    Returns:
+        Regex source matching the whole relative path.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 2] == "**":
+                at_start = i == 0 or pattern[i - 1] == "/"
+                after = pattern[i + 2:i + 3]
+                if at_start and after == "/":
+                    out.append("(?:.*/)?")  # "**/" matches zero or more directories
+                    i += 3
+                    continue
+                if at_start and after == "":
+                    out.append(".*")  # trailing "/**" matches everything inside
+                    i += 2
+                    continue
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1:j].replace("\\", "\\\\")
+            if body and body[0] in "!^":
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class _TrieNode:
+    """Path-component trie node for anchored literal rules."""
+    __slots__ = ("children", "rules")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.rules: List[Tuple[int, bool, bool]] = []  # (index, negated, dir_only), in file order
+
+
+def _last_applicable(rules: Sequence[Tuple[int, bool, bool]], is_dir: bool) -> Optional[Tuple[int, bool, bool]]:
+    """Last of a pattern's rules that applies to the path (dir-only rules skip files)."""
+    for rule in reversed(rules):
+        if is_dir or not rule[2]:
+            return rule
+    return None
+
+
+class RuleSet:
+    """
+    Compiled rules from one ignore file, relative to the directory containing it.
+
+    Rules are split three ways so most lookups avoid regexes:
+    - literal basename rules ("node_modules", ".venv") in a dict
+    - anchored literal rules ("/build", "docs/_build") in a path trie
+    - wildcard rules ("*.pyc", "src/**/gen") as compiled regexes
+    The highest-index matching rule decides, as in git.
+    """
+
+    def __init__(self, base: str = ""):
+        """
+        Args:
+            base: Directory of the ignore file, relative to the walk root ("" for the root)
+        """
+        self.base = base
+        self.names: Dict[str, List[Tuple[int, bool, bool]]] = {}  # every rule per name, in file order
+        self.trie = _TrieNode()
+        self.wildcards: List[Tuple[int, bool, bool, "re.Pattern"]] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, line: str) -> None:
+        """Compile one line of an ignore file."""
+        line = line.rstrip("\n").rstrip("\r")
+        if not line or line.startswith("#"):
+            return
+
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+        if not line:
+            return
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+        index = self._count
+        self._count += 1
+        rule = (index, negated, dir_only)
+
+        if not _GLOB_CHARS.search(line):
+            if anchored:
+                node = self.trie
+                for part in line.split("/"):
+                    node = node.children.setdefault(part, _TrieNode())
+                node.rules.append(rule)
+            else:
+                self.names.setdefault(line, []).append(rule)
+            return
+
+        if anchored:
+            regex = re.compile(glob_to_regex(line) + r"\Z", re.DOTALL)
+        else:
+            regex = re.compile(r"(?:.*/)?" + glob_to_regex(line) + r"\Z", re.DOTALL)
+        self.wildcards.append((index, negated, dir_only, regex))
+
+    def match(self, relative: str, is_dir: bool) -> Optional[bool]:
+        """
+        Decide whether a path is ignored by this rule set.
+
+        Args:
+            relative: Path relative to this rule set's base, '/'-separated
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if ignored, False if re-included by a negated rule,
+            None if no rule matches.
+        """
+        name = relative.rsplit("/", 1)[-1]
+        best = _last_applicable(self.names.get(name, ()), is_dir)
+
+        node = self.trie
+        for part in relative.split("/"):
+            node = node.children.get(part)
+            if node is None:
+                break
+        else:
+            rule = _last_applicable(node.rules, is_dir)
+            if rule is not None and (best is None or rule[0] > best[0]):
+                best = rule
+
+        floor = best[0] if best is not None else -1
+        for index, negated, dir_only, regex in reversed(self.wildcards):
+            if index <= floor:
+                break
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative):
+                best = (index, negated, dir_only)
+                break
+
+        if best is None:
+            return None
+        return not best[1]
+
+    @classmethod
+    def from_file(cls, path: Path, base: str = "") -> "RuleSet":
+        """
+        Compile an ignore file.
+
+        Args:
+            path: Path to .gitignore or .git/info/exclude
+            base: Directory the rules are relative to (relative to the walk root)
+
+        Returns:
+            RuleSet (empty if the file cannot be read).
+        """
+        rules = cls(base)
+        rules.add_file(path)
+        return rules
+
+    def add_file(self, path: Path) -> None:
+        """Compile every line of an ignore file after the existing rules (missing files add nothing)."""
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    self.add(line)
+        except (IOError, OSError):
+            pass
+
+
+def git_dirs(root: Path) -> Optional[Tuple[Path, Path]]:
+    """
+    Git directory and common (shared) directory of a working tree.
+
+    Follows a "gitdir:" file (linked worktrees, submodules) and the
+    git directory's commondir file (linked worktrees).
+
+    Returns:
+        (git dir, common dir), or None if root has no readable .git.
+    """
+    dot_git = Path(root) / ".git"
+    if dot_git.is_dir():
+        git_dir = dot_git
+    else:
+        try:
+            text = dot_git.read_text(encoding="utf-8").strip()
+        except (IOError, OSError, UnicodeDecodeError):
+            return None
+        if not text.startswith("gitdir:"):
+            return None
+        git_dir = Path(text[len("gitdir:"):].strip())
+        if not git_dir.is_absolute():
+            git_dir = (Path(root) / git_dir).resolve()
+        if not git_dir.is_dir():
+            return None
+
+    try:
+        shared = Path((git_dir / "commondir").read_text(encoding="utf-8").strip())
+        common = shared if shared.is_absolute() else (git_dir / shared).resolve()
+    except (IOError, OSError, UnicodeDecodeError):
+        common = git_dir
+    return git_dir, common
+
+
+def _config_value(path: Path, section: str, key: str) -> Tuple[Optional[str], bool]:
+    """
+    Last value of section.key in one git config file.
+
+    Returns:
+        (value or None, whether the file could be fully interpreted). Files
+        using [include] or [includeIf] are not: their values may come from
+        elsewhere.
+    """
+    value = None
+    current = ""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line[0] in "#;":
+                    continue
+                if line.startswith("["):
+                    header = line[1:line.find("]")] if "]" in line else line[1:]
+                    current = header.split()[0].split(".")[0].lower() if header.strip() else ""
+                    if current in ("include", "includeif"):
+                        return None, False
+                    continue
+                name, sep, raw = line.partition("=")
+                if current != section or name.strip().lower() != key:
+                    continue
+                raw = raw.strip()
+                if raw.startswith('"'):
+                    value = raw[1:].split('"', 1)[0]
+                else:
+                    value = re.split(r"\s[#;]", raw, 1)[0].strip() if sep else ""
+    except FileNotFoundError:
+        return None, True
+    except (IOError, OSError):
+        return None, False
+    return value, True
+
+
+def git_exclude_files(root: Path) -> Optional[List[Path]]:
+    """
+    Repository-wide exclude files git applies to a working tree, lowest precedence first.
+
+    These are the file named by core.excludesFile (from the system, global
+    and repository config; $XDG_CONFIG_HOME/git/ignore when unset) and the
+    common git directory's info/exclude. The files need not exist.
+
+    Args:
+        root: Top level of the working tree
+
+    Returns:
+        Paths, or None if they cannot be determined the way git would (no
+        readable .git, config includes, git environment overrides, or no
+        home directory).
+    """
+    if any(name in os.environ for name in CONFIG_ENVIRONMENT):
+        return None
+    dirs = git_dirs(root)
+    if dirs is None:
+        return None
+    git_dir, common = dirs
+
+    home = os.environ.get("HOME")
+    xdg = os.environ.get("XDG_CONFIG_HOME") or (os.path.join(home, ".config") if home else None)
+    configs = [] if os.environ.get("GIT_CONFIG_NOSYSTEM") else [Path(SYSTEM_CONFIG)]
+    if xdg:
+        configs.append(Path(xdg) / "git" / "config")
+    if home:
+        configs.append(Path(home) / ".gitconfig")
+    configs.append(common / "config")
+    configs.append(git_dir / "config.worktree")
+
+    excludes_file = None
+    for config in configs:
+        value, readable = _config_value(config, "core", "excludesfile")
+        if not readable:
+            return None
+        if value is not None:
+            excludes_file = value
+
+    files = []
+    if excludes_file is None:
+        if not xdg:
+            return None
+        files.append(Path(xdg) / "git" / "ignore")
+    elif excludes_file:
+        expanded = os.path.expanduser(excludes_file)
+        if expanded.startswith("~"):
+            return None
+        files.append(Path(root) / expanded)  # an absolute path replaces root
+    files.append(common / "info" / "exclude")
+    return files
+
+
+class IgnoreMatcher:
+    """Ignore rules for a tree: global excludes, info/exclude, root .gitignore and nested ones."""
+
+    def __init__(
+        self,
+        root: Path,
+        extra_patterns: Optional[List[str]] = None,
+        exclude_files: Optional[List[Path]] = None
+    ):
+        """
+        Args:
+            root: Root of the tree (normally the repository top level)
+            extra_patterns: Additional gitignore-style patterns applied at the root
+            exclude_files: Root-level exclude files, lowest precedence first;
+                           defaults to git_exclude_files(root), or just
+                           .git/info/exclude when those cannot be determined
+        """
+        self.root = Path(root)
+        self._root = os.fspath(self.root)  # string joins keep pathlib out of the walk loop
+        self._rule_sets: Dict[str, Optional[RuleSet]] = {}
+
+        if exclude_files is None:
+            exclude_files = git_exclude_files(self.root)
+        if exclude_files is None:
+            dirs = git_dirs(self.root)
+            exclude_files = [(dirs[1] if dirs else self.root / ".git") / "info" / "exclude"]
+        base_rules = RuleSet()
+        for path in exclude_files:
+            base_rules.add_file(path)
+        for pattern in extra_patterns or []:
+            base_rules.add(pattern)
+        self._base = base_rules if len(base_rules) else None
+
+    def rules_for(self, directory: str) -> Optional[RuleSet]:
+        """
+        Compiled rules of the .gitignore in a directory (loaded once, lazily).
+
+        Args:
+            directory: Directory relative to the root ("" for the root)
+        """
+        if directory not in self._rule_sets:
+            path = os.path.join(self._root, directory, IGNORE_FILE)
+            rules = RuleSet.from_file(Path(path), directory) if os.path.isfile(path) else None
+            self._rule_sets[directory] = rules if rules is not None and len(rules) else None
+        return self._rule_sets[directory]
+
+    def _decide(self, relative: str, is_dir: bool, stack: List[RuleSet]) -> bool:
+        # Deeper ignore files override shallower ones
+        for rules in reversed(stack):
+            sub = relative[len(rules.base) + 1:] if rules.base else relative
+            decision = rules.match(sub, is_dir)
+            if decision is not None:
+                return decision
+        return False
+
+    def _stack(self, directory: str) -> List[RuleSet]:
+        stack = [self._base] if self._base is not None else []
+        parts = directory.split("/") if directory else []
+        for depth in range(len(parts) + 1):
+            rules = self.rules_for("/".join(parts[:depth]))
+            if rules is not None:
+                stack.append(rules)
+        return stack
+
+    def is_ignored(self, relative: str, is_dir: bool = False) -> bool:
+        """
+        Check a single path, including whether any parent directory is ignored.
+
+        Args:
+            relative: Path relative to the root, '/'-separated
+            is_dir: Whether the path is a directory
+
+        Returns:
+            True if git would ignore the path.
+        """
+        parts = relative.strip("/").split("/")
+        for depth in range(1, len(parts) + 1):
+            current = "/".join(parts[:depth])
+            last = depth == len(parts)
+            if parts[depth - 1] in ALWAYS_PRUNED:
+                return True
+            if self._decide(current, is_dir or not last, self._stack("/".join(parts[:depth - 1]))):
+                return True
+        return False
+
+    def relative(self, path: Path) -> Optional[str]:
+        """
+        Path relative to the root, '/'-separated ("" for the root itself).
+
+        Returns:
+            The relative path, or None if path is outside the root.
+        """
+        try:
+            relative = Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return None
+        return "" if relative == "." else relative
+
+    def walk(
+        self,
+        start: Optional[Path] = None,
+        skip: Optional[Set[str]] = None
+    ) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Walk the tree, pruning ignored directories.
+
+        Args:
+            start: Directory to start from (defaults to the root); must be inside the root
+            skip: Directories (relative to the root) not to descend into, e.g. submodules
+
+        Yields:
+            (path relative to the root, DirEntry) for every non-ignored file.
+        """
+        start_rel = self.relative(start) if start else ""
+        if start_rel is None or (start_rel and self.is_ignored(start_rel, is_dir=True)):
+            return
+
+        pending = [(start_rel, self._stack(start_rel))]
+        while pending:
+            directory, stack = pending.pop()
+            try:
+                entries = list(os.scandir(os.path.join(self._root, directory)))
+            except OSError:
+                continue
+
+            for entry in sorted(entries, key=lambda e: e.name, reverse=True):
+                relative = f"{directory}/{entry.name}" if directory else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                if is_dir:
+                    if (entry.name in ALWAYS_PRUNED or (skip and relative in skip)
+                            or self._decide(relative, True, stack)):
+                        continue
+                    child_rules = self.rules_for(relative)
+                    pending.append((relative, stack + [child_rules] if child_rules else stack))
+                elif entry.name not in ALWAYS_PRUNED and not self._decide(relative, False, stack):
+                    yield relative, entry
+
+
+def walk_files(
+    root: Path,
+    patterns: Optional[List[str]] = None,
+    start: Optional[Path] = None,
+    extra_ignores: Optional[List[str]] = None
+) -> Iterator[Path]:
+    """
+    Yield files that git would not ignore, like a pruned Path.glob.
+
+    Args:
+        root: Tree root whose .gitignore files apply
+        patterns: Optional globs relative to start (e.g. "**/*.py"); files must match one
+        start: Directory inside root to walk (defaults to root)
+        extra_ignores: Additional gitignore-style patterns applied at the root
+
+    Yields:
+        start / <relative path> for each matching file.
+    """
+    matcher = IgnoreMatcher(Path(root), extra_patterns=extra_ignores)
+    start = Path(start) if start is not None else Path(root)
+    prefix = matcher.relative(start)
+    if prefix is None:
+        return
+    skip = len(prefix) + 1 if prefix else 0
+    regexes = [re.compile(glob_to_regex(p.lstrip("/")) + r"\Z", re.DOTALL) for p in patterns or []]
+
+    for relative, _entry in matcher.walk(start):
+        sub = relative[skip:]
+        if regexes and not any(r.match(sub) for r in regexes):
+            continue
+        yield start / sub
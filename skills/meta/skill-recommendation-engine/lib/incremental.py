@@ -0,0 +1,150 @@
+"""
+Incremental Scoring Module
+
+Keeps the last per-skill confidence components together with the inputs
+each one read, and on the next request recomputes only the components
+whose inputs changed:
+
+- context relevance reads the context signature (activity, project type,
+  file type class, budget band), the same for every skill
+- user alignment reads a per-skill slice of the preferences, so recording
+  feedback for one skill only rescores that skill
+- project fit reads the project signature
+- utility reads the skill's reliability score
+
+The ranking is kept sorted and only the rescored skills are moved in it.
+"""
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Component name -> points it contributes at a score of 1.0
+COMPONENT_WEIGHTS = {"context": 40, "user": 30, "project": 20, "utility": 10}
+COMPONENTS = tuple(COMPONENT_WEIGHTS)
+
+
+class IncrementalScores:
+    """Per-skill component scores with their input dependencies."""
+
+    def __init__(self, scorer: Any, utility_scorer: Any):
+        """
+        Args:
+            scorer: ConfidenceScorer
+            utility_scorer: SkillUtilityScorer
+        """
+        self.scorer = scorer
+        self.utility_scorer = utility_scorer
+        self.catalog_key: Optional[Tuple] = None
+        self.inputs: Dict[str, Dict[str, Any]] = {}     # skill -> component -> input signature
+        self.values: Dict[str, Dict[str, float]] = {}   # skill -> component -> score 0.0-1.0
+        self.totals: Dict[str, float] = {}              # skill -> confidence 0-100
+        self.ranking: List[Tuple[float, str]] = []      # (-confidence, skill), sorted
+        self.recomputed: Dict[str, Set[str]] = {name: set() for name in COMPONENTS}  # last update only
+
+    @property
+    def primed(self) -> bool:
+        return bool(self.totals)
+
+    @staticmethod
+    def _catalog_key(skills: Dict[str, Any]) -> Tuple:
+        return tuple(sorted((name, meta.category, meta.priority) for name, meta in skills.items()))
+
+    def _signature(self, component: str, skill: Any, context: Any, project_state: Any, user_prefs: Any,
+                   shared: Dict[str, Any]) -> Any:
+        if component == "user":
+            return self.scorer.user_signature(skill, user_prefs)
+        if component == "utility":
+            utility = self.utility_scorer.get_utility_score(skill.name)
+            return utility.reliability_score if utility else None
+        return shared[component]
+
+    def _compute(self, component: str, skill: Any, context: Any, project_state: Any, user_prefs: Any,
+                 signature: Any) -> float:
+        if component == "context":
+            return self.scorer.analyze_context_relevance(skill, context)
+        if component == "user":
+            return self.scorer.analyze_user_alignment(skill, user_prefs, context) if signature is not None else 0.0
+        if component == "project":
+            return self.scorer.analyze_project_fit(skill, project_state) if signature is not None else 0.0
+        return signature or 0.0
+
+    def update(
+        self,
+        skills: Dict[str, Any],
+        context: Any,
+        project_state: Optional[Any],
+        user_prefs: Optional[Any]
+    ) -> Dict[str, float]:
+        """
+        Bring every skill's confidence up to date with the given inputs.
+
+        Args:
+            skills: Skill catalog (name -> SkillMetadata)
+            context: ContextAnalysis object
+            project_state: ProjectState object (optional)
+            user_prefs: UserPreferences object (optional)
+
+        Returns:
+            Dict mapping skill name to confidence (0-100). ``recomputed``
+            lists which skills had each component recomputed.
+        """
+        catalog_key = self._catalog_key(skills)
+        if catalog_key != self.catalog_key:
+            self.catalog_key = catalog_key
+            self.inputs, self.values, self.totals, self.ranking = {}, {}, {}, []
+
+        shared = {
+            "context": self.scorer.context_signature(context),
+            "project": self.scorer.project_signature(project_state),
+        }
+        self.recomputed = {name: set() for name in COMPONENTS}
+
+        for name, skill in skills.items():
+            inputs = self.inputs.setdefault(name, {})
+            values = self.values.setdefault(name, {})
+            changed = False
+            for component in COMPONENTS:
+                signature = self._signature(component, skill, context, project_state, user_prefs, shared)
+                if component in inputs and inputs[component] == signature:
+                    continue
+                inputs[component] = signature
+                values[component] = self._compute(component, skill, context, project_state, user_prefs, signature)
+                self.recomputed[component].add(name)
+                changed = True
+
+            if changed:
+                total = sum(values[c] * weight for c, weight in COMPONENT_WEIGHTS.items())
+                self._move(name, min(100.0, max(0.0, total)))
+
+        return self.totals
+
+    def _move(self, name: str, total: float) -> None:
+        """Update one skill's total and its position in the ranking."""
+        old = self.totals.get(name)
+        if old is not None:
+            index = bisect_left(self.ranking, (-old, name))
+            if index < len(self.ranking) and self.ranking[index] == (-old, name):
+                del self.ranking[index]
+        self.totals[name] = total
+        insort(self.ranking, (-total, name))
+
+    def ranked(self) -> List[Tuple[str, float]]:
+        """(skill, confidence) pairs, highest confidence first."""
+        return [(name, -negative) for negative, name in self.ranking]
+
+    def to_state(self) -> Dict[str, Any]:
+        """Plain-type state for the warm-start snapshot."""
+        return {
+            "catalog_key": self.catalog_key,
+            "inputs": self.inputs,
+            "values": self.values,
+            "totals": self.totals,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Load state saved by to_state()."""
+        self.catalog_key = tuple(tuple(item) for item in state["catalog_key"])
+        self.inputs = {name: dict(inputs) for name, inputs in state["inputs"].items()}
+        self.values = {name: dict(values) for name, values in state["values"].items()}
+        self.totals = dict(state["totals"])
+        self.ranking = sorted((-total, name) for name, total in self.totals.items())
@@ -0,0 +1,489 @@
+"""
+Lockfile Dependency Counting Module
+
+Streams through package-lock.json, poetry.lock, Cargo.lock, go.sum and
+pnpm-lock.yaml line by line to count direct and transitive dependencies
+without loading the whole document. Results are cached by file content hash.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .metrics import cache_result
+
+CACHE_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class DependencyCounts:
+    """Direct and transitive dependency counts for a project."""
+    direct: int = 0
+    transitive: int = 0
+    sources: List[str] = field(default_factory=list)  # files the counts came from
+
+    @property
+    def total(self) -> int:
+        return self.direct + self.transitive
+
+    def add(self, other: "DependencyCounts") -> None:
+        self.direct += other.direct
+        self.transitive += other.transitive
+        self.sources.extend(other.sources)
+
+
+def _lines(path: Path) -> Iterator[str]:
+    """Yield lines of a text file without reading it all at once."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield line.rstrip("\n").rstrip("\r")
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+# ----------------------------------------------------------------------
+# Format parsers: each returns (direct names, all package identifiers)
+# ----------------------------------------------------------------------
+
+_JSON_KEY = re.compile(r'^\s*"((?:[^"\\]|\\.)*)"\s*:')
+
+
+def parse_package_lock(path: Path) -> Tuple[Set[str], Set[str]]:
+    """
+    Parse an npm package-lock.json (lockfile v1, v2 or v3).
+
+    npm writes lockfiles with two-space indentation, so packages can be found
+    from key indentation alone. v2/v3 list every installed package under
+    "packages" as "node_modules/..." keys; v1 nests packages under
+    "dependencies". Direct dependencies come from the root ("") package entry,
+    or from package.json next to the lockfile for v1.
+    """
+    direct: Set[str] = set()
+    packages: Set[str] = set()
+    legacy_packages: Set[str] = set()
+
+    section = None        # top-level key currently open
+    in_root = False       # inside packages[""]
+    in_root_deps = False  # inside packages[""].*dependencies
+    v1_stack: List[str] = []
+
+    for line in _lines(path):
+        indent = _indent(line)
+        # Most lines are package fields; skip them before running the regex
+        if section == "packages" and (
+            indent > 8
+            or (indent == 6 and not in_root)
+            or (indent == 8 and not in_root_deps)
+        ):
+            continue
+
+        match = _JSON_KEY.match(line)
+        key = match.group(1) if match else None
+
+        if indent == 2 and key is not None:
+            section = key
+            in_root = in_root_deps = False
+            v1_stack = []
+            continue
+
+        if section == "packages":
+            if indent == 4 and key is not None:
+                in_root = key == ""
+                in_root_deps = False
+                if key.startswith("node_modules/") or "/node_modules/" in key:
+                    packages.add(key)
+            elif in_root and indent == 6:
+                in_root_deps = key in ("dependencies", "devDependencies", "optionalDependencies")
+            elif in_root_deps and indent == 8 and key is not None:
+                direct.add(key)
+
+        elif section == "dependencies":
+            # v1: "dependencies" objects nest in steps of 4 spaces (name, then fields)
+            if key is not None and line.rstrip().endswith("{") and indent % 4 == 0:
+                depth = indent // 4
+                if key == "dependencies":
+                    continue
+                del v1_stack[depth - 1:]
+                v1_stack.append(key)
+                legacy_packages.add("/".join(v1_stack))
+
+    # v2 files carry both sections; the "packages" view is authoritative
+    if not packages:
+        packages = legacy_packages
+
+    if not direct:
+        manifest = path.with_name("package.json")
+        try:
+            data = json.loads(manifest.read_text(encoding="utf-8"))
+            for group in ("dependencies", "devDependencies", "optionalDependencies"):
+                direct.update(data.get(group, {}) or {})
+        except (IOError, OSError, ValueError, AttributeError):
+            pass
+
+    return direct, packages
+
+
+def parse_poetry_lock(path: Path) -> Tuple[Set[str], Set[str]]:
+    """
+    Parse a poetry.lock file.
+
+    Every locked package is a [[package]] table with a name. Direct
+    dependencies come from pyproject.toml next to the lockfile.
+    """
+    packages: Set[str] = set()
+    in_package = False
+
+    for line in _lines(path):
+        stripped = line.strip()
+        if stripped.startswith("["):
+            in_package = stripped == "[[package]]"
+            continue
+        if in_package and stripped.startswith("name"):
+            name = stripped.split("=", 1)[-1].strip().strip('"\'')
+            packages.add(name.lower())
+            in_package = False
+
+    direct = {name.lower() for name in _pyproject_dependencies(path.with_name("pyproject.toml"))}
+    return direct, packages
+
+
+_REQUIREMENT_NAME = re.compile(r'^\s*"?\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+
+def _pyproject_dependencies(path: Path) -> Set[str]:
+    """Collect dependency names from Poetry tables and PEP 621 arrays in pyproject.toml."""
+    names: Set[str] = set()
+    if not path.exists():
+        return names
+
+    table = ""
+    in_array = False
+    for line in _lines(path):
+        stripped = line.split("#", 1)[0].strip()
+        if not stripped:
+            continue
+
+        if in_array:
+            if stripped.startswith("]"):
+                in_array = False
+                continue
+            match = _REQUIREMENT_NAME.match(stripped.strip(","))
+            if match:
+                names.add(match.group(1))
+            continue
+
+        if stripped.startswith("["):
+            table = stripped.strip("[]").strip()
+            continue
+
+        key, _, value = stripped.partition("=")
+        key = key.strip().strip('"')
+        if table.startswith("tool.poetry") and table.endswith("dependencies"):
+            if key and key != "python":
+                names.add(key)
+        elif table in ("project", "project.optional-dependencies") and value.strip().startswith("["):
+            if table == "project" and key != "dependencies":
+                continue
+            rest = value.strip()[1:]
+            for item in rest.rstrip("]").split(","):
+                match = _REQUIREMENT_NAME.match(item.strip())
+                if match:
+                    names.add(match.group(1))
+            in_array = not rest.rstrip().endswith("]")
+
+    return names
+
+
+def parse_cargo_lock(path: Path) -> Tuple[Set[str], Set[str]]:
+    """
+    Parse a Cargo.lock file.
+
+    Packages without a "source" line are workspace members; the names listed
+    in their dependencies arrays (excluding other members) are direct.
+    """
+    packages: Set[str] = set()
+    local: Set[str] = set()
+    local_deps: Set[str] = set()
+
+    name = version = None
+    has_source = False
+    deps: List[str] = []
+    in_deps = False
+
+    def finish() -> None:
+        if name is None:
+            return
+        if has_source:
+            packages.add(f"{name} {version}")
+        else:
+            local.add(name)
+            local_deps.update(deps)
+
+    for line in _lines(path):
+        stripped = line.strip()
+        if stripped == "[[package]]":
+            finish()
+            name = version = None
+            has_source = False
+            deps = []
+            in_deps = False
+            continue
+
+        if in_deps:
+            if stripped.startswith("]"):
+                in_deps = False
+            elif stripped.startswith('"'):
+                # entries look like "serde", "serde 1.0.1" or "serde 1.0.1 (registry+...)"
+                deps.append(stripped.strip('",').split(" ", 1)[0])
+            continue
+
+        if stripped.startswith("name ="):
+            name = stripped.split("=", 1)[1].strip().strip('"')
+        elif stripped.startswith("version ="):
+            version = stripped.split("=", 1)[1].strip().strip('"')
+        elif stripped.startswith("source ="):
+            has_source = True
+        elif stripped.startswith("dependencies = ["):
+            inline = stripped[len("dependencies = ["):]
+            if inline.endswith("]"):
+                deps.extend(d.strip().strip('"').split(" ", 1)[0]
+                            for d in inline[:-1].split(",") if d.strip())
+            else:
+                in_deps = True
+        elif stripped.startswith("[") and stripped != "[[package]]":
+            finish()
+            name = None
+
+    finish()
+    return local_deps - local, packages
+
+
+def parse_go_sum(path: Path) -> Tuple[Set[str], Set[str]]:
+    """
+    Parse a go.sum file.
+
+    Each module version appears once for its tree and once for its go.mod;
+    modules are counted once per path. Direct dependencies are go.mod
+    require entries not marked "// indirect".
+    """
+    packages: Set[str] = set()
+    for line in _lines(path):
+        parts = line.split()
+        if len(parts) >= 2:
+            packages.add(parts[0])
+
+    direct: Set[str] = set()
+    go_mod = path.with_name("go.mod")
+    if go_mod.exists():
+        in_block = False
+        for line in _lines(go_mod):
+            stripped = line.strip()
+            if stripped.startswith("require ("):
+                in_block = True
+                continue
+            if in_block and stripped.startswith(")"):
+                in_block = False
+                continue
+            if stripped.startswith("require "):
+                stripped = stripped[len("require "):]
+            elif not in_block:
+                continue
+            if stripped and "// indirect" not in stripped and not stripped.startswith("//"):
+                direct.add(stripped.split()[0])
+
+    return direct, packages
+
+
+def parse_pnpm_lock(path: Path) -> Tuple[Set[str], Set[str]]:
+    """
+    Parse a pnpm-lock.yaml file.
+
+    Locked packages are the two-space-indented keys under "packages:".
+    Direct dependencies are listed per importer (lockfile v6+) or at the top
+    level (v5) under dependencies/devDependencies/optionalDependencies.
+    """
+    direct: Set[str] = set()
+    packages: Set[str] = set()
+    dep_sections = ("dependencies:", "devDependencies:", "optionalDependencies:")
+
+    section = None
+    dep_indent = None  # indent of an open dependency section
+
+    for line in _lines(path):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        indent = _indent(line)
+        stripped = line.strip()
+
+        if indent == 0:
+            section = stripped
+            dep_indent = 0 if stripped in dep_sections else None
+            continue
+
+        if section == "packages:":
+            if indent == 2 and stripped.endswith(":"):
+                packages.add(stripped[:-1].strip("'\""))
+        elif section == "importers:":
+            if indent == 4:
+                dep_indent = 4 if stripped in dep_sections else None
+            elif dep_indent == 4 and indent == 6 and stripped.endswith(":"):
+                direct.add(stripped[:-1].strip("'\""))
+        elif dep_indent == 0 and indent == 2:
+            direct.add(stripped.split(":", 1)[0].strip("'\""))
+
+    return direct, packages
+
+
+# Manifests whose contents feed a lockfile parser's direct dependency count
+LOCKFILE_MANIFESTS = {
+    "package-lock.json": "package.json",
+    "poetry.lock": "pyproject.toml",
+    "go.sum": "go.mod",
+}
+
+# Lockfile name -> (parser, ecosystem)
+LOCKFILE_PARSERS: Dict[str, Tuple[Callable[[Path], Tuple[Set[str], Set[str]]], str]] = {
+    "package-lock.json": (parse_package_lock, "node"),
+    "pnpm-lock.yaml": (parse_pnpm_lock, "node"),
+    "poetry.lock": (parse_poetry_lock, "python"),
+    "Cargo.lock": (parse_cargo_lock, "rust"),
+    "go.sum": (parse_go_sum, "go"),
+}
+
+
+class LockfileCounter:
+    """Counts lockfile dependencies with a content-hash keyed cache."""
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        """
+        Initialize the counter.
+
+        Args:
+            cache_file: Optional JSON file to persist results across processes
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._lock = threading.Lock()
+        self._results: Dict[str, Dict[str, object]] = {}   # sha256 -> counts
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}  # path -> (mtime_ns, size, sha256)
+        self._dirty = False
+        self._load_cache()
+
+    def _load_cache(self) -> None:
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+            if data.get("version") == CACHE_VERSION:
+                self._results = data.get("results", {})
+                self._hashes = {k: tuple(v) for k, v in data.get("hashes", {}).items()}
+        except (IOError, OSError, ValueError, AttributeError):
+            pass
+
+    def save(self) -> None:
+        """Persist the cache if it changed."""
+        if not self.cache_file or not self._dirty:
+            return
+        # Held while writing so analyzers sharing one counter never interleave writes
+        with self._lock:
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.cache_file, "w", encoding="utf-8") as f:
+                    json.dump({
+                        "version": CACHE_VERSION,
+                        "results": self._results,
+                        "hashes": self._hashes,
+                    }, f)
+                self._dirty = False
+            except (IOError, OSError):
+                pass
+
+    def file_hash(self, path: Path) -> str:
+        """
+        SHA-256 of a file, reusing the previous hash when size and mtime match.
+        """
+        stat = path.stat()
+        key = str(path.resolve())
+        known = self._hashes.get(key)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha = digest.hexdigest()
+        with self._lock:
+            self._hashes[key] = (stat.st_mtime_ns, stat.st_size, sha)
+            self._dirty = True
+        return sha
+
+    def count(self, path: Path) -> Optional[DependencyCounts]:
+        """
+        Count dependencies in a single lockfile.
+
+        Args:
+            path: Path to a supported lockfile
+
+        Returns:
+            DependencyCounts, or None if the file is unsupported or unreadable.
+        """
+        path = Path(path)
+        entry = LOCKFILE_PARSERS.get(path.name)
+        if entry is None:
+            return None
+        parser, _ = entry
+
+        try:
+            cache_key = f"{path.name}:{self.file_hash(path)}"
+            manifest = path.with_name(LOCKFILE_MANIFESTS.get(path.name, path.name))
+            if manifest != path and manifest.exists():
+                cache_key += f":{self.file_hash(manifest)}"
+            cached = self._results.get(cache_key)
+            cache_result("lockfile", cached is not None)
+            if cached is None:
+                direct, packages = parser(path)
+                cached = {
+                    "direct": len(direct),
+                    "transitive": max(0, len(packages) - len(direct)),
+                }
+                with self._lock:
+                    self._results[cache_key] = cached
+                    self._dirty = True
+        except (IOError, OSError, UnicodeDecodeError):
+            return None
+
+        return DependencyCounts(
+            direct=cached["direct"],
+            transitive=cached["transitive"],
+            sources=[path.name]
+        )
+
+    def count_project(self, project_dir: Path) -> Dict[str, DependencyCounts]:
+        """
+        Count dependencies from every supported lockfile in a directory.
+
+        Args:
+            project_dir: Directory containing lockfiles
+
+        Returns:
+            Dict mapping ecosystem ("node", "python", "rust", "go") to counts.
+            When an ecosystem has several lockfiles, the first found wins.
+        """
+        results: Dict[str, DependencyCounts] = {}
+        for name, (_, ecosystem) in LOCKFILE_PARSERS.items():
+            if ecosystem in results:
+                continue
+            lockfile = Path(project_dir) / name
+            if lockfile.exists():
+                counts = self.count(lockfile)
+                if counts is not None:
+                    results[ecosystem] = counts
+        self.save()
+        return results
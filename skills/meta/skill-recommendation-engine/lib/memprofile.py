@@ -0,0 +1,216 @@
+"""
+Memory Profiling Module
+
+Opt-in tracemalloc profiling of named stages. Code marks its stages with
+``memory_stage(name)``, which costs nothing unless a MemoryProfiler is
+active; while one is, each stage records its net allocation, its peak
+above the memory in use when it started, and the source lines that
+allocated the most during it. The result is a JSON report.
+
+Profiling is enabled with ``with MemoryProfiler() as profiler:`` or, for
+whole processes (CLI tools, the .github scripts), by setting
+SKILL_MEMORY_PROFILE to a report path; the report is written at exit.
+
+This module has no imports from the rest of the engine so the .github
+scripts can load it by file path.
+"""
+
+import atexit
+import json
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+PROFILE_ENV = "SKILL_MEMORY_PROFILE"
+DEFAULT_TOP = 10
+DEFAULT_FRAMES = 1
+
+_active: Optional["MemoryProfiler"] = None
+_active_lock = threading.Lock()
+
+
+class _Stage:
+    """Measurements of one open stage."""
+
+    def __init__(self, name: str, start_bytes: int, snapshot: Optional[tracemalloc.Snapshot]):
+        self.name = name
+        self.start_bytes = start_bytes
+        self.peak_bytes = start_bytes  # absolute traced memory
+        self.snapshot = snapshot
+
+
+class MemoryProfiler:
+    """Collects per-stage allocation statistics while active."""
+
+    def __init__(self, top: int = DEFAULT_TOP, frames: int = DEFAULT_FRAMES, sites: bool = True):
+        """
+        Args:
+            top: Allocation sites kept per stage
+            frames: Traceback depth tracemalloc stores per allocation
+            sites: Take snapshots to attribute allocations to source lines
+                   (slower, and the snapshots count toward enclosing stages'
+                   peaks; peak and net figures do not need them)
+        """
+        self.top = top
+        self.frames = frames
+        self.sites = sites
+        self.stages: List[Dict[str, Any]] = []
+        self.peak_bytes = 0
+        self._open: List[_Stage] = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+
+    def start(self) -> "MemoryProfiler":
+        """Start tracing and make this the active profiler."""
+        global _active
+        with _active_lock:
+            if _active is not None:
+                raise RuntimeError("Another MemoryProfiler is already active")
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracing = True
+            _active = self
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        Deactivate the profiler (and stop tracing if it started it).
+
+        Returns:
+            The report (see report()).
+        """
+        global _active
+        with _active_lock:
+            if _active is self:
+                _active = None
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        return self.report()
+
+    def __enter__(self) -> "MemoryProfiler":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _observe_peak(self) -> None:
+        """Fold the peak since the last reset into every open stage, then reset it."""
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak_bytes = max(self.peak_bytes, peak)
+        for stage in self._open:
+            stage.peak_bytes = max(stage.peak_bytes, peak)
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+; earlier peaks are process-wide
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure a named stage; stages may nest."""
+        with self._lock:
+            # Snapshot first so its own allocations do not count against this stage
+            snapshot = tracemalloc.take_snapshot() if self.sites else None
+            self._observe_peak()
+            stage = _Stage(name, tracemalloc.get_traced_memory()[0], snapshot)
+            self._open.append(stage)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._observe_peak()
+                self._open.remove(stage)
+                self.stages.append(self._finish(stage))
+
+    def _finish(self, stage: _Stage) -> Dict[str, Any]:
+        current = tracemalloc.get_traced_memory()[0]
+        result = {
+            "stage": stage.name,
+            "net_bytes": current - stage.start_bytes,
+            "peak_bytes": stage.peak_bytes - stage.start_bytes,
+            "top_sites": [],
+        }
+        if stage.snapshot is not None:
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            after = tracemalloc.take_snapshot().filter_traces(ignore)
+            before = stage.snapshot.filter_traces(ignore)
+            for diff in after.compare_to(before, "lineno")[:self.top]:
+                if diff.size_diff <= 0:
+                    break
+                frame = diff.traceback[0]
+                result["top_sites"].append({
+                    "site": f"{frame.filename}:{frame.lineno}",
+                    "size_bytes": diff.size_diff,
+                    "count": diff.count_diff,
+                })
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Report of the stages finished so far.
+
+        Returns:
+            Dict with peak_bytes (largest traced memory seen) and stages: one
+            entry per finished stage, in completion order, with net_bytes,
+            peak_bytes (above the stage's starting memory) and top_sites.
+        """
+        return {"peak_bytes": self.peak_bytes, "stages": list(self.stages)}
+
+    def write(self, path: Union[str, Path]) -> bool:
+        """
+        Write the report as JSON.
+
+        Returns:
+            True if the file was written.
+        """
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=2)
+        except (IOError, OSError):
+            return False
+        return True
+
+
+class _NoStage:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+def memory_stage(name: str) -> Any:
+    """Context manager measuring a stage in the active profiler (no-op when none is)."""
+    profiler = _active
+    if profiler is None:
+        return _NO_STAGE
+    return profiler.stage(name)
+
+
+def profile_from_env() -> Optional[MemoryProfiler]:
+    """
+    Start a process-wide profiler if SKILL_MEMORY_PROFILE names a report path.
+
+    Returns:
+        The started profiler (its report is written at exit), or None.
+    """
+    path = os.environ.get(PROFILE_ENV)
+    if not path or _active is not None:
+        return None
+    profiler = MemoryProfiler().start()
+
+    def write_report() -> None:
+        profiler.stop()
+        profiler.write(path)
+
+    atexit.register(write_report)
+    return profiler
+
+
+profile_from_env()
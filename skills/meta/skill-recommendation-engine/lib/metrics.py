@@ -0,0 +1,291 @@
+"""
+Operational Metrics Module
+
+Process-wide counters and histograms with Prometheus text-format export.
+Recording is a lock-protected dict update, cheap enough for hot paths;
+nothing is written until export is requested, or at exit when the
+SKILL_METRICS_DIR environment variable names a directory (for
+node-exporter's textfile collector).
+
+This module has no imports from the rest of the engine so the installer
+and the .github scripts can load it by file path.
+"""
+
+import atexit
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+METRICS_DIR_ENV = "SKILL_METRICS_DIR"
+
+# Seconds; covers sub-millisecond cache hits up to slow git calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonically increasing value per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        """
+        Add to the counter.
+
+        Args:
+            amount: Non-negative increment
+            labels: One value per label name, in declaration order
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram:
+    """Bucketed observations (e.g. latencies) per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # per-bucket counts + [+Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value (seconds for timings)
+            labels: One value per label name, in declaration order
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of a with-block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def timed(self, *labels: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator observing each call's duration (coroutine functions included)."""
+        def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    with self.time(*labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.time(*labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {_format_value(cumulative)}")
+            labels = _label_text(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+Metric = Union[Counter, Histogram]
+
+
+class MetricsRegistry:
+    """Named metrics of one process, exported together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self._exit_path: Optional[Path] = None
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labels != metric.labels:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics with at least one sample, in Prometheus text format."""
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            samples = metric.samples()
+            if not samples:
+                continue
+            help_text = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, path: Union[str, Path]) -> bool:
+        """
+        Write the metrics atomically (the textfile collector must never see a partial file).
+
+        Args:
+            path: Output file, conventionally ending in .prom
+
+        Returns:
+            True if the file was written.
+        """
+        path = Path(path)
+        temp = path.with_name(path.name + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(temp, path)
+        except (IOError, OSError):
+            return False
+        return True
+
+    def write_at_exit(self, path: Union[str, Path]) -> None:
+        """Write the metrics to path when the interpreter exits (the last path given wins)."""
+        if self._exit_path is None:
+            atexit.register(lambda: self.write(self._exit_path))
+        self._exit_path = Path(path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def export_at_exit_from_env(job: str, registry: MetricsRegistry = REGISTRY) -> Optional[Path]:
+    """
+    Arrange for <SKILL_METRICS_DIR>/<job>.prom to be written at exit.
+
+    Args:
+        job: File name stem identifying the exporting tool
+        registry: Registry to export
+
+    Returns:
+        The output path, or None if the environment variable is not set.
+    """
+    directory = os.environ.get(METRICS_DIR_ENV)
+    if not directory:
+        return None
+    path = Path(directory) / f"{job}.prom"
+    registry.write_at_exit(path)
+    return path
+
+
+# ----------------------------------------------------------------------
+# Recommendation engine metrics
+# ----------------------------------------------------------------------
+
+RECOMMEND_SECONDS = REGISTRY.histogram(
+    "skill_engine_recommend_seconds", "Latency of SkillRecommender.recommend calls")
+GIT_SECONDS = REGISTRY.histogram(
+    "skill_engine_git_subprocess_seconds", "Wall time of git subprocesses", ["command"])
+FILES_SCANNED = REGISTRY.counter(
+    "skill_engine_files_scanned_total", "Files visited by project tree walks")
+GIT_OBJECT_PROCESSES = REGISTRY.counter(
+    "skill_engine_git_object_processes_total", "Long-lived git cat-file processes started", ["mode"])
+STATUS_SOURCES = REGISTRY.counter(
+    "skill_engine_status_source_total", "Working tree status reads by source (index, git)", ["source"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "skill_engine_cache_requests_total", "Cache lookups by cache and result (hit, miss)", ["cache", "result"])
+FEEDBACK_WRITES = REGISTRY.counter(
+    "skill_engine_feedback_writes_total", "Feedback history and preferences file writes", ["file"])
+BYTES_REWRITTEN = REGISTRY.counter(
+    "skill_engine_bytes_rewritten_total", "Bytes written when rewriting feedback and preferences files", ["file"])
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    """Count one lookup of a named cache."""
+    CACHE_REQUESTS.inc(1, cache, "hit" if hit else "miss")
+
+
+export_at_exit_from_env("skill_engine")
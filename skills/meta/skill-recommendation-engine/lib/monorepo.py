@@ -0,0 +1,229 @@
+"""
+Monorepo Package Analysis Module
+
+Finds the packages of a monorepo (directories with their own package.json,
+pyproject.toml, Cargo.toml, ...) in one pruned walk, attributes changed
+files to the package that contains them, and analyzes the dirty packages
+in parallel so each gets its own context and project state instead of the
+whole repository being treated as one project.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .context_analyzer import ContextAnalysis, ContextAnalyzer
+from .coverage import CoverageReader
+from .deadline import EXACT, Deadline
+from .gitignore import IgnoreMatcher
+from .lockfiles import LockfileCounter
+from .project_analyzer import ProjectAnalyzer, ProjectState
+
+# Files that make a directory a package
+PACKAGE_MARKERS = ("package.json", "pyproject.toml", "setup.py", "Cargo.toml", "go.mod", "pom.xml")
+MAX_WORKERS = 8
+
+# ProjectState fields that come from repository-wide git history
+GIT_FIELDS = ("recent_commits_count", "repository_age_days")
+
+
+@dataclass
+class Package:
+    """A package directory inside the repository."""
+    path: str  # relative to the repository root, '/'-separated ("" for the root)
+    markers: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.path or "."
+
+
+@dataclass
+class PackageAnalysis:
+    """Context and project state of one dirty package."""
+    package: Package
+    changed_files: int
+    context: ContextAnalysis
+    project_state: ProjectState
+
+
+def discover_packages(root: Path, matcher: Optional[IgnoreMatcher] = None) -> List[Package]:
+    """
+    Find every package directory in one walk, skipping directories git ignores.
+
+    Args:
+        root: Repository root
+        matcher: Optional IgnoreMatcher for root (to share its compiled rules)
+
+    Returns:
+        Packages sorted by path; the root is included if it has markers.
+    """
+    matcher = matcher or IgnoreMatcher(Path(root))
+    found: Dict[str, List[str]] = {}
+    for relative, entry in matcher.walk():
+        if entry.name in PACKAGE_MARKERS:
+            directory = relative.rpartition("/")[0]
+            found.setdefault(directory, []).append(entry.name)
+    return [Package(path, sorted(markers)) for path, markers in sorted(found.items())]
+
+
+class PackageIndex:
+    """Maps repository paths to the innermost package containing them."""
+
+    def __init__(self, packages: List[Package]):
+        self.packages = {package.path: package for package in packages}
+
+    def package_of(self, path: str) -> Optional[Package]:
+        """
+        Innermost package containing a path.
+
+        Args:
+            path: File path relative to the repository root; a trailing '/'
+                  marks a directory (git status reports new directories so)
+
+        Returns:
+            Package, or None if the path is outside every package.
+        """
+        directory = path.strip("/")
+        if not path.endswith("/"):
+            directory = directory.rpartition("/")[0]
+        while True:
+            package = self.packages.get(directory)
+            if package is not None:
+                return package
+            if not directory:
+                return None
+            directory = directory.rpartition("/")[0]
+
+    def attribute(self, changes: Dict[str, List[str]]) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Split git status changes by package.
+
+        Args:
+            changes: Git status dict (category -> repository-relative paths)
+
+        Returns:
+            Dict mapping package path to its own status dict, for packages with
+            at least one change. Paths outside every package are dropped.
+        """
+        by_package: Dict[str, Dict[str, List[str]]] = {}
+        for category, paths in changes.items():
+            for path in paths:
+                package = self.package_of(path)
+                if package is None:
+                    continue
+                status = by_package.get(package.path)
+                if status is None:
+                    status = by_package[package.path] = {name: [] for name in changes}
+                status[category].append(path)
+        return by_package
+
+
+class MonorepoAnalyzer:
+    """Per-package analysis of the dirty packages in a monorepo."""
+
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        max_workers: int = MAX_WORKERS,
+        sampling: bool = False
+    ):
+        """
+        Initialize monorepo analyzer.
+
+        Args:
+            working_dir: Repository root. Defaults to current directory.
+            cache_dir: Optional directory for persistent caches (shared by all packages)
+            max_workers: Packages analyzed concurrently
+            sampling: Use sampled tree statistics in each package (see ProjectAnalyzer)
+        """
+        self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.max_workers = max_workers
+        self.sampling = sampling
+        self.matcher = IgnoreMatcher(self.working_dir)
+        self.lockfiles = LockfileCounter(
+            cache_file=Path(cache_dir) / "lockfile_cache.json" if cache_dir else None
+        )
+        self.coverage = CoverageReader(
+            cache_file=Path(cache_dir) / "coverage_cache.json" if cache_dir else None
+        )
+        self._packages: Optional[List[Package]] = None
+
+    def packages(self) -> List[Package]:
+        """Packages of the repository (discovered once per analyzer)."""
+        if self._packages is None:
+            self._packages = discover_packages(self.working_dir, self.matcher)
+        return self._packages
+
+    def is_monorepo(self) -> bool:
+        """True if there is at least one package below the root."""
+        return any(package.path for package in self.packages())
+
+    def analyze(
+        self,
+        context: ContextAnalysis,
+        repository_state: ProjectState,
+        context_analyzer: ContextAnalyzer,
+        deadline_ms: Optional[float] = None
+    ) -> List[PackageAnalysis]:
+        """
+        Analyze every package that has changes, in parallel.
+
+        Each package's context is derived from the changes under it and its
+        own marker files; its project state comes from a walk of its own
+        subtree and its own manifests. Git history is repository-wide, so it
+        is copied from repository_state instead of being queried per package.
+
+        Args:
+            context: Repository-wide context (its recent_changes are attributed)
+            repository_state: Repository-wide project state (for git history fields)
+            context_analyzer: Analyzer used to derive per-package activity and type
+            deadline_ms: Optional time budget for all package analyses together
+
+        Returns:
+            PackageAnalysis list, most changed files first.
+        """
+        deadline = Deadline(deadline_ms)
+        index = PackageIndex(self.packages())
+        dirty = index.attribute(context.recent_changes)
+        if not dirty:
+            return []
+
+        def analyze_package(path: str) -> PackageAnalysis:
+            changes = dirty[path]
+            directory = self.working_dir / path if path else self.working_dir
+            file_types = context_analyzer._analyze_file_types(changes)
+            package_context = context_analyzer._build_analysis(
+                changes, file_types,
+                context.field_confidence.get("recent_changes", EXACT),
+                context.token_budget_remaining,
+                directory=directory
+            )
+            package_context.session_metadata = dict(context.session_metadata, package=path)
+
+            analyzer = ProjectAnalyzer(
+                working_dir=str(directory),
+                sampling=self.sampling,
+                ignore_matcher=self.matcher,
+                lockfiles=self.lockfiles,
+                coverage=self.coverage
+            )
+            state = analyzer.analyze(deadline_ms=deadline.remaining_ms(), include_git=False)
+            confidence = dict(state.field_confidence)
+            for name in GIT_FIELDS:
+                confidence[name] = repository_state.field_confidence.get(name, confidence.get(name))
+            state = replace(
+                state,
+                field_confidence=confidence,
+                **{name: getattr(repository_state, name) for name in GIT_FIELDS}
+            )
+            changed = sum(len(paths) for paths in changes.values())
+            return PackageAnalysis(index.packages[path], changed, package_context, state)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(dirty)))) as pool:
+            results = list(pool.map(analyze_package, sorted(dirty)))
+
+        results.sort(key=lambda r: (-r.changed_files, r.package.path))
+        return results
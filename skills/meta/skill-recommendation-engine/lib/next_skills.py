@@ -0,0 +1,287 @@
+"""
+Next-Skill Table
+
+Mines the feedback history for skills that tend to follow one another
+(diff-summariser, then quick-test-runner) and stores, per skill, its most
+likely follow-ups in a small JSON table. Suggesting what to run after a
+skill completes is then a dictionary lookup instead of a recommendation
+run.
+
+A use of skill B follows a use of A when it is among the next few uses
+after A and starts within a time window of it; the scan for A stops at
+A's next use, which starts a sequence of its own. Only follow-ups that
+went well count. A follower's confidence is the share of A's uses it
+followed.
+
+The table records the feedback file it was mined from and the mining
+parameters. Lookups serve the stored table even once the feedback file has
+changed; refresh_next_skills re-mines it with the same parameters, either
+from the mining job or in a background thread started by
+refresh_in_background, so no lookup waits for a re-mine.
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .feedback_columns import FeedbackColumns, is_relevant
+
+TABLE_VERSION = 1
+NEXT_SKILLS_FILE = "next_skills.json"
+
+DEFAULT_WINDOW_SECONDS = 30 * 60  # a follow-up must start within this of the skill
+DEFAULT_LOOKAHEAD = 3             # uses after the skill that can count as follow-ups
+DEFAULT_MIN_SUPPORT = 3           # times a pair must occur to be kept
+DEFAULT_MIN_CONFIDENCE = 0.1
+DEFAULT_TOP = 3                   # follow-ups kept per skill
+
+# Mining parameters stored with the table, besides the window
+MINING_OPTIONS = ("lookahead", "min_support", "min_confidence", "top")
+
+
+class NextSkillTable:
+    """Most likely follow-up skills per skill."""
+
+    def __init__(self, followers: Dict[str, List[Tuple[str, float, int]]],
+                 source: Tuple[int, int] = (0, 0), window: float = DEFAULT_WINDOW_SECONDS,
+                 options: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            followers: Skill -> [(follow-up, confidence 0.0-1.0, count)], most likely first
+            source: (mtime_ns, size) of the feedback file the table was mined from
+            window: Follow-up window in seconds used when mining
+            options: Other mining parameters (lookahead, min_support, min_confidence, top)
+        """
+        self.followers = followers
+        self.source = tuple(source)
+        self.window = window
+        self.options = dict(options or {})
+
+    def next_skills(self, skill: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Likely follow-ups of a skill.
+
+        Args:
+            skill: Skill that just completed
+            limit: Maximum number of suggestions
+
+        Returns:
+            [(skill, confidence)], most likely first; empty if none qualify.
+        """
+        return [(name, confidence) for name, confidence, _ in self.followers.get(skill, ())[:limit]]
+
+    def save(self, path: Path) -> None:
+        """Write the table as compact JSON (atomically, so readers never see a partial file)."""
+        data = {
+            "version": TABLE_VERSION,
+            "source": list(self.source),
+            "window": self.window,
+            "options": self.options,
+            "next": self.followers,
+        }
+        path = Path(path)
+        temp = path.with_name(path.name + ".tmp")
+        try:
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp, path)
+        except (IOError, OSError):
+            pass
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["NextSkillTable"]:
+        """
+        Read a table written by save().
+
+        Returns:
+            NextSkillTable, or None if missing, unreadable or of another version.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != TABLE_VERSION:
+                return None
+            followers = {
+                skill: [(name, float(confidence), int(count)) for name, confidence, count in entries]
+                for skill, entries in data.get("next", {}).items()
+            }
+            options = {name: value for name, value in data.get("options", {}).items() if name in MINING_OPTIONS}
+            return cls(followers, tuple(data.get("source", (0, 0))), data.get("window", DEFAULT_WINDOW_SECONDS), options)
+        except (IOError, OSError, ValueError, AttributeError, TypeError):
+            return None
+
+
+def count_follow_ups(
+    columns: FeedbackColumns,
+    window: float = DEFAULT_WINDOW_SECONDS,
+    lookahead: int = DEFAULT_LOOKAHEAD
+) -> Tuple[Counter, Counter]:
+    """
+    Count uses per skill and follow-ups per ordered skill pair.
+
+    Args:
+        columns: Feedback history as FeedbackColumns
+        window: Seconds within which a later use counts as a follow-up
+        lookahead: Number of later uses considered per use
+
+    Returns:
+        (uses by skill id, follow-ups by (skill id, follow-up skill id)).
+        Entries without a parseable timestamp are left out.
+    """
+    cols = columns.columns
+    timestamps, skill_ids = cols["timestamps"], cols["skill_ids"]
+    rows = [row for row in range(len(timestamps)) if timestamps[row] > 0]
+    if any(timestamps[a] > timestamps[b] for a, b in zip(rows, rows[1:])):
+        rows.sort(key=timestamps.__getitem__)
+
+    relevant = bytes(map(is_relevant, cols["outcomes"], cols["ratings"]))
+    uses: Counter = Counter()
+    pairs: Counter = Counter()
+    for position, row in enumerate(rows):
+        skill = skill_ids[row]
+        uses[skill] += 1
+        deadline = timestamps[row] + window
+        seen = set()
+        for later in rows[position + 1:position + 1 + lookahead]:
+            if timestamps[later] > deadline:
+                break
+            follow_up = skill_ids[later]
+            if follow_up == skill:
+                break
+            if relevant[later] and follow_up not in seen:
+                seen.add(follow_up)
+                pairs[skill, follow_up] += 1
+    return uses, pairs
+
+
+def mine_next_skills(
+    columns: FeedbackColumns,
+    window: float = DEFAULT_WINDOW_SECONDS,
+    lookahead: int = DEFAULT_LOOKAHEAD,
+    min_support: int = DEFAULT_MIN_SUPPORT,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    top: int = DEFAULT_TOP,
+    source: Tuple[int, int] = (0, 0)
+) -> NextSkillTable:
+    """
+    Build the next-skill table from the feedback history.
+
+    Args:
+        columns: Feedback history as FeedbackColumns
+        window: Seconds within which a later use counts as a follow-up
+        lookahead: Number of later uses considered per use
+        min_support: Minimum follow-up count for a pair to be kept
+        min_confidence: Minimum share of the skill's uses a follow-up must reach
+        top: Follow-ups kept per skill
+        source: (mtime_ns, size) of the feedback file, stored with the table
+
+    Returns:
+        NextSkillTable.
+    """
+    uses, pairs = count_follow_ups(columns, window, lookahead)
+    names = columns.skills
+
+    candidates: Dict[int, List[Tuple[int, int]]] = {}
+    for (skill, follow_up), count in pairs.items():
+        if not names[skill] or not names[follow_up]:
+            continue  # entries without a skill name
+        if count >= min_support and count / uses[skill] >= min_confidence:
+            candidates.setdefault(skill, []).append((count, follow_up))
+
+    followers = {}
+    for skill, entries in candidates.items():
+        entries.sort(key=lambda entry: (-entry[0], names[entry[1]]))
+        followers[names[skill]] = [
+            (names[follow_up], round(count / uses[skill], 3), count)
+            for count, follow_up in entries[:top]
+        ]
+    options = {"lookahead": lookahead, "min_support": min_support, "min_confidence": min_confidence, "top": top}
+    return NextSkillTable(followers, source, window, options)
+
+
+def feedback_stamp(feedback_file: Path) -> Tuple[int, int]:
+    """(mtime_ns, size) of the feedback file, or (0, 0) if it is missing."""
+    try:
+        stat = Path(feedback_file).stat()
+    except (IOError, OSError):
+        return 0, 0
+    return stat.st_mtime_ns, stat.st_size
+
+
+def refresh_next_skills(
+    table_path: Path,
+    feedback_file: Path,
+    columns: Callable[[], FeedbackColumns]
+) -> Optional[NextSkillTable]:
+    """
+    Read the stored table, re-mining it if the feedback file changed since.
+
+    A stale table is mined again with the window and parameters it was
+    mined with, and the fresh table replaces the stored one. This parses
+    the whole history, so keep it off the lookup path (see
+    refresh_in_background).
+
+    Args:
+        table_path: Path to next_skills.json
+        feedback_file: Feedback history the table was mined from
+        columns: Returns the current history as FeedbackColumns (only called when stale)
+
+    Returns:
+        Current NextSkillTable, or None if no table has been mined.
+    """
+    table = NextSkillTable.load(table_path)
+    if table is None:
+        return None
+    stamp = feedback_stamp(feedback_file)
+    if table.source != stamp:
+        table = mine_next_skills(columns(), window=table.window, source=stamp, **table.options)
+        table.save(table_path)
+    return table
+
+
+_refreshes: Dict[str, threading.Thread] = {}  # table path -> running refresh
+_refreshes_lock = threading.Lock()
+
+
+def refresh_in_background(
+    table_path: Path,
+    feedback_file: Path,
+    columns: Callable[[], FeedbackColumns],
+    on_done: Optional[Callable[[NextSkillTable], None]] = None
+) -> threading.Thread:
+    """
+    Run refresh_next_skills in a background thread.
+
+    At most one refresh per table runs at a time; while one is running,
+    its thread is returned instead of starting another.
+
+    Args:
+        table_path: Path to next_skills.json
+        feedback_file: Feedback history the table was mined from
+        columns: Returns the current history as FeedbackColumns
+        on_done: Called with the refreshed table, if there is one
+
+    Returns:
+        The thread doing the refresh (join it to wait for the result).
+    """
+    key = os.fspath(table_path)
+
+    def run() -> None:
+        try:
+            table = refresh_next_skills(table_path, feedback_file, columns)
+            if table is not None and on_done is not None:
+                on_done(table)
+        finally:
+            with _refreshes_lock:
+                _refreshes.pop(key, None)
+
+    with _refreshes_lock:
+        thread = _refreshes.get(key)
+        if thread is None:
+            # Not a daemon: an interrupted refresh would leave the table stale for the next process
+            thread = _refreshes[key] = threading.Thread(target=run, name="next-skills-refresh")
+            thread.start()
+    return thread
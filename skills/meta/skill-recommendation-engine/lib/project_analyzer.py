@@ -5,11 +5,50 @@ Analyzes project health, age, complexity, and other state indicators.
 Implements 30% weight of the recommendation algorithm.
 """
 
+import asyncio
+import re
 import subprocess
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from fnmatch import translate
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from .coverage import CoverageReader
+from .deadline import DEFAULT, ESTIMATED, EXACT, PARTIAL, Deadline
+from .gitignore import IgnoreMatcher
+from .lockfiles import DependencyCounts, LockfileCounter
+from .memprofile import memory_stage
+from .metrics import FILES_SCANNED, GIT_SECONDS
+from .sampling import Estimate, Reservoir, adaptive_estimate, mean_estimate, ratio_estimate
+
+
+# Tree scan patterns (matched against file names; directories git ignores are pruned)
+TEST_DIRS = {"test", "tests", "__tests__"}
+TEST_FILE_PATTERNS = ["*test.py", "*test.js", "*.test.ts", "*.test.tsx", "*.spec.js", "*.spec.ts"]
+TEST_COUNT_PATTERNS = ["test*.py", "*test.py", "*test.js", "*.test.ts"]
+COVERAGE_SOURCE_EXTENSIONS = (".py", ".js", ".ts")
+COMPLEXITY_EXTENSIONS = (".py", ".js", ".ts", ".java", ".go", ".rs")
+COMPLEXITY_SAMPLE_SIZE = 100
+DEADLINE_CHECK_INTERVAL = 256  # directory entries between deadline checks during the walk
+GIT_TIMEOUT = 10.0
+REPO_AGE_COMMAND = ["git", "log", "--reverse", "--format=%ct"]
+RECENT_COMMITS_COMMAND = ["git", "log", "--since=30 days ago", "--oneline"]
+
+# Test-to-source ratio thresholds for medium and high coverage
+COVERAGE_THRESHOLDS = (0.2, 0.6)
+# Measured line-coverage thresholds (from coverage artifacts) for medium and high
+MEASURED_COVERAGE_THRESHOLDS = (0.5, 0.8)
+LARGE_FILE_LINES = 500
+
+# Sampling mode: reservoir sizes bound the work per tree; prefixes of the
+# reservoir are measured until the confidence interval is tight enough
+COVERAGE_RESERVOIR_SIZE = 4096
+COMPLEXITY_RESERVOIR_SIZE = 1024
+SIZE_RELATIVE_PRECISION = 0.1  # stop when the mean file size is known to +-10%
+
+_TEST_FILE_RE = re.compile("|".join(translate(p) for p in TEST_FILE_PATTERNS))
+_TEST_COUNT_RES = [re.compile(translate(p)) for p in TEST_COUNT_PATTERNS]
 
 
 @dataclass
@@ -23,133 +62,456 @@ class ProjectState:
     documentation_quality: str  # poor, adequate, good
     recent_commits_count: int
     complexity_indicators: Dict[str, Any] = field(default_factory=dict)
+    transitive_dependency_count: int = 0
+    measured_coverage: Optional[float] = None  # line coverage 0.0-1.0 from a coverage artifact, if any
+    field_confidence: Dict[str, str] = field(default_factory=dict)  # field -> exact, partial, default, estimated
+    estimates: Dict[str, Estimate] = field(default_factory=dict)  # sampling mode: test_ratio, avg_file_size, ...
 
 
 class ProjectAnalyzer:
     """Analyzes project state and health."""
 
-    def __init__(self, working_dir: Optional[str] = None):
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        sampling: bool = False,
+        sample_seed: Optional[int] = None,
+        ignore_matcher: Optional[IgnoreMatcher] = None,
+        lockfiles: Optional[LockfileCounter] = None,
+        coverage: Optional[CoverageReader] = None
+    ):
         """
         Initialize project analyzer.
 
         Args:
             working_dir: Project directory to analyze. Defaults to current directory.
+            cache_dir: Optional directory for persistent caches (e.g. lockfile counts)
+            sampling: Estimate test ratio and file sizes from a uniform random
+                      sample of files instead of exhaustive counts (for huge trees)
+            sample_seed: Optional seed for reproducible samples
+            ignore_matcher: Matcher for an enclosing repository when working_dir is
+                            a package inside it, so the repository's ignore rules
+                            apply (and their compiled rules are shared)
+            lockfiles: Shared lockfile counter (takes precedence over cache_dir)
+            coverage: Shared coverage artifact reader (takes precedence over cache_dir)
         """
         self.working_dir = Path(working_dir) if working_dir else Path.cwd()
+        self.sampling = sampling
+        self.sample_seed = sample_seed
+        self.ignore_matcher = ignore_matcher
+        self.lockfiles = lockfiles or LockfileCounter(
+            cache_file=Path(cache_dir) / "lockfile_cache.json" if cache_dir else None
+        )
+        self.coverage = coverage or CoverageReader(
+            cache_file=Path(cache_dir) / "coverage_cache.json" if cache_dir else None
+        )
+        self.last_git_timed_out = False
 
-    def analyze(self) -> ProjectState:
+    def analyze(self, deadline_ms: Optional[float] = None, include_git: bool = True) -> ProjectState:
         """
         Perform full project state analysis.
 
+        Steps run cheapest first: README size and marker files, dependency
+        manifests, git history, then the tree walk for tests and complexity.
+        Once the deadline passes the remaining steps are skipped or cut short
+        and their fields keep best-effort values; field_confidence marks each
+        field as exact, partial or default.
+
+        Args:
+            deadline_ms: Optional time budget in milliseconds
+            include_git: Query git history; when False the history fields keep
+                         their defaults (e.g. for packages sharing one repository)
+
+        Returns:
+            ProjectState object with all analysis results.
+        """
+        deadline, state, confidence = self._start_analysis(deadline_ms)
+        with memory_stage("project.local"):
+            self._analyze_local(deadline, state, confidence)
+
+        # Git history
+        with memory_stage("project.git"):
+            if include_git and not deadline.expired:
+                state.recent_commits_count = self._analyze_commit_patterns(timeout=deadline.remaining(GIT_TIMEOUT))
+                if not self.last_git_timed_out:
+                    confidence["recent_commits_count"] = EXACT
+            if include_git and not deadline.expired:
+                state.repository_age_days = self._get_repo_age(timeout=deadline.remaining(GIT_TIMEOUT))
+                if not self.last_git_timed_out:
+                    confidence["repository_age_days"] = EXACT
+
+        with memory_stage("project.tree"):
+            self._analyze_tree(deadline, state, confidence)
+        return self._finish_analysis(state, confidence)
+
+    async def analyze_async(self, deadline_ms: Optional[float] = None) -> ProjectState:
+        """
+        Perform full project state analysis without blocking the event loop.
+
+        Git history queries run as asyncio subprocesses concurrently with the
+        filesystem steps, which run in the default executor. Cancelling the
+        task kills git and stops the tree walk at its next deadline check.
+
+        Args:
+            deadline_ms: Optional time budget in milliseconds
+
         Returns:
             ProjectState object with all analysis results.
         """
-        return ProjectState(
-            repository_age_days=self._get_repo_age(),
-            has_tests=self._check_for_tests(),
-            test_coverage_estimate=self._estimate_test_coverage(),
-            dependency_count=self._count_dependencies(),
-            has_security_issues=self._check_security_indicators(),
-            documentation_quality=self._assess_documentation(),
-            recent_commits_count=self._analyze_commit_patterns(),
-            complexity_indicators=self._analyze_complexity()
+        loop = asyncio.get_running_loop()
+        deadline, state, confidence = self._start_analysis(deadline_ms)
+
+        def filesystem_steps() -> None:
+            self._analyze_local(deadline, state, confidence)
+            self._analyze_tree(deadline, state, confidence)
+
+        try:
+            _, recent_output, age_output = await asyncio.gather(
+                loop.run_in_executor(None, filesystem_steps),
+                self._run_git_async(RECENT_COMMITS_COMMAND, deadline),
+                self._run_git_async(REPO_AGE_COMMAND, deadline)
+            )
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
+
+        if recent_output is not None:
+            state.recent_commits_count = _parse_commit_count(recent_output)
+            confidence["recent_commits_count"] = EXACT
+        if age_output is not None:
+            state.repository_age_days = _parse_repo_age(age_output)
+            confidence["repository_age_days"] = EXACT
+        return self._finish_analysis(state, confidence)
+
+    def _start_analysis(self, deadline_ms: Optional[float]) -> Tuple[Deadline, ProjectState, Dict[str, str]]:
+        """Create a state with every field at its default (estimates are filled in per analysis)."""
+        state = ProjectState(
+            repository_age_days=0,
+            has_tests=False,
+            test_coverage_estimate="low",
+            dependency_count=0,
+            has_security_issues=False,
+            documentation_quality="poor",
+            recent_commits_count=0
         )
+        confidence = {
+            f.name: DEFAULT for f in fields(ProjectState) if f.name not in ("field_confidence", "estimates")
+        }
+        return Deadline(deadline_ms), state, confidence
+
+    def _analyze_local(self, deadline: Deadline, state: ProjectState, confidence: Dict[str, str]) -> None:
+        """Cheap steps: single-file checks, then manifests and lockfiles."""
+        if not deadline.expired:
+            state.documentation_quality = self._assess_documentation()
+            state.has_security_issues = self._check_security_indicators()
+            confidence.update(documentation_quality=EXACT, has_security_issues=EXACT)
+
+        # Lockfile counts are cached by content hash
+        if not deadline.expired:
+            dependencies = self._analyze_dependencies()
+            state.dependency_count = dependencies.direct
+            state.transitive_dependency_count = dependencies.transitive
+            confidence.update(dependency_count=EXACT, transitive_dependency_count=EXACT)
+
+        # Coverage artifacts are cached by mtime, so only a new report is parsed
+        if not deadline.expired:
+            report = self.coverage.find(self.working_dir)
+            confidence["measured_coverage"] = EXACT
+            if report is not None:
+                state.measured_coverage = report.ratio
+                state.test_coverage_estimate = _measured_coverage_class(report.ratio)
+                confidence["test_coverage_estimate"] = EXACT
+
+    def _analyze_tree(self, deadline: Deadline, state: ProjectState, confidence: Dict[str, str]) -> None:
+        """Expensive step: tree walk for tests, test ratio and file sizes."""
+        if deadline.expired:
+            return
+
+        # One walk per analysis; its stats and the estimates stay with this call's state
+        stats = self._scan_tree(deadline)
+        estimates = state.estimates
+        walk_confidence = EXACT if stats["complete"] else PARTIAL
+        state.has_tests = self._check_for_tests(stats)
+        state.complexity_indicators, complexity_complete = self._analyze_complexity(stats, deadline, estimates)
+        confidence.update(
+            # Finding one test file is conclusive even on a partial walk
+            has_tests=EXACT if state.has_tests else walk_confidence,
+            complexity_indicators=_sampled_confidence(estimates, "avg_file_size", walk_confidence)
+            if complexity_complete else PARTIAL
+        )
+        # A measured coverage artifact beats the test-to-source ratio guess
+        if state.measured_coverage is None:
+            state.test_coverage_estimate = self._estimate_test_coverage(stats, estimates)
+            confidence["test_coverage_estimate"] = _sampled_confidence(estimates, "test_ratio", walk_confidence)
+
+    def _finish_analysis(self, state: ProjectState, confidence: Dict[str, str]) -> ProjectState:
+        state.field_confidence = confidence
+        return state
+
+    @GIT_SECONDS.timed("log")
+    async def _run_git_async(self, cmd: List[str], deadline: Deadline) -> Optional[str]:
+        """
+        Run a git command as an asyncio subprocess.
+
+        Args:
+            cmd: Command line
+            deadline: Analysis deadline (git also gets at most GIT_TIMEOUT seconds)
+
+        Returns:
+            stdout ("" if git failed), or None if skipped or timed out.
+        """
+        if deadline.expired:
+            return None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=str(self.working_dir),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+        except (FileNotFoundError, OSError):
+            return ""
 
-    def _get_repo_age(self) -> int:
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), deadline.remaining(GIT_TIMEOUT))
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+        if proc.returncode != 0:
+            return ""
+        return stdout.decode("utf-8", "replace")
+
+    @GIT_SECONDS.timed("log")
+    def _get_repo_age(self, timeout: float = GIT_TIMEOUT) -> int:
         """
         Get repository age in days since first commit.
 
+        Args:
+            timeout: Seconds to wait for git (sets last_git_timed_out when exceeded)
+
         Returns:
             Number of days since first commit, or 0 if not a git repo.
         """
+        self.last_git_timed_out = False
         try:
             result = subprocess.run(
-                ["git", "log", "--reverse", "--format=%ct"],
+                REPO_AGE_COMMAND,
                 cwd=self.working_dir,
                 capture_output=True,
                 text=True,
-                timeout=10
+                timeout=timeout
             )
 
-            if result.returncode != 0 or not result.stdout.strip():
+            if result.returncode != 0:
                 return 0
 
-            first_commit_ts = int(result.stdout.strip().split('\n')[0])
-            current_time = int(time.time())
-            age_seconds = current_time - first_commit_ts
-            return age_seconds // 86400  # Convert to days
+            return _parse_repo_age(result.stdout)
 
-        except (subprocess.TimeoutExpired, FileNotFoundError, ValueError, Exception):
+        except subprocess.TimeoutExpired:
+            self.last_git_timed_out = True
+            return 0
+        except (FileNotFoundError, ValueError, Exception):
             return 0
 
-    def _check_for_tests(self) -> bool:
+    def _check_for_tests(self, stats: Optional[Dict[str, Any]] = None) -> bool:
         """
         Check if project has test files.
 
+        Args:
+            stats: Result of _scan_tree for this analysis (walks the tree if omitted)
+
         Returns:
             True if test files are found.
         """
-        test_patterns = [
-            "**/test/**",
-            "**/tests/**",
-            "**/*test.py",
-            "**/*test.js",
-            "**/*.test.ts",
-            "**/*.test.tsx",
-            "**/*.spec.js",
-            "**/*.spec.ts",
-            "**/__tests__/**"
-        ]
-
-        for pattern in test_patterns:
-            if list(self.working_dir.glob(pattern)):
-                return True
+        return (stats or self._scan_tree())["has_tests"]
 
-        return False
+    def _scan_tree(self, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Walk the project once, skipping directories git ignores.
+
+        Replaces per-pattern recursive globs, which descended into
+        node_modules, virtualenvs and build output on every call.
+
+        Args:
+            deadline: Optional deadline; the walk stops early when it passes
 
-    def _estimate_test_coverage(self) -> str:
+        In sampling mode no per-file counting is done; instead uniform
+        reservoirs of candidate test/source files and of source files for the
+        size metrics are kept.
+
+        Returns:
+            Dict with has_tests, test_count, source_count, complexity_sample
+            (the first COMPLEXITY_SAMPLE_SIZE source files) and complete
+            (False if the walk was cut short); in sampling mode also
+            coverage_reservoir and complexity_reservoir.
+        """
+        has_tests = False
+        test_count = 0
+        source_count = 0
+        complexity_sample: List[Path] = []
+        complete = True
+        sampling = self.sampling
+        coverage_reservoir: Reservoir[str] = Reservoir(COVERAGE_RESERVOIR_SIZE, seed=self.sample_seed)
+        complexity_reservoir: Reservoir[Path] = Reservoir(COMPLEXITY_RESERVOIR_SIZE, seed=self.sample_seed)
+
+        if self.ignore_matcher is not None:
+            matcher = self.ignore_matcher
+            prefix = matcher.relative(self.working_dir) or ""
+            walk = matcher.walk(self.working_dir)
+        else:
+            matcher, prefix = IgnoreMatcher(self.working_dir), ""
+            walk = matcher.walk()
+        skip = len(prefix) + 1 if prefix else 0
+
+        seen = -1
+        try:
+            for seen, (relative, entry) in enumerate(walk):
+                relative = relative[skip:]
+                if deadline is not None and seen % DEADLINE_CHECK_INTERVAL == 0 and deadline.expired:
+                    complete = False
+                    break
+                name = entry.name
+                if not has_tests:
+                    has_tests = bool(TEST_DIRS.intersection(relative.split("/")[:-1])
+                                     or _TEST_FILE_RE.match(name))
+
+                if sampling:
+                    # Every test-count pattern ends in one of the coverage extensions
+                    if name.endswith(COVERAGE_SOURCE_EXTENSIONS):
+                        coverage_reservoir.add(relative)
+                    if name.endswith(COMPLEXITY_EXTENSIONS):
+                        complexity_reservoir.add(Path(entry.path))
+                    continue
+
+                test_count += _test_weight(name)
+                # Exclude test files from source count
+                if name.endswith(COVERAGE_SOURCE_EXTENSIONS) and "test" not in relative.lower():
+                    source_count += 1
+                if name.endswith(COMPLEXITY_EXTENSIONS) and len(complexity_sample) < COMPLEXITY_SAMPLE_SIZE:
+                    complexity_sample.append(Path(entry.path))
+        except Exception:
+            pass
+        FILES_SCANNED.inc(seen + 1)
+
+        stats = {
+            "has_tests": has_tests,
+            "test_count": test_count,
+            "source_count": source_count,
+            "complexity_sample": complexity_sample,
+            "complete": complete,
+        }
+        if sampling:
+            stats.update(
+                coverage_reservoir=coverage_reservoir,
+                complexity_reservoir=complexity_reservoir
+            )
+        return stats
+
+    def _estimate_test_coverage(
+        self,
+        stats: Optional[Dict[str, Any]] = None,
+        estimates: Optional[Dict[str, Estimate]] = None
+    ) -> str:
         """
         Estimate test coverage based on test file to source file ratio.
 
+        Args:
+            stats: Result of _scan_tree for this analysis (walks the tree if omitted)
+            estimates: The analysis's estimates, which receive test_ratio in sampling mode
+
         Returns:
             "low", "medium", or "high"
         """
-        if not self._check_for_tests():
+        stats = stats or self._scan_tree()
+        if not self._check_for_tests(stats):
             return "low"
 
         try:
-            # Count test files
-            test_count = 0
-            test_patterns = ["**/test*.py", "**/*test.py", "**/*test.js", "**/*.test.ts"]
-            for pattern in test_patterns:
-                test_count += len(list(self.working_dir.glob(pattern)))
-
-            # Count source files (rough estimate)
-            source_count = 0
-            source_patterns = ["**/*.py", "**/*.js", "**/*.ts"]
-            for pattern in source_patterns:
-                files = list(self.working_dir.glob(pattern))
-                # Exclude test files from source count
-                source_count += len([f for f in files if 'test' not in str(f).lower()])
+            if self.sampling:
+                return self._sample_test_coverage(stats["coverage_reservoir"], estimates)
+
+            test_count = stats["test_count"]
+            source_count = stats["source_count"]
 
             if source_count == 0:
                 return "low"
 
-            coverage_ratio = test_count / source_count
-
-            if coverage_ratio >= 0.6:
-                return "high"
-            elif coverage_ratio >= 0.2:
-                return "medium"
-            else:
-                return "low"
+            return _coverage_class(test_count / source_count)
 
         except Exception:
             return "low"
 
+    def _sample_test_coverage(self, reservoir: Reservoir, estimates: Optional[Dict[str, Estimate]] = None) -> str:
+        """
+        Classify coverage from a sampled test-to-source ratio.
+
+        Sampled files are measured in growing prefixes until the ratio's
+        confidence interval lies within a single low/medium/high band.
+
+        Args:
+            reservoir: Uniform sample of .py/.js/.ts files from _scan_tree
+            estimates: Receives the test_ratio estimate
+
+        Returns:
+            "low", "medium", or "high"
+        """
+        def measure(relative: str):
+            name = relative.rsplit("/", 1)[-1]
+            return _test_weight(name), 0 if "test" in relative.lower() else 1
+
+        estimate, _ = adaptive_estimate(
+            reservoir.shuffled(),
+            reservoir.seen,
+            measure,
+            ratio_estimate,
+            lambda e: _coverage_class(e.low) == _coverage_class(e.high)
+        )
+        if estimate is None:
+            return "low"
+
+        if estimates is not None:
+            estimates["test_ratio"] = estimate
+        return _coverage_class(estimate.value)
+
     def _count_dependencies(self) -> int:
         """
-        Count project dependencies from package files.
+        Count direct project dependencies.
+
+        Returns:
+            Number of direct dependencies found.
+        """
+        return self._analyze_dependencies().direct
+
+    def _analyze_dependencies(self) -> DependencyCounts:
+        """
+        Count direct and transitive dependencies.
+
+        Lockfiles (package-lock.json, pnpm-lock.yaml, poetry.lock, Cargo.lock,
+        go.sum) are preferred since they also give transitive counts; manifest
+        files are used for ecosystems without a lockfile.
+
+        Returns:
+            DependencyCounts across all ecosystems found.
+        """
+        counts = DependencyCounts()
+        locked = self.lockfiles.count_project(self.working_dir)
+        for ecosystem_counts in locked.values():
+            counts.add(ecosystem_counts)
+
+        counts.direct += self._count_manifest_dependencies(skip=set(locked))
+        return counts
+
+    def _count_manifest_dependencies(self, skip: set = frozenset()) -> int:
+        """
+        Count direct dependencies from manifest files.
+
+        Args:
+            skip: Ecosystems ("python", "node", "rust") already counted from a lockfile
 
         Returns:
             Number of dependencies found.
@@ -158,7 +520,7 @@ class ProjectAnalyzer:
 
         # Python dependencies
         requirements_file = self.working_dir / "requirements.txt"
-        if requirements_file.exists():
+        if "python" not in skip and requirements_file.exists():
             try:
                 content = requirements_file.read_text()
                 # Count non-empty, non-comment lines
@@ -171,7 +533,7 @@ class ProjectAnalyzer:
 
         # JavaScript/Node dependencies
         package_json = self.working_dir / "package.json"
-        if package_json.exists():
+        if "node" not in skip and package_json.exists():
             try:
                 import json
                 data = json.loads(package_json.read_text())
@@ -182,7 +544,7 @@ class ProjectAnalyzer:
 
         # Rust dependencies
         cargo_toml = self.working_dir / "Cargo.toml"
-        if cargo_toml.exists():
+        if "rust" not in skip and cargo_toml.exists():
             try:
                 content = cargo_toml.read_text()
                 # Simple count of lines in [dependencies] section
@@ -261,37 +623,57 @@ class ProjectAnalyzer:
         except Exception:
             return "poor"
 
-    def _analyze_commit_patterns(self) -> int:
+    @GIT_SECONDS.timed("log")
+    def _analyze_commit_patterns(self, timeout: float = GIT_TIMEOUT) -> int:
         """
         Analyze recent commit activity.
 
+        Args:
+            timeout: Seconds to wait for git (sets last_git_timed_out when exceeded)
+
         Returns:
             Number of commits in the last 30 days.
         """
+        self.last_git_timed_out = False
         try:
             result = subprocess.run(
-                ["git", "log", "--since=30 days ago", "--oneline"],
+                RECENT_COMMITS_COMMAND,
                 cwd=self.working_dir,
                 capture_output=True,
                 text=True,
-                timeout=10
+                timeout=timeout
             )
 
             if result.returncode != 0:
                 return 0
 
-            return len([line for line in result.stdout.strip().split('\n') if line])
+            return _parse_commit_count(result.stdout)
 
-        except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
+        except subprocess.TimeoutExpired:
+            self.last_git_timed_out = True
+            return 0
+        except (FileNotFoundError, Exception):
             return 0
 
-    def _analyze_complexity(self) -> Dict[str, Any]:
+    def _analyze_complexity(
+        self,
+        stats: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+        estimates: Optional[Dict[str, Estimate]] = None
+    ) -> Tuple[Dict[str, Any], bool]:
         """
         Analyze project complexity indicators.
 
+        Args:
+            stats: Result of _scan_tree for this analysis (walks the tree if omitted)
+            deadline: Optional deadline; stops reading files when it passes
+            estimates: The analysis's estimates, which receive the size estimates in sampling mode
+
         Returns:
-            Dict with complexity metrics.
+            (dict with complexity metrics, False if the deadline cut reading short)
         """
+        stats = stats or self._scan_tree()
+        complete = True
         indicators = {
             "total_lines": 0,
             "large_files": 0,
@@ -300,22 +682,24 @@ class ProjectAnalyzer:
         }
 
         try:
-            # Find all source files
-            source_patterns = ["**/*.py", "**/*.js", "**/*.ts", "**/*.java", "**/*.go", "**/*.rs"]
-            all_files = []
-            for pattern in source_patterns:
-                all_files.extend(self.working_dir.glob(pattern))
+            if self.sampling:
+                return self._sample_complexity(stats["complexity_reservoir"], indicators, deadline, estimates)
+
+            all_files = stats["complexity_sample"]
 
             if not all_files:
-                return indicators
+                return indicators, complete
 
             file_sizes = []
-            for filepath in all_files[:100]:  # Limit to first 100 files for performance
+            for filepath in all_files:
+                if deadline is not None and deadline.expired:
+                    complete = False
+                    break
                 try:
                     lines = len(filepath.read_text().split('\n'))
                     file_sizes.append(lines)
 
-                    if lines > 500:
+                    if lines > LARGE_FILE_LINES:
                         indicators["large_files"] += 1
 
                 except Exception:
@@ -329,4 +713,118 @@ class ProjectAnalyzer:
         except Exception:
             pass
 
-        return indicators
+        return indicators, complete
+
+    def _sample_complexity(
+        self,
+        reservoir: Reservoir,
+        indicators: Dict[str, Any],
+        deadline: Optional[Deadline] = None,
+        estimates: Optional[Dict[str, Estimate]] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Estimate file size metrics from a uniform sample of source files.
+
+        Files are read in growing prefixes of the sample until the mean line
+        count is known to within SIZE_RELATIVE_PRECISION. Counts are reported
+        on the same basis as exhaustive mode (at most COMPLEXITY_SAMPLE_SIZE
+        files) so thresholds on them keep their meaning; the population-level
+        estimates are recorded in estimates.
+
+        Args:
+            reservoir: Uniform sample of source files from _scan_tree
+            indicators: Zeroed indicator dict to fill in
+            deadline: Optional deadline; stops reading files when it passes
+            estimates: Receives the avg_file_size and large_file_share estimates
+
+        Returns:
+            (dict with complexity metrics, False if the deadline cut reading short)
+        """
+        expired = []
+
+        def measure(filepath: Path) -> Optional[int]:
+            if deadline is not None and deadline.expired:
+                expired.append(True)
+                return None
+            try:
+                return len(filepath.read_text().split('\n'))
+            except Exception:
+                return None
+
+        def estimator(measured: List[Optional[int]], population: int) -> Optional[Estimate]:
+            return mean_estimate([lines for lines in measured if lines is not None], population)
+
+        def is_tight(estimate: Estimate) -> bool:
+            if expired:
+                return True  # deadline passed: stop with what we have
+            return estimate.high - estimate.value <= SIZE_RELATIVE_PRECISION * max(estimate.value, 1.0)
+
+        estimate, measured = adaptive_estimate(
+            reservoir.shuffled(), reservoir.seen, measure, estimator, is_tight
+        )
+        sizes = [lines for lines in measured if lines is not None]
+        if estimate is None or not sizes:
+            return indicators, not expired
+
+        large_share = mean_estimate([1.0 if lines > LARGE_FILE_LINES else 0.0 for lines in sizes], reservoir.seen)
+        if estimates is not None:
+            estimates["avg_file_size"] = estimate
+            estimates["large_file_share"] = large_share
+
+        basis = min(reservoir.seen, COMPLEXITY_SAMPLE_SIZE)
+        indicators["total_lines"] = round(estimate.value * basis)
+        indicators["large_files"] = round(large_share.value * basis)
+        indicators["max_file_size"] = max(sizes)
+        indicators["avg_file_size"] = round(estimate.value)
+        return indicators, not expired
+
+
+def _sampled_confidence(estimates: Dict[str, Estimate], estimate_name: str, walk_confidence: str) -> str:
+    """Confidence flag for a field that may come from a sampled estimate."""
+    estimate = estimates.get(estimate_name)
+    if walk_confidence != EXACT or estimate is None or estimate.exact:
+        return walk_confidence
+    return ESTIMATED
+
+
+def _parse_repo_age(output: str) -> int:
+    """Days since the first commit, from ``git log --reverse --format=%ct`` output."""
+    output = output.strip()
+    if not output:
+        return 0
+    try:
+        first_commit_ts = int(output.split('\n')[0])
+    except ValueError:
+        return 0
+    age_seconds = int(time.time()) - first_commit_ts
+    return age_seconds // 86400  # Convert to days
+
+
+def _parse_commit_count(output: str) -> int:
+    """Number of commits in ``git log --oneline`` output."""
+    return len([line for line in output.strip().split('\n') if line])
+
+
+def _test_weight(name: str) -> int:
+    """Number of test-count patterns a file name matches (the exhaustive mode's per-file count)."""
+    return sum(1 for pattern in _TEST_COUNT_RES if pattern.match(name))
+
+
+def _measured_coverage_class(ratio: float) -> str:
+    """Map measured line coverage to low, medium or high."""
+    medium, high = MEASURED_COVERAGE_THRESHOLDS
+    if ratio >= high:
+        return "high"
+    elif ratio >= medium:
+        return "medium"
+    return "low"
+
+
+def _coverage_class(ratio: float) -> str:
+    """Map a test-to-source ratio to low, medium or high."""
+    medium, high = COVERAGE_THRESHOLDS
+    if ratio >= high:
+        return "high"
+    elif ratio >= medium:
+        return "medium"
+    return "low"
@@ -0,0 +1,167 @@
+"""
+Precomputed Recommendation Table
+
+Most recommendation calls fall into a small number of context buckets
+(activity x project type x file type class x budget band). For each bucket
+this module precomputes every skill's score from the inputs that do not
+depend on project state - context relevance, user alignment and utility -
+and stores them in a compact file. At recommendation time only the project
+fit term is added on top of the bucket's scores.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+TABLE_VERSION = 1
+TABLE_FILE = "recommendation_table.json"
+
+# Values the context analyzer produces; contexts outside these fall back to full scoring
+ACTIVITIES = ["coding", "refactoring", "testing", "debugging", "planning", "exploring"]
+PROJECT_TYPES = [
+    "web", "python", "javascript", "java", "rust", "go",
+    "formal_verification", "quantum", "polyglot", "unknown",
+]
+FILE_CLASSES = {".v": {".v"}, ".qasm": {".qasm"}, ".py": {".py"}, "other": set()}
+BUDGET_BANDS = {"low": 10000, "normal": 150000}
+
+# Scores are stored as integer hundredths of a confidence point
+SCALE = 100
+
+
+@dataclass
+class _BucketContext:
+    """Minimal stand-in for ContextAnalysis with a bucket's representative values."""
+    current_activity: str
+    project_type: str
+    file_types: set
+    token_budget_remaining: int
+
+
+def table_key(skills: Dict[str, object], user_prefs: object) -> str:
+    """
+    Fingerprint the inputs a table is built from.
+
+    Args:
+        skills: Skill catalog (name -> SkillMetadata)
+        user_prefs: UserPreferences object
+
+    Returns:
+        Hex digest that changes whenever the catalog or preferences change.
+    """
+    catalog = sorted(
+        (name, meta.category, meta.priority, meta.token_estimate)
+        for name, meta in skills.items()
+    )
+    prefs = {
+        "preferred": sorted(getattr(user_prefs, "preferred_skills", ()) or ()),
+        "avoided": sorted(getattr(user_prefs, "avoided_skills", ()) or ()),
+        "rates": sorted((getattr(user_prefs, "skill_success_rates", {}) or {}).items()),
+        "complexity": getattr(user_prefs, "complexity_tolerance", "medium"),
+        "expertise": sorted(getattr(user_prefs, "domain_expertise", ()) or ()),
+    }
+    payload = json.dumps([TABLE_VERSION, catalog, prefs], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecommendationTable:
+    """Per-bucket base scores for every skill."""
+
+    def __init__(self, key: str, skill_names: List[str], buckets: Dict[str, List[int]]):
+        self.key = key
+        self.skill_names = skill_names
+        self.buckets = buckets
+
+    @staticmethod
+    def bucket_id(signature: Tuple[str, str, str, str]) -> str:
+        return "|".join(signature)
+
+    @classmethod
+    def build(cls, skills, user_prefs, scorer, utility_scorer) -> "RecommendationTable":
+        """
+        Score every skill in every bucket.
+
+        Args:
+            skills: Skill catalog (name -> SkillMetadata)
+            user_prefs: UserPreferences object
+            scorer: ConfidenceScorer
+            utility_scorer: SkillUtilityScorer
+
+        Returns:
+            A new RecommendationTable.
+        """
+        names = sorted(skills)
+        # Bucket-independent terms: user alignment (30 pts) and utility (10 pts)
+        fixed = []
+        for name in names:
+            pattern = scorer.analyze_user_alignment(skills[name], user_prefs, None) * 30 if user_prefs else 0.0
+            utility = utility_scorer.get_utility_score(name)
+            fixed.append(pattern + (utility.reliability_score * 10 if utility else 0.0))
+
+        buckets = {}
+        for activity, project_type, file_class, band in product(
+            ACTIVITIES, PROJECT_TYPES, FILE_CLASSES, BUDGET_BANDS
+        ):
+            context = _BucketContext(activity, project_type, FILE_CLASSES[file_class], BUDGET_BANDS[band])
+            scores = [
+                round((scorer.analyze_context_relevance(skills[name], context) * 40 + fixed[i]) * SCALE)
+                for i, name in enumerate(names)
+            ]
+            buckets[cls.bucket_id((activity, project_type, file_class, band))] = scores
+
+        return cls(table_key(skills, user_prefs), names, buckets)
+
+    def lookup(self, signature: Tuple[str, str, str, str]) -> Optional[Dict[str, float]]:
+        """
+        Base scores for a context signature.
+
+        Args:
+            signature: Output of ConfidenceScorer.context_signature
+
+        Returns:
+            Dict mapping skill name to base score (0-80), or None if the
+            context falls outside the table.
+        """
+        scores = self.buckets.get(self.bucket_id(signature))
+        if scores is None:
+            return None
+        return {name: score / SCALE for name, score in zip(self.skill_names, scores)}
+
+    def save(self, path: Path) -> None:
+        """Write the table as compact JSON."""
+        data = {
+            "version": TABLE_VERSION,
+            "key": self.key,
+            "skills": self.skill_names,
+            "buckets": self.buckets,
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+        except (IOError, OSError):
+            pass
+
+    @classmethod
+    def load(cls, path: Path, key: str) -> Optional["RecommendationTable"]:
+        """
+        Read a table if it was built from the same inputs.
+
+        Args:
+            path: Table file
+            key: Expected table_key for the current catalog and preferences
+
+        Returns:
+            RecommendationTable, or None if missing or stale.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if data.get("version") != TABLE_VERSION or data.get("key") != key:
+            return None
+        return cls(key, data.get("skills", []), data.get("buckets", {}))
@@ -4,8 +4,17 @@ Main Recommendation Engine
 Orchestrates all components to generate intelligent skill recommendations.
 """
 
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+import asyncio
+import atexit
+import hashlib
+import os
+import threading
+from dataclasses import asdict, astuple, dataclass, field
+from functools import reduce
+from itertools import takewhile
+from math import gcd
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 
 # Import all components
 from .skill_metadata import SkillMetadataLoader, SkillMetadata
@@ -14,6 +23,56 @@ from .project_analyzer import ProjectAnalyzer, ProjectState
 from .user_patterns import UserPatternAnalyzer, UserPreferences
 from .skill_utility import SkillUtilityScorer, SkillUtility
 from .confidence_scorer import ConfidenceScorer
+from .recommendation_table import RecommendationTable, TABLE_FILE, table_key
+from .deadline import Deadline
+from .monorepo import MAX_WORKERS, MonorepoAnalyzer, PackageAnalysis
+from .snapshot import SNAPSHOT_FILE, load_snapshot, save_snapshot
+from .incremental import IncrementalScores
+from .memprofile import memory_stage
+from .metrics import RECOMMEND_SECONDS, cache_result
+from .next_skills import (
+    NEXT_SKILLS_FILE, NextSkillTable, feedback_stamp, mine_next_skills, refresh_in_background
+)
+
+CACHE_DIR_NAME = "skill-recommendation-engine"
+
+
+def _user_cache_dir(data_dir: Path) -> Path:
+    """
+    Per-user cache directory for state derived from one data directory.
+
+    Uses $XDG_CACHE_HOME (%LOCALAPPDATA% on Windows), else ~/.cache, with a
+    subdirectory per data directory so that their caches do not overwrite
+    each other.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or (os.environ.get("LOCALAPPDATA") if os.name == "nt" else None)
+    root = Path(base) if base else Path.home() / ".cache"
+    digest = hashlib.sha1(str(data_dir.resolve()).encode("utf-8")).hexdigest()[:12]
+    return root / CACHE_DIR_NAME / digest
+
+
+# Modules whose code determines the snapshotted state
+SNAPSHOT_SOURCES = (
+    "skill_metadata.py", "skill_utility.py", "confidence_scorer.py", "recommendation_table.py", "incremental.py"
+)
+
+# Recommenders whose built state is not in their snapshot yet, by snapshot path
+# (the latest one per path wins); saved when the interpreter exits
+_pending_snapshots: Dict[Path, "SkillRecommender"] = {}
+_pending_snapshots_lock = threading.Lock()
+
+
+def _save_pending_snapshots() -> None:
+    """Write the snapshots deferred by recommend() calls."""
+    with _pending_snapshots_lock:
+        pending = list(_pending_snapshots.values())
+        _pending_snapshots.clear()
+    for recommender in pending:
+        if not recommender._snapshot_current:
+            recommender.save_snapshot()
+
+
+atexit.register(_save_pending_snapshots)
 
 
 @dataclass
@@ -24,6 +83,7 @@ class Recommendation:
     context: ContextAnalysis
     reasoning: str
     category: str  # Immediate Needs, Quick Wins, etc.
+    packages: List[str] = field(default_factory=list)  # monorepo packages it applies to, dirtiest first
 
     def __post_init__(self):
         """Categorize based on confidence after initialization."""
@@ -40,29 +100,247 @@ class Recommendation:
                 self.category = "💡 Low Priority"
 
 
+@dataclass
+class RecommendationPlan:
+    """A set of recommendations chosen to fit a token budget."""
+    recommendations: List[Recommendation]
+    token_budget: int
+    expected_token_cost: int
+    total_confidence: float
+    method: str  # dp or greedy
+    skipped: List[str] = field(default_factory=list)  # eligible skills left out
+
+
+@dataclass
+class MonorepoRecommendations:
+    """Recommendations aggregated over the dirty packages of a monorepo."""
+    recommendations: List[Recommendation]  # aggregated, highest confidence first
+    packages: List[PackageAnalysis]  # dirty packages, most changed files first
+    package_recommendations: Dict[str, List[Recommendation]] = field(default_factory=dict)
+
+
+def select_within_budget(
+    candidates: List[Recommendation],
+    token_budget: int,
+    method: str = "dp"
+) -> List[Recommendation]:
+    """
+    Choose the subset of candidates with the highest total confidence whose
+    summed token estimates fit the budget (0/1 knapsack).
+
+    The "dp" method is exact. Token estimates are divided by their greatest
+    common divisor first, so the table stays small for the round numbers used
+    in the catalog. The "greedy" method orders by confidence per token and
+    compares against the best single skill, which guarantees at least half of
+    the optimal total.
+
+    Args:
+        candidates: Scored recommendations to choose from
+        token_budget: Maximum summed SkillMetadata.token_estimate
+        method: "dp" (exact) or "greedy" (approximate)
+
+    Returns:
+        Chosen recommendations sorted by confidence (highest first).
+    """
+    items = [c for c in candidates if 0 < c.skill.token_estimate <= token_budget and c.confidence > 0]
+    if not items:
+        return []
+
+    if sum(c.skill.token_estimate for c in items) <= token_budget:
+        chosen = items
+    elif method == "greedy":
+        ordered = sorted(items, key=lambda c: c.confidence / c.skill.token_estimate, reverse=True)
+        chosen, used = [], 0
+        for c in ordered:
+            if used + c.skill.token_estimate <= token_budget:
+                chosen.append(c)
+                used += c.skill.token_estimate
+        best_single = max(items, key=lambda c: c.confidence)
+        if best_single.confidence > sum(c.confidence for c in chosen):
+            chosen = [best_single]
+    else:
+        unit = reduce(gcd, (c.skill.token_estimate for c in items))
+        weights = [c.skill.token_estimate // unit for c in items]
+        capacity = min(token_budget // unit, sum(weights))
+
+        # best[w] = highest confidence using exactly w units; keep[i][w] marks item i taken
+        best = [0.0] + [-1.0] * capacity
+        keep = []
+        for c, w in zip(items, weights):
+            taken = bytearray(capacity + 1)
+            for cap in range(capacity, w - 1, -1):
+                if best[cap - w] >= 0 and best[cap - w] + c.confidence > best[cap]:
+                    best[cap] = best[cap - w] + c.confidence
+                    taken[cap] = 1
+            keep.append(taken)
+
+        cap = max(range(capacity + 1), key=lambda w: (best[w], -w))
+        chosen = []
+        for i in range(len(items) - 1, -1, -1):
+            if keep[i][cap]:
+                chosen.append(items[i])
+                cap -= weights[i]
+
+    return sorted(chosen, key=lambda c: c.confidence, reverse=True)
+
+
 class SkillRecommender:
     """Main recommendation engine that coordinates all analysis components."""
 
-    def __init__(self, skills_dir: Optional[str] = None, data_dir: Optional[str] = None):
+    def __init__(
+        self,
+        skills_dir: Optional[str] = None,
+        data_dir: Optional[str] = None,
+        working_dir: Optional[str] = None,
+        use_table: bool = True,
+        warm_start: bool = True,
+        incremental: bool = True,
+        skill_roots: Optional[List[str]] = None
+    ):
         """
         Initialize the recommender.
 
         Args:
             skills_dir: Directory containing skills (for metadata loader)
-            data_dir: Directory for user data storage
+            data_dir: Directory for user data storage. Derived caches (recommendation
+                      table, snapshot, analyzer caches) are kept here too when it
+                      is given, and in a per-user cache directory otherwise
+            working_dir: Directory to analyze. Defaults to current directory.
+            use_table: Score common contexts from the precomputed recommendation table
+            warm_start: Restore the built catalog, utilities, table and preferences
+                        from the snapshot in the cache directory when its inputs are unchanged,
+                        and write a fresh snapshot at interpreter exit once a
+                        recommendation has built new state
+            incremental: After the first request, keep per-skill component scores
+                         and recompute only those whose inputs changed
+            skill_roots: Optional skill directories layered over the built-in
+                         catalog, lowest precedence first (see default_skill_roots)
         """
-        self.skills_metadata = SkillMetadataLoader(repo_root=skills_dir)
-        self.context_analyzer = ContextAnalyzer()
-        self.project_analyzer = ProjectAnalyzer()
+        self.skills_metadata = SkillMetadataLoader(repo_root=skills_dir, roots=skill_roots)
         self.user_patterns = UserPatternAnalyzer(data_dir=data_dir)
-        self.skill_utility = SkillUtilityScorer()
+        self.cache_dir = self._cache_dir(data_dir)
+        self.context_analyzer = ContextAnalyzer(
+            working_dir=working_dir,
+            cache_dir=str(self.cache_dir)
+        )
+        self.project_analyzer = ProjectAnalyzer(
+            working_dir=working_dir,
+            cache_dir=str(self.cache_dir)
+        )
         self.confidence_scorer = ConfidenceScorer()
+        self.use_table = use_table
+        self.warm_start = warm_start
+        self.incremental = incremental
+        self._table: Optional[RecommendationTable] = None
+        self._next_skills: Optional[NextSkillTable] = None
+        self._next_skills_refresh: Optional[threading.Thread] = None
+        self._scores_state: Optional[Dict[str, Any]] = None
+        self._scores_lock = threading.Lock()  # recommend_async scores in executor threads
+        self._scored_once = False
+        self.snapshot_restored = False
+
+        state = load_snapshot(self.snapshot_path, self._snapshot_inputs()) if warm_start else None
+        if warm_start:
+            cache_result("snapshot", state is not None)
+        if state is not None:
+            try:
+                self._restore_state(state)
+                self.snapshot_restored = True
+            except (KeyError, TypeError, ValueError):
+                self._table = None
+        if not self.snapshot_restored:
+            self.skill_utility = SkillUtilityScorer()
+        self._snapshot_current = self.snapshot_restored
+
+        self.scores = IncrementalScores(self.confidence_scorer, self.skill_utility)
+        if self._scores_state is not None:
+            try:
+                self.scores.restore(self._scores_state)
+                self._scored_once = True
+            except (KeyError, TypeError, ValueError, AttributeError):
+                self.scores = IncrementalScores(self.confidence_scorer, self.skill_utility)
+
+    def _cache_dir(self, data_dir: Optional[str]) -> Path:
+        """The configured data directory, or a per-user cache directory for the default one."""
+        if data_dir:
+            return self.user_patterns.data_dir
+        cache_dir = _user_cache_dir(self.user_patterns.data_dir)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return self.user_patterns.data_dir
+        return cache_dir
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.cache_dir / SNAPSHOT_FILE
+
+    def _snapshot_inputs(self) -> List[Path]:
+        """Files the snapshotted state is built from."""
+        lib_dir = Path(__file__).parent
+        return ([lib_dir / name for name in SNAPSHOT_SOURCES] + [self.user_patterns.preferences_file]
+                + self.skills_metadata.root_files())
+
+    def _restore_state(self, state: Dict[str, Any]) -> None:
+        """Rebuild components from snapshot state (plain types only)."""
+        skills = {row[0]: SkillMetadata(*row) for row in state["catalog"]}
+        utilities = {name: SkillUtility(*row) for name, row in state["utilities"].items()}
+        prefs = state["preferences"]
+        prefs = UserPreferences(
+            preferred_skills=set(prefs["preferred_skills"]),
+            avoided_skills=set(prefs["avoided_skills"]),
+            skill_success_rates=dict(prefs["skill_success_rates"]),
+            complexity_tolerance=prefs["complexity_tolerance"],
+            domain_expertise=set(prefs["domain_expertise"]),
+            last_updated=prefs["last_updated"]
+        )
+        table = state.get("table")
+        self._scores_state = state.get("scores")
+
+        self.skills_metadata.prime(skills)
+        self.skill_utility = SkillUtilityScorer(base_utilities=utilities)
+        self.user_patterns.prime_preferences(prefs)
+        if table is not None:
+            self._table = RecommendationTable(table["key"], table["skills"], table["buckets"])
+
+    def save_snapshot(self) -> bool:
+        """
+        Write the built state to the warm-start snapshot in the data directory.
 
+        After a recommend() call that had to build state, this runs
+        automatically when the interpreter exits, off the request path; call
+        it to write the snapshot sooner.
+
+        Returns:
+            True if the snapshot was written.
+        """
+        prefs = asdict(self.user_patterns.load_preferences())
+        for name in ("preferred_skills", "avoided_skills", "domain_expertise"):
+            prefs[name] = sorted(prefs[name])
+
+        state = {
+            "catalog": [list(astuple(meta)) for meta in self.skills_metadata.load_all_skills().values()],
+            "utilities": {name: list(astuple(u)) for name, u in self.skill_utility.base_utilities.items()},
+            "preferences": prefs,
+            "table": None,
+            "scores": None,
+        }
+        with self._scores_lock:
+            if self.scores.primed:
+                state["scores"] = self.scores.to_state()
+        if self._table is not None:
+            state["table"] = {"key": self._table.key, "skills": self._table.skill_names, "buckets": self._table.buckets}
+
+        self._snapshot_current = save_snapshot(self.snapshot_path, state, self._snapshot_inputs())
+        return self._snapshot_current
+
+    @RECOMMEND_SECONDS.timed()
     def recommend(
         self,
         top_n: int = 5,
         min_confidence: float = 60.0,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        deadline_ms: Optional[float] = None
     ) -> List[Recommendation]:
         """
         Generate skill recommendations based on current context.
@@ -71,20 +349,243 @@ class SkillRecommender:
             top_n: Number of top recommendations to return
             min_confidence: Minimum confidence threshold (0-100)
             filters: Optional filters (e.g., {'category': 'development'})
+            deadline_ms: Optional time budget for context and project analysis;
+                         fields not computed in time keep best-effort values
+
+        Returns:
+            List of Recommendation objects sorted by confidence.
+        """
+        # 1. Gather context (project analysis gets whatever the context step leaves)
+        deadline = Deadline(deadline_ms)
+        with memory_stage("recommend.context"):
+            context = self.context_analyzer.analyze(deadline_ms=deadline.remaining_ms())
+        with memory_stage("recommend.project"):
+            project_state = self.project_analyzer.analyze(deadline_ms=deadline.remaining_ms())
+        with memory_stage("recommend.preferences"):
+            user_prefs = self.user_patterns.load_preferences()
+
+        # 2. Score all skills
+        with memory_stage("recommend.scoring"):
+            recommendations = self._score_skills(
+                context, project_state, user_prefs, min_confidence, filters
+            )
+
+        # 3. Sort by confidence (highest first) and return top N
+        recommendations.sort(key=lambda r: r.confidence, reverse=True)
+        return recommendations[:top_n]
+
+    @RECOMMEND_SECONDS.timed()
+    async def recommend_async(
+        self,
+        top_n: int = 5,
+        min_confidence: float = 60.0,
+        filters: Optional[Dict[str, Any]] = None,
+        deadline_ms: Optional[float] = None
+    ) -> List[Recommendation]:
+        """
+        Asyncio counterpart of recommend().
+
+        Context analysis, project analysis and preference loading run
+        concurrently (git as asyncio subprocesses, filesystem work in the
+        default executor), then scoring runs in the executor. Cancelling the
+        task cancels all three and kills any running git process.
+
+        Args:
+            top_n: Number of top recommendations to return
+            min_confidence: Minimum confidence threshold (0-100)
+            filters: Optional filters (e.g., {'category': 'development'})
+            deadline_ms: Optional time budget for each of the concurrent analyses
 
         Returns:
             List of Recommendation objects sorted by confidence.
         """
-        # 1. Gather context
+        loop = asyncio.get_running_loop()
+        context, project_state, user_prefs = await asyncio.gather(
+            self.context_analyzer.analyze_async(deadline_ms=deadline_ms),
+            self.project_analyzer.analyze_async(deadline_ms=deadline_ms),
+            loop.run_in_executor(None, self.user_patterns.load_preferences)
+        )
+
+        recommendations = await loop.run_in_executor(
+            None, self._score_skills, context, project_state, user_prefs, min_confidence, filters
+        )
+        recommendations.sort(key=lambda r: r.confidence, reverse=True)
+        return recommendations[:top_n]
+
+    def recommend_monorepo(
+        self,
+        top_n: int = 5,
+        min_confidence: float = 60.0,
+        filters: Optional[Dict[str, Any]] = None,
+        deadline_ms: Optional[float] = None,
+        max_workers: Optional[int] = None
+    ) -> MonorepoRecommendations:
+        """
+        Recommend per package in a monorepo and rank by where the changes are.
+
+        Packages (directories with package.json, pyproject.toml, Cargo.toml,
+        ...) are discovered in one walk, changed files are attributed to their
+        innermost package, and every dirty package is analyzed in parallel.
+        A skill's aggregated confidence is the mean of its per-package scores
+        weighted by each package's share of the changed files, so skills for
+        the packages actually being edited rank first. Without dirty packages
+        this is plain recommend().
+
+        Args:
+            top_n: Number of aggregated recommendations to return
+            min_confidence: Minimum confidence threshold (0-100)
+            filters: Optional filters (e.g., {'category': 'development'})
+            deadline_ms: Optional time budget for all analysis
+            max_workers: Packages analyzed concurrently (default MAX_WORKERS)
+
+        Returns:
+            MonorepoRecommendations with aggregated and per-package results.
+        """
+        deadline = Deadline(deadline_ms)
+        context = self.context_analyzer.analyze(deadline_ms=deadline.remaining_ms())
+        project_state = self.project_analyzer.analyze(deadline_ms=deadline.remaining_ms())
+        user_prefs = self.user_patterns.load_preferences()
+
+        monorepo = MonorepoAnalyzer(
+            working_dir=str(self.project_analyzer.working_dir),
+            cache_dir=str(self.cache_dir),
+            max_workers=max_workers or MAX_WORKERS,
+            sampling=self.project_analyzer.sampling
+        )
+        packages = monorepo.analyze(
+            context, project_state, self.context_analyzer, deadline_ms=deadline.remaining_ms()
+        )
+
+        if not packages:
+            recommendations = self._score_skills(context, project_state, user_prefs, min_confidence, filters)
+            recommendations.sort(key=lambda r: r.confidence, reverse=True)
+            return MonorepoRecommendations(recommendations[:top_n], [])
+
+        total_changes = sum(p.changed_files for p in packages)
+        weighted: Dict[str, float] = {}
+        best: Dict[str, Recommendation] = {}
+        applies_to: Dict[str, List[str]] = {}
+        per_package: Dict[str, List[Recommendation]] = {}
+
+        for analysis in packages:
+            scored = self._score_skills(analysis.context, analysis.project_state, user_prefs, 0.0, filters)
+            weight = analysis.changed_files / total_changes
+            for rec in scored:
+                name = rec.skill.name
+                weighted[name] = weighted.get(name, 0.0) + weight * rec.confidence
+                if rec.confidence >= min_confidence:
+                    applies_to.setdefault(name, []).append(analysis.package.name)
+                    # Packages are visited dirtiest first, so keep the first qualifying one
+                    best.setdefault(name, rec)
+            per_package[analysis.package.name] = sorted(
+                (rec for rec in scored if rec.confidence >= min_confidence),
+                key=lambda r: r.confidence, reverse=True
+            )[:top_n]
+
+        changed = {p.package.name: p.changed_files for p in packages}
+        aggregated = []
+        for name, confidence in weighted.items():
+            if confidence < min_confidence or name not in best:
+                continue
+            source = best[name]
+            where = ", ".join(f"{pkg} ({changed[pkg]} changed)" for pkg in applies_to[name][:3])
+            aggregated.append(Recommendation(
+                skill=source.skill,
+                confidence=confidence,
+                context=source.context,
+                reasoning=f"{where} - {source.reasoning}",
+                category="",
+                packages=applies_to[name]
+            ))
+
+        aggregated.sort(key=lambda r: r.confidence, reverse=True)
+        return MonorepoRecommendations(aggregated[:top_n], packages, per_package)
+
+    def recommend_within_budget(
+        self,
+        token_budget: Optional[int] = None,
+        min_confidence: float = 60.0,
+        filters: Optional[Dict[str, Any]] = None,
+        method: str = "dp"
+    ) -> RecommendationPlan:
+        """
+        Choose the skill set with the highest total confidence that fits a token budget.
+
+        Unlike recommend(), which takes the top N by score, this picks the
+        cheapest high-value combination when the budget is tight.
+
+        Args:
+            token_budget: Token budget to fill. Defaults to the context's
+                          token_budget_remaining.
+            min_confidence: Minimum confidence for a skill to be considered (0-100)
+            filters: Optional filters (e.g., {'category': 'development'})
+            method: "dp" for an exact 0/1 knapsack, "greedy" for a fast bound
+
+        Returns:
+            RecommendationPlan with the chosen recommendations and their token cost.
+        """
         context = self.context_analyzer.analyze()
         project_state = self.project_analyzer.analyze()
         user_prefs = self.user_patterns.load_preferences()
 
-        # 2. Score all skills
-        recommendations = []
+        if token_budget is None:
+            token_budget = context.token_budget_remaining
+
+        candidates = self._score_skills(
+            context, project_state, user_prefs, min_confidence, filters
+        )
+        chosen = select_within_budget(candidates, token_budget, method=method)
+        chosen_names = {rec.skill.name for rec in chosen}
+
+        return RecommendationPlan(
+            recommendations=chosen,
+            token_budget=token_budget,
+            expected_token_cost=sum(rec.skill.token_estimate for rec in chosen),
+            total_confidence=round(sum(rec.confidence for rec in chosen), 1),
+            method=method,
+            skipped=sorted(rec.skill.name for rec in candidates if rec.skill.name not in chosen_names)
+        )
+
+    def _score_skills(
+        self,
+        context: ContextAnalysis,
+        project_state: ProjectState,
+        user_prefs: UserPreferences,
+        min_confidence: float,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Recommendation]:
+        """
+        Score every catalog skill against the gathered inputs.
+
+        Args:
+            context: ContextAnalysis object
+            project_state: ProjectState object
+            user_prefs: UserPreferences object
+            min_confidence: Minimum confidence threshold (0-100)
+            filters: Optional filters (e.g., {'category': 'development'})
+
+        The first request in a process scores every skill from scratch (or
+        from the recommendation table). Later requests go through the
+        incremental scores: only components whose inputs changed are
+        recomputed and the kept ranking is walked down to min_confidence.
+
+        Returns:
+            List of Recommendation objects meeting the threshold (highest
+            confidence first on the incremental path, unsorted otherwise).
+        """
         all_skills = self.skills_metadata.load_all_skills()
+        if self.incremental and self._scored_once:
+            ranked = takewhile(
+                lambda item: item[1] >= min_confidence,
+                self._score_incrementally(all_skills, context, project_state, user_prefs)
+            )
+        else:
+            ranked = self._score_from_scratch(all_skills, context, project_state, user_prefs)
+            self._scored_once = True
 
-        for skill_name, skill_meta in all_skills.items():
+        recommendations = []
+        for skill_name, confidence in ranked:
+            skill_meta = all_skills[skill_name]
             # Apply filters if provided
             if filters:
                 if 'category' in filters and skill_meta.category != filters['category']:
@@ -92,18 +593,6 @@ class SkillRecommender:
                 if 'priority' in filters and skill_meta.priority != filters['priority']:
                     continue
 
-            # Get utility scores
-            utility = self.skill_utility.get_utility_score(skill_name)
-
-            # Calculate confidence
-            confidence = self.confidence_scorer.calculate_confidence(
-                skill=skill_meta,
-                context=context,
-                project_state=project_state,
-                user_prefs=user_prefs,
-                skill_utility=utility
-            )
-
             # Only include if meets minimum confidence
             if confidence >= min_confidence:
                 reasoning = self._generate_reasoning(skill_meta, context, project_state, confidence)
@@ -118,9 +607,162 @@ class SkillRecommender:
                     )
                 )
 
-        # 3. Sort by confidence (highest first) and return top N
-        recommendations.sort(key=lambda r: r.confidence, reverse=True)
-        return recommendations[:top_n]
+        if self.warm_start and not self._snapshot_current:
+            with _pending_snapshots_lock:
+                _pending_snapshots[self.snapshot_path] = self
+        return recommendations
+
+    def _score_from_scratch(
+        self,
+        all_skills: Dict[str, SkillMetadata],
+        context: ContextAnalysis,
+        project_state: ProjectState,
+        user_prefs: UserPreferences
+    ) -> List[Tuple[str, float]]:
+        """Confidence of every skill from the recommendation table or full scoring."""
+        base_scores = self._lookup_table(all_skills, context, user_prefs) if self.use_table else None
+        scored = []
+        for skill_name, skill_meta in all_skills.items():
+            if base_scores is not None and skill_name in base_scores:
+                # Precomputed bucket score plus the project fit term (20 points max)
+                confidence = base_scores[skill_name]
+                if project_state:
+                    confidence += self.confidence_scorer.analyze_project_fit(skill_meta, project_state) * 20
+                confidence = min(100.0, max(0.0, confidence))
+            else:
+                # Get utility scores
+                utility = self.skill_utility.get_utility_score(skill_name)
+
+                # Calculate confidence
+                confidence = self.confidence_scorer.calculate_confidence(
+                    skill=skill_meta,
+                    context=context,
+                    project_state=project_state,
+                    user_prefs=user_prefs,
+                    skill_utility=utility
+                )
+            scored.append((skill_name, confidence))
+        return scored
+
+    def _score_incrementally(
+        self,
+        all_skills: Dict[str, SkillMetadata],
+        context: ContextAnalysis,
+        project_state: ProjectState,
+        user_prefs: UserPreferences
+    ) -> List[Tuple[str, float]]:
+        """Confidence of every skill, recomputing only components whose inputs changed."""
+        # Concurrent requests would otherwise interleave their updates of the shared scores
+        with self._scores_lock:
+            was_primed = self.scores.primed
+            self.scores.update(all_skills, context, project_state, user_prefs)
+            ranked = self.scores.ranked()
+        if not was_primed:
+            self._snapshot_current = False  # keep the component scores for the next process
+        return ranked
+
+    def precompute_table(self) -> RecommendationTable:
+        """
+        Build and store the recommendation table for the current catalog and preferences.
+
+        recommend() rebuilds the table automatically when either input changes;
+        call this to pay that cost ahead of time (e.g. after bulk feedback).
+
+        Returns:
+            The freshly built RecommendationTable.
+        """
+        all_skills = self.skills_metadata.load_all_skills()
+        user_prefs = self.user_patterns.load_preferences()
+        self._table = RecommendationTable.build(
+            all_skills, user_prefs, self.confidence_scorer, self.skill_utility
+        )
+        self._table.save(self.cache_dir / TABLE_FILE)
+        self._snapshot_current = False
+        return self._table
+
+    def mine_next_skills(self, **options: Any) -> NextSkillTable:
+        """
+        Mine the next-skill table from the feedback history and store it.
+
+        Run this offline (e.g. after bulk feedback); suggest_next() reads the
+        stored table, and once the feedback history has changed re-mines it
+        with the same parameters in the background.
+
+        Args:
+            **options: Mining parameters passed to next_skills.mine_next_skills
+                       (window, lookahead, min_support, min_confidence, top)
+
+        Returns:
+            The freshly mined NextSkillTable.
+        """
+        source = feedback_stamp(self.user_patterns.feedback_file)
+        self._next_skills = mine_next_skills(self.user_patterns.load_feedback_columns(), source=source, **options)
+        self._next_skills.save(self.user_patterns.data_dir / NEXT_SKILLS_FILE)
+        return self._next_skills
+
+    def suggest_next(self, skill_name: str, limit: int = 3) -> List[Tuple[str, float]]:
+        """
+        Skills the user tends to run after the given one.
+
+        A lookup in the stored next-skill table; no context is analyzed and
+        nothing is scored. When the feedback history changed since the table
+        was mined, the stored table is still served and a background thread
+        re-mines it with its own parameters for later calls.
+
+        Args:
+            skill_name: Skill that just completed
+            limit: Maximum number of suggestions
+
+        Returns:
+            [(skill, confidence 0.0-1.0)], most likely first; empty if the table
+            has not been mined or has nothing for the skill.
+        """
+        refreshing = self._next_skills_refresh is not None and self._next_skills_refresh.is_alive()
+        if not refreshing:
+            feedback_file = self.user_patterns.feedback_file
+            stamp = feedback_stamp(feedback_file)
+            if self._next_skills is None or self._next_skills.source != stamp:
+                table_path = self.user_patterns.data_dir / NEXT_SKILLS_FILE
+                table = NextSkillTable.load(table_path)
+                if table is not None and table.source != stamp:
+                    self._next_skills_refresh = refresh_in_background(
+                        table_path, feedback_file, self.user_patterns.load_feedback_columns,
+                        on_done=self._set_next_skills
+                    )
+                self._next_skills = table or NextSkillTable({}, stamp)
+        return self._next_skills.next_skills(skill_name, limit)
+
+    def _set_next_skills(self, table: NextSkillTable) -> None:
+        self._next_skills = table
+
+    def _lookup_table(
+        self,
+        all_skills: Dict[str, SkillMetadata],
+        context: ContextAnalysis,
+        user_prefs: UserPreferences
+    ) -> Optional[Dict[str, float]]:
+        """
+        Get precomputed base scores for the context's bucket.
+
+        Loads the stored table, or rebuilds it when the catalog or preferences
+        no longer match the ones it was built from.
+
+        Returns:
+            Dict mapping skill name to base score, or None if the context
+            falls outside the table.
+        """
+        key = table_key(all_skills, user_prefs)
+        if self._table is None or self._table.key != key:
+            table_path = self.cache_dir / TABLE_FILE
+            self._table = RecommendationTable.load(table_path, key)
+            self._snapshot_current = False
+            if self._table is None:
+                self._table = RecommendationTable.build(
+                    all_skills, user_prefs, self.confidence_scorer, self.skill_utility
+                )
+                self._table.save(table_path)
+
+        return self._table.lookup(self.confidence_scorer.context_signature(context))
 
     def _generate_reasoning(
         self,
@@ -0,0 +1,276 @@
+"""
+Offline Replay Evaluation Module
+
+Replays the recorded feedback history in time order against a scorer and
+measures how highly it ranked the skills the user went on to use: hit rate
+at k and mean reciprocal rank. Preferences are rebuilt from the replayed
+events as they go, so every event is ranked with only what was known
+before it, the way the live recommender would have ranked it.
+
+The replay works on FeedbackColumns rather than feedback entries and
+relies on the same decomposition as the incremental scores: context
+relevance depends only on the context signature, so one row of context
+points per distinct signature is computed up front; user alignment
+depends only on the skill's user signature, so an event rescores only its
+own skill. Ranking an event is then a few C-level passes over one list of
+per-skill totals.
+
+A scorer variant that overrides analyze_context_relevance or
+analyze_user_alignment should override the matching signature method as
+well. When it does not, the inherited signature cannot be trusted to
+cover what the variant reads: context rows are then computed per distinct
+context and user alignment for every skill at every event, which is
+slower but exact.
+
+Usage:
+    evaluator = ReplayEvaluator.from_history(history_path, skills)
+    baseline = evaluator.evaluate()
+    variant = evaluator.evaluate(weights={"context": 50, "user": 20})
+    print(baseline.mrr, variant.mrr)
+"""
+
+import time
+from array import array
+from dataclasses import dataclass, field
+from operator import add
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .confidence_scorer import ConfidenceScorer
+from .context_analyzer import ContextAnalysis
+from .feedback_columns import FeedbackColumns, OTHER_FILE_TYPE_BIT, is_relevant
+from .incremental import COMPONENT_WEIGHTS
+from .user_patterns import UserPreferences, _apply_feedback
+
+DEFAULT_KS = (1, 3, 5)
+DEFAULT_TOKEN_BUDGET = 150000  # fingerprints do not record the budget
+
+# Outcome column value -> outcome name passed to the preference update
+_OUTCOME_NAMES = {1: "success", 0: "failure", -1: "unknown"}
+
+
+def _overrides(scorer: ConfidenceScorer, method: str) -> bool:
+    """Whether the scorer's class replaces a ConfidenceScorer method."""
+    return getattr(type(scorer), method, None) is not getattr(ConfidenceScorer, method)
+
+
+@dataclass
+class ReplayReport:
+    """Ranking quality of one scorer over a replayed history."""
+    events: int                  # events replayed
+    evaluated: int               # relevant events whose skill is in the catalog
+    unknown_skill: int           # relevant events whose skill is not in the catalog
+    hits: Dict[int, int] = field(default_factory=dict)  # k -> evaluated events ranked within the top k
+    reciprocal_rank_sum: float = 0.0
+    seconds: float = 0.0
+
+    def hit_rate(self, k: int) -> float:
+        """Share of evaluated events whose skill was ranked within the top k."""
+        return self.hits.get(k, 0) / self.evaluated if self.evaluated else 0.0
+
+    @property
+    def mrr(self) -> float:
+        """Mean reciprocal rank of the used skill (0 for events below the threshold)."""
+        return self.reciprocal_rank_sum / self.evaluated if self.evaluated else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "evaluated": self.evaluated,
+            "unknown_skill": self.unknown_skill,
+            "hit_rate": {str(k): round(self.hit_rate(k), 4) for k in sorted(self.hits)},
+            "mrr": round(self.mrr, 4),
+            "seconds": round(self.seconds, 3),
+        }
+
+
+class ReplayEvaluator:
+    """Replays one feedback history against scorer variants."""
+
+    def __init__(self, columns: FeedbackColumns, skills: Dict[str, Any],
+                 token_budget: int = DEFAULT_TOKEN_BUDGET):
+        """
+        Decode the history's contexts and event order once for all variants.
+
+        Args:
+            columns: Feedback history as FeedbackColumns
+            skills: Skill catalog (name -> SkillMetadata) to rank
+            token_budget: Budget assumed for every replayed context
+        """
+        self.columns = columns
+        self.names = sorted(skills)  # ties rank by name, as in the incremental ranking
+        self.skills = [skills[name] for name in self.names]
+        index = {name: i for i, name in enumerate(self.names)}
+        self.catalog_ids = [index.get(name, -1) for name in columns.skills]  # skill id -> catalog index
+
+        # One context per distinct (activity, project type, file types) triple
+        keys: Dict[Tuple[int, int, int], int] = {}
+        cols = columns.columns
+        self.context_ids = array("I", [
+            keys.setdefault(key, len(keys))
+            for key in zip(cols["activity_ids"], cols["project_type_ids"], cols["file_type_masks"])
+        ])
+        self.contexts: List[ContextAnalysis] = [None] * len(keys)
+        for (activity, project_type, mask), i in keys.items():
+            self.contexts[i] = ContextAnalysis(
+                current_activity=columns.activities[activity],
+                file_types=self._file_types(mask),
+                recent_changes={},
+                project_type=columns.project_types[project_type],
+                token_budget_remaining=token_budget
+            )
+
+        self.relevant = bytes(map(is_relevant, cols["outcomes"], cols["ratings"]))
+
+        timestamps = cols["timestamps"]
+        if all(a <= b for a, b in zip(timestamps, timestamps[1:])):
+            self.order: Sequence[int] = range(len(timestamps))
+        else:
+            # Stable, so events with equal timestamps keep their recorded order
+            self.order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+
+    @classmethod
+    def from_history(cls, history_path: Path, skills: Dict[str, Any], **kwargs: Any) -> "ReplayEvaluator":
+        """
+        Build an evaluator for a feedback_history.json file.
+
+        Args:
+            history_path: Path to feedback_history.json (the column sidecar is used when fresh)
+            skills: Skill catalog (name -> SkillMetadata)
+        """
+        return cls(FeedbackColumns.load(history_path), skills, **kwargs)
+
+    def _file_types(self, mask: int) -> set:
+        # Extensions past the first 63 share one bit and cannot be told apart
+        mask &= ~OTHER_FILE_TYPE_BIT
+        return {ext for i, ext in enumerate(self.columns.file_types) if mask >> i & 1}
+
+    def evaluate(
+        self,
+        scorer: Optional[ConfidenceScorer] = None,
+        weights: Optional[Dict[str, float]] = None,
+        ks: Sequence[int] = DEFAULT_KS,
+        project_state: Optional[Any] = None,
+        utility_scorer: Optional[Any] = None,
+        base_prefs: Optional[UserPreferences] = None,
+        min_confidence: float = 0.0
+    ) -> ReplayReport:
+        """
+        Replay the history and rank every catalog skill at each relevant event.
+
+        Args:
+            scorer: ConfidenceScorer (or a subclass under evaluation)
+            weights: Component points overriding COMPONENT_WEIGHTS, e.g. {"context": 50}
+            ks: Cutoffs for hit rate
+            project_state: ProjectState to score project fit against (none by default;
+                           the history does not record project state)
+            utility_scorer: SkillUtilityScorer for the utility component (none by default)
+            base_prefs: Preferences whose complexity tolerance and domain expertise
+                        apply throughout; learned fields start empty and are replayed
+            min_confidence: Events whose skill scores below this count as misses
+
+        Returns:
+            ReplayReport. Scores are the unclamped weighted component sums.
+        """
+        start = time.perf_counter()
+        scorer = scorer or ConfidenceScorer()
+        points = dict(COMPONENT_WEIGHTS)
+        points.update(weights or {})
+        skills = self.skills
+
+        # Project fit and utility do not change during the replay; fold them into the context rows
+        constant = [0.0] * len(skills)
+        for i, skill in enumerate(skills):
+            if project_state:
+                constant[i] += scorer.analyze_project_fit(skill, project_state) * points["project"]
+            utility = utility_scorer.get_utility_score(skill.name) if utility_scorer else None
+            if utility:
+                constant[i] += utility.reliability_score * points["utility"]
+
+        # A variant's relevance may read more than the inherited signature covers
+        shared_rows = (not _overrides(scorer, "analyze_context_relevance")
+                       or _overrides(scorer, "context_signature"))
+        rows_by_signature: Dict[Any, List[float]] = {}
+        context_rows = []
+        for i, context in enumerate(self.contexts):
+            signature = scorer.context_signature(context) if shared_rows else i
+            row = rows_by_signature.get(signature)
+            if row is None:
+                row = rows_by_signature[signature] = [
+                    scorer.analyze_context_relevance(skill, context) * points["context"] + base
+                    for skill, base in zip(skills, constant)
+                ]
+            context_rows.append(row)
+
+        prefs = UserPreferences(
+            complexity_tolerance=base_prefs.complexity_tolerance if base_prefs else "medium",
+            domain_expertise=set(base_prefs.domain_expertise) if base_prefs else set()
+        )
+        preferred, avoided, rates = prefs.preferred_skills, prefs.avoided_skills, prefs.skill_success_rates
+        alignment: Dict[Tuple, float] = {}  # (catalog index, user signature) -> points
+
+        if _overrides(scorer, "user_signature"):
+            def user_key(i: int) -> Tuple:
+                return i, scorer.user_signature(skills[i], prefs)
+        else:
+            # Domain expertise and complexity tolerance stay fixed during the replay,
+            # so these are the only parts of the base user signature that can change
+            def user_key(i: int) -> Tuple:
+                name = self.names[i]
+                return i, name in preferred, name in avoided, rates.get(name)
+
+        def user_points(i: int, context: Any) -> float:
+            key = user_key(i)
+            value = alignment.get(key)
+            if value is None:
+                value = alignment[key] = scorer.analyze_user_alignment(skills[i], prefs, context) * points["user"]
+            return value
+
+        # Without its own signature a variant's alignment may depend on the context too
+        per_event_user = (_overrides(scorer, "analyze_user_alignment")
+                          and not _overrides(scorer, "user_signature"))
+        if self.order:
+            first_context = self.contexts[self.context_ids[self.order[0]]]
+        else:
+            first_context = None
+        user_row = [user_points(i, first_context) for i in range(len(skills))]
+
+        report = ReplayReport(events=len(self.order), evaluated=0, unknown_skill=0,
+                              hits={k: 0 for k in ks})
+        cols = self.columns.columns
+        skill_ids, outcomes, ratings = cols["skill_ids"], cols["outcomes"], cols["ratings"]
+        context_ids, catalog_ids, names = self.context_ids, self.catalog_ids, self.columns.skills
+        relevant = self.relevant
+        hits = report.hits
+        reciprocal_rank_sum = 0.0
+
+        for row in self.order:
+            skill_id = skill_ids[row]
+            target = catalog_ids[skill_id]
+
+            if relevant[row]:
+                if target < 0:
+                    report.unknown_skill += 1
+                else:
+                    report.evaluated += 1
+                    if per_event_user:
+                        context = self.contexts[context_ids[row]]
+                        user_row = [scorer.analyze_user_alignment(skill, prefs, context) * points["user"]
+                                    for skill in skills]
+                    totals = list(map(add, context_rows[context_ids[row]], user_row))
+                    score = totals[target]
+                    if score >= min_confidence:
+                        rank = 1 + sum(map(score.__lt__, totals)) + totals[:target].count(score)
+                        reciprocal_rank_sum += 1.0 / rank
+                        for k in hits:
+                            if rank <= k:
+                                hits[k] += 1
+
+            # Learn from the event only after ranking it
+            _apply_feedback(prefs, names[skill_id], _OUTCOME_NAMES[outcomes[row]], ratings[row] or None)
+            if target >= 0 and not per_event_user:
+                user_row[target] = user_points(target, self.contexts[context_ids[row]])
+
+        report.reciprocal_rank_sum = reciprocal_rank_sum
+        report.seconds = time.perf_counter() - start
+        return report
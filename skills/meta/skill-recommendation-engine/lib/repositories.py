@@ -0,0 +1,304 @@
+"""
+Repository Discovery Module
+
+Enumerates the repositories that make up a working context: the main
+working tree, its (initialized, possibly nested) submodules and the linked
+worktrees of the same repository. Discovery and HEAD resolution only read
+files under .git, so they cost no subprocesses; the caller runs git status
+in every repository concurrently.
+
+Submodule status is cached per submodule, keyed by the submodule's own HEAD,
+index and working tree stat data, so unchanged dependencies are not
+rescanned on every analysis.
+"""
+
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+MAIN, SUBMODULE, WORKTREE = "main", "submodule", "worktree"
+MAX_SUBMODULE_DEPTH = 3
+STATUS_CACHE_FILE = "repository_status_cache.json"
+STATUS_CACHE_VERSION = 2
+STATUS_CACHE_TTL = 300.0  # seconds a cached submodule status is trusted at most
+
+
+@dataclass
+class Repository:
+    """One working tree taking part in the context."""
+    path: Path             # working tree directory
+    name: str              # "" for the main tree, submodule path, or worktree location
+    kind: str              # main, submodule, worktree
+    git_dir: Optional[Path] = None
+
+    def qualify(self, path: str) -> str:
+        """Prefix a repository-relative path with the repository's name."""
+        return f"{self.name}/{path}" if self.name else path
+
+
+def resolve_git_dir(worktree: Path) -> Optional[Path]:
+    """
+    Git directory of a working tree (.git directory or "gitdir:" file).
+
+    Returns:
+        The git directory, or None if worktree is not a (initialized) checkout.
+    """
+    dot_git = Path(worktree) / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    try:
+        text = dot_git.read_text(encoding="utf-8").strip()
+    except (IOError, OSError, UnicodeDecodeError):
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    git_dir = Path(text[len("gitdir:"):].strip())
+    if not git_dir.is_absolute():
+        git_dir = (Path(worktree) / git_dir).resolve()
+    return git_dir if git_dir.is_dir() else None
+
+
+def common_dir(git_dir: Path) -> Path:
+    """Shared git directory of a linked worktree (the git_dir itself otherwise)."""
+    try:
+        text = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except (IOError, OSError, UnicodeDecodeError):
+        return git_dir
+    path = Path(text)
+    return path if path.is_absolute() else (git_dir / path).resolve()
+
+
+def read_head(git_dir: Path) -> Optional[str]:
+    """
+    Commit id HEAD points to, following one level of symbolic ref.
+
+    Returns:
+        Hex object id, "ref:<name>" for an unborn branch, or None if unreadable.
+    """
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except (IOError, OSError, UnicodeDecodeError):
+        return None
+    if not head.startswith("ref:"):
+        return head or None
+
+    ref = head[len("ref:"):].strip()
+    shared = common_dir(git_dir)
+    for base in (git_dir, shared):
+        try:
+            return (base / ref).read_text(encoding="utf-8").strip()
+        except (IOError, OSError, UnicodeDecodeError):
+            continue
+
+    try:
+        with open(shared / "packed-refs", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except (IOError, OSError, UnicodeDecodeError):
+        pass
+    return f"ref:{ref}"
+
+
+def index_stamp(git_dir: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a repository's index, or None if it has none."""
+    try:
+        stat = (git_dir / "index").stat()
+    except (IOError, OSError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def parse_gitmodules(path: Path) -> List[str]:
+    """
+    Submodule paths declared in a .gitmodules file.
+
+    Returns:
+        Paths relative to the file's directory, in file order.
+    """
+    paths = []
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep and key.strip() == "path":
+                    paths.append(value.strip().strip("/"))
+    except (IOError, OSError):
+        pass
+    return paths
+
+
+def discover_repositories(
+    root: Path,
+    include_submodules: bool = True,
+    include_worktrees: bool = True,
+    max_depth: int = MAX_SUBMODULE_DEPTH
+) -> List[Repository]:
+    """
+    Enumerate the main working tree, its submodules and linked worktrees.
+
+    Args:
+        root: Top level of the main working tree
+        include_submodules: Include initialized submodules (recursively)
+        include_worktrees: Include the other worktrees of the same repository
+        max_depth: Maximum submodule nesting depth
+
+    Returns:
+        Repositories, the main tree first. Uninitialized submodules and
+        worktrees whose directory is missing are skipped.
+    """
+    root = Path(root)
+    main = Repository(root, "", MAIN, resolve_git_dir(root))
+    repositories = [main]
+
+    if include_submodules:
+        pending = [(main, 0)]
+        while pending:
+            parent, depth = pending.pop()
+            if depth >= max_depth:
+                continue
+            for sub in parse_gitmodules(parent.path / ".gitmodules"):
+                path = parent.path / sub
+                git_dir = resolve_git_dir(path)
+                if git_dir is None:
+                    continue
+                repository = Repository(path, parent.qualify(sub), SUBMODULE, git_dir)
+                repositories.append(repository)
+                pending.append((repository, depth + 1))
+
+    if include_worktrees and main.git_dir is not None:
+        shared = common_dir(main.git_dir)
+        here = root.resolve()
+        trees = []
+        # When root is itself a linked worktree, the main worktree is another one
+        if shared != main.git_dir and shared.name == ".git":
+            trees.append((shared.parent, shared))
+        try:
+            entries = sorted((shared / "worktrees").iterdir())
+        except (IOError, OSError):
+            entries = []
+        for entry in entries:
+            try:
+                gitdir_file = (entry / "gitdir").read_text(encoding="utf-8").strip()
+            except (IOError, OSError, UnicodeDecodeError):
+                continue
+            trees.append((Path(gitdir_file).parent, entry))
+
+        for path, git_dir in trees:
+            if not path.is_dir() or path.resolve() == here:
+                continue
+            repositories.append(Repository(path, _worktree_name(path, here), WORKTREE, git_dir))
+
+    return repositories
+
+
+def _worktree_name(path: Path, root: Path) -> str:
+    try:
+        return path.resolve().relative_to(root).as_posix()
+    except ValueError:
+        return path.resolve().as_posix()
+
+
+class RepositoryStatusCache:
+    """Submodule git status results keyed by the submodule's HEAD, index and working tree."""
+
+    def __init__(self, cache_file: Optional[Path] = None, ttl: Optional[float] = STATUS_CACHE_TTL):
+        """
+        Args:
+            cache_file: Optional JSON file to persist results across processes
+            ttl: Seconds an entry is trusted while its key is unchanged (a
+                 bound for changes the stat data cannot show); None trusts
+                 entries until the key changes
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.ttl = ttl
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+            if data.get("version") == STATUS_CACHE_VERSION:
+                self._entries = data.get("repositories", {})
+        except (IOError, OSError, ValueError, AttributeError):
+            pass
+
+    @staticmethod
+    def _key(repository: Repository) -> Tuple[Optional[str], Optional[list]]:
+        if repository.git_dir is None:
+            return None, None
+        stamp = index_stamp(repository.git_dir)
+        return read_head(repository.git_dir), list(stamp) if stamp else None
+
+    def get(self, repository: Repository, worktree: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Cached status of a repository if its HEAD, index and working tree are unchanged.
+
+        Args:
+            repository: Repository to look up
+            worktree: Current working tree stamp (git_index.worktree_stamp)
+
+        Returns:
+            Status dict, or None on a miss.
+        """
+        entry = self._entries.get(str(repository.path))
+        if entry is None:
+            return None
+        head, stamp = self._key(repository)
+        if (head is None or entry.get("head") != head or entry.get("index") != stamp
+                or entry.get("worktree") != worktree):
+            return None
+        if self.ttl is not None and time.time() - entry.get("time", 0.0) > self.ttl:
+            return None
+        return {category: list(paths) for category, paths in entry.get("status", {}).items()}
+
+    def put(self, repository: Repository, status: Dict[str, List[str]], worktree: str) -> None:
+        """
+        Remember a complete status result.
+
+        Args:
+            repository: Repository the status belongs to
+            status: Status dict
+            worktree: Working tree stamp taken before the status was collected
+        """
+        head, stamp = self._key(repository)
+        if head is None:
+            return
+        self._entries[str(repository.path)] = {
+            "head": head, "index": stamp, "worktree": worktree, "time": time.time(), "status": status,
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """
+        Persist the cache if it changed.
+
+        The file is written to a temporary file and renamed into place, so
+        concurrent analyzers and crashes never leave a truncated cache; the
+        temporary name is unique because several analyzers may save at once.
+        """
+        if not self.cache_file or not self._dirty:
+            return
+        temp = None
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp = tempfile.mkstemp(prefix=self.cache_file.name + ".", suffix=".tmp",
+                                        dir=str(self.cache_file.parent))
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": STATUS_CACHE_VERSION, "repositories": self._entries}, f)
+            os.replace(temp, self.cache_file)
+            self._dirty = False
+        except (IOError, OSError):
+            if temp is not None:
+                try:
+                    os.unlink(temp)
+                except OSError:
+                    pass
@@ -0,0 +1,173 @@
+"""
+Sampling Estimators Module
+
+Uniform reservoir sampling over a stream of files and estimators with
+confidence intervals, used by ProjectAnalyzer to estimate the test-to-source
+ratio and file size metrics on trees too large to measure exhaustively.
+"""
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+Z_95 = 1.96  # two-sided 95% normal quantile
+
+T = TypeVar("T")
+
+
+@dataclass
+class Estimate:
+    """A sampled estimate with its confidence interval."""
+    value: float
+    low: float
+    high: float
+    sample_size: int
+    population: int
+
+    @property
+    def exact(self) -> bool:
+        """True when the whole population was measured."""
+        return self.sample_size >= self.population
+
+
+class Reservoir(Generic[T]):
+    """
+    Fixed-size uniform random sample of a stream of unknown length.
+
+    Uses Algorithm L, which draws random numbers only when an item is kept,
+    so most items of a long stream cost a counter increment.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        """
+        Args:
+            size: Maximum number of items kept
+            seed: Optional seed for reproducible samples
+        """
+        self.size = size
+        self.items: List[T] = []
+        self.seen = 0
+        self._rng = random.Random(seed)
+        self._weight = self._draw_weight()
+        self._next = size + self._skip() + 1
+
+    def _draw_weight(self) -> float:
+        return math.exp(math.log(1.0 - self._rng.random()) / self.size)
+
+    def _skip(self) -> int:
+        weight = self._weight
+        if weight >= 1.0:
+            return 0
+        return int(math.log(1.0 - self._rng.random()) / math.log(1.0 - weight))
+
+    def add(self, item: T) -> None:
+        """Offer one stream item to the sample."""
+        self.seen += 1
+        if self.seen <= self.size:
+            self.items.append(item)
+        elif self.seen == self._next:
+            self.items[self._rng.randrange(self.size)] = item
+            self._weight *= self._draw_weight()
+            self._next += self._skip() + 1
+
+    def shuffled(self) -> List[T]:
+        """The sample in random order, so any prefix is itself a uniform sample."""
+        items = list(self.items)
+        self._rng.shuffle(items)
+        return items
+
+
+def _fpc(sample_size: int, population: int) -> float:
+    """Finite population correction for sampling without replacement."""
+    if population <= 0:
+        return 0.0
+    return max(0.0, 1.0 - sample_size / population)
+
+
+def mean_estimate(values: Sequence[float], population: int, z: float = Z_95) -> Optional[Estimate]:
+    """
+    Estimate a population mean from a simple random sample.
+
+    Args:
+        values: Measured sample values
+        population: Number of items the sample was drawn from
+        z: Normal quantile for the interval width
+
+    Returns:
+        Estimate, or None for an empty sample.
+    """
+    n = len(values)
+    if n == 0:
+        return None
+    mean = sum(values) / n
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+    half = z * math.sqrt(variance / n * _fpc(n, population))
+    return Estimate(mean, mean - half, mean + half, n, population)
+
+
+def ratio_estimate(
+    pairs: Sequence[Tuple[float, float]],
+    population: int,
+    z: float = Z_95
+) -> Optional[Estimate]:
+    """
+    Estimate a ratio of population totals, sum(x) / sum(y).
+
+    Uses the standard linearized variance of the ratio estimator:
+    Var(r) ~ (1 - n/N) * s_d^2 / (n * ybar^2) with d_i = x_i - r * y_i.
+
+    Args:
+        pairs: (x, y) measurements of the sampled items
+        population: Number of items the sample was drawn from
+        z: Normal quantile for the interval width
+
+    Returns:
+        Estimate (interval clipped at 0), or None if no sampled item has y > 0.
+    """
+    n = len(pairs)
+    total_x = sum(x for x, _ in pairs)
+    total_y = sum(y for _, y in pairs)
+    if n == 0 or total_y == 0:
+        return None
+
+    ratio = total_x / total_y
+    y_bar = total_y / n
+    residual = sum((x - ratio * y) ** 2 for x, y in pairs) / (n - 1) if n > 1 else 0.0
+    half = z * math.sqrt(residual / (n * y_bar ** 2) * _fpc(n, population))
+    return Estimate(ratio, max(0.0, ratio - half), ratio + half, n, population)
+
+
+def adaptive_estimate(
+    sample: Sequence[T],
+    population: int,
+    measure: Callable[[T], Any],
+    estimator: Callable[[List[Any], int], Optional[Estimate]],
+    is_tight: Callable[[Estimate], bool],
+    initial_size: int = 64
+) -> Tuple[Optional[Estimate], List[Any]]:
+    """
+    Measure growing prefixes of a random sample until the interval is tight enough.
+
+    The prefix doubles each round, so at most about twice the needed number
+    of items is measured.
+
+    Args:
+        sample: Uniform sample in random order (e.g. Reservoir.shuffled())
+        population: Number of items the sample was drawn from
+        measure: Per-item measurement (may be expensive, e.g. reading a file)
+        estimator: Turns measurements into an Estimate (mean_estimate, ratio_estimate)
+        is_tight: Stopping rule applied to each intermediate estimate
+        initial_size: Size of the first prefix
+
+    Returns:
+        (final estimate or None, measurements taken)
+    """
+    measured: List[Any] = []
+    size = min(initial_size, len(sample))
+    while True:
+        measured.extend(measure(item) for item in sample[len(measured):size])
+        estimate = estimator(measured, population)
+        if size >= len(sample) or (estimate is not None and is_tight(estimate)):
+            return estimate, measured
+        size = min(size * 2, len(sample))
@@ -3,11 +3,26 @@ Skill Metadata Management
 
 This module provides functionality to load, parse, and cache skill metadata
 from the claude-code-skills repository structure.
+
+Besides the built-in manifest, skills can come from an ordered list of skill
+roots (e.g. ~/.claude/skills, then the project's .claude/skills). Each root
+keeps its own index, built on first use from the frontmatter of its skill
+files and rebuilt only when that root's files change. A skill defined in a
+later root shadows the same name from earlier roots and the manifest.
 """
 
-from dataclasses import dataclass, field
+import os
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .memprofile import memory_stage
+
+SKILL_FILE = "SKILL.md"
+MAX_ROOT_DEPTH = 3  # <root>/analysis/code/<skill>/SKILL.md
+
+# Frontmatter keys copied onto SkillMetadata (others are ignored)
+FRONTMATTER_FIELDS = ("name", "category", "description", "priority", "dependencies", "token_estimate")
 
 
 @dataclass
@@ -25,19 +40,160 @@ class SkillMetadata:
     quality_score: float = 0.8  # Default quality score
 
 
+def default_skill_roots(project_dir: Optional[str] = None) -> List[Path]:
+    """
+    The usual skill roots, lowest precedence first.
+
+    Args:
+        project_dir: Project whose .claude/skills is searched. Defaults to
+                     current directory.
+
+    Returns:
+        [~/.claude/skills, <project>/.claude/skills] (missing roots are fine).
+    """
+    project = Path(project_dir) if project_dir else Path.cwd()
+    return [Path.home() / ".claude" / "skills", project / ".claude" / "skills"]
+
+
+def parse_frontmatter(path: Path) -> Dict[str, Any]:
+    """
+    Read the "---" delimited key: value header of a skill file.
+
+    Only the header is read. List values may be written as "[a, b]" or
+    "a, b"; token_estimate is converted to int.
+
+    Returns:
+        Dict of the known fields present, empty if there is no header.
+    """
+    fields: Dict[str, Any] = {}
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            if f.readline().strip() != "---":
+                return fields
+            for line in f:
+                if line.strip() == "---":
+                    break
+                key, sep, value = line.partition(":")
+                key, value = key.strip(), value.strip().strip("\"'")
+                if not sep or key not in FRONTMATTER_FIELDS or not value:
+                    continue
+                if key == "dependencies":
+                    fields[key] = [d.strip().strip("\"'") for d in value.strip("[]").split(",") if d.strip()]
+                elif key == "token_estimate":
+                    try:
+                        fields[key] = int(value)
+                    except ValueError:
+                        continue
+                else:
+                    fields[key] = value
+    except (IOError, OSError):
+        return {}
+    return fields
+
+
+class SkillRoot:
+    """One skill directory with a lazily built, change-checked index."""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Directory holding <skill>/SKILL.md trees (optionally below
+                  category directories) and/or flat <skill>.md files as
+                  written by install.py
+        """
+        self.path = Path(path).expanduser()
+        self.version = 0  # incremented on every rebuild
+        self._stamp: Optional[Tuple] = None
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        # skill -> category implied by its directory layout, a fallback only
+        self.layout_categories: Dict[str, str] = {}
+
+    def files(self) -> List[Tuple[str, os.stat_result]]:
+        """Skill files under the root as (root-relative path, stat), sorted."""
+        found = []
+        pending = [("", self.path, 0)]
+        while pending:
+            prefix, directory, depth = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except (IOError, OSError):
+                continue
+            for entry in entries:
+                relative = prefix + entry.name
+                try:
+                    if entry.is_dir():
+                        if depth < MAX_ROOT_DEPTH and not entry.name.startswith("."):
+                            pending.append((relative + "/", entry.path, depth + 1))
+                    elif entry.name == SKILL_FILE or (depth == 0 and entry.name.endswith(".md")):
+                        found.append((relative, entry.stat()))
+                except (IOError, OSError):
+                    continue
+        return sorted(found, key=lambda item: item[0])
+
+    def stamp(self) -> Tuple:
+        """Paths, mtimes and sizes of the root's skill files."""
+        return tuple((relative, stat.st_mtime_ns, stat.st_size) for relative, stat in self.files())
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Skill fields defined by this root, rebuilt only if its files changed.
+
+        Returns:
+            Dict mapping skill name to the fields the root defines (always
+            name and file_path). Categories implied by the directory layout
+            are kept apart in layout_categories.
+        """
+        stamp = self.stamp()
+        if self._index is not None and stamp == self._stamp:
+            return self._index
+
+        index: Dict[str, Dict[str, Any]] = {}
+        layout_categories: Dict[str, str] = {}
+        for relative, _, _ in stamp:
+            parts = relative.split("/")
+            fields = parse_frontmatter(self.path / relative)
+            name = fields.get("name")
+            if parts[-1] == SKILL_FILE and len(parts) > 1:
+                name = name or parts[-2]
+            # Flat files (install.py copies, or stray READMEs) must name themselves
+            if not name:
+                continue
+            if parts[-1] == SKILL_FILE and len(parts) > 2:
+                layout_categories[name] = "/".join(parts[:-2])
+            fields["name"] = name
+            fields["file_path"] = str(self.path / relative)
+            index[name] = fields
+
+        self._index, self._stamp = index, stamp
+        self.layout_categories = layout_categories
+        self.version += 1
+        return index
+
+
 class SkillMetadataLoader:
     """Loads and caches skill metadata from the repository."""
 
-    def __init__(self, repo_root: Optional[str] = None):
+    def __init__(self, repo_root: Optional[str] = None, roots: Optional[List[str]] = None):
         """
         Initialize the metadata loader.
 
         Args:
             repo_root: Root directory of claude-code-skills repo.
                       If None, attempts to auto-detect.
+            roots: Optional skill directories layered over the built-in
+                   manifest, lowest precedence first (see default_skill_roots).
+                   Later roots shadow earlier ones by skill name.
         """
         self.repo_root = Path(repo_root) if repo_root else self._find_repo_root()
+        self.roots = [SkillRoot(Path(root)) for root in (roots or [])]
         self._cache: Optional[Dict[str, SkillMetadata]] = None
+        self._manifest: Optional[Dict[str, SkillMetadata]] = None
+        self._cache_key: Optional[Tuple] = None
+        self._primed_stamps: Optional[List[Tuple]] = None
 
     def _find_repo_root(self) -> Path:
         """Auto-detect repository root by searching for install.py."""
@@ -248,14 +404,67 @@ class SkillMetadataLoader:
 
     def load_all_skills(self) -> Dict[str, SkillMetadata]:
         """
-        Load all skills from the manifest.
+        Load all skills from the manifest and the skill roots.
+
+        Each root's index is checked for changes on every call; only roots
+        whose files changed are re-read, and the merged catalog is rebuilt
+        only if one of them was.
 
         Returns:
             Dict mapping skill name to SkillMetadata.
         """
-        if self._cache is not None:
+        if self._cache is not None and self._primed_stamps is not None:
+            if [root.stamp() for root in self.roots] == self._primed_stamps:
+                return self._cache
+            self._primed_stamps = None
+            self._cache = None
+
+        with memory_stage("skills.roots"):
+            indexes = [root.index() for root in self.roots]
+        key = tuple(root.version for root in self.roots)
+        if self._cache is not None and key == self._cache_key:
             return self._cache
 
+        with memory_stage("skills.manifest"):
+            skills = dict(self._load_manifest_skills())
+            for root, index in zip(self.roots, indexes):
+                for name, fields in index.items():
+                    skills[name] = self._shadow(skills.get(name), fields, root.layout_categories.get(name))
+
+        self._cache, self._cache_key = skills, key
+        return skills
+
+    @staticmethod
+    def _shadow(
+        base: Optional[SkillMetadata],
+        fields: Dict[str, Any],
+        layout_category: Optional[str] = None
+    ) -> SkillMetadata:
+        """
+        Apply a root's definition of a skill over the one it shadows.
+
+        Fields the root cannot tell (e.g. the category of a flat installed
+        file) are kept from the shadowed definition. So is its category when
+        the root only implies one through its directory layout, which need
+        not follow the catalog's category names.
+        """
+        if base is not None:
+            return replace(base, **fields)
+        return SkillMetadata(
+            name=fields["name"],
+            category=fields.get("category", layout_category or "custom"),
+            description=fields.get("description", ""),
+            priority=fields.get("priority", "medium"),
+            dependencies=fields.get("dependencies", []),
+            file_path=fields["file_path"],
+            token_estimate=fields.get("token_estimate", 1000)
+        )
+
+    def _load_manifest_skills(self) -> Dict[str, SkillMetadata]:
+        """Skills of the built-in manifest (built once per loader)."""
+        if self._manifest is not None:
+            return self._manifest
+
         manifest = self._load_manifest_from_install_py()
         token_estimates = self._parse_token_estimates()
         skills = {}
@@ -286,9 +495,26 @@ class SkillMetadataLoader:
                     quality_score=0.8  # Default score
                 )
 
-        self._cache = skills
+        self._manifest = skills
         return skills
 
+    def prime(self, skills: Dict[str, SkillMetadata]) -> None:
+        """
+        Use an already built catalog (e.g. restored from a snapshot).
+
+        The catalog is trusted until a root's files change; root indexes are
+        not built until then.
+
+        Args:
+            skills: Dict mapping skill name to SkillMetadata
+        """
+        self._cache = skills
+        self._primed_stamps = [root.stamp() for root in self.roots]
+
+    def root_files(self) -> List[Path]:
+        """Skill files of every root (for cache invalidation by callers)."""
+        return [root.path / relative for root in self.roots for relative, _ in root.files()]
+
     def get_skill(self, name: str) -> Optional[SkillMetadata]:
         """
         Retrieve metadata for a specific skill.
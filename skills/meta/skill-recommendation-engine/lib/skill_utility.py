@@ -29,9 +29,14 @@ class SkillUtility:
 class SkillUtilityScorer:
     """Manages utility scoring for skills."""
 
-    def __init__(self):
-        """Initialize utility scorer with base utility scores."""
-        self.base_utilities = self._load_base_utilities()
+    def __init__(self, base_utilities: Optional[Dict[str, SkillUtility]] = None):
+        """
+        Initialize utility scorer with base utility scores.
+
+        Args:
+            base_utilities: Already built scores (e.g. restored from a snapshot)
+        """
+        self.base_utilities = base_utilities if base_utilities is not None else self._load_base_utilities()
 
     def _load_base_utilities(self) -> Dict[str, SkillUtility]:
         """
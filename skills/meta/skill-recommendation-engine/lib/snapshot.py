@@ -0,0 +1,159 @@
+"""
+Recommender Snapshot Module
+
+Saves the fully built SkillRecommender state (skill catalog, utilities,
+recommendation table and preferences) to one binary file so short-lived
+processes can restore it with a single read instead of rebuilding.
+
+A snapshot records every input it was built from with its stat stamp and a
+content hash. It is used only while all inputs are unchanged: an input whose
+stamp still matches is trusted, one whose stamp moved is re-hashed, so
+touching a file without editing it does not invalidate the snapshot.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE = "recommender_snapshot.bin"
+SNAPSHOT_MAGIC = b"SKREC-SNAPSHOT\n"
+
+# marshal output is only readable by the same interpreter version
+_RUNTIME = [sys.implementation.name, list(sys.version_info[:2]), marshal.version]
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except (IOError, OSError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def content_hash(path: Path) -> str:
+    """
+    SHA-256 of a file's contents.
+
+    Returns:
+        Hex digest, or "" if the file does not exist or cannot be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (IOError, OSError):
+        return ""
+
+
+def describe_inputs(paths: Iterable[Path]) -> Dict[str, list]:
+    """
+    Record the inputs a snapshot is built from.
+
+    Args:
+        paths: Files the built state depends on (missing files are allowed)
+
+    Returns:
+        Dict mapping path to [mtime_ns, size, sha256] (stamp None if missing).
+    """
+    inputs = {}
+    for path in paths:
+        path = Path(path)
+        stamp = _stamp(path)
+        inputs[str(path)] = [list(stamp) if stamp else None, content_hash(path)]
+    return inputs
+
+
+def inputs_current(recorded: Dict[str, list], paths: Iterable[Path]) -> bool:
+    """
+    Check that the given inputs are exactly the recorded ones, unchanged.
+
+    Args:
+        recorded: Output of describe_inputs stored in the snapshot
+        paths: Current input files
+
+    Returns:
+        True if every input has the recorded content.
+    """
+    paths = [Path(p) for p in paths]
+    if sorted(str(p) for p in paths) != sorted(recorded):
+        return False
+
+    for path in paths:
+        stamp, digest = recorded[str(path)]
+        current = _stamp(path)
+        if current is None:
+            if digest:
+                return False
+            continue
+        if stamp is not None and tuple(stamp) == current:
+            continue
+        if content_hash(path) != digest:
+            return False
+    return True
+
+
+def save_snapshot(path: Path, state: Dict[str, Any], inputs: Iterable[Path]) -> bool:
+    """
+    Write a snapshot atomically.
+
+    Args:
+        path: Snapshot file
+        state: Built state made of plain types (dict, list, str, int, float, None)
+        inputs: Files the state was built from
+
+    Returns:
+        True if the snapshot was written.
+    """
+    path = Path(path)
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "runtime": _RUNTIME,
+        "inputs": describe_inputs(inputs),
+    }
+    temp = path.with_name(path.name + ".tmp")
+    try:
+        payload = marshal.dumps(state)
+        with open(temp, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(payload)
+        os.replace(temp, path)
+    except (IOError, OSError, ValueError):
+        return False
+    return True
+
+
+def load_snapshot(path: Path, inputs: Iterable[Path]) -> Optional[Dict[str, Any]]:
+    """
+    Read a snapshot if it was built by this version from the current inputs.
+
+    Args:
+        path: Snapshot file
+        inputs: Files the state depends on now
+
+    Returns:
+        The saved state, or None if missing, unreadable or stale.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except (IOError, OSError):
+        return None
+
+    if not data.startswith(SNAPSHOT_MAGIC):
+        return None
+    try:
+        end = data.index(b"\n", len(SNAPSHOT_MAGIC))
+        header = json.loads(data[len(SNAPSHOT_MAGIC):end])
+        if (header.get("version") != SNAPSHOT_VERSION
+                or header.get("runtime") != _RUNTIME
+                or not inputs_current(header.get("inputs", {}), inputs)):
+            return None
+        state = marshal.loads(data[end + 1:])
+    except (ValueError, EOFError, TypeError, KeyError, AttributeError):
+        return None
+    return state if isinstance(state, dict) else None
@@ -6,10 +6,16 @@ Implements 20% weight of the recommendation algorithm.
 """
 
 import json
-from dataclasses import dataclass, field, asdict
-from datetime import datetime
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Set, List, Optional, Any
+from typing import Dict, Set, List, Optional, Any, Iterable, Iterator, Tuple
+
+from .feedback_columns import FeedbackColumns
+from .metrics import BYTES_REWRITTEN, FEEDBACK_WRITES, cache_result
+from .fingerprint import (
+    ContextFingerprint, FingerprintVocabulary, dump_history, fingerprint_context, fingerprint_from_values
+)
 
 # Import ContextAnalysis for type hinting
 try:
@@ -34,10 +40,131 @@ class FeedbackEntry:
     """Represents a single feedback entry."""
     timestamp: str
     skill: str
-    context: Dict[str, Any]
+    context: Dict[str, Any]  # full context dict; only present in entries from older versions
     outcome: str  # success, failure
     user_rating: Optional[int] = None  # 1-5
     notes: str = ""
+    fingerprint: Optional[ContextFingerprint] = None  # ids refer to the history's vocabulary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Stored form: the fingerprint replaces the context when present."""
+        data = {"timestamp": self.timestamp, "skill": self.skill}
+        if self.fingerprint is not None:
+            data["fingerprint"] = self.fingerprint.encode()
+        else:
+            data["context"] = self.context
+        data.update(outcome=self.outcome, user_rating=self.user_rating, notes=self.notes)
+        return data
+
+
+def _copy_preferences(prefs: UserPreferences) -> UserPreferences:
+    return replace(
+        prefs,
+        preferred_skills=set(prefs.preferred_skills),
+        avoided_skills=set(prefs.avoided_skills),
+        skill_success_rates=dict(prefs.skill_success_rates),
+        domain_expertise=set(prefs.domain_expertise)
+    )
+
+
+def _apply_feedback(prefs: UserPreferences, skill: str, outcome: str, rating: Optional[int]) -> None:
+    """Update preferences in place for one feedback event."""
+    # Update success rate
+    if skill not in prefs.skill_success_rates:
+        prefs.skill_success_rates[skill] = 0.5  # Start at neutral
+
+    current_rate = prefs.skill_success_rates[skill]
+
+    # Update based on outcome
+    if outcome == "success":
+        new_rate = current_rate * 0.8 + 0.2  # Move towards 1.0
+    else:
+        new_rate = current_rate * 0.8  # Move towards 0.0
+
+    prefs.skill_success_rates[skill] = max(0.0, min(1.0, new_rate))
+
+    # Update preferred/avoided based on rating
+    if rating is not None:
+        if rating >= 4:
+            prefs.preferred_skills.add(skill)
+            prefs.avoided_skills.discard(skill)
+        elif rating <= 2:
+            prefs.avoided_skills.add(skill)
+            prefs.preferred_skills.discard(skill)
+
+
+def _event_time(value: Any, now: datetime) -> datetime:
+    """
+    Naive UTC time of an ingested event's timestamp.
+
+    Args:
+        value: ISO 8601 string (optionally 'Z'-suffixed or with an offset),
+               epoch seconds, or empty for now
+        now: Time used for events without a timestamp
+
+    Raises:
+        ValueError: If the timestamp is not a valid date.
+    """
+    if value is None or value == "":
+        return now
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value)
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    text = value[:-1] + "+00:00" if value.endswith(("Z", "z")) else value
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _check_event_context(context: Any) -> None:
+    """Raise ValueError unless an ingested context dict has the types record_feedback stores."""
+    if not isinstance(context, dict):
+        raise ValueError("context must be an object")
+    for name in ("current_activity", "project_type"):
+        if context.get(name) is not None and not isinstance(context[name], str):
+            raise ValueError(f"{name} must be a string")
+    file_types = context.get("file_types") or ()
+    if not isinstance(file_types, (list, tuple)) or not all(isinstance(ext, str) for ext in file_types):
+        raise ValueError("file_types must be a list of strings")
+    changes = context.get("recent_changes") or {}
+    if not isinstance(changes, dict) or not all(
+        isinstance(paths, (list, tuple)) and all(isinstance(path, str) for path in paths)
+        for paths in changes.values()
+    ):
+        raise ValueError("recent_changes must map categories to lists of paths")
+
+
+def _count_write(name: str, path: Path) -> None:
+    """Record a rewrite of a data file and its new size."""
+    FEEDBACK_WRITES.inc(1, name)
+    try:
+        BYTES_REWRITTEN.inc(path.stat().st_size, name)
+    except (IOError, OSError):
+        pass
+
+
+def read_feedback_events(lines: Iterable[str]) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Parse a JSONL stream of feedback events lazily.
+
+    Args:
+        lines: Lines of JSON objects (blank lines are ignored)
+
+    Yields:
+        Event dicts, or None for lines that are not valid JSON (so that
+        record_feedback_batch counts them as skipped).
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
 
 
 class UserPatternAnalyzer:
@@ -61,6 +188,13 @@ class UserPatternAnalyzer:
 
         self.preferences_file = self.data_dir / "preferences.json"
         self.feedback_file = self.data_dir / "feedback_history.json"
+        self._preferences: Optional[UserPreferences] = None
+        self._preferences_stamp: Optional[tuple] = None
+        self._columns: Optional[FeedbackColumns] = None
+        self._columns_stamp: Optional[tuple] = None
+        self._vocabulary: Optional[FingerprintVocabulary] = None
+        self._vocabulary_stamp: Optional[tuple] = None
+        self._scratch_vocabulary: Optional[FingerprintVocabulary] = None  # see _is_similar_context
 
     def _find_data_dir(self) -> Path:
         """
@@ -85,13 +219,44 @@ class UserPatternAnalyzer:
         # Fallback: create in current directory
         return current / "data"
 
+    def _preferences_file_stamp(self) -> Optional[tuple]:
+        try:
+            stat = self.preferences_file.stat()
+        except (IOError, OSError):
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def prime_preferences(self, prefs: UserPreferences) -> None:
+        """
+        Use already loaded preferences (e.g. restored from a snapshot) until the file changes.
+
+        Args:
+            prefs: Preferences matching the current preferences file
+        """
+        self._preferences = prefs
+        self._preferences_stamp = self._preferences_file_stamp()
+
     def load_preferences(self) -> UserPreferences:
         """
         Load user preferences from storage.
 
+        Parsed preferences are kept in memory until the file changes; each
+        call returns a copy that the caller may modify.
+
         Returns:
             UserPreferences object with loaded data or defaults.
         """
+        stamp = self._preferences_file_stamp()
+        hit = self._preferences is not None and stamp == self._preferences_stamp
+        cache_result("preferences", hit)
+        if hit:
+            return _copy_preferences(self._preferences)
+
+        prefs = self._read_preferences()
+        self._preferences, self._preferences_stamp = prefs, stamp
+        return _copy_preferences(prefs)
+
+    def _read_preferences(self) -> UserPreferences:
         if not self.preferences_file.exists():
             return UserPreferences()
 
@@ -132,6 +297,7 @@ class UserPatternAnalyzer:
         try:
             with open(self.preferences_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
+            _count_write("preferences", self.preferences_file)
         except IOError:
             pass  # Silently fail if can't write
 
@@ -142,8 +308,17 @@ class UserPatternAnalyzer:
         Returns:
             List of FeedbackEntry objects.
         """
+        return self._load_history()[0]
+
+    def _load_history(self) -> Tuple[List[FeedbackEntry], FingerprintVocabulary]:
+        """
+        Load feedback entries together with the vocabulary their fingerprints use.
+
+        Returns:
+            (entries, vocabulary); both empty if the file is missing or invalid.
+        """
         if not self.feedback_file.exists():
-            return []
+            return [], FingerprintVocabulary()
 
         try:
             with open(self.feedback_file, 'r', encoding='utf-8') as f:
@@ -151,37 +326,85 @@ class UserPatternAnalyzer:
 
             entries = []
             for entry_data in data.get("feedback", []):
+                fingerprint = entry_data.get("fingerprint")
                 entries.append(FeedbackEntry(
                     timestamp=entry_data["timestamp"],
                     skill=entry_data["skill"],
                     context=entry_data.get("context", {}),
                     outcome=entry_data.get("outcome", "unknown"),
                     user_rating=entry_data.get("user_rating"),
-                    notes=entry_data.get("notes", "")
+                    notes=entry_data.get("notes", ""),
+                    fingerprint=ContextFingerprint.decode(fingerprint) if fingerprint else None
                 ))
-            return entries
+            return entries, FingerprintVocabulary(data.get("vocabulary"))
 
         except (json.JSONDecodeError, IOError, Exception):
-            return []
+            return [], FingerprintVocabulary()
+
+    def load_vocabulary(self) -> FingerprintVocabulary:
+        """
+        Vocabulary of the stored history, cached until the file changes.
+
+        Returns:
+            FingerprintVocabulary (empty if there is no history).
+        """
+        try:
+            stat = self.feedback_file.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except (IOError, OSError):
+            self._scratch_vocabulary = None
+            return FingerprintVocabulary()
+
+        if self._vocabulary is None or self._vocabulary_stamp != stamp:
+            self._vocabulary = self._load_history()[1]
+            self._vocabulary_stamp = stamp
+            self._scratch_vocabulary = None
+        return self._vocabulary
+
+    def load_feedback_columns(self) -> FeedbackColumns:
+        """
+        Load feedback history as column arrays for aggregate queries.
+
+        Columns are kept in memory until the history file changes, and cached
+        on disk in a binary sidecar next to it.
+
+        Returns:
+            FeedbackColumns for the current history.
+        """
+        try:
+            stat = self.feedback_file.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except (IOError, OSError):
+            return FeedbackColumns()
+
+        if self._columns is None or self._columns_stamp != stamp:
+            self._columns = FeedbackColumns.load(self.feedback_file)
+            self._columns_stamp = stamp
+        return self._columns
 
     def save_feedback_entry(self, entry: FeedbackEntry) -> None:
         """
         Save a new feedback entry.
 
+        An entry that carries a full context instead of a fingerprint is
+        fingerprinted against the stored vocabulary first.
+
         Args:
             entry: FeedbackEntry to save.
         """
-        history = self.load_feedback_history()
+        history, vocabulary = self._load_history()
+        if entry.fingerprint is None and entry.context:
+            entry.fingerprint = fingerprint_context(entry.context, vocabulary)
+            entry.context = {}
         history.append(entry)
+        self._write_history(history, vocabulary)
 
-        data = {
-            "version": "1.0",
-            "feedback": [asdict(entry) for entry in history]
-        }
-
+    def _write_history(self, history: List[FeedbackEntry], vocabulary: FingerprintVocabulary) -> None:
+        """Write entries with the vocabulary header their fingerprints refer to (see dump_history)."""
         try:
             with open(self.feedback_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                dump_history((entry.to_dict() for entry in history), vocabulary, f)
+            _count_write("feedback_history", self.feedback_file)
         except IOError:
             pass
 
@@ -196,6 +419,9 @@ class UserPatternAnalyzer:
         """
         Record feedback about a skill usage.
 
+        Only a compact fingerprint of the context is stored (activity,
+        project type, file types, change-count bucket and a path hash).
+
         Args:
             skill: Skill name
             context: ContextAnalysis object (or dict for compatibility)
@@ -203,31 +429,106 @@ class UserPatternAnalyzer:
             rating: Optional 1-5 rating
             notes: Optional notes
         """
-        # Convert context to dict if needed
-        if hasattr(context, '__dict__'):
-            context_dict = asdict(context) if hasattr(context, '__dataclass_fields__') else context.__dict__
-            # Convert sets to lists for JSON serialization
-            if 'file_types' in context_dict and isinstance(context_dict['file_types'], set):
-                context_dict['file_types'] = list(context_dict['file_types'])
-        else:
-            context_dict = context if isinstance(context, dict) else {}
+        history, vocabulary = self._load_history()
 
         # Create feedback entry
         entry = FeedbackEntry(
             timestamp=datetime.utcnow().isoformat() + "Z",
             skill=skill,
-            context=context_dict,
+            context={},
             outcome=outcome,
             user_rating=rating,
-            notes=notes
+            notes=notes,
+            fingerprint=fingerprint_context(context or {}, vocabulary)
         )
 
         # Save feedback
-        self.save_feedback_entry(entry)
+        history.append(entry)
+        self._write_history(history, vocabulary)
 
         # Update preferences based on feedback
         self._update_preferences_from_feedback(skill, outcome, rating)
 
+    def record_feedback_batch(self, events: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Fold a stream of feedback events into the history and preferences.
+
+        The history and preferences are read once, every event is applied in
+        memory, and each file is written once. No context analysis is run:
+        each event carries its own context.
+
+        Args:
+            events: Dicts with skill, outcome and optional rating, notes,
+                    timestamp (ISO 8601 string or epoch seconds, stored in
+                    UTC; naive strings are taken as UTC; defaults to now),
+                    and context given either as a context dict (as
+                    record_feedback stores it) or as a fingerprint by value
+                    (see fingerprint_from_values). Events are applied in
+                    timestamp order; equal timestamps keep stream order.
+
+        Returns:
+            (recorded, skipped) event counts; malformed events are skipped.
+        """
+        history, vocabulary = self._load_history()
+        now = datetime.utcnow()
+        timed = []
+        skipped = 0
+
+        for event in events:
+            try:
+                timed.append(self._event_entry(event, vocabulary, now))
+            except (KeyError, TypeError, ValueError, AttributeError, OverflowError, OSError):
+                skipped += 1
+
+        if not timed:
+            return 0, skipped
+
+        # Sort on the parsed time: ISO strings with and without fractions do not sort lexically
+        timed.sort(key=lambda item: item[0])
+        entries = [entry for _, entry in timed]
+        prefs = self.load_preferences()
+        for entry in entries:
+            _apply_feedback(prefs, entry.skill, entry.outcome, entry.user_rating)
+
+        history.extend(entries)
+        self._write_history(history, vocabulary)
+        self.save_preferences(prefs)
+        return len(entries), skipped
+
+    @staticmethod
+    def _event_entry(
+        event: Dict[str, Any],
+        vocabulary: FingerprintVocabulary,
+        now: datetime
+    ) -> Tuple[datetime, FeedbackEntry]:
+        """(UTC time, FeedbackEntry) for one ingested event; raises on malformed events."""
+        skill, outcome = event["skill"], event["outcome"]
+        if not isinstance(skill, str) or not skill or outcome not in ("success", "failure"):
+            raise ValueError(f"Invalid feedback event: {event!r}")
+
+        rating = event.get("rating")
+        if rating is not None and (not isinstance(rating, int) or not 1 <= rating <= 5):
+            raise ValueError(f"Invalid rating: {rating!r}")
+
+        moment = _event_time(event.get("timestamp"), now)
+
+        if event.get("fingerprint") is not None:
+            fingerprint = fingerprint_from_values(event["fingerprint"], vocabulary)
+        else:
+            context = event.get("context") or {}
+            _check_event_context(context)
+            fingerprint = fingerprint_context(context, vocabulary)
+
+        return moment, FeedbackEntry(
+            timestamp=moment.isoformat() + "Z",
+            skill=skill,
+            context={},
+            outcome=outcome,
+            user_rating=rating,
+            notes=str(event.get("notes") or ""),
+            fingerprint=fingerprint
+        )
+
     def _update_preferences_from_feedback(
         self,
         skill: str,
@@ -243,30 +544,7 @@ class UserPatternAnalyzer:
             rating: Optional rating 1-5
         """
         prefs = self.load_preferences()
-
-        # Update success rate
-        if skill not in prefs.skill_success_rates:
-            prefs.skill_success_rates[skill] = 0.5  # Start at neutral
-
-        current_rate = prefs.skill_success_rates[skill]
-
-        # Update based on outcome
-        if outcome == "success":
-            new_rate = current_rate * 0.8 + 0.2  # Move towards 1.0
-        else:
-            new_rate = current_rate * 0.8  # Move towards 0.0
-
-        prefs.skill_success_rates[skill] = max(0.0, min(1.0, new_rate))
-
-        # Update preferred/avoided based on rating
-        if rating is not None:
-            if rating >= 4:
-                prefs.preferred_skills.add(skill)
-                prefs.avoided_skills.discard(skill)
-            elif rating <= 2:
-                prefs.avoided_skills.add(skill)
-                prefs.preferred_skills.discard(skill)
-
+        _apply_feedback(prefs, skill, outcome, rating)
         self.save_preferences(prefs)
 
     def calculate_skill_affinity(self, skill: str, context: Optional[Any] = None) -> float:
@@ -297,48 +575,47 @@ class UserPatternAnalyzer:
 
         # Context similarity bonus (if context provided)
         if context:
-            history = self.load_feedback_history()
-            similar_successes = sum(
-                1 for entry in history
-                if entry.skill == skill
-                and entry.outcome == "success"
-                and self._is_similar_context(entry.context, context)
+            if isinstance(context, dict):
+                activity = context.get("current_activity")
+                file_types = set(context.get("file_types", []))
+            else:
+                activity = getattr(context, "current_activity", None)
+                file_types = set(getattr(context, "file_types", set()))
+
+            similar_successes = self.load_feedback_columns().similar_success_count(
+                skill, activity, file_types
             )
             if similar_successes > 0:
                 score += min(0.2, similar_successes * 0.05)
 
         return min(1.0, score)
 
-    def _is_similar_context(self, ctx1: Dict[str, Any], ctx2: Any) -> bool:
+    def _is_similar_context(self, ctx1: Any, ctx2: Any) -> bool:
         """
         Check if two contexts are similar.
 
+        Both contexts are reduced to fingerprints over the stored vocabulary,
+        so the check is an id comparison and a bitmask intersection.
+
         Args:
-            ctx1: Context dict from history
-            ctx2: Current context
+            ctx1: ContextFingerprint or legacy context dict from history
+            ctx2: Current context (ContextAnalysis, dict or ContextFingerprint)
 
         Returns:
             True if contexts are similar.
         """
-        # Simple similarity check
-        if isinstance(ctx2, dict):
-            ctx2_dict = ctx2
-        elif hasattr(ctx2, '__dict__'):
-            ctx2_dict = ctx2.__dict__
-        else:
+        if ctx2 is None or not (isinstance(ctx2, (dict, ContextFingerprint)) or hasattr(ctx2, '__dict__')):
             return False
 
-        # Check activity match
-        if ctx1.get("current_activity") == ctx2_dict.get("current_activity"):
-            return True
-
-        # Check file type overlap
-        ctx1_types = set(ctx1.get("file_types", []))
-        ctx2_types = set(ctx2_dict.get("file_types", []))
-        if ctx1_types and ctx2_types and len(ctx1_types & ctx2_types) > 0:
-            return True
-
-        return False
+        # Intern into a scratch copy, made once per history load: values new to
+        # the history get fresh ids that can only match each other, never a stored id
+        stored = self.load_vocabulary()
+        if self._scratch_vocabulary is None:
+            self._scratch_vocabulary = FingerprintVocabulary(stored.to_dict())
+        vocabulary = self._scratch_vocabulary
+        first = fingerprint_context(ctx1 or {}, vocabulary, include_path_hash=False)
+        second = fingerprint_context(ctx2, vocabulary, include_path_hash=False)
+        return first.similar_to(second)
 
     def determine_complexity_tolerance(self) -> str:
         """
@@ -354,8 +631,8 @@ class UserPatternAnalyzer:
             return prefs.complexity_tolerance
 
         # Otherwise, infer from feedback history
-        history = self.load_feedback_history()
-        if not history:
+        columns = self.load_feedback_columns()
+        if not len(columns):
             return "medium"
 
         # Check for complex skills usage
@@ -364,14 +641,11 @@ class UserPatternAnalyzer:
             "anti-pattern-sniffer", "quantum-circuit-optimizer"
         }
 
-        complex_successes = sum(
-            1 for entry in history
-            if entry.skill in complex_skills and entry.outcome == "success"
-        )
+        complex_successes = columns.success_count_for(complex_skills)
 
         if complex_successes >= 3:
             return "high"
-        elif complex_successes == 0 and len(history) > 5:
+        elif complex_successes == 0 and len(columns) > 5:
             return "low"
         else:
             return "medium"
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Bulk Feedback Ingestion
+
+Folds a JSONL stream of skill-usage events into the feedback history and
+preferences with a single write of each, without analyzing the current
+context per event. One event per line:
+
+    {"skill": "quick-test-runner", "outcome": "success", "rating": 5,
+     "timestamp": "2024-05-01T09:30:00Z",
+     "fingerprint": {"activity": "testing", "file_types": [".py"], "change_bucket": 2}}
+
+"context" (a context dict) may be given instead of "fingerprint".
+
+Usage:
+    python scripts/ingest_feedback.py events.jsonl
+    cat day-*.jsonl | python scripts/ingest_feedback.py - --data-dir ~/my-data
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to allow package imports
+parent_path = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_path))
+
+from lib.user_patterns import UserPatternAnalyzer, read_feedback_events
+
+
+DEFAULT_DATA_DIR = parent_path / "data"
+
+
+def _lines(paths):
+    for path in paths:
+        if path == "-":
+            yield from sys.stdin
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            yield from f
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Record a JSONL stream of skill-usage events as feedback"
+    )
+    parser.add_argument("files", nargs="+",
+                        help="JSONL event files ('-' reads standard input)")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help="Directory containing feedback_history.json and preferences.json")
+    args = parser.parse_args()
+
+    analyzer = UserPatternAnalyzer(data_dir=str(args.data_dir))
+    start = time.perf_counter()
+    try:
+        recorded, skipped = analyzer.record_feedback_batch(read_feedback_events(_lines(args.files)))
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Ingestion failed: {e}")
+        return 1
+
+    elapsed = time.perf_counter() - start
+    print(f"Recorded {recorded:,} events ({skipped:,} skipped) in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
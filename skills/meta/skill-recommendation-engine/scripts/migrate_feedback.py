@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Feedback History Migration
+
+Converts a feedback_history.json written by older versions, where every
+entry embeds the full ContextAnalysis, to the compact fingerprint format.
+Entries that already store a fingerprint are left unchanged.
+
+Usage:
+    python scripts/migrate_feedback.py
+    python scripts/migrate_feedback.py --data-dir ~/my-data --no-backup
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow package imports
+parent_path = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_path))
+
+from lib.fingerprint import migrate_history_file
+
+
+DEFAULT_DATA_DIR = parent_path / "data"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert stored feedback contexts to compact fingerprints"
+    )
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help="Directory containing feedback_history.json")
+    parser.add_argument("--no-backup", action="store_true",
+                        help="Do not keep the original file as feedback_history.json.bak")
+    args = parser.parse_args()
+
+    history = args.data_dir / "feedback_history.json"
+    if not history.exists():
+        print(f"No feedback history at {history}")
+        return 0
+
+    try:
+        converted, before, after = migrate_history_file(history, backup=not args.no_backup)
+    except (OSError, ValueError) as e:
+        print(f"Migration failed: {e}")
+        return 1
+
+    ratio = before / after if after else 0.0
+    print(f"Converted {converted} entries: {before:,} -> {after:,} bytes ({ratio:.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Next-Skill Mining
+
+Mines the feedback history for skills that are usually run one after the
+other and stores each skill's likely follow-ups in next_skills.json, which
+suggest_next_skills() and SkillRecommender.suggest_next() read. Run it
+after feedback has accumulated (e.g. nightly or after a bulk ingest); lookups
+keep serving a stale table and re-mine it in the background with the
+parameters given here.
+
+Usage:
+    python scripts/mine_next_skills.py
+    python scripts/mine_next_skills.py --window-minutes 10 --min-support 5 --show
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to allow package imports
+parent_path = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_path))
+
+from lib.next_skills import (
+    DEFAULT_LOOKAHEAD, DEFAULT_MIN_CONFIDENCE, DEFAULT_MIN_SUPPORT, DEFAULT_TOP,
+    DEFAULT_WINDOW_SECONDS, NEXT_SKILLS_FILE, feedback_stamp, mine_next_skills
+)
+from lib.user_patterns import UserPatternAnalyzer
+
+
+DEFAULT_DATA_DIR = parent_path / "data"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Mine follow-up skill patterns from the feedback history"
+    )
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help="Directory containing feedback_history.json")
+    parser.add_argument("--window-minutes", type=float, default=DEFAULT_WINDOW_SECONDS / 60,
+                        help="Time after a skill within which a use counts as its follow-up")
+    parser.add_argument("--lookahead", type=int, default=DEFAULT_LOOKAHEAD,
+                        help="Later uses considered as follow-ups of each use")
+    parser.add_argument("--min-support", type=int, default=DEFAULT_MIN_SUPPORT,
+                        help="Minimum times a skill pair must occur")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help="Minimum share of a skill's uses a follow-up must reach")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="Follow-ups kept per skill")
+    parser.add_argument("--show", action="store_true", help="Print the mined table")
+    args = parser.parse_args()
+
+    analyzer = UserPatternAnalyzer(data_dir=str(args.data_dir))
+    start = time.perf_counter()
+    source = feedback_stamp(analyzer.feedback_file)
+    if source == (0, 0):
+        print(f"No feedback recorded in {analyzer.feedback_file}")
+        return 1
+
+    columns = analyzer.load_feedback_columns()
+    table = mine_next_skills(
+        columns,
+        window=args.window_minutes * 60,
+        lookahead=args.lookahead,
+        min_support=args.min_support,
+        min_confidence=args.min_confidence,
+        top=args.top,
+        source=source
+    )
+    table.save(analyzer.data_dir / NEXT_SKILLS_FILE)
+
+    elapsed = time.perf_counter() - start
+    print(f"Mined follow-ups for {len(table.followers):,} skills from {len(columns):,} events "
+          f"in {elapsed:.2f}s")
+    if args.show:
+        for skill in sorted(table.followers):
+            follow_ups = ", ".join(f"{name} ({confidence:.0%})" for name, confidence in table.next_skills(skill))
+            print(f"  {skill} -> {follow_ups}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
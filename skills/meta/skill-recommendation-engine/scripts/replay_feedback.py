@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Offline Scorer Evaluation
+
+Replays the recorded feedback history in time order and reports how highly
+the confidence scorer ranked the skills the user went on to use (hit rate
+at k and mean reciprocal rank). Every --weights and --scorer option adds a
+variant, evaluated against the same history as the current scorer.
+
+Usage:
+    python scripts/replay_feedback.py
+    python scripts/replay_feedback.py --weights context=50,user=20 --weights user=40
+    python scripts/replay_feedback.py --scorer my_scorers:RecencyScorer --json
+"""
+
+import argparse
+import importlib
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow package imports
+parent_path = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_path))
+
+from lib.confidence_scorer import ConfidenceScorer
+from lib.incremental import COMPONENT_WEIGHTS
+from lib.replay import DEFAULT_KS, ReplayEvaluator
+from lib.skill_metadata import SkillMetadataLoader
+from lib.user_patterns import UserPatternAnalyzer
+
+
+DEFAULT_DATA_DIR = parent_path / "data"
+
+
+def _weights(spec: str) -> dict:
+    weights = {}
+    for item in spec.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() not in COMPONENT_WEIGHTS:
+            raise argparse.ArgumentTypeError(f"unknown component {name.strip()!r}")
+        try:
+            weights[name.strip()] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight in {item!r}")
+    return weights
+
+
+def _scorer(spec: str) -> ConfidenceScorer:
+    module_name, _, class_name = spec.partition(":")
+    try:
+        return getattr(importlib.import_module(module_name), class_name)()
+    except (ImportError, AttributeError, TypeError) as e:
+        raise argparse.ArgumentTypeError(f"cannot load scorer {spec!r}: {e}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Evaluate confidence scorer variants against the recorded feedback history"
+    )
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help="Directory containing feedback_history.json and preferences.json")
+    parser.add_argument("--skills-dir", help="Repository root containing the skills (auto-detected)")
+    parser.add_argument("--weights", type=_weights, action="append", default=[],
+                        help="Variant component points, e.g. context=50,user=20 (repeatable)")
+    parser.add_argument("--scorer", type=_scorer, action="append", default=[],
+                        help="Variant ConfidenceScorer subclass as module:Class (repeatable)")
+    parser.add_argument("-k", type=int, action="append", dest="ks",
+                        help=f"Hit rate cutoff (repeatable, default {', '.join(map(str, DEFAULT_KS))})")
+    parser.add_argument("--json", action="store_true", help="Print reports as JSON")
+    args = parser.parse_args()
+
+    analyzer = UserPatternAnalyzer(data_dir=str(args.data_dir))
+    skills = SkillMetadataLoader(repo_root=args.skills_dir).load_all_skills()
+    evaluator = ReplayEvaluator(analyzer.load_feedback_columns(), skills)
+    if not len(evaluator.columns):
+        print(f"No feedback recorded in {analyzer.feedback_file}")
+        return 1
+
+    preferences = analyzer.load_preferences()
+    ks = tuple(sorted(set(args.ks))) if args.ks else DEFAULT_KS
+    variants = [("current", None, None)]
+    variants += [(",".join(f"{k}={v:g}" for k, v in w.items()), None, w) for w in args.weights]
+    variants += [(type(s).__name__, s, None) for s in args.scorer]
+
+    reports = {
+        name: evaluator.evaluate(scorer=scorer, weights=weights, ks=ks, base_prefs=preferences)
+        for name, scorer, weights in variants
+    }
+
+    if args.json:
+        print(json.dumps({name: report.to_dict() for name, report in reports.items()}, indent=2))
+        return 0
+
+    first = next(iter(reports.values()))
+    print(f"Replayed {first.events:,} events: {first.evaluated:,} evaluated, "
+          f"{first.unknown_skill:,} for skills no longer in the catalog")
+    header = f"{'variant':<30}" + "".join(f"{'hit@' + str(k):>9}" for k in ks) + f"{'MRR':>9}{'time':>9}"
+    print(header)
+    for name, report in reports.items():
+        print(f"{name:<30}" + "".join(f"{report.hit_rate(k):>9.3f}" for k in ks)
+              + f"{report.mrr:>9.3f}{report.seconds:>8.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
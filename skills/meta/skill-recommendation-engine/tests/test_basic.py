@@ -2,7 +2,14 @@
 Basic tests for the skill recommendation engine.
 """
 
+import asyncio
+import json
+import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
 from pathlib import Path
 
 # Add parent directory to path to allow package imports
@@ -10,12 +17,21 @@ parent_path = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_path))
 
 from lib.skill_metadata import SkillMetadataLoader
-from lib.context_analyzer import ContextAnalyzer
-from lib.project_analyzer import ProjectAnalyzer
+from lib.context_analyzer import ContextAnalyzer, ContextAnalysis, parse_porcelain_v2
+from lib.context_watcher import ContextWatcher
+from lib.project_analyzer import ProjectAnalyzer, ProjectState
+from lib.gitignore import IgnoreMatcher, RuleSet, walk_files
+from lib.monorepo import MonorepoAnalyzer, PackageIndex
+from lib.lockfiles import LockfileCounter
+from lib.sampling import Reservoir, ratio_estimate
 from lib.user_patterns import UserPatternAnalyzer
+from lib.feedback_columns import FeedbackColumns
+from lib.fingerprint import ContextFingerprint, migrate_history_file
 from lib.skill_utility import SkillUtilityScorer
 from lib.confidence_scorer import ConfidenceScorer
-from lib.recommender import SkillRecommender
+from lib.recommender import SkillRecommender, Recommendation, _save_pending_snapshots, select_within_budget
+from lib.skill_metadata import SkillMetadata
+from lib import get_recommendations_async, record_feedback_async
 
 
 def test_skill_metadata_loader():
@@ -33,6 +49,60 @@ def test_skill_metadata_loader():
     print("[OK] test_skill_metadata_loader passed")
 
 
+def test_skill_roots():
+    """Test layered skill roots with lazy, per-root indexes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        user_root = Path(tmp) / "user"
+        project_root = Path(tmp) / "project"
+        (project_root / "development" / "lint-fixer").mkdir(parents=True)
+        user_root.mkdir()
+
+        # Flat install.py copy of a manifest skill, plus a README without frontmatter
+        (user_root / "quick-test-runner.md").write_text(
+            "---\nname: quick-test-runner\ndescription: Locally tuned runner\n---\n# Body\n")
+        (user_root / "README.md").write_text("# My skills\n")
+        (project_root / "development" / "lint-fixer" / "SKILL.md").write_text(
+            "---\nname: lint-fixer\ndescription: Fix lint\npriority: high\ndependencies: [quick-test-runner]\n---\n")
+
+        loader = SkillMetadataLoader(roots=[str(user_root), str(project_root)])
+        assert not any(root.loaded for root in loader.roots), "Roots should load lazily"
+        skills = loader.load_all_skills()
+
+        runner = skills["quick-test-runner"]
+        assert runner.description == "Locally tuned runner"
+        assert runner.category == "development", "Fields a root does not define are inherited"
+        assert "README" not in skills
+        lint = skills["lint-fixer"]
+        assert lint.category == "development" and lint.priority == "high"
+        assert lint.dependencies == ["quick-test-runner"]
+
+        # A later root shadows an earlier one
+        (project_root / "quick-test-runner").mkdir()
+        (project_root / "quick-test-runner" / "SKILL.md").write_text(
+            "---\nname: quick-test-runner\ndescription: Project runner\n---\n")
+        versions = [root.version for root in loader.roots]
+        assert loader.load_all_skills()["quick-test-runner"].description == "Project runner"
+        assert [root.version for root in loader.roots] == [versions[0], versions[1] + 1], \
+            "Only the changed root should be rebuilt"
+
+        # A layout-implied category does not replace the catalog's, so category filters still match
+        (project_root / "tools" / "code" / "dead-code-hunter").mkdir(parents=True)
+        (project_root / "tools" / "code" / "dead-code-hunter" / "SKILL.md").write_text(
+            "---\nname: dead-code-hunter\npriority: low\n---\n")
+        hunter = loader.load_all_skills()["dead-code-hunter"]
+        assert hunter.category == "analysis/code" and hunter.priority == "low"
+
+        unchanged = loader.load_all_skills()
+        assert loader.load_all_skills() is unchanged, "Unchanged roots should reuse the catalog"
+
+        primed = SkillMetadataLoader(roots=[str(user_root), str(project_root)])
+        primed.prime(dict(unchanged))
+        assert primed.load_all_skills()["lint-fixer"].priority == "high"
+        assert not any(root.loaded for root in primed.roots), "Primed catalog should not build indexes"
+        assert len(primed.root_files()) == 5
+    print("[OK] test_skill_roots passed")
+
+
 def test_context_analyzer():
     """Test context analysis."""
     analyzer = ContextAnalyzer()
@@ -45,6 +115,330 @@ def test_context_analyzer():
     print("[OK] test_context_analyzer passed")
 
 
+def test_parse_porcelain_v2():
+    """Test streaming porcelain v2 parsing across chunk boundaries."""
+    output = (
+        b"1 .M N... 100644 100644 100644 aaa aaa src/my file.py\0"
+        b"1 A. N... 000000 100644 100644 000 bbb new.js\0"
+        b"1 .D N... 100644 100644 000000 ccc ccc gone.md\0"
+        b"2 R. N... 100644 100644 100644 ddd ddd R100 renamed.rs\0old name.rs\0"
+        b"? odd\nname.txt\0"
+    )
+    # Feed in 7-byte chunks so records straddle chunk boundaries
+    chunks = [output[i:i + 7] for i in range(0, len(output), 7)]
+    parsed = list(parse_porcelain_v2(chunks))
+
+    assert parsed == [
+        ("modified", "src/my file.py"),
+        ("added", "new.js"),
+        ("deleted", "gone.md"),
+        ("modified", "renamed.rs"),
+        ("untracked", "odd\nname.txt"),
+    ]
+
+    # A malformed record is an error, and git status output containing one is a partial result
+    try:
+        list(parse_porcelain_v2([b"1 .M N... truncated\0"]))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    analyzer = ContextAnalyzer()
+    output = b"? kept.txt\0" + b"1 .M N... truncated\0" + b"? after.txt\0"
+    analyzer._git_status_command = lambda *args: [
+        sys.executable, "-c", f"import sys; sys.stdout.buffer.write({output!r})"
+    ]
+    status, complete = analyzer._collect_git_status()
+    assert status["untracked"] == ["kept.txt"] and not complete
+    print("[OK] test_parse_porcelain_v2 passed")
+
+
+def test_git_index():
+    """Test the .git/index reader against git status for index versions 2-4."""
+    import os
+    import subprocess
+    from lib.git_index import nothing_staged, read_index
+    from lib.metrics import STATUS_SOURCES
+
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+
+    def run(*args, cwd):
+        subprocess.run(git + list(args), cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / "repo"
+        repo.mkdir()
+        run("init", "-q", cwd=repo)
+        (repo / ".gitignore").write_text("build/\n", encoding="utf-8")
+        for name in ("src/app.py", "src/app_test.py", "src/util/io.py", "docs/guide.md", "run.sh"):
+            (repo / name).parent.mkdir(parents=True, exist_ok=True)
+            (repo / name).write_text("x = 1\n", encoding="utf-8")
+        run("add", ".", cwd=repo)
+        run("commit", "-q", "-m", "init", cwd=repo)
+
+        (repo / "src/app.py").write_text("x = 22\n", encoding="utf-8")
+        (repo / "docs/guide.md").unlink()
+        (repo / "run.sh").chmod(0o755)
+        (repo / "notes.txt").write_text("todo\n", encoding="utf-8")
+        (repo / "src/new").mkdir()
+        (repo / "src/new/mod.py").write_text("y = 1\n", encoding="utf-8")
+        (repo / "build").mkdir()
+        (repo / "build/out.o").write_text("", encoding="utf-8")
+        stamp = (repo / "src/app_test.py").stat().st_mtime_ns
+        os.utime(repo / "src/app_test.py", ns=(stamp + 10**9, stamp + 10**9))  # touched, content unchanged
+
+        expected = ContextAnalyzer(working_dir=str(repo), use_index=False)._get_git_status(untracked_files="all")
+        for version in ("2", "3", "4"):
+            if version == "3":
+                run("update-index", "--skip-worktree", "src/util/io.py", cwd=repo)  # v3 needs extended flags
+            run("update-index", "--index-version", version, cwd=repo)
+            run("write-tree", cwd=repo)  # rebuilds the cache tree that update-index dropped
+            index = read_index(repo / ".git")
+            assert index.version == int(version)
+            assert [e.path for e in index.entries] == [
+                ".gitignore", "docs/guide.md", "run.sh", "src/app.py", "src/app_test.py", "src/util/io.py"]
+            assert nothing_staged(repo / ".git", index)
+
+            before = STATUS_SOURCES.value("index")
+            analyzer = ContextAnalyzer(working_dir=str(repo))
+            for mode in ("all", "normal", "no"):
+                status = analyzer._get_status(untracked_files=mode)
+                assert analyzer.last_status_complete
+                assert {k: sorted(v) for k, v in status.items() if k != "untracked"} == \
+                    {k: sorted(v) for k, v in expected.items() if k != "untracked"}
+            assert status["untracked"] == []
+            assert analyzer._get_status(untracked_files="all")["untracked"] == ["notes.txt", "src/new/mod.py"]
+            assert analyzer._get_status()["untracked"] == ["notes.txt", "src/new/"]
+            assert STATUS_SOURCES.value("index") == before + 5
+
+        # Staged changes are only visible to git
+        run("add", "notes.txt", cwd=repo)
+        assert not nothing_staged(repo / ".git", read_index(repo / ".git"))
+        before = STATUS_SOURCES.value("git")
+        status = ContextAnalyzer(working_dir=str(repo))._get_status()
+        assert status["added"] == ["notes.txt"] and STATUS_SOURCES.value("git") == before + 1
+        run("reset", "-q", cwd=repo)
+
+        # Global excludes (XDG default, then core.excludesFile) and a linked worktree's shared info/exclude
+        home = Path(tmp) / "home"
+        (home / ".config/git").mkdir(parents=True)
+        (home / ".config/git/ignore").write_text(".DS_Store\n", encoding="utf-8")
+        (home / "global.ignore").write_text("*.swp\n", encoding="utf-8")
+        saved = {name: os.environ.get(name) for name in ("HOME", "XDG_CONFIG_HOME")}
+        os.environ["HOME"] = str(home)
+        os.environ.pop("XDG_CONFIG_HOME", None)
+        try:
+            (repo / ".DS_Store").write_text("", encoding="utf-8")
+            (repo / "src/app.py.swp").write_text("", encoding="utf-8")
+            untracked = ContextAnalyzer(working_dir=str(repo))._get_status(untracked_files="all")["untracked"]
+            assert ".DS_Store" not in untracked and "src/app.py.swp" in untracked
+
+            (home / ".gitconfig").write_text("[core]\n\texcludesFile = ~/global.ignore\n", encoding="utf-8")
+            untracked = ContextAnalyzer(working_dir=str(repo))._get_status(untracked_files="all")["untracked"]
+            assert ".DS_Store" in untracked and "src/app.py.swp" not in untracked  # the XDG file no longer applies
+
+            run("worktree", "add", "-q", str(Path(tmp) / "wt"), cwd=repo)
+            (repo / ".git/info/exclude").write_text("w.log\n", encoding="utf-8")
+            (Path(tmp) / "wt/w.log").write_text("", encoding="utf-8")
+            (Path(tmp) / "wt/x.swp").write_text("", encoding="utf-8")
+            (Path(tmp) / "wt/new.md").write_text("", encoding="utf-8")
+            worktree = ContextAnalyzer(working_dir=str(Path(tmp) / "wt"))
+            before = STATUS_SOURCES.value("index")
+            assert worktree._get_status(untracked_files="all")["untracked"] == ["new.md"]
+            assert STATUS_SOURCES.value("index") == before + 1
+            assert worktree._get_git_status(untracked_files="all")["untracked"] == ["new.md"]
+
+            # Config the matcher cannot follow sends status to git
+            (home / ".gitconfig").write_text("[include]\n\tpath = other.inc\n", encoding="utf-8")
+            before = STATUS_SOURCES.value("git")
+            worktree._get_status()
+            assert STATUS_SOURCES.value("git") == before + 1
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+    print("[OK] test_git_index passed")
+
+
+def test_git_objects():
+    """Test pooled cat-file object reads: pipelining, threads, one process for many lookups."""
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+    from lib.git_objects import GitObjects
+    from lib.metrics import GIT_OBJECT_PROCESSES
+
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        subprocess.run(git + ["init", "-q"], cwd=repo, check=True)
+        for i in range(200):
+            (repo / "src" / f"m{i % 10}").mkdir(parents=True, exist_ok=True)
+            (repo / "src" / f"m{i % 10}" / f"f{i}.py").write_text(f"value = {i}\n", encoding="utf-8")
+        (repo / "big.bin").write_bytes(bytes(range(256)) * 4096)  # larger than a pipe buffer
+        subprocess.run(git + ["add", "."], cwd=repo, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "init"], cwd=repo, check=True)
+
+        names = [f"HEAD:src/m{i % 10}/f{i}.py" for i in range(200)]
+        started = {mode: GIT_OBJECT_PROCESSES.value(mode) for mode in ("batch", "batch-check")}
+        with GitObjects(repo) as objects:
+            for _ in range(10):  # 2000 blob reads
+                blobs = objects.read_blobs(names + ["HEAD:big.bin"])
+                assert blobs[7] == b"value = 7\n" and len(blobs[-1]) == 1024 * 1024
+            assert objects.object_sizes(names[:3] + ["HEAD:missing", "HEAD:big.bin"]) == [10, 10, 10, None, 1024 * 1024]
+            assert objects.read_blob("HEAD:nope") is None and objects.read_blob("HEAD:src") is None
+            assert objects.object_size("bad\nname") is None
+
+            top = objects.read_tree("HEAD")
+            assert [(e.name, e.type) for e in top] == [("big.bin", "blob"), ("src", "tree")]
+            sub = objects.read_tree("HEAD:src/m3")
+            assert len(sub) == 20 and objects.read_blob(sub[0].oid) == b"value = 103\n"
+            tree = subprocess.run(["git", "rev-parse", "HEAD^{tree}"], cwd=repo, check=True,
+                                  capture_output=True, text=True).stdout.strip()
+            assert objects.resolve("HEAD^{tree}") == tree and objects.object_info("HEAD").type == "commit"
+            assert GIT_OBJECT_PROCESSES.value("batch") == started["batch"] + 1
+            assert GIT_OBJECT_PROCESSES.value("batch-check") == started["batch-check"] + 1
+
+            # Threads share the pool, each borrowing its own process
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(lambda i: objects.read_blob(names[i]), range(200)))
+            assert results == [f"value = {i}\n".encode() for i in range(200)]
+            assert GIT_OBJECT_PROCESSES.value("batch") - started["batch"] <= objects.max_processes
+        assert objects.read_blob(names[0]) is None  # closed
+    print("[OK] test_git_objects passed")
+
+
+def test_repository_context():
+    """Test submodule and worktree status collection and per-HEAD caching."""
+    import subprocess
+
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", "-c", "protocol.file.allow=always"]
+
+    def run(*args, cwd):
+        subprocess.run(git + list(args), cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        dep, main = root / "dep", root / "main"
+        for repo, name in ((dep, "lib.py"), (main, "app.py")):
+            repo.mkdir()
+            run("init", "-q", cwd=repo)
+            (repo / name).write_text("x = 1\n", encoding="utf-8")
+            run("add", ".", cwd=repo)
+            run("commit", "-q", "-m", "init", cwd=repo)
+        run("submodule", "add", "-q", str(dep), "vendor/dep", cwd=main)
+        run("commit", "-q", "-m", "add submodule", cwd=main)
+        run("worktree", "add", "-q", str(root / "wt"), cwd=main)
+
+        (main / "app.py").write_text("x = 2\n", encoding="utf-8")
+        (main / "vendor/dep/lib.py").write_text("x = 3\n", encoding="utf-8")
+        (root / "wt" / "notes.md").write_text("todo\n", encoding="utf-8")
+
+        wt = (root / "wt").resolve().as_posix()  # worktrees outside the main tree are named by location
+        analyzer = ContextAnalyzer(working_dir=str(main), cache_dir=str(root / "cache"))
+        assert [(r.kind, r.name) for r in analyzer._repositories()] == [
+            ("main", ""), ("submodule", "vendor/dep"), ("worktree", wt)]
+
+        context = analyzer.analyze()
+        assert context.field_confidence["recent_changes"] == "exact"
+        assert sorted(context.recent_changes["modified"]) == ["app.py", "vendor/dep/lib.py"]
+        assert context.recent_changes["untracked"] == [f"{wt}/notes.md"]
+        assert context.change_sources == {"vendor/dep/lib.py": "vendor/dep", f"{wt}/notes.md": wt}
+        assert not any(r["cached"] for r in context.session_metadata["repositories"])
+
+        # Second analysis (new process) reuses the submodule result for the same HEAD
+        again = ContextAnalyzer(working_dir=str(main), cache_dir=str(root / "cache")).analyze()
+        cached = {r["name"]: r["cached"] for r in again.session_metadata["repositories"]}
+        assert cached == {"": False, "vendor/dep": True, wt: False}
+        assert again.recent_changes == context.recent_changes
+        assert [p.name for p in (root / "cache").iterdir()] == ["repository_status_cache.json"]  # no temp files left
+
+        run("commit", "-q", "-am", "edit", cwd=main / "vendor/dep")
+        moved = ContextAnalyzer(working_dir=str(main), cache_dir=str(root / "cache")).analyze()
+        assert "vendor/dep/lib.py" not in moved.recent_changes["modified"]
+        assert "vendor/dep" in moved.recent_changes["modified"]  # parent sees the new submodule commit
+
+        # Edits inside a clean submodule are seen although its HEAD and index did not change
+        warm = ContextAnalyzer(working_dir=str(main), cache_dir=str(root / "cache")).analyze()
+        assert {r["name"]: r["cached"] for r in warm.session_metadata["repositories"]}["vendor/dep"]
+        (main / "vendor/dep/lib.py").write_text("x = 44\n", encoding="utf-8")
+        (main / "vendor/dep/new.py").write_text("y = 1\n", encoding="utf-8")
+        edited = ContextAnalyzer(working_dir=str(main), cache_dir=str(root / "cache")).analyze()
+        assert {r["name"]: r["cached"] for r in edited.session_metadata["repositories"]}["vendor/dep"] is False
+        assert "vendor/dep/lib.py" in edited.recent_changes["modified"]
+        assert "vendor/dep/new.py" in edited.recent_changes["untracked"]
+        assert edited.field_confidence["recent_changes"] == "exact"
+
+        single = ContextAnalyzer(working_dir=str(main), include_repositories=False).analyze()
+        assert not single.change_sources and f"{wt}/notes.md" not in single.recent_changes["untracked"]
+    print("[OK] test_repository_context passed")
+
+
+def test_context_watcher():
+    """Test that a running watcher feeds analyze() without drifting from git."""
+    analyzer = ContextAnalyzer()
+    with ContextWatcher(use_inotify=False, poll_interval=60.0) as watcher:
+        live = ContextAnalyzer(watcher=watcher).analyze()
+        direct = analyzer._get_git_status(untracked_files="all")
+
+        assert watcher.is_running
+        for category in ("modified", "added", "deleted", "untracked"):
+            assert sorted(live.recent_changes[category]) == sorted(direct[category])
+        assert live.session_metadata["git_status_complete"]
+    assert not watcher.is_running
+    print("[OK] test_context_watcher passed")
+
+
+def test_context_watcher_inotify():
+    """Test that inotify events keep the watcher's state in line with git status."""
+    if not sys.platform.startswith("linux"):
+        print("[SKIP] test_context_watcher_inotify: inotify is Linux only")
+        return
+
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        (repo / "pkg").mkdir()
+        (repo / "app.py").write_text("a = 1\n")
+        (repo / "pkg" / "mod.py").write_text("b = 1\n")
+        (repo / ".gitignore").write_text("build/\n")
+        for args in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", "init"]):
+            subprocess.run(git + args, cwd=repo, check=True, stdout=subprocess.DEVNULL)
+
+        with ContextWatcher(working_dir=str(repo), resync_interval=3600.0, debounce=0.02) as watcher:
+            assert watcher.mode == "inotify"
+            synced = watcher.last_resync
+            (repo / "app.py").write_text("a = 2\n")
+            (repo / "pkg" / "mod.py").unlink()
+            (repo / "docs" / "guide").mkdir(parents=True)
+            (repo / "docs" / "guide" / "intro.md").write_text("# Intro\n")
+            (repo / "build" / "assets").mkdir(parents=True)
+            (repo / "build" / "out.js").write_text("")
+
+            # Running git status here could rewrite the index, which triggers a resync
+            expected = {"modified": ["app.py"], "added": [], "deleted": ["pkg/mod.py"],
+                        "untracked": ["docs/guide/intro.md"]}
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                status, file_types = watcher.snapshot()
+                if status == expected:
+                    break
+                time.sleep(0.02)
+            assert status == expected and file_types == {".py", ".md"}, status
+            # Applied from the events, not from a periodic resync
+            assert watcher.last_resync == synced
+            # The ignored build tree is not watched
+            assert not any("build" in path.parts for path in watcher._watches.values())
+
+            copy, copied_types = watcher.snapshot()
+            copy["untracked"].append("scratch.md")
+            copied_types.add(".txt")
+            assert watcher.snapshot() == (expected, {".py", ".md"})
+
+        assert status == ContextAnalyzer(working_dir=str(repo), use_index=False)._get_git_status(untracked_files="all")
+    print("[OK] test_context_watcher_inotify passed")
+
+
 def test_project_analyzer():
     """Test project state analysis."""
     analyzer = ProjectAnalyzer()
@@ -56,10 +450,320 @@ def test_project_analyzer():
     print("[OK] test_project_analyzer passed")
 
 
+def test_gitignore_walk():
+    """Test ignore rules and directory pruning during tree walks."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        files = [
+            "app.py", "debug.log", "keep.log", "build/out.py", "src/build/gen.py",
+            "node_modules/pkg/index.js", "src/tests/test_app.py", "src/vendor/lib.py",
+            "src/vendor/keep.py", "docs/notes.tmp",
+        ]
+        for name in files:
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_text("x = 1\n", encoding="utf-8")
+        (root / ".git" / "info").mkdir(parents=True)
+        (root / ".git" / "info" / "exclude").write_text("*.tmp\n", encoding="utf-8")
+        (root / ".gitignore").write_text(
+            "# deps\nnode_modules/\n/build\n*.log\n!keep.log\n", encoding="utf-8"
+        )
+        (root / "src" / ".gitignore").write_text("vendor/*\n!vendor/keep.py\n", encoding="utf-8")
+
+        walked = sorted(p.relative_to(root).as_posix() for p in walk_files(root))
+        assert walked == [
+            ".gitignore", "app.py", "keep.log", "src/.gitignore",
+            "src/build/gen.py", "src/tests/test_app.py", "src/vendor/keep.py",
+        ]
+        assert sorted(p.as_posix() for p in walk_files(root, ["**/*.py"], start=root / "src")) == [
+            (root / "src" / name).as_posix() for name in ("build/gen.py", "tests/test_app.py", "vendor/keep.py")
+        ]
+
+        matcher = IgnoreMatcher(root)
+        assert matcher.is_ignored("node_modules/pkg/index.js")
+        assert matcher.is_ignored("build", is_dir=True)
+        assert not matcher.is_ignored("src/build", is_dir=True)
+
+        # A later dir-only rule for the same name does not hide an earlier rule from files
+        rules = RuleSet()
+        for line in ("cache", "!cache/", "/out", "!/out/", "tmp/", "!tmp"):
+            rules.add(line)
+        assert rules.match("src/cache", is_dir=False) is True
+        assert rules.match("src/cache", is_dir=True) is False
+        assert rules.match("out", is_dir=False) is True
+        assert rules.match("out", is_dir=True) is False
+        assert rules.match("tmp", is_dir=True) is False
+
+        # Ignored trees do not count towards project test/source statistics
+        state = ProjectAnalyzer(working_dir=tmp).analyze()
+        assert state.has_tests
+        stats = ProjectAnalyzer(working_dir=tmp)._scan_tree()
+        assert (stats["test_count"], stats["source_count"]) == (1, 3)
+    print("[OK] test_gitignore_walk passed")
+
+
+def test_analysis_deadline():
+    """Test anytime analysis with per-field confidence flags."""
+    # An already-expired deadline skips git and the tree walk but still returns
+    context = ContextAnalyzer().analyze(deadline_ms=0)
+    assert context.field_confidence["recent_changes"] == "default"
+    assert context.field_confidence["token_budget_remaining"] == "exact"
+    assert context.recent_changes == {"modified": [], "added": [], "deleted": [], "untracked": []}
+
+    state = ProjectAnalyzer().analyze(deadline_ms=0)
+    assert set(state.field_confidence.values()) == {"default"}
+    assert state.test_coverage_estimate == "low"
+
+    # Without a deadline every field is computed
+    state = ProjectAnalyzer().analyze()
+    assert state.field_confidence["has_tests"] == "exact"
+    assert state.field_confidence["complexity_indicators"] == "exact"
+    context = ContextAnalyzer().analyze()
+    assert context.field_confidence["project_type"] in ("exact", "partial")
+    print("[OK] test_analysis_deadline passed")
+
+
+def test_sampling_estimators():
+    """Test reservoir sampling and sampled coverage/complexity estimates."""
+    reservoir = Reservoir(100, seed=7)
+    for i in range(10000):
+        reservoir.add(i)
+    assert reservoir.seen == 10000 and len(set(reservoir.items)) == 100
+    assert 3000 < sum(reservoir.items) / 100 < 7000  # roughly centred on the stream mean
+
+    # Sampling the whole population gives an exact, zero-width interval
+    exact = ratio_estimate([(1, 0), (0, 1), (0, 1), (1, 0)], population=4)
+    assert (exact.value, exact.low, exact.high) == (1.0, 1.0, 1.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "src").mkdir()
+        (root / "tests").mkdir()
+        for i in range(3000):
+            (root / "src" / f"mod{i}.py").write_text("x = 1\n" * (10 + i % 20), encoding="utf-8")
+        for i in range(300):
+            (root / "tests" / f"test_mod{i}.py").write_text("pass\n", encoding="utf-8")
+
+        exhaustive = ProjectAnalyzer(working_dir=tmp).analyze()
+        sampled = ProjectAnalyzer(working_dir=tmp, sampling=True, sample_seed=1).analyze()
+
+        assert exhaustive.test_coverage_estimate == sampled.test_coverage_estimate == "low"
+        ratio = sampled.estimates["test_ratio"]
+        assert ratio.low <= 0.1 <= ratio.high and ratio.high < 0.2
+        assert ratio.sample_size < ratio.population == 3300
+        assert sampled.field_confidence["test_coverage_estimate"] == "estimated"
+
+        size = sampled.estimates["avg_file_size"]
+        true_mean = (3000 * 20.5 + 300 * 2) / 3300  # sources have 11..30 lines, tests 2
+        assert size.low <= true_mean <= size.high
+        assert sampled.complexity_indicators["large_files"] == 0
+    print("[OK] test_sampling_estimators passed")
+
+
+LOCKFILE_FIXTURES = {
+    "package-lock.json": json.dumps({
+        "name": "app", "lockfileVersion": 3, "requires": True,
+        "packages": {
+            "": {"name": "app", "dependencies": {"express": "^4.0.0"},
+                 "devDependencies": {"jest": "^29.0.0"}},
+            "node_modules/express": {"version": "4.18.2"},
+            "node_modules/jest": {"version": "29.0.0"},
+            "node_modules/accepts": {"version": "1.3.8"},
+            "node_modules/express/node_modules/debug": {"version": "2.6.9"},
+        },
+    }, indent=2),
+    "pnpm-lock.yaml": (
+        "lockfileVersion: '6.0'\n\n"
+        "importers:\n  .:\n    dependencies:\n      react:\n        specifier: ^18\n"
+        "        version: 18.2.0\n\n"
+        "packages:\n  /react@18.2.0:\n    resolution: {integrity: x}\n"
+        "  /loose-envify@1.4.0:\n    resolution: {integrity: y}\n"
+        "  /js-tokens@4.0.0:\n    resolution: {integrity: z}\n"
+    ),
+    "Cargo.lock": (
+        "version = 3\n\n"
+        "[[package]]\nname = \"app\"\nversion = \"0.1.0\"\ndependencies = [\n \"serde\",\n]\n\n"
+        "[[package]]\nname = \"serde\"\nversion = \"1.0.0\"\n"
+        "source = \"registry+https://github.com/rust-lang/crates.io-index\"\n"
+        "dependencies = [\n \"serde_derive\",\n]\n\n"
+        "[[package]]\nname = \"serde_derive\"\nversion = \"1.0.0\"\n"
+        "source = \"registry+https://github.com/rust-lang/crates.io-index\"\n"
+    ),
+    "go.sum": (
+        "github.com/a/x v1.0.0 h1:aaa=\ngithub.com/a/x v1.0.0/go.mod h1:bbb=\n"
+        "github.com/b/y v0.2.0/go.mod h1:ccc=\ngithub.com/c/z v0.3.0 h1:ddd=\n"
+    ),
+    "go.mod": "module app\n\nrequire (\n\tgithub.com/a/x v1.0.0\n\tgithub.com/c/z v0.3.0 // indirect\n)\n",
+}
+
+
+def test_lockfile_counts():
+    """Test direct/transitive counts from streamed lockfiles."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, content in LOCKFILE_FIXTURES.items():
+            (Path(tmp) / name).write_text(content, encoding="utf-8")
+
+        counter = LockfileCounter(cache_file=Path(tmp) / "cache.json")
+        npm = counter.count(Path(tmp) / "package-lock.json")
+        assert (npm.direct, npm.transitive) == (2, 2)
+
+        pnpm = counter.count(Path(tmp) / "pnpm-lock.yaml")
+        assert (pnpm.direct, pnpm.transitive) == (1, 2)
+
+        cargo = counter.count(Path(tmp) / "Cargo.lock")
+        assert (cargo.direct, cargo.transitive) == (1, 1)
+
+        go = counter.count(Path(tmp) / "go.sum")
+        assert (go.direct, go.transitive) == (1, 2)
+
+        # Node is counted once (package-lock.json wins over pnpm-lock.yaml)
+        state = ProjectAnalyzer(working_dir=tmp, cache_dir=tmp).analyze()
+        assert state.dependency_count == 4
+        assert state.transitive_dependency_count == 5
+
+        # Results are reused from the on-disk cache by content hash
+        counter.save()
+        cached = LockfileCounter(cache_file=Path(tmp) / "cache.json")
+        assert cached._results == counter._results
+    print("[OK] test_lockfile_counts passed")
+
+
+COVERAGE_FIXTURES = {
+    # Method-level lines repeat the class's lines and must not be counted twice
+    "coverage.xml": """<?xml version="1.0" ?>
+<coverage line-rate="0.5" version="7.0">
+  <packages><package name="pkg"><classes>
+    <class name="a.py" filename="a.py">
+      <methods><method name="f"><lines><line number="1" hits="1"/></lines></method></methods>
+      <lines><line number="1" hits="1"/><line number="2" hits="0"/><line number="3" hits="2"/><line number="4" hits="0"/></lines>
+    </class>
+  </classes></package></packages>
+</coverage>
+""",
+    "lcov.info": "SF:a.js\nDA:1,1\nDA:2,0\nLF:2\nLH:1\nend_of_record\nSF:b.js\nDA:1,3\nDA:2,1\nDA:3,0\nend_of_record\n",
+    "coverage-final.json": json.dumps({
+        "/p/a.js": {"path": "/p/a.js", "statementMap": {"0": {"start": {"line": 1}}}, "s": {"0": 1, "1": 0, "2": 4}},
+        "/p/b.js": {"path": "/p/b.js", "s": {"0": 0}, "b": {"0": [1, 0]}},
+    }, separators=(",", ":")),
+}
+
+
+def test_coverage_artifacts():
+    """Test streamed parsing of coverage artifacts and their use in project state."""
+    import os
+    import sqlite3
+    from lib.coverage import CoverageReader, parse_istanbul
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, content in COVERAGE_FIXTURES.items():
+            (Path(tmp) / name).write_text(content, encoding="utf-8")
+
+        reader = CoverageReader(cache_file=Path(tmp) / "cache.json")
+        assert reader.read(Path(tmp) / "coverage.xml") == (2, 4)
+        assert reader.read(Path(tmp) / "lcov.info") == (3, 5)
+        assert reader.read(Path(tmp) / "coverage-final.json") == (2, 4)
+
+        # Counter objects split across chunk boundaries are still found
+        import lib.coverage as coverage_module
+        chunk_size, coverage_module.CHUNK_SIZE = coverage_module.CHUNK_SIZE, 7
+        try:
+            assert parse_istanbul(Path(tmp) / "coverage-final.json") == (2, 4)
+        finally:
+            coverage_module.CHUNK_SIZE = chunk_size
+
+        # coverage.py database: executed line bitmaps against the source's code lines
+        (Path(tmp) / "mod.py").write_text("import os\n\n# note\ndef f():\n    return os.sep\n", encoding="utf-8")
+        db = sqlite3.connect(str(Path(tmp) / ".coverage"))
+        db.executescript("CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT);"
+                         "CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER, numbits BLOB);")
+        db.execute("INSERT INTO file VALUES (1, ?)", (str(Path(tmp) / "mod.py"),))
+        db.executemany("INSERT INTO line_bits VALUES (1, ?, ?)", [(1, bytes([0b10])), (2, bytes([0b10010]))])
+        db.commit()
+        db.close()
+        assert reader.read(Path(tmp) / ".coverage") == (2, 3)
+
+        # The newest artifact decides; results are cached by mtime
+        stamp = os.stat(Path(tmp) / "lcov.info").st_mtime_ns + 10 ** 9
+        os.utime(Path(tmp) / "lcov.info", ns=(stamp, stamp))
+        state = ProjectAnalyzer(working_dir=tmp, cache_dir=tmp).analyze(include_git=False)
+        assert state.measured_coverage == 0.6
+        assert state.test_coverage_estimate == "medium"
+        assert state.field_confidence["test_coverage_estimate"] == "exact"
+
+        reader.save()
+        cached = CoverageReader(cache_file=Path(tmp) / "cache.json")
+        (Path(tmp) / "coverage.xml").write_text("not xml", encoding="utf-8")
+        os.utime(Path(tmp) / "coverage.xml", ns=(stamp, stamp))
+        assert cached.read(Path(tmp) / "coverage.xml") is None, "A changed artifact should be reparsed"
+        assert cached._results[str((Path(tmp) / "lcov.info").resolve())][2:] == [3, 5]
+    print("[OK] test_coverage_artifacts passed")
+
+
+def test_monorepo_packages():
+    """Test package discovery, change attribution and per-package recommendations."""
+    import subprocess
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        files = {
+            ".gitignore": "node_modules/\n",
+            "pyproject.toml": "[project]\nname = 'root'\n",
+            "packages/web/package.json": "{}",
+            "packages/web/src/app.js": "export {}\n",
+            "packages/api/pyproject.toml": "[project]\nname = 'api'\n",
+            "packages/api/api/core.py": "x = 1\n",
+            "packages/api/tests/test_core.py": "def test(): pass\n",
+            "node_modules/dep/package.json": "{}",
+            "tools/build.py": "pass\n",
+        }
+        for name, text in files.items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_text(text, encoding="utf-8")
+
+        monorepo = MonorepoAnalyzer(working_dir=tmp)
+        assert [p.path for p in monorepo.packages()] == ["", "packages/api", "packages/web"]
+        assert monorepo.is_monorepo()
+
+        index = PackageIndex(monorepo.packages())
+        assert index.package_of("packages/web/src/app.js").path == "packages/web"
+        assert index.package_of("tools/build.py").path == ""
+
+        changes = {"modified": ["packages/web/src/app.js", "packages/web/src/ui.js", "packages/api/api/core.py"],
+                   "added": [], "deleted": [], "untracked": ["packages/web/src/new.js"]}
+        context = ContextAnalysis("coding", {".js", ".py"}, changes, "polyglot")
+        state = ProjectState(repository_age_days=400, has_tests=False, test_coverage_estimate="low",
+                             dependency_count=0, has_security_issues=False,
+                             documentation_quality="poor", recent_commits_count=7)
+        results = monorepo.analyze(context, state, ContextAnalyzer(working_dir=tmp))
+        assert [(r.package.path, r.changed_files) for r in results] == [("packages/web", 3), ("packages/api", 1)]
+        web, api = results
+        assert web.context.project_type == "web" and api.context.project_type == "python"
+        assert web.context.recent_changes["untracked"] == ["packages/web/src/new.js"]
+        assert api.project_state.has_tests and not web.project_state.has_tests
+        assert api.project_state.repository_age_days == 400 and api.project_state.recent_commits_count == 7
+
+        git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+        subprocess.run(["git", "init", "-q"], cwd=tmp, check=True)
+        subprocess.run(["git", "add", "."], cwd=tmp, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "init"], cwd=tmp, check=True)
+        (root / "packages/web/src/app.js").write_text("export const a = 1\n", encoding="utf-8")
+        (root / "packages/web/src/ui.js").write_text("export {}\n", encoding="utf-8")
+        (root / "packages/api/api/core.py").write_text("x = 2\n", encoding="utf-8")
+        assert index.package_of("packages/web/src/").path == "packages/web"
+
+        recommender = SkillRecommender(data_dir=str(root / "data"), working_dir=tmp, warm_start=False)
+        result = recommender.recommend_monorepo(top_n=5, min_confidence=0.0)
+        assert [(p.package.path, p.changed_files) for p in result.packages] == [("packages/web", 2),
+                                                                                 ("packages/api", 1)]
+        assert result.recommendations and all(rec.packages for rec in result.recommendations)
+        assert set(result.package_recommendations) == {"packages/api", "packages/web"}
+    print("[OK] test_monorepo_packages passed")
+
+
 def test_user_patterns():
     """Test user pattern analyzer."""
-    analyzer = UserPatternAnalyzer()
-    prefs = analyzer.load_preferences()
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = UserPatternAnalyzer(data_dir=tmp)
+        prefs = analyzer.load_preferences()
 
     assert hasattr(prefs, 'preferred_skills')
     assert hasattr(prefs, 'skill_success_rates')
@@ -67,6 +771,348 @@ def test_user_patterns():
     print("[OK] test_user_patterns passed")
 
 
+def test_feedback_columns():
+    """Test columnar aggregates against the row-based history."""
+    entries = [
+        {"timestamp": "2025-01-01T00:00:00Z", "skill": "quick-test-runner", "outcome": "success",
+         "user_rating": 5, "context": {"current_activity": "coding", "file_types": [".py"]}},
+        {"timestamp": "2025-01-01T00:01:00Z", "skill": "quick-test-runner", "outcome": "failure",
+         "user_rating": 2, "context": {"current_activity": "testing", "file_types": [".js"]}},
+        {"timestamp": "2025-01-01T00:02:00Z", "skill": "quick-test-runner", "outcome": "success",
+         "context": {"current_activity": "exploring", "file_types": [".md"]}},
+        {"timestamp": "2025-01-01T00:03:00Z", "skill": "refactoring", "outcome": "success",
+         "context": {"current_activity": "refactoring", "file_types": [".py", ".rs"]}},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(Path(tmp) / "feedback_history.json", "w", encoding="utf-8") as f:
+            json.dump({"version": "1.0", "feedback": entries}, f, indent=2)
+
+        analyzer = UserPatternAnalyzer(data_dir=tmp)
+        columns = analyzer.load_feedback_columns()
+        assert len(columns) == 4
+        assert columns.success_rate_by_skill() == {"quick-test-runner": 2 / 3, "refactoring": 1.0}
+
+        context = {"current_activity": "coding", "file_types": [".md"]}
+        expected = sum(
+            1 for e in analyzer.load_feedback_history()
+            if e.skill == "quick-test-runner" and e.outcome == "success"
+            and analyzer._is_similar_context(e.context, context)
+        )
+        assert columns.similar_success_count("quick-test-runner", "coding", {".md"}) == expected == 2
+
+        # Second load comes from the binary sidecar
+        reloaded = FeedbackColumns.load(analyzer.feedback_file)
+        assert list(reloaded.columns["ratings"]) == [5, 2, 0, 0]
+        assert reloaded.skills == columns.skills
+
+        # The stream reader matches a full parse for both layouts; a truncated file decodes to nothing
+        analyzer.record_feedback("refactoring", {"current_activity": "coding", "file_types": [".go"]}, "success")
+        streamed = FeedbackColumns.from_history_file(analyzer.feedback_file)
+        assert len(streamed) == 5 and streamed.file_types[-1] == ".go"
+        text = analyzer.feedback_file.read_text(encoding="utf-8")
+        analyzer.feedback_file.write_text(text[:len(text) // 2], encoding="utf-8")
+        assert len(FeedbackColumns.from_history_file(analyzer.feedback_file)) == 0
+
+    # Extensions past the mask width share the overflow bit, which never makes contexts similar
+    overflow = FeedbackColumns()
+    for i in range(70):
+        overflow.append({"timestamp": "2025-01-01T00:00:00Z", "skill": "lean-plan", "outcome": "success",
+                         "context": {"current_activity": "coding", "file_types": [f".x{i}"]}})
+    assert overflow.similar_success_count("lean-plan", "testing", {".x65"}) == 0
+    assert overflow.similar_success_count("lean-plan", "testing", {".x5"}) == 1
+    print("[OK] test_feedback_columns passed")
+
+
+def test_replay_evaluator():
+    """Test the offline replay against a row-by-row ranking with calculate_confidence."""
+    import random
+    from array import array
+    from lib.feedback_columns import is_relevant
+    from lib.replay import ReplayEvaluator
+    from lib.user_patterns import UserPreferences, _apply_feedback
+
+    skills = SkillMetadataLoader().load_all_skills()
+    names = ["quick-test-runner", "dead-code-hunter", "dependency-audit", "refactoring", "retired-skill"]
+    contexts = [("coding", [".py"], "python"), ("testing", [".js"], "web"), ("refactoring", [".v"], "unknown")]
+    rng = random.Random(7)
+    columns = FeedbackColumns()
+    for i in range(400):
+        activity, file_types, project_type = rng.choice(contexts)
+        columns.append({
+            # Recorded out of order; the replay sorts by time
+            "timestamp": f"2025-01-01T{(i * 7) % 400 // 60:02d}:{(i * 7) % 400 % 60:02d}:00Z",
+            "skill": rng.choice(names), "outcome": rng.choice(["success", "success", "failure"]),
+            "user_rating": rng.choice([None, None, 5, 4, 3, 2, 1]),
+            "context": {"current_activity": activity, "file_types": file_types, "project_type": project_type},
+        })
+
+    evaluator = ReplayEvaluator(columns, skills)
+    report = evaluator.evaluate(ks=(1, 3))
+
+    def brute_force(scorer):
+        # Score every skill with the full scorer at every event
+        prefs = UserPreferences()
+        cols = columns.columns
+        evaluated = unknown = reciprocal = 0
+        hits = {1: 0, 3: 0}
+        for row in sorted(range(len(columns)), key=lambda r: cols["timestamps"][r]):
+            skill = columns.skills[cols["skill_ids"][row]]
+            outcome, rating = cols["outcomes"][row], cols["ratings"][row]
+            if is_relevant(outcome, rating):
+                if skill not in skills:
+                    unknown += 1
+                else:
+                    evaluated += 1
+                    context = ContextAnalysis(columns.activities[cols["activity_ids"][row]],
+                                              evaluator._file_types(cols["file_type_masks"][row]), {},
+                                              columns.project_types[cols["project_type_ids"][row]])
+                    ranking = sorted(skills, key=lambda n: (-scorer.calculate_confidence(
+                        skills[n], context, None, prefs, None), n))
+                    rank = ranking.index(skill) + 1
+                    reciprocal += 1.0 / rank
+                    for k in hits:
+                        hits[k] += rank <= k
+            _apply_feedback(prefs, skill, {1: "success", 0: "failure"}.get(outcome, "unknown"), rating or None)
+        return evaluated, unknown, hits, reciprocal
+
+    evaluated, unknown, hits, reciprocal = brute_force(ConfidenceScorer())
+    assert report.events == 400
+    assert (report.evaluated, report.unknown_skill) == (evaluated, unknown) and evaluated > 100
+    assert report.hits == hits
+    assert abs(report.mrr - reciprocal / evaluated) < 1e-9
+
+    # Variants: ignoring preferences changes the ranking; an unreachable threshold misses everything
+    assert evaluator.evaluate(weights={"user": 0}).mrr != report.mrr
+    assert evaluator.evaluate(min_confidence=101).hits == {1: 0, 3: 0, 5: 0}
+
+    # Scorer variants reading more than the inherited signatures cover are still ranked exactly
+    class ScriptScorer(ConfidenceScorer):
+        # .js and .py share a context signature
+        def analyze_context_relevance(self, skill, context):
+            if ".js" in context.file_types and skill.name == "dependency-audit":
+                return 1.0
+            return super().analyze_context_relevance(skill, context)
+
+    class ActivityScorer(ConfidenceScorer):
+        # Alignment that also reads the context
+        def analyze_user_alignment(self, skill, user_prefs, context):
+            bonus = 0.8 if context.current_activity == "refactoring" and skill.name == "refactoring" else 0.0
+            return bonus + super().analyze_user_alignment(skill, user_prefs, context)
+
+    class SignedScorer(ConfidenceScorer):
+        def user_signature(self, skill, user_prefs):
+            return ("signed",) + super().user_signature(skill, user_prefs)
+
+    for variant in (ScriptScorer(), ActivityScorer()):
+        variant_report = evaluator.evaluate(scorer=variant, ks=(1, 3))
+        evaluated, unknown, hits, reciprocal = brute_force(variant)
+        assert variant_report.hits == hits and variant_report.hits != report.hits
+        assert abs(variant_report.mrr - reciprocal / evaluated) < 1e-9
+    # A variant's own user signature keys the alignment memo
+    assert evaluator.evaluate(scorer=SignedScorer(), ks=(1, 3)).hits == report.hits
+
+    # A large history replays with shared context rows and per-skill user updates
+    size = 100000
+    large = FeedbackColumns()
+    for vocabulary, values in (("skills", names), ("activities", ["coding", "testing"]),
+                               ("project_types", ["python"]), ("file_types", [".py", ".js"])):
+        for value in values:
+            large._intern(vocabulary, value)
+    large.columns.update({
+        "timestamps": array("d", range(size)),
+        "skill_ids": array("I", (rng.randrange(len(names)) for _ in range(size))),
+        "outcomes": array("b", (rng.choice((1, 0)) for _ in range(size))),
+        "ratings": array("b", (rng.choice((0, 5, 2)) for _ in range(size))),
+        "activity_ids": array("I", (rng.randrange(2) for _ in range(size))),
+        "project_type_ids": array("I", [0]) * size,
+        "file_type_masks": array("Q", (rng.randrange(1, 4) for _ in range(size))),
+    })
+    large_report = ReplayEvaluator(large, skills).evaluate()
+    assert large_report.events == size and large_report.evaluated > 0
+    print("[OK] test_replay_evaluator passed")
+
+
+def test_next_skills():
+    """Test mining follow-up skills into the next-skill table."""
+    from lib import suggest_next_skills
+    from lib.next_skills import NEXT_SKILLS_FILE, NextSkillTable
+
+    def event(minute, skill, outcome="success", rating=None):
+        return {"timestamp": f"2025-01-01T{minute // 60:02d}:{minute % 60:02d}:00Z", "skill": skill,
+                "outcome": outcome, "user_rating": rating, "context": {"current_activity": "coding"}}
+
+    entries = []
+    for session in range(5):
+        start = session * 120
+        entries.append(event(start, "diff-summariser"))
+        entries.append(event(start + 2, "quick-test-runner"))
+        # A failed follow-up does not count; one outside the window does not either
+        entries.append(event(start + 4, "dependency-audit", outcome="failure"))
+        entries.append(event(start + 90, "dead-code-hunter"))
+    entries.append(event(1000, "diff-summariser"))
+    entries.append(event(1001, "lean-plan", rating=1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(Path(tmp) / "feedback_history.json", "w", encoding="utf-8") as f:
+            json.dump({"version": "1.0", "feedback": entries}, f)
+
+        recommender = SkillRecommender(data_dir=tmp, working_dir=tmp, warm_start=False)
+        assert recommender.suggest_next("diff-summariser") == []  # not mined yet
+        table = recommender.mine_next_skills(min_support=2)
+        assert table.followers["diff-summariser"] == [("quick-test-runner", 0.833, 5)]
+        assert "dependency-audit" not in table.followers.get("quick-test-runner", [])
+        assert "quick-test-runner" not in table.followers.get("dead-code-hunter", [])
+
+        assert recommender.suggest_next("diff-summariser") == [("quick-test-runner", 0.833)]
+        assert recommender.suggest_next("unknown-skill") == []
+        assert suggest_next_skills("diff-summariser", data_dir=tmp) == [("quick-test-runner", 0.833)]
+
+        stored = NextSkillTable.load(Path(tmp) / NEXT_SKILLS_FILE)
+        assert stored.followers == table.followers and stored.source == table.source != (0, 0)
+
+        # A higher support threshold drops the pair
+        assert "diff-summariser" not in recommender.mine_next_skills(min_support=6).followers
+        assert recommender.suggest_next("diff-summariser") == []
+
+        # New feedback makes the table stale: it is still served while a background
+        # thread re-mines it with the threshold it was mined with
+        recommender.user_patterns.record_feedback_batch([
+            {"skill": skill, "outcome": "success", "timestamp": f"2025-01-0{day}T00:0{minute}:00Z",
+             "context": {"current_activity": "coding"}}
+            for day in (2, 3) for minute, skill in ((0, "diff-summariser"), (2, "quick-test-runner"))
+        ])
+        assert recommender.suggest_next("diff-summariser") == []
+        recommender._next_skills_refresh.join()
+        assert recommender.suggest_next("diff-summariser") == [("quick-test-runner", 0.875)]
+        assert suggest_next_skills("diff-summariser", data_dir=tmp) == [("quick-test-runner", 0.875)]
+        stored = NextSkillTable.load(Path(tmp) / NEXT_SKILLS_FILE)
+        assert stored.options["min_support"] == 6 and stored.followers["diff-summariser"][0][2] == 7
+    print("[OK] test_next_skills passed")
+
+
+def test_context_fingerprints():
+    """Test compact feedback fingerprints and migration of legacy histories."""
+    changes = {
+        "modified": [f"src/pkg/module_{i}.py" for i in range(150)],
+        "added": [f"tests/test_{i}.py" for i in range(30)],
+        "deleted": [], "untracked": [f"notes/{i}.md" for i in range(20)],
+    }
+    context = ContextAnalysis(
+        current_activity="refactoring", file_types={".py", ".md"},
+        recent_changes=changes, project_type="python"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Legacy layout: the whole context in every entry
+        legacy_context = asdict(context)
+        legacy_context["file_types"] = sorted(legacy_context["file_types"])
+        legacy = [
+            {"timestamp": f"2025-01-01T00:0{i}:00Z", "skill": "refactoring", "context": legacy_context,
+             "outcome": "success", "user_rating": 4, "notes": ""}
+            for i in range(5)
+        ]
+        history = Path(tmp) / "feedback_history.json"
+        history.write_text(json.dumps({"version": "1.0", "feedback": legacy}, indent=2), encoding="utf-8")
+
+        analyzer = UserPatternAnalyzer(data_dir=tmp)
+        before = analyzer.load_feedback_columns().similar_success_count("refactoring", "coding", {".md"})
+
+        converted, size_before, size_after = migrate_history_file(history)
+        assert converted == 5 and size_before > 10 * size_after
+        assert (Path(tmp) / "feedback_history.json.bak").exists()
+        # Same compact one-entry-per-line layout the analyzer writes
+        lines = history.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 5 + 6 and all(json.loads(line.strip().rstrip(",")) for line in lines[4:9])
+        assert analyzer.load_feedback_columns().similar_success_count("refactoring", "coding", {".md"}) == before == 5
+
+        # New entries store only the fingerprint, interned against the same vocabulary
+        analyzer.record_feedback("refactoring", context, "success", rating=5)
+        stored = json.loads(history.read_text(encoding="utf-8"))
+        assert "context" not in stored["feedback"][-1]
+        fingerprint = ContextFingerprint.decode(stored["feedback"][-1]["fingerprint"])
+        assert fingerprint == ContextFingerprint.decode(stored["feedback"][0]["fingerprint"])
+        assert fingerprint.change_bucket == 5 and fingerprint.path_hash
+
+        entries = analyzer.load_feedback_history()
+        assert analyzer._is_similar_context(entries[-1].fingerprint, {"current_activity": "refactoring"})
+        assert analyzer._is_similar_context(entries[-1].fingerprint, {"file_types": [".md"]})
+        assert not analyzer._is_similar_context(entries[-1].fingerprint, {"current_activity": "coding",
+                                                                          "file_types": [".rs"]})
+
+        # The scratch vocabulary is copied once per history load
+        scratch = analyzer._scratch_vocabulary
+        analyzer._is_similar_context(entries[-1].fingerprint, {"current_activity": "reviewing"})
+        assert analyzer._scratch_vocabulary is scratch
+        analyzer.record_feedback("refactoring", context, "success", rating=4)
+        analyzer._is_similar_context(entries[-1].fingerprint, {"current_activity": "refactoring"})
+        assert analyzer._scratch_vocabulary is not scratch
+    print("[OK] test_context_fingerprints passed")
+
+
+def test_feedback_batch():
+    """Test bulk ingestion of a JSONL feedback event stream."""
+    from lib.user_patterns import read_feedback_events
+
+    events = [
+        json.dumps({"skill": "lean-plan", "outcome": "failure", "rating": 1, "timestamp": 1700000100,
+                    "fingerprint": {"activity": "planning", "file_types": [".md"], "change_bucket": 1}}),
+        json.dumps({"skill": "lean-plan", "outcome": "success", "rating": 5, "timestamp": "2023-11-14T22:00:00Z",
+                    "context": {"current_activity": "coding", "file_types": [".py"]}}),
+        "",
+        "{not json",
+        json.dumps({"skill": "lean-plan", "outcome": "maybe"}),
+        json.dumps({"skill": "refactoring", "outcome": "success", "rating": 9}),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        batch = UserPatternAnalyzer(data_dir=tmp)
+        batch.record_feedback("refactoring", {"current_activity": "coding"}, "success")
+        recorded, skipped = batch.record_feedback_batch(read_feedback_events(events))
+        assert (recorded, skipped) == (2, 3)
+
+        history = batch.load_feedback_history()
+        assert [e.skill for e in history] == ["refactoring", "lean-plan", "lean-plan"]
+        # Applied in timestamp order: the later failure wins
+        assert history[-1].timestamp == "2023-11-14T22:15:00Z" and history[-1].outcome == "failure"
+        prefs = batch.load_preferences()
+        assert "lean-plan" in prefs.avoided_skills
+        assert abs(prefs.skill_success_rates["lean-plan"] - 0.48) < 1e-9
+
+        vocabulary = batch.load_vocabulary()
+        assert vocabulary.value_for("activities", history[-1].fingerprint.activity) == "planning"
+        assert batch.load_feedback_columns().similar_success_count("lean-plan", "coding", set()) == 1
+
+        # Same result as recording the events one by one
+        with tempfile.TemporaryDirectory() as tmp2:
+            single = UserPatternAnalyzer(data_dir=tmp2)
+            single.record_feedback("refactoring", {"current_activity": "coding"}, "success")
+            single.record_feedback("lean-plan", {"current_activity": "coding"}, "success", rating=5)
+            single.record_feedback("lean-plan", {}, "failure", rating=1)
+            assert single.load_preferences().skill_success_rates == prefs.skill_success_rates
+
+        # Events that would not serialize or sort are skipped, not fatal to the batch
+        size = batch.feedback_file.stat().st_size
+        malformed = [
+            {"skill": "lean-plan", "outcome": "success", "fingerprint": {"path_hash": 12345}},
+            {"skill": "lean-plan", "outcome": "success", "fingerprint": {"path_hash": "zz:not-hex"}},
+            {"skill": "lean-plan", "outcome": "success", "timestamp": "not a date"},
+            {"skill": "lean-plan", "outcome": "success", "context": {"current_activity": 7}},
+        ]
+        assert batch.record_feedback_batch(malformed) == (0, 4)
+        assert batch.feedback_file.stat().st_size == size
+
+        # Timestamps are stored in UTC and applied in time order, fractions and offsets included
+        timed = [
+            {"skill": "diff-summariser", "outcome": "success", "timestamp": "2023-11-15T01:00:00.5+01:00"},
+            {"skill": "diff-summariser", "outcome": "failure", "timestamp": "2023-11-15T00:00:00Z"},
+        ]
+        assert batch.record_feedback_batch(malformed + timed) == (2, 4)
+        assert [(e.timestamp, e.outcome) for e in batch.load_feedback_history()[-2:]] == [
+            ("2023-11-15T00:00:00Z", "failure"), ("2023-11-15T00:00:00.500000Z", "success")]
+    print("[OK] test_feedback_batch passed")
+
+
 def test_skill_utility():
     """Test skill utility scorer."""
     scorer = SkillUtilityScorer()
@@ -95,8 +1141,9 @@ def test_confidence_scorer():
 
 def test_recommender():
     """Test main recommender."""
-    recommender = SkillRecommender()
-    recommendations = recommender.recommend(top_n=5, min_confidence=0.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        recommender = SkillRecommender(data_dir=tmp)
+        recommendations = recommender.recommend(top_n=5, min_confidence=0.0)
 
     assert isinstance(recommendations, list)
     assert len(recommendations) <= 5
@@ -112,6 +1159,323 @@ def test_recommender():
         print("[OK] test_recommender passed (no recommendations)")
 
 
+def test_async_api():
+    """Test the asyncio API against the blocking one, including cancellation."""
+    async def scenario(data_dir):
+        context, state = await asyncio.gather(
+            ContextAnalyzer().analyze_async(), ProjectAnalyzer().analyze_async()
+        )
+        assert context.recent_changes == ContextAnalyzer().analyze().recent_changes
+        assert state.repository_age_days == ProjectAnalyzer().analyze().repository_age_days
+        assert set(state.field_confidence.values()) == {"exact"}
+
+        # Concurrent analyses on shared analyzers keep their tree stats, estimates and completeness apart
+        context_analyzer = ContextAnalyzer()
+        project_analyzer = ProjectAnalyzer(sampling=True, sample_seed=3)
+        expected = ProjectAnalyzer(sampling=True, sample_seed=3).analyze()
+        results = await asyncio.gather(
+            context_analyzer.analyze_async(), context_analyzer.analyze_async(deadline_ms=0),
+            project_analyzer.analyze_async(), project_analyzer.analyze_async(deadline_ms=0)
+        )
+        assert results[0].session_metadata["git_status_complete"]
+        assert not results[1].session_metadata["git_status_complete"]
+        assert results[2].estimates == expected.estimates and results[2].estimates
+        assert results[2].complexity_indicators == expected.complexity_indicators
+        assert results[3].estimates == {}
+
+        recommendations = await get_recommendations_async(top_n=3, min_confidence=0.0, data_dir=data_dir)
+        assert len(recommendations) <= 3
+
+        await record_feedback_async("quick-test-runner", "success", rating=5, data_dir=data_dir)
+        assert len(UserPatternAnalyzer(data_dir=data_dir).load_feedback_history()) == 1
+
+        task = asyncio.ensure_future(ProjectAnalyzer().analyze_async())
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+            assert False, "analysis should have been cancelled"
+        except asyncio.CancelledError:
+            pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(scenario(tmp))
+    print("[OK] test_async_api passed")
+
+
+def test_metrics_registry():
+    """Test metric recording and Prometheus text export."""
+    from lib.metrics import RECOMMEND_SECONDS, MetricsRegistry
+    from lib import write_metrics
+
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests\nby \\ path", ["path"])
+    latency = registry.histogram("demo_seconds", "Latency", buckets=(0.1, 1.0))
+    assert registry.counter("demo_requests_total", "again", ["path"]) is requests
+    requests.inc(2, 'a"b')
+    latency.observe(0.1)
+    latency.observe(0.5)
+    latency.observe(3.0)
+
+    text = registry.render()
+    assert "# HELP demo_requests_total Requests\\nby \\\\ path" in text
+    assert 'demo_requests_total{path="a\\"b"} 2' in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_sum 3.6" in text and "demo_seconds_count 3" in text
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = RECOMMEND_SECONDS.count()
+        SkillRecommender(data_dir=tmp, warm_start=False).recommend(top_n=1)
+        assert RECOMMEND_SECONDS.count() == before + 1
+
+        out = Path(tmp) / "metrics" / "engine.prom"
+        assert write_metrics(out)
+        assert "# TYPE skill_engine_recommend_seconds histogram" in out.read_text(encoding="utf-8")
+        assert not list(out.parent.glob("*.tmp"))
+    print("[OK] test_metrics_registry passed")
+
+
+def test_memory_profile():
+    """Test per-stage memory figures and ceilings on synthetic inputs."""
+    from lib.coverage import parse_lcov
+    from lib.memprofile import MemoryProfiler, memory_stage
+
+    with memory_stage("inactive"):
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        # ~6MB tracefile: streaming keeps memory flat however large it is
+        with open(root / "lcov.info", "w", encoding="utf-8") as f:
+            for record in range(2000):
+                f.write(f"SF:src/module_{record}.py\n")
+                f.writelines(f"DA:{line},{line % 3}\n" for line in range(1, 301))
+                f.write("end_of_record\n")
+
+        project = root / "project"
+        for package in range(20):
+            directory = project / "src" / f"package_{package}"
+            directory.mkdir(parents=True)
+            for module in range(100):
+                (directory / f"module_{module}.py").write_text("x = 1\n" * 20, encoding="utf-8")
+        (project / "package.json").write_text("{}", encoding="utf-8")
+
+        with MemoryProfiler(sites=False) as profiler:
+            with memory_stage("lcov"):
+                covered, total = parse_lcov(root / "lcov.info")
+            with memory_stage("analyze"):
+                ProjectAnalyzer(working_dir=str(project)).analyze(include_git=False)
+        assert (covered, total) == (400000, 600000)
+
+        stages = {stage["stage"]: stage for stage in profiler.report()["stages"]}
+        assert {"lcov", "analyze", "project.local", "project.git", "project.tree"} <= set(stages)
+        assert stages["lcov"]["peak_bytes"] < 1024 * 1024
+        assert stages["analyze"]["peak_bytes"] < 2 * 1024 * 1024
+        assert stages["project.tree"]["peak_bytes"] <= stages["analyze"]["peak_bytes"]
+
+        with MemoryProfiler(top=3) as profiler:
+            with memory_stage("alloc"):
+                kept = [bytearray(1024) for _ in range(200)]
+        alloc = profiler.report()["stages"][0]
+        assert alloc["net_bytes"] >= 200 * 1024 and len(kept) == 200
+        assert 0 < len(alloc["top_sites"]) <= 3
+        assert alloc["top_sites"][0]["site"].startswith(__file__)
+
+        report_path = root / "memory.json"
+        assert profiler.write(report_path)
+        assert json.loads(report_path.read_text(encoding="utf-8"))["stages"][0]["stage"] == "alloc"
+    print("[OK] test_memory_profile passed")
+
+
+def test_select_within_budget():
+    """Test knapsack selection beats top-N when the budget is tight."""
+    def candidate(name, confidence, tokens):
+        skill = SkillMetadata(name=name, category="development", description="",
+                              priority="high", dependencies=[], file_path="",
+                              token_estimate=tokens)
+        return Recommendation(skill=skill, confidence=confidence, context=None,
+                              reasoning="", category="")
+
+    candidates = [
+        candidate("big", 90.0, 1000),
+        candidate("small-a", 60.0, 500),
+        candidate("small-b", 55.0, 500),
+        candidate("tiny", 10.0, 100),
+    ]
+
+    exact = select_within_budget(candidates, 1000, method="dp")
+    assert [c.skill.name for c in exact] == ["small-a", "small-b"]
+
+    greedy = select_within_budget(candidates, 1000, method="greedy")
+    assert sum(c.skill.token_estimate for c in greedy) <= 1000
+    assert sum(c.confidence for c in greedy) >= 115.0 / 2
+
+    assert len(select_within_budget(candidates, 10000)) == 4
+    assert select_within_budget(candidates, 50) == []
+    print("[OK] test_select_within_budget passed")
+
+
+def test_recommend_within_budget():
+    """Test budget-constrained plan generation."""
+    with tempfile.TemporaryDirectory() as tmp:
+        recommender = SkillRecommender(data_dir=tmp)
+        plan = recommender.recommend_within_budget(token_budget=1500, min_confidence=0.0)
+
+    assert plan.expected_token_cost <= 1500
+    assert plan.expected_token_cost == sum(r.skill.token_estimate for r in plan.recommendations)
+    print(f"[OK] test_recommend_within_budget passed ({len(plan.recommendations)} skills, "
+          f"{plan.expected_token_cost} tokens)")
+
+
+def test_recommendation_table():
+    """Test that table lookups match full scoring."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(Path(tmp) / "preferences.json", "w", encoding="utf-8") as f:
+            json.dump({"preferred_skills": ["refactoring"], "avoided_skills": ["lean-plan"],
+                       "skill_success_rates": {"quick-test-runner": 0.9},
+                       "complexity_tolerance": "high", "domain_expertise": ["analysis"]}, f)
+
+        fast = SkillRecommender(data_dir=tmp, use_table=True)
+        full = SkillRecommender(data_dir=tmp, use_table=False)
+        prefs = full.user_patterns.load_preferences()
+        state = ProjectState(repository_age_days=800, has_tests=True, test_coverage_estimate="low",
+                             dependency_count=30, has_security_issues=False,
+                             documentation_quality="poor", recent_commits_count=3,
+                             complexity_indicators={"large_files": 9})
+
+        contexts = [
+            ContextAnalysis("coding", {".py", ".md"}, {}, "python", token_budget_remaining=20000),
+            ContextAnalysis("testing", {".v"}, {}, "formal_verification"),
+            ContextAnalysis("exploring", set(), {}, "unknown"),
+            ContextAnalysis("reviewing", {".go"}, {}, "go"),  # outside the table
+        ]
+        for context in contexts:
+            table_scores = {r.skill.name: r.confidence for r in fast._score_skills(context, state, prefs, 0.0)}
+            full_scores = {r.skill.name: r.confidence for r in full._score_skills(context, state, prefs, 0.0)}
+            assert table_scores.keys() == full_scores.keys()
+            for name, confidence in full_scores.items():
+                assert abs(table_scores[name] - confidence) < 0.01, (context.current_activity, name)
+
+        assert (Path(tmp) / "recommendation_table.json").exists()
+    print("[OK] test_recommendation_table passed")
+
+
+def test_incremental_scores():
+    """Test that only components whose inputs changed are recomputed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        recommender = SkillRecommender(data_dir=tmp, working_dir=tmp, warm_start=False)
+        scorer, utility = recommender.confidence_scorer, recommender.skill_utility
+        skills = recommender.skills_metadata.load_all_skills()
+        context = ContextAnalysis("coding", {".py"}, {}, "python")
+        state = ProjectState(repository_age_days=800, has_tests=True, test_coverage_estimate="low",
+                             dependency_count=30, has_security_issues=False,
+                             documentation_quality="poor", recent_commits_count=3)
+
+        def full_scores(ctx, prefs):
+            return {name: scorer.calculate_confidence(meta, ctx, state, prefs, utility.get_utility_score(name))
+                    for name, meta in skills.items()}
+
+        def score(ctx):
+            prefs = recommender.user_patterns.load_preferences()
+            recs = recommender._score_skills(ctx, state, prefs, 0.0)
+            return {r.skill.name: r.confidence for r in recs}, prefs, recs
+
+        score(context)  # first request: scored from scratch
+        score(context)  # primes the component scores
+        assert recommender.scores.recomputed["context"] == set(skills)
+        _, _, recs = score(context)
+        assert not any(recommender.scores.recomputed.values())
+        assert [r.confidence for r in recs] == sorted((r.confidence for r in recs), reverse=True)
+
+        recommender.user_patterns.record_feedback("dead-code-hunter", context, "success", rating=5)
+        scores, prefs, _ = score(context)
+        assert recommender.scores.recomputed["user"] == {"dead-code-hunter"}
+        assert not recommender.scores.recomputed["context"] and not recommender.scores.recomputed["project"]
+        assert all(abs(scores[n] - c) < 1e-9 for n, c in full_scores(context, prefs).items())
+
+        testing = ContextAnalysis("testing", {".py"}, {}, "python")
+        scores, prefs, _ = score(testing)
+        assert recommender.scores.recomputed["context"] == set(skills) and not recommender.scores.recomputed["user"]
+        assert all(abs(scores[n] - c) < 1e-9 for n, c in full_scores(testing, prefs).items())
+
+        high = [r.skill.name for r in recommender._score_skills(testing, state, prefs, 50.0)]
+        assert high == [n for n, c in sorted(scores.items(), key=lambda i: (-i[1], i[0])) if c >= 50.0]
+
+        # Concurrent requests (as recommend_async makes) each see scores for their own context
+        expected = {ctx.current_activity: full_scores(ctx, prefs) for ctx in (context, testing)}
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads often enough to interleave updates
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(lambda ctx: (ctx.current_activity, score(ctx)[0]),
+                                        [context, testing] * 50))
+        finally:
+            sys.setswitchinterval(interval)
+        for activity, scores in results:
+            assert all(abs(scores[n] - c) < 1e-9 for n, c in expected[activity].items())
+    print("[OK] test_incremental_scores passed")
+
+
+def test_warm_start_snapshot():
+    """Test restoring recommender state from the snapshot and its input guard."""
+    import os
+
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = UserPatternAnalyzer(data_dir=tmp)
+        prefs = analyzer.load_preferences()
+        prefs.preferred_skills = {"refactoring"}
+        analyzer.save_preferences(prefs)
+
+        context = ContextAnalysis("coding", {".py"}, {}, "python")
+        state = ProjectState(repository_age_days=10, has_tests=True, test_coverage_estimate="medium",
+                             dependency_count=5, has_security_issues=False,
+                             documentation_quality="good", recent_commits_count=3)
+
+        cold = SkillRecommender(data_dir=tmp, working_dir=tmp)
+        assert not cold.snapshot_restored
+        cold_scores = {r.skill.name: r.confidence
+                       for r in cold._score_skills(context, state, cold.user_patterns.load_preferences(), 0.0)}
+        # Written at interpreter exit, not on the request path
+        assert not cold.snapshot_path.exists()
+        _save_pending_snapshots()
+        assert cold.snapshot_path.exists()
+
+        warm = SkillRecommender(data_dir=tmp, working_dir=tmp)
+        assert warm.snapshot_restored and warm._table is not None
+        assert warm.user_patterns.load_preferences().preferred_skills == {"refactoring"}
+        warm_scores = {r.skill.name: r.confidence
+                       for r in warm._score_skills(context, state, warm.user_patterns.load_preferences(), 0.0)}
+        assert warm_scores == cold_scores
+
+        # Touching an input without changing it keeps the snapshot; editing it does not
+        os.utime(analyzer.preferences_file, None)
+        assert SkillRecommender(data_dir=tmp, working_dir=tmp).snapshot_restored
+        prefs.avoided_skills = {"lean-plan"}
+        analyzer.save_preferences(prefs)
+        assert not SkillRecommender(data_dir=tmp, working_dir=tmp).snapshot_restored
+
+        cold.snapshot_path.write_bytes(b"garbage")
+        assert not SkillRecommender(data_dir=tmp, working_dir=tmp).snapshot_restored
+        assert not SkillRecommender(data_dir=tmp, working_dir=tmp, warm_start=False).snapshot_restored
+
+        # Caches stay in a configured data directory; the default one keeps them out of the package
+        assert cold.cache_dir == Path(tmp)
+        saved = os.environ.get("XDG_CACHE_HOME")
+        os.environ["XDG_CACHE_HOME"] = str(Path(tmp) / "cache")
+        try:
+            default = SkillRecommender(working_dir=tmp, warm_start=False)
+        finally:
+            if saved is None:
+                os.environ.pop("XDG_CACHE_HOME", None)
+            else:
+                os.environ["XDG_CACHE_HOME"] = saved
+        assert default.cache_dir.parent == Path(tmp) / "cache" / "skill-recommendation-engine"
+        assert default.cache_dir.is_dir() and default.snapshot_path.parent == default.cache_dir
+    print("[OK] test_warm_start_snapshot passed")
+
+
 def run_all_tests():
     """Run all tests."""
     print("Running basic tests...")
@@ -119,12 +1483,38 @@ def run_all_tests():
 
     tests = [
         test_skill_metadata_loader,
+        test_skill_roots,
         test_context_analyzer,
+        test_parse_porcelain_v2,
+        test_git_index,
+        test_git_objects,
+        test_repository_context,
+        test_context_watcher,
+        test_context_watcher_inotify,
         test_project_analyzer,
+        test_gitignore_walk,
+        test_analysis_deadline,
+        test_sampling_estimators,
+        test_lockfile_counts,
+        test_coverage_artifacts,
+        test_monorepo_packages,
         test_user_patterns,
+        test_feedback_columns,
+        test_replay_evaluator,
+        test_next_skills,
+        test_context_fingerprints,
+        test_feedback_batch,
         test_skill_utility,
         test_confidence_scorer,
-        test_recommender
+        test_recommender,
+        test_async_api,
+        test_metrics_registry,
+        test_memory_profile,
+        test_select_within_budget,
+        test_recommend_within_budget,
+        test_recommendation_table,
+        test_incremental_scores,
+        test_warm_start_snapshot
     ]
 
     passed = 0
@@ -0,0 +1,42 @@
+"""
+Tests for the benchmark harness helpers.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow package imports
+parent_path = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_path))
+sys.path.insert(0, str(parent_path / "benchmarks"))
+
+from bench_recommender import percentile, compare_to_baseline
+
+
+def test_percentile():
+    """Test nearest-rank percentile."""
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+    print("[OK] test_percentile passed")
+
+
+def test_compare_to_baseline():
+    """Test regression detection against a baseline."""
+    baseline = {"cases": {"small": {"operations": {"recommend": {"p95_ms": 100.0}}}}}
+    fast = {"cases": {"small": {"operations": {"recommend": {"p95_ms": 110.0}}}}}
+    slow = {"cases": {"small": {"operations": {"recommend": {"p95_ms": 200.0}}}}}
+    new_case = {"cases": {"medium": {"operations": {"recommend": {"p95_ms": 999.0}}}}}
+
+    assert compare_to_baseline(fast, baseline, tolerance=0.25) == []
+    assert len(compare_to_baseline(slow, baseline, tolerance=0.25)) == 1
+    assert compare_to_baseline(new_case, baseline, tolerance=0.25) == []
+    print("[OK] test_compare_to_baseline passed")
+
+
+if __name__ == "__main__":
+    test_percentile()
+    test_compare_to_baseline()